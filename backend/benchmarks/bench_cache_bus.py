@@ -0,0 +1,145 @@
+# backend/benchmarks/bench_cache_bus.py
+#
+# Kullanıcı okuma cache'lerinin worker'lar arası tutarlılığı, karışık
+# okuma/yazma yükü altında. Her "worker" kendi CacheBus'ı ve cache'i olan
+# bağımsız bir düğümdür (ayrı origin, ayrı takip cursor'ı - process'ler
+# arasındakiyle aynı yol); okuma ve yazmalar rastgele worker'lara dağıtılır.
+# Yazma bir kullanıcının sürümünü artırır ve yazan worker'da invalidate()
+# çağırır. Okuma, o kullanıcı için daha yeni bir sürüm yazılmışken eski
+# sürümü döndürürse bayattır; bayatlık = okuma anı - yeni sürümün yazıldığı an.
+# İki mod karşılaştırılır: bus (geçersiz kılmalar yayılır) ve ttl (yalnızca
+# yazan worker'da atılır, diğerleri TTL'e kalır).
+# MONGO_URL/DB_NAME gerçek bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_cache_bus.py --workers 4 --users 2000 --duration 20 --write-ratio 0.05
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+from cache_bus import CacheBus  # noqa: E402
+
+MODES = ("bus", "ttl")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_mode(db, mode: str, args) -> dict:
+    users = db.bench_cache_users
+    events = db.bench_cache_invalidations
+    await users.drop()
+    await events.drop()
+    await users.insert_many([{"_id": f"user-{i}", "version": 0} for i in range(args.users)])
+
+    buses = [CacheBus(db, collection=events.name, flush_ms=args.flush_ms) for _ in range(args.workers)]
+    caches = [bus.cache("profile", ttl=args.ttl) for bus in buses]
+    if mode == "bus":
+        for bus in buses:
+            bus.start()
+        for bus in buses:
+            await bus.log.wait_ready(30)
+
+    async def load(user_id):
+        return await users.find_one({"_id": user_id}, projection={"version": 1})
+
+    # user_id → {sürüm: yazıldığı an}; okunan sürümden sonraki yazma bayatlığın başlangıcı
+    written = {f"user-{i}": {0: 0.0} for i in range(args.users)}
+    latest = {user_id: 0 for user_id in written}
+    staleness_ms = []
+    reads = writes = db_reads = 0
+    deadline = time.perf_counter() + args.duration
+    rng = random.Random(args.seed)
+
+    async def client():
+        nonlocal reads, writes, db_reads
+        while time.perf_counter() < deadline:
+            # Cache isabeti I/O yapmaz; gerçek sunucuda her istek soket I/O'suyla event loop'a döner
+            await asyncio.sleep(0)
+            worker = rng.randrange(args.workers)
+            # Zipf benzeri dağılım: küçük bir kullanıcı grubu trafiğin çoğunu alır
+            user_id = f"user-{min(int(rng.paretovariate(1.2)) - 1, args.users - 1)}"
+            if rng.random() < args.write_ratio:
+                doc = await users.find_one_and_update(
+                    {"_id": user_id}, {"$inc": {"version": 1}},
+                    projection={"version": 1}, return_document=ReturnDocument.AFTER)
+                written[user_id][doc["version"]] = time.perf_counter()
+                latest[user_id] = max(latest[user_id], doc["version"])
+                buses[worker].invalidate(user_id, "profile")
+                writes += 1
+            else:
+                misses = caches[worker].misses
+                doc = await caches[worker].get_or_load(user_id, load)
+                db_reads += caches[worker].misses - misses
+                reads += 1
+                newer = written[user_id].get(doc["version"] + 1)
+                if newer is not None:
+                    staleness_ms.append((time.perf_counter() - newer) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    for bus in buses:
+        await bus.stop()
+    hits = sum(cache.hits for cache in caches)
+    lookups = hits + sum(cache.misses for cache in caches)
+    await users.drop()
+    await events.drop()
+    return {
+        "reads": reads, "writes": writes, "ops_per_s": (reads + writes) / elapsed,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "db_reads": db_reads,
+        "stale_reads": len(staleness_ms),
+        "stale_p50": percentile(staleness_ms, 50), "stale_p99": percentile(staleness_ms, 99),
+        "stale_max": max(staleness_ms, default=0.0),
+        "bus_lag_max": max(bus.log.max_lag_ms for bus in buses),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=20, help="mod başına saniye")
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=32, help="eşzamanlı istemci")
+    parser.add_argument("--ttl", type=float, default=30)
+    parser.add_argument("--flush-ms", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    print(f"🏁 {args.workers} worker, {args.users} kullanıcı, %{args.write_ratio * 100:.0f} yazma, "
+          f"{args.duration:.0f}s/mod, TTL {args.ttl:.0f}s, flush {args.flush_ms}ms")
+    print(f"{'mod':<5} {'işlem/s':>9} {'isabet':>7} {'db okuma':>9} {'bayat okuma':>12} "
+          f"{'bayatlık p50':>13} {'p99':>9} {'maks':>9} {'takip maks':>11}")
+    try:
+        for mode in args.modes.split(","):
+            r = await run_mode(db, mode, args)
+            stale_share = r["stale_reads"] / r["reads"] if r["reads"] else 0.0
+            print(f"{mode:<5} {r['ops_per_s']:>9,.0f} {r['hit_rate']:>7.1%} {r['db_reads']:>9,} "
+                  f"{r['stale_reads']:>6,} ({stale_share:.2%}) {r['stale_p50']:>10.1f}ms {r['stale_p99']:>7.1f}ms "
+                  f"{r['stale_max']:>7.1f}ms {r['bus_lag_max']:>9.1f}ms")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
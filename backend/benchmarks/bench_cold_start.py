@@ -0,0 +1,157 @@
+# backend/benchmarks/bench_cold_start.py
+#
+# Soğuk başlangıç: uvicorn process'i her çalıştırmada sıfırdan başlatılır,
+# process'in açılmasından ilk başarılı isteğe kadar geçen süre ölçülür.
+# Ardından ilk login (bcrypt + UA çözümleme + jwt) ve ilk /auth/me (jwt
+# doğrulama) - tembel yüklenen modüllerin maliyeti bu isteklere düşer ya da
+# STARTUP_WARMUP ile arka planda ödenir. Her çalıştırmanın sonunda
+# /api/auth/debug-startup'tan fazlar (import, modül bölümleri, lifespan
+# adımları) okunur ve medyanları basılır (DEBUG_ENDPOINTS=1 ile, bench
+# kullanıcısı admin yapılır).
+#
+# Modlar:
+#   warm          index şema sürümü kayıtlı (normal yeniden başlatma)
+#   cold-indexes  her çalıştırmadan önce schema_meta silinir (ilk deploy / INDEXES değişti)
+#   no-warmup     STARTUP_WARMUP=0: tembel modülleri ilk kullanan istek yükler
+#
+# MONGO_URL/DB_NAME gerçek bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_cold_start.py --runs 5 --modes warm,cold-indexes,no-warmup
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+MODES = ("warm", "cold-indexes", "no-warmup")
+# Veritabanına dokunmayan, her zaman 200 dönen endpoint
+PROBE_PATH = "/api/auth/test-refresh"
+
+
+async def wait_for_first_success(http: httpx.AsyncClient, proc: subprocess.Popen, timeout: float) -> float:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn çıktı (kod {proc.returncode})")
+        try:
+            if (await http.get(PROBE_PATH)).status_code == 200:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.005)
+    raise TimeoutError(f"{timeout}s içinde yanıt yok")
+
+
+async def run_once(args, mode: str, db, credentials: dict) -> dict:
+    if mode == "cold-indexes":
+        await db.schema_meta.delete_one({"_id": "indexes"})
+    env = {**os.environ, "STARTUP_WARMUP": "0" if mode == "no-warmup" else "1", "DEBUG_ENDPOINTS": "1"}
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as http:
+            first_ok = await wait_for_first_success(http, proc, args.timeout)
+
+            # Login IP başına rate limit'li: her çalıştırma farklı bir adres
+            headers = {"X-Forwarded-For": f"10.77.{credentials['runs'] // 250}.{credentials['runs'] % 250 + 1}"}
+            credentials["runs"] += 1
+            t = time.perf_counter()
+            login = await http.post("/api/auth/login", headers=headers,
+                                    json={"email": credentials["email"], "password": credentials["password"]})
+            login_ms = (time.perf_counter() - t) * 1000
+            login.raise_for_status()
+
+            auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            t = time.perf_counter()
+            me = await http.get("/api/auth/me", headers=auth)
+            me_ms = (time.perf_counter() - t) * 1000
+            me.raise_for_status()
+
+            report = await http.get("/api/auth/debug-startup", headers=auth)
+            report.raise_for_status()
+            report = report.json()
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    return {
+        "first_ok_ms": (first_ok - started) * 1000,
+        "login_ms": login_ms,
+        "me_ms": me_ms,
+        "ready_ms": report["ready_ms"],
+        "phases": {p["name"]: p["ms"] for p in report["phases"]},
+        "lazy": report["lazy_modules"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="mod başına process başlatma")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    credentials = {"email": f"bench-cold-{uuid.uuid4().hex[:8]}@example.com", "password": "bench-password", "runs": 0}
+
+    # Kullanıcı bir kez, ayrı bir process'te (ölçülmez) kaydedilir
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "server:app", "--port", str(args.port),
+                             "--log-level", "warning"], cwd=BACKEND_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30) as http:
+            await wait_for_first_success(http, proc, args.timeout)
+            (await http.post("/api/auth/register", headers={"X-Forwarded-For": "10.78.0.1"},
+                             json={"email": credentials["email"], "password": credentials["password"]})).raise_for_status()
+        await db.users.update_one({"email": credentials["email"]}, {"$set": {"role": "admin"}})
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(f"🏁 {args.runs} başlatma/mod, ilk başarılı istek: GET {PROBE_PATH}")
+    print(f"{'mod':<13} {'ilk 200':>9} {'hazır':>8} {'ilk login':>10} {'ilk /me':>8}   yavaş fazlar (medyan)")
+    try:
+        for mode in args.modes.split(","):
+            runs = [await run_once(args, mode, db, credentials) for _ in range(args.runs)]
+            median = lambda key: statistics.median(r[key] for r in runs)  # noqa: E731
+            phases = {name: statistics.median(r["phases"].get(name, 0.0) for r in runs) for name in runs[0]["phases"]}
+            slowest = sorted(phases.items(), key=lambda p: -p[1])[:4]
+            print(f"{mode:<13} {median('first_ok_ms'):>7.0f}ms {median('ready_ms'):>6.0f}ms "
+                  f"{median('login_ms'):>8.0f}ms {median('me_ms'):>6.0f}ms   "
+                  + ", ".join(f"{name} {ms:.0f}ms" for name, ms in slowest))
+            lazy = runs[-1]["lazy"]
+            if lazy:
+                print(" " * 14 + "tembel: " + ", ".join(
+                    f"{name} {info['ms']:.0f}ms{' (startup)' if info['during_startup'] else ''}"
+                    for name, info in lazy.items()))
+    finally:
+        user = await db.users.find_one_and_delete({"email": credentials["email"]})
+        if user:
+            await db.refresh_tokens.delete_many({"user_id": user["_id"]})
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+# backend/benchmarks/bench_geoip.py
+#
+# GeoIP arama hızı: sentetik aralık tablosu (varsayılan 400k IPv4 + 100k IPv6
+# aralık, gerçek ülke/şehir veritabanları boyutunda) yazılır, mmap ile açılır ve
+#   - tamsayı anahtarla tekil IPv4/IPv6 arama (bisect),
+#   - string'den uçtan uca locate() (ayrıştırma + özel ağ kontrolü + arama),
+#   - numpy ile toplu IPv4 arama
+# ölçülür. Hedef: saniyede 1M+ arama.
+#
+#   python benchmarks/bench_geoip.py --lookups 1000000
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from geoip import GeoIPResolver, RangeTable, write_range_file  # noqa: E402
+
+
+def synthetic_ranges(v4: int, v6: int, locations: int, rng: random.Random):
+    def ipv4(n):
+        return f"{n >> 24}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+    def ipv6(n):
+        return ":".join(f"{(n >> shift) & 0xFFFF:x}" for shift in range(112, -1, -16))
+
+    points = sorted(rng.sample(range(1 << 32), 2 * v4))
+    for i in range(0, len(points), 2):
+        yield ipv4(points[i]), ipv4(points[i + 1]), f"Şehir {rng.randrange(locations)}"
+    # IPv6: /32 blokları içinde /48 aralıklar
+    base = 0x2A00 << 112
+    for i in range(v6):
+        start = base + (i << 80)
+        yield ipv6(start), ipv6(start + (1 << 80) - 1), f"Şehir {rng.randrange(locations)}"
+
+
+def report(name: str, count: int, elapsed: float):
+    print(f"  {name:<30} {count / elapsed:>14,.0f} arama/s   {elapsed / count * 1e9:>8.0f} ns/arama")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ipv4-ranges", type=int, default=400000)
+    parser.add_argument("--ipv6-ranges", type=int, default=100000)
+    parser.add_argument("--locations", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=1000000)
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "geoip.bin"
+        started = time.perf_counter()
+        summary = write_range_file(path, synthetic_ranges(args.ipv4_ranges, args.ipv6_ranges, args.locations, rng))
+        print(f"🏗️  {summary['ipv4_ranges']:,} IPv4 + {summary['ipv6_ranges']:,} IPv6 aralık, "
+              f"{path.stat().st_size / 1e6:.1f} MB, {time.perf_counter() - started:.1f}s'de yazıldı")
+
+        started = time.perf_counter()
+        geo = GeoIPResolver(path, reload_interval=0)
+        print(f"📂 mmap ile açılış: {(time.perf_counter() - started) * 1000:.2f} ms")
+        table = geo._table
+
+        ips = [rng.randrange(1 << 32) for _ in range(args.lookups)]
+        print("📊 Tekil arama")
+        lookup_v4 = table.lookup_v4
+        started = time.perf_counter()
+        for ip in ips:
+            lookup_v4(ip)
+        report("IPv4 (tamsayı, bisect)", len(ips), time.perf_counter() - started)
+
+        keys6 = [((0x2A00 << 48) + (rng.randrange(args.ipv6_ranges + 100) << 16), rng.randrange(1 << 64))
+                 for _ in range(args.lookups // 4)]
+        lookup_v6 = table.lookup_v6
+        started = time.perf_counter()
+        for hi, lo in keys6:
+            lookup_v6(hi, lo)
+        report("IPv6 (tamsayı, bisect)", len(keys6), time.perf_counter() - started)
+
+        texts = [f"{ip >> 24}.{(ip >> 16) & 255}.{(ip >> 8) & 255}.{ip & 255}" for ip in ips]
+        locate = geo.locate
+        started = time.perf_counter()
+        for text in texts:
+            locate(text)
+        report("locate(str) uçtan uca", len(texts), time.perf_counter() - started)
+
+        print("📊 Toplu arama (numpy searchsorted)")
+        batch = np.array(ips, dtype=np.uint32)
+        started = time.perf_counter()
+        found = table.lookup_many_v4(batch)
+        report("IPv4 toplu", len(batch), time.perf_counter() - started)
+
+        # Doğruluk: toplu ve tekil arama aynı sonucu vermeli
+        sample = rng.sample(range(len(ips)), 20000)
+        mismatches = sum(
+            (table.names[found[i]] if found[i] >= 0 else None) != lookup_v4(ips[i]) for i in sample
+        )
+        print(f"{'✅' if not mismatches else '❌'} Toplu/tekil uyuşmazlık: {mismatches} (20.000 örnek), "
+              f"isabet oranı {(found >= 0).mean() * 100:.0f}%")
+
+        # Sıcak değiştirme: yeni dosya os.replace ile taşınır, izleyici yeni tabloyu açar
+        write_range_file(path, [("1.0.0.0", "1.0.0.255", "Yeni")])
+        started = time.perf_counter()
+        geo.maybe_reload()
+        print(f"🔁 Sıcak değiştirme: {(time.perf_counter() - started) * 1000:.2f} ms → "
+              f"1.0.0.1 = {geo.locate('1.0.0.1')}")
+        del table, lookup_v4, lookup_v6
+        assert isinstance(geo._table, RangeTable)
+
+
+if __name__ == "__main__":
+    main()
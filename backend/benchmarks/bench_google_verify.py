@@ -0,0 +1,137 @@
+# backend/benchmarks/bench_google_verify.py
+#
+# Google ID token doğrulayıcısını tamamen offline test eder ve ölçer:
+# yerel bir JWKS sunucusu (Cache-Control: max-age) + yerelde üretilen RS256
+# token'lar. Önce doğruluk kontrolleri, sonra saniyede doğrulama sayısı.
+#
+#   python benchmarks/bench_google_verify.py --tokens 5000 --concurrency 64
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from google_auth import GoogleIdTokenVerifier  # noqa: E402
+
+CLIENT_ID = "bench-client.apps.googleusercontent.com"
+
+
+class JwksState:
+    def __init__(self):
+        self.private_keys = {}
+        self.requests = 0
+
+    def add_key(self, kid):
+        self.private_keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def jwks(self):
+        keys = []
+        for kid, private_key in self.private_keys.items():
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+            jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+
+def start_jwks_server(state: JwksState):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state.requests += 1
+            body = json.dumps(state.jwks()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", "public, max-age=19800, must-revalidate, no-transform")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f"http://127.0.0.1:{httpd.server_address[1]}/certs"
+
+
+def mint(state: JwksState, kid: str, email: str, audience: str = CLIENT_ID, exp_offset: int = 3600):
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": audience,
+        "sub": email,
+        "email": email,
+        "email_verified": True,
+        "iat": now,
+        "exp": now + exp_offset,
+    }
+    return jwt.encode(payload, state.private_keys[kid], algorithm="RS256", headers={"kid": kid})
+
+
+async def expect_rejected(verifier, token, reason):
+    try:
+        await verifier.verify(token)
+    except ValueError:
+        print(f"  ✅ reddedildi: {reason}")
+        return
+    raise AssertionError(f"kabul edilmemeliydi: {reason}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    state = JwksState()
+    state.add_key("key-1")
+    httpd, url = start_jwks_server(state)
+    verifier = GoogleIdTokenVerifier(CLIENT_ID, certs_url=url, workers=args.workers)
+
+    print("🔍 Doğruluk kontrolleri")
+    payload = await verifier.verify(mint(state, "key-1", "a@example.com"))
+    assert payload["email"] == "a@example.com"
+    print("  ✅ geçerli token doğrulandı")
+    await expect_rejected(verifier, mint(state, "key-1", "a@example.com", audience="other"), "yanlış audience")
+    await expect_rejected(verifier, mint(state, "key-1", "a@example.com", exp_offset=-10), "süresi dolmuş")
+    forged = mint(state, "key-1", "a@example.com")
+    await expect_rejected(verifier, forged[:-4] + ("AAAA" if not forged.endswith("AAAA") else "BBBB"), "bozuk imza")
+
+    # Anahtar rotasyonu: yeni kid ilk görüldüğünde JWKS yeniden çekilir
+    state.add_key("key-2")
+    verifier._last_fetch -= 120
+    await verifier.verify(mint(state, "key-2", "b@example.com"))
+    print(f"  ✅ yeni kid sonrası JWKS yenilendi (fetch sayısı: {verifier.fetches})")
+
+    tokens = [mint(state, "key-1" if i % 2 else "key-2", f"user{i}@example.com") for i in range(args.tokens)]
+    fetches_before = state.requests
+    queue = asyncio.Queue()
+    for token in tokens:
+        queue.put_nowait(token)
+
+    async def worker():
+        while not queue.empty():
+            await verifier.verify(queue.get_nowait())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    print(f"🏁 {args.tokens} doğrulama, {args.concurrency} eşzamanlı, {args.workers} worker thread")
+    print(f"📊 {args.tokens / elapsed:,.0f} doğrulama/s  ({elapsed / args.tokens * 1e6:.0f} µs/op)")
+    print(f"📊 Ölçüm sırasında JWKS fetch: {state.requests - fetches_before} (cache: {verifier.stats()})")
+
+    await verifier.stop()
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+# backend/benchmarks/bench_janitor_soak.py
+#
+# Janitor soak testi: --backlog (varsayılan 5M) silinecek token (süresi dolmuş,
+# 90 günden eski, uzun süredir inaktif karışık) ve --live canlı token ayrı bir
+# koleksiyona yazılır. Sabit hızlı bir yazma yükü (yeni token insert +
+# last_used_at update, login/refresh'in yazma şekli) önce janitor'suz
+# (--baseline-s), sonra temizlik sürerken çalışır. --interval saniyelik
+# dilimlerde yazma gecikmesi p50/p99/maks ve saniyede silinen doküman basılır;
+# sonunda janitor öncesi / sırası karşılaştırması.
+#
+# Modlar:
+#   janitor      TokenJanitor (index'li kural pencereleri, hız tavanı, geri çekilme)
+#   delete-many  tek bir sınırsız delete_many (eski startup temizliğinin / TTL dalgasının şekli)
+#
+# MONGO_URL/DB_NAME gerçek bir mongod'u (tercihen replica set) göstermeli.
+#
+#   python benchmarks/bench_janitor_soak.py --backlog 5000000 --live 200000 --rate 2000
+#   python benchmarks/bench_janitor_soak.py --mode delete-many --reuse
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+from token_janitor import TokenJanitor, garbage_filter  # noqa: E402
+
+COLLECTION = "bench_janitor_tokens"
+STATE_COLLECTION = "bench_janitor_state"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def token_doc(rng: random.Random, now: datetime, garbage: bool, created: datetime, seq: int = None) -> dict:
+    # Seed'de _id oluşturulma zamanından: _id sırası gerçek koleksiyondaki gibi zaman sırası
+    _id = ObjectId() if seq is None else ObjectId(int(created.replace(tzinfo=timezone.utc).timestamp()).to_bytes(4, "big")
+                                                  + seq.to_bytes(8, "big"))
+    doc = {"_id": _id, "user_id": f"user-{rng.randrange(100000)}",
+           "token": os.urandom(32), "created_at": created, "ip_address": "85.1.2.3",
+           "device_info": "Chrome 124 on Windows", "user_agent": "Mozilla/5.0 " + "x" * 100}
+    if not garbage:
+        return {**doc, "is_active": True, "last_used_at": now, "expires_at": now + timedelta(days=7)}
+    kind = rng.random()
+    if kind < 0.7:  # süresi dolmuş
+        return {**doc, "is_active": rng.random() < 0.5, "last_used_at": created, "expires_at": now - timedelta(hours=1)}
+    if kind < 0.9:  # rotate / logout edilmiş, süresi dolmuş
+        return {**doc, "is_active": False, "last_used_at": now - timedelta(days=2), "expires_at": now - timedelta(days=1)}
+    return {**doc, "is_active": True, "last_used_at": created, "expires_at": now + timedelta(days=300)}  # >90 gün
+
+
+async def seed(collection, backlog: int, live: int):
+    await collection.drop()
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    total = backlog + live
+    started = time.perf_counter()
+    for offset in range(0, total, 10000):
+        batch = []
+        for i in range(offset, min(offset + 10000, total)):
+            # _id sırası zaman sırası: çöp çoğunlukla eski ucta, canlılar araya serpiştirilmiş
+            created = now - timedelta(days=120) + timedelta(seconds=i * 120 * 86400 / total)
+            batch.append(token_doc(rng, now, rng.random() < backlog / total, created, seq=i))
+        await collection.insert_many(batch, ordered=False)
+        if (offset // 10000) % 50 == 0:
+            print(f"  ↳ {offset + len(batch):,}/{total:,} ({(offset + len(batch)) / (time.perf_counter() - started):,.0f}/s)")
+    await collection.create_index([("user_id", 1)])
+    # Janitor'ın kural sorguları için (TOKEN_JANITOR=1 iken mongo_indexes.py'deki gibi)
+    await collection.create_index([("expires_at", 1)])
+    await collection.create_index([("created_at", 1)])
+
+
+async def write_load(collection, rate: float, samples: list, inserts: list, stop: asyncio.Event, clients: int = 16):
+    """Saniyede `rate` yazma: yarısı insert, yarısı canlı bir token'a update; (an, gecikme ms)"""
+    rng = random.Random(11)
+    interval = clients / rate
+    live_ids = [d["_id"] for d in await collection.find({"is_active": True, "expires_at": {"$gt": datetime.utcnow()}},
+                                                         projection={"_id": 1}).limit(20000).to_list(20000)]
+
+    async def client():
+        next_at = time.perf_counter()
+        while not stop.is_set():
+            now = datetime.utcnow()
+            started = time.perf_counter()
+            if rng.random() < 0.5 or not live_ids:
+                await collection.insert_one(token_doc(rng, now, False, now))
+                inserts[0] += 1
+            else:
+                await collection.update_one({"_id": rng.choice(live_ids)}, {"$set": {"last_used_at": now}})
+            samples.append((started, (time.perf_counter() - started) * 1000))
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backlog", type=int, default=5_000_000)
+    parser.add_argument("--live", type=int, default=200_000)
+    parser.add_argument("--reuse", action="store_true", help="koleksiyon zaten doluysa yeniden yazma")
+    parser.add_argument("--mode", choices=("janitor", "delete-many"), default="janitor")
+    parser.add_argument("--rate", type=float, default=2000, help="janitor hız tavanı (silme/s)")
+    parser.add_argument("--write-rate", type=float, default=200, help="arka plan yazma/s")
+    parser.add_argument("--baseline-s", type=float, default=30)
+    parser.add_argument("--interval", type=float, default=5)
+    parser.add_argument("--max-duration", type=float, default=3600, help="temizlik en fazla bu kadar izlenir")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    collection = db[COLLECTION]
+    if not args.reuse or await collection.estimated_document_count() == 0:
+        print(f"🏗️  {args.backlog:,} silinecek + {args.live:,} canlı token yazılıyor")
+        await seed(collection, args.backlog, args.live)
+    await db[STATE_COLLECTION].drop()
+    garbage = await collection.count_documents(garbage_filter(datetime.utcnow()))
+    print(f"📊 {await collection.estimated_document_count():,} doküman, {garbage:,} silinecek")
+
+    samples, inserts, stop = [], [0], asyncio.Event()
+    load = asyncio.create_task(write_load(collection, args.write_rate, samples, inserts, stop))
+    await asyncio.sleep(args.baseline_s)
+
+    janitor = TokenJanitor(db, collection=COLLECTION, state_collection=STATE_COLLECTION, max_rate=args.rate)
+    cleanup_started = time.perf_counter()
+    if args.mode == "janitor":
+        cleanup = asyncio.create_task(janitor.run_pass())
+    else:
+        cleanup = asyncio.create_task(collection.delete_many(garbage_filter(datetime.utcnow())))
+
+    def row(label, latencies, removed_per_s, batch):
+        print(f"{label:>7} {len(latencies):>6} {percentile(latencies, 50):>6.1f}ms {percentile(latencies, 99):>6.1f}ms "
+              f"{max(latencies, default=0):>6.1f}ms {removed_per_s:>10,.0f} {batch:>6}  ", end="")
+
+    print(f"{'dilim':>7} {'yazma':>6} {'p50':>8} {'p99':>8} {'maks':>8} {'silinen/s':>10} {'batch':>6}  durum")
+    baseline = [ms for at, ms in samples if at < cleanup_started]
+    row("önce", baseline, 0, "-")
+    print("janitor'suz")
+    during = []
+    last_count, last_inserts = await collection.estimated_document_count(), inserts[0]
+    bucket_start = cleanup_started
+    while True:
+        done = cleanup.done() or time.perf_counter() - cleanup_started > args.max_duration
+        await asyncio.sleep(max(0.0, bucket_start + args.interval - time.perf_counter()))
+        bucket_end = time.perf_counter()
+        latencies = [ms for at, ms in samples if bucket_start <= at < bucket_end]
+        during.extend(latencies)
+        count = await collection.estimated_document_count()
+        # Yazma yükü de insert ediyor: silinen = sayım farkı + bu dilimdeki insert'ler
+        removed = max(0, last_count - count + inserts[0] - last_inserts)
+        last_count, last_inserts = count, inserts[0]
+        row(f"{bucket_end - cleanup_started:.0f}s", latencies, removed / (bucket_end - bucket_start),
+            janitor.delete_batch if args.mode == "janitor" else "-")
+        print((janitor.paused_reason or "temizlik") if args.mode == "janitor" else "delete_many")
+        bucket_start = bucket_end
+        if done:
+            break
+
+    elapsed = time.perf_counter() - cleanup_started
+    stop.set()
+    await load
+    if not cleanup.done():
+        cleanup.cancel()
+    left = await collection.count_documents(garbage_filter(datetime.utcnow()))
+    print(f"\n🧹 {garbage - left:,} silindi, {left:,} kaldı, {elapsed:,.0f}s ({(garbage - left) / elapsed:,.0f}/s)")
+    print(f"⏱️  yazma p50/p99/maks janitor'suz: {percentile(baseline, 50):.1f}/{percentile(baseline, 99):.1f}/"
+          f"{max(baseline, default=0):.1f}ms  temizlik sırasında: {percentile(during, 50):.1f}/"
+          f"{percentile(during, 99):.1f}/{max(during, default=0):.1f}ms")
+    if args.mode == "janitor":
+        stats = janitor.stats()
+        print(f"⏸️  geri çekilme: {stats['pauses']} ({stats['paused_seconds']:.0f}s), "
+              f"replikasyon gecikmesi: {stats['replication_lag_s'] if stats['replication_lag_s'] is not None else 'izlenmiyor'}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+# backend/benchmarks/bench_logging.py
+#
+# Refresh başına loglama maliyeti: eski handler'ın ~22 print satırı ile yeni
+# kuyruklu logger'ın karşılaştırması. stdout gerçek bir pipe'a yönlendirilir
+# (container log sürücüsü gibi) ve arka planda okunur; sonuçlar stderr'e yazılır.
+#
+#   python benchmarks/bench_logging.py --refreshes 20000
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import log_config  # noqa: E402
+
+
+def legacy_refresh_prints(token: str, user_id: str):
+    """Eski /auth/refresh handler'ının mutlu yolda bastığı satırlar"""
+    now = datetime.utcnow()
+    print("\n" + "=" * 60)
+    print("🔄 /api/auth/refresh ÇAĞRILDI")
+    print(f"📅 Zaman: {now}")
+    print(f"📨 Authorization header (ilk 50 karakter): Bearer {token}"[:80])
+    print(f"🔑 Alınan refresh token (ilk 20 karakter): {token[:20]}")
+    print(f"🔑 Token uzunluğu: {len(token)} karakter")
+    print("📊 MongoDB'de token var mı (aktif olmasa bile): EVET")
+    print(f"📊 Token detayları: is_active=True, user_id={user_id}")
+    print("✅ Token BULUNDU!")
+    print(f"   👤 user_id: {user_id}")
+    print("   ✅ is_active: True")
+    print(f"   📅 created_at: {now}")
+    print(f"   🆔 jti: {token[:10]}...")
+    print(f"   ⏰ Token süresi: {now}")
+    print(f"   ⏰ Şu an: {now}")
+    print(f"   ⏰ Kalan süre: {167.9:.1f} saat")
+    print("   🔄 Rotation sayısı: 0")
+    print("   ✅ Kullanıcı bulundu: email=user@example.com")
+    print("   ✅ Yeni access token oluşturuldu (ilk 30 karakter): eyJhbGciOiJIUzI1NiIsInR5cCI6Ik...")
+    print(f"   🔄 Yeni refresh token oluşturuldu: {token[:12]}...")
+    print("   📱 User-Agent: Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)")
+    print("   🌐 IP Address: 127.0.0.1")
+    print("   🔄 Eski token inaktif yapıldı. Güncellenen: 1")
+    print("   💾 Yeni token kaydedildi. ID: 6650f0c2e4b0a1b2c3d4e5f6")
+    print("✅ REFRESH BAŞARILI!")
+    print("=" * 60 + "\n")
+
+
+def new_refresh_logs(logger, user_id: str):
+    """Yeni handler'ın mutlu yoldaki loglaması"""
+    logger.debug("✅ Refresh başarılı", extra={"user_id": user_id})
+
+
+def redirect_stdout_to_pipe():
+    read_fd, write_fd = os.pipe()
+    saved = os.dup(1)
+    os.dup2(write_fd, 1)
+    os.close(write_fd)
+    sys.stdout = os.fdopen(1, "w", buffering=1, closefd=False)
+
+    def drain():
+        while os.read(read_fd, 65536):
+            pass
+
+    threading.Thread(target=drain, daemon=True).start()
+    return saved
+
+
+def report(name, elapsed, refreshes):
+    per_call = elapsed / refreshes
+    print(f"{name:<28} {per_call * 1e6:>8.1f} µs/refresh  → loglama tek başına en fazla "
+          f"{1 / per_call:>10,.0f} refresh/s", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refreshes", type=int, default=20000)
+    args = parser.parse_args()
+
+    redirect_stdout_to_pipe()
+    tokens = [(str(uuid.uuid4()), str(uuid.uuid4())) for _ in range(1000)]
+
+    started = time.perf_counter()
+    for i in range(args.refreshes):
+        legacy_refresh_prints(*tokens[i % len(tokens)])
+    report("print (eski)", time.perf_counter() - started, args.refreshes)
+
+    log_config.setup_logging()
+    root = logging.getLogger("healthlex")
+    logger = logging.getLogger("healthlex.auth.refresh")
+    sampler = root.handlers[0].filters[0]
+
+    for level, sampling, name in (
+        (logging.INFO, {}, "logger, INFO (debug kapalı)"),
+        (logging.DEBUG, {"healthlex.auth.refresh": 0.1}, "logger, DEBUG %10 örnekleme"),
+        (logging.DEBUG, {}, "logger, DEBUG tümü"),
+    ):
+        root.setLevel(level)
+        sampler.rates, sampler._cache = sampling, {}
+        dropped_before = log_config.dropped_records()
+        started = time.perf_counter()
+        for i in range(args.refreshes):
+            new_refresh_logs(logger, tokens[i % len(tokens)][1])
+        report(name, time.perf_counter() - started, args.refreshes)
+        dropped = log_config.dropped_records() - dropped_before
+        if dropped:
+            print(f"{'':<28} (kuyruk dolu: {dropped} kayıt düşürüldü)", file=sys.stderr)
+
+    log_config.shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
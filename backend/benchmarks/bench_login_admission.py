@@ -0,0 +1,181 @@
+# backend/benchmarks/bench_login_admission.py
+#
+# Credential stuffing altında /auth/login: çok sayıda IP'den (her IP rate
+# limit'in altında kalır) sızdırılmış (e-posta, parola) listesi denenir.
+# Listede var olan hesaplar (--victims, parolaları listede yok) ve olmayan
+# e-postalar (--fake) karışık; liste küçük olduğu için çiftler tekrar eder.
+# Her mod için iki faz:
+#   saldırı        yalnızca saldırı: deneme/s, bcrypt/s, deneme başına process
+#                  CPU'su (bcrypt thread'leri dahil) ve 401 gecikmesi var olan /
+#                  olmayan e-postaya göre (zamanlama sızıntısı)
+#   saldırı+meşru  aynı saldırı sürerken --legit kullanıcı doğru parolayla
+#                  login olur: gecikme ve başarı oranı
+# Uygulama in-process (httpx ASGITransport) çalışır; MONGO_URL/DB_NAME gerçek
+# bir mongod'u göstermeli.
+#
+# Modlar:
+#   off        LOGIN_ADMISSION=0: her deneme find_one + bcrypt (eski davranış)
+#   admission  kilit + bilinen çift kontrolü bcrypt'ten önce, başarısızlar sabit sürede
+#
+#   python benchmarks/bench_login_admission.py --seconds 20 --attack-clients 64
+#   python benchmarks/bench_login_admission.py --modes admission --floor-ms 300
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import bcrypt
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+from login_admission import LOGIN_FAILURE_FLOOR_MS, LOGIN_FAILURE_MAX_MS, LoginAdmission  # noqa: E402
+
+MODES = ("off", "admission")
+LEGIT_PASSWORD = "legit-password-123"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def verify_stats() -> tuple:
+    verify = server.password_hasher.stats()["operations"]["verify"]
+    return verify["calls"], verify["total_seconds"]
+
+
+async def seed(prefix: str, victims: int, legit: int) -> tuple:
+    # Aynı parolaya aynı hash: binlerce bcrypt yerine iki tane
+    victim_hash = bcrypt.hashpw(uuid.uuid4().hex.encode(), bcrypt.gensalt()).decode()
+    legit_hash = bcrypt.hashpw(LEGIT_PASSWORD.encode(), bcrypt.gensalt()).decode()
+    users = [{"_id": str(uuid.uuid4()), "email": f"{prefix}-victim-{i}@example.com", "password": victim_hash}
+             for i in range(victims)]
+    users += [{"_id": str(uuid.uuid4()), "email": f"{prefix}-legit-{i}@example.com", "password": legit_hash}
+              for i in range(legit)]
+    for user in users:
+        user.update(name="", email_verified=True, role="user")
+    await server.db.users.insert_many(users)
+    return [u["email"] for u in users[:victims]], [u["email"] for u in users[victims:]], [u["_id"] for u in users]
+
+
+async def attacker(index: int, base: int, pairs: list, real: set, deadline: float, results: list):
+    """Her 5 istekte bir yeni "IP" - IP rate limit'i hiç tetiklenmez"""
+    rng = random.Random(index)
+    generation = 0
+    while time.perf_counter() < deadline:
+        generation += 1
+        ip = f"{base + generation // 250 % 10}.{index // 250}.{index % 250}.{generation % 250 + 1}"
+        transport = httpx.ASGITransport(app=server.app, client=(ip, 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as http:
+            for _ in range(5):
+                if time.perf_counter() >= deadline:
+                    break
+                email, password = rng.choice(pairs)
+                started = time.perf_counter()
+                res = await http.post("/api/auth/login", json={"email": email, "password": password})
+                results.append((email in real, res.status_code, (time.perf_counter() - started) * 1000))
+
+
+async def legit_user(index: int, base: int, email: str, deadline: float, latencies: list, failures: list):
+    generation = 0
+    while time.perf_counter() < deadline:
+        generation += 1
+        ip = f"{base + generation // 250 % 10}.250.{index % 250}.{generation % 250 + 1}"
+        transport = httpx.ASGITransport(app=server.app, client=(ip, 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as http:
+            for _ in range(5):
+                if time.perf_counter() >= deadline:
+                    break
+                started = time.perf_counter()
+                res = await http.post("/api/auth/login", json={"email": email, "password": LEGIT_PASSWORD})
+                latencies.append((time.perf_counter() - started) * 1000)
+                if res.status_code != 200:
+                    failures.append(res.status_code)
+                await asyncio.sleep(0.2)
+
+
+async def run_mode(args, mode: str, pairs: list, real: set, legit_emails: list):
+    # IP rate limit'i fazlar arasında da tetiklenmesin: her faz ayrı bir adres aralığı
+    base = 20 + 40 * MODES.index(mode)
+    server.login_admission = LoginAdmission(enabled=mode == "admission", failure_floor_ms=args.floor_ms,
+                                           failure_max_ms=args.max_ms)
+
+    # Faz 1: yalnızca saldırı
+    results = []
+    calls0, verify0 = verify_stats()
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    deadline = wall0 + args.seconds
+    await asyncio.gather(*(attacker(i, base, pairs, real, deadline, results) for i in range(args.attack_clients)))
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    calls, verify_seconds = verify_stats()
+    calls, verify_seconds = calls - calls0, verify_seconds - verify0
+
+    statuses = {}
+    for _, status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"\n⚔️  {mode}: {len(results):,} deneme, {len(results) / wall:,.0f}/s, bcrypt {calls:,} ({calls / wall:,.1f}/s), "
+          f"CPU {cpu / max(1, len(results)) * 1000:.2f}ms/deneme "
+          f"(bcrypt {verify_seconds / max(1, calls) * 1000:.0f}ms/çağrı), durum {dict(sorted(statuses.items()))}")
+    print(f"   {'yanıt':<22} {'adet':>7} {'p50':>8} {'p99':>8}")
+    for label, is_real, status in (("401 var olan e-posta", True, 401), ("401 olmayan e-posta", False, 401),
+                                   ("429 kilitli (var olan)", True, 429), ("429 kilitli (olmayan)", False, 429)):
+        latencies = [ms for r, s, ms in results if r is is_real and s == status]
+        if latencies:
+            print(f"   {label:<22} {len(latencies):>7,} {percentile(latencies, 50):>6.1f}ms {percentile(latencies, 99):>6.1f}ms")
+    if mode == "admission":
+        stats = server.login_admission.stats()
+        print(f"   bcrypt'siz ret: {stats['rejected']}, kilit {stats['locks']:,}, "
+              f"yanıt tabanı {stats['failure_floor_ms']}ms, bilinen çift nesilleri {stats['bad_pair_generations']}")
+
+    # Faz 2: saldırı sürerken meşru kullanıcılar
+    if not legit_emails:
+        return
+    results, latencies, failures = [], [], []
+    deadline = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        *(attacker(i, base + 20, pairs, real, deadline, results) for i in range(args.attack_clients)),
+        *(legit_user(i, base + 30, email, deadline, latencies, failures) for i, email in enumerate(legit_emails)),
+    )
+    print(f"👤 saldırı+meşru: {len(results) / args.seconds:,.0f} deneme/s; meşru login {len(latencies):,}, "
+          f"başarısız {len(failures)} {sorted(set(failures))}, p50 {percentile(latencies, 50):.0f}ms "
+          f"p99 {percentile(latencies, 99):.0f}ms maks {max(latencies, default=0):.0f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=20.0, help="faz başına")
+    parser.add_argument("--attack-clients", type=int, default=64)
+    parser.add_argument("--victims", type=int, default=200, help="listede var olan hesaplar")
+    parser.add_argument("--fake", type=int, default=200, help="listede olmayan e-postalar")
+    parser.add_argument("--passwords", type=int, default=5, help="hesap başına denenen sızdırılmış parola")
+    parser.add_argument("--legit", type=int, default=4, help="saldırı sırasında login olan kullanıcı")
+    parser.add_argument("--floor-ms", type=float, default=LOGIN_FAILURE_FLOOR_MS)
+    parser.add_argument("--max-ms", type=float, default=LOGIN_FAILURE_MAX_MS)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+
+    prefix = f"bench-stuffing-{uuid.uuid4().hex[:8]}"
+    victims, legit_emails, user_ids = await seed(prefix, args.victims, args.legit)
+    fakes = [f"{prefix}-nobody-{i}@example.com" for i in range(args.fake)]
+    leaked = [f"Summer20{i:02d}!" for i in range(args.passwords)]
+    pairs = [(email, password) for email in victims + fakes for password in leaked]
+    print(f"🏁 {len(pairs):,} çiftlik liste ({args.victims} var olan, {args.fake} olmayan e-posta × {args.passwords} parola), "
+          f"{args.attack_clients} saldırgan, {args.legit} meşru kullanıcı, faz başına {args.seconds:.0f}s, "
+          f"bcrypt pool {server.password_hasher.workers} worker")
+    try:
+        for mode in args.modes.split(","):
+            await run_mode(args, mode, pairs, set(victims), legit_emails)
+    finally:
+        await server.db.users.delete_many({"_id": {"$in": user_ids}})
+        await server.db.refresh_tokens.delete_many({"user_id": {"$in": user_ids}})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
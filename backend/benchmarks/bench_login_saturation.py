@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_login_saturation.py
+#
+# /auth/login doyuma ulaşmışken /auth/me gecikmesini (p50/p95/p99) ölçer.
+# Uygulama in-process (httpx ASGITransport) çalışır; MONGO_URL/DB_NAME gerçek
+# bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_login_saturation.py --seconds 10 --login-clients 32
+#   python benchmarks/bench_login_saturation.py --blocking   # eski davranış (bcrypt loop içinde)
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import bcrypt
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_worker(index: int, email: str, password: str, deadline: float, counters: dict):
+    # Login rate limit IP başına 5/dk - her 5 istekte bir yeni "IP"ye geçilir
+    generation = 0
+    while time.perf_counter() < deadline:
+        generation += 1
+        ip = f"10.{100 + index % 100}.{generation // 250 % 250}.{generation % 250}"
+        transport = httpx.ASGITransport(app=server.app, client=(ip, 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for _ in range(5):
+                if time.perf_counter() >= deadline:
+                    break
+                res = await http.post("/api/auth/login", json={"email": email, "password": password})
+                counters[res.status_code] = counters.get(res.status_code, 0) + 1
+
+
+async def me_sampler(access_token: str, deadline: float, latencies: list):
+    transport = httpx.ASGITransport(app=server.app, client=("10.98.0.1", 5000))
+    headers = {"Authorization": f"Bearer {access_token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            res = await http.get("/api/auth/me", headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            res.raise_for_status()
+            await asyncio.sleep(0.005)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--login-clients", type=int, default=32)
+    parser.add_argument("--blocking", action="store_true", help="bcrypt'i event loop içinde çalıştır (eski davranış)")
+    args = parser.parse_args()
+
+    if args.blocking:
+        async def blocking_verify(password: str, hashed: str) -> bool:
+            return bcrypt.checkpw(password.encode(), hashed.encode())
+        server.verify_password = blocking_verify
+
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    password = "bench-password-123"
+
+    transport = httpx.ASGITransport(app=server.app, client=("10.97.0.1", 5000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        (await http.post("/api/auth/register", json={"email": email, "password": password})).raise_for_status()
+        res = await http.post("/api/auth/login", json={"email": email, "password": password})
+        res.raise_for_status()
+        access_token = res.json()["access_token"]
+        user_id = (await http.get("/api/auth/me", headers={"Authorization": f"Bearer {access_token}"})).json()["id"]
+
+    print(f"🏁 {args.seconds:.0f}s, {args.login_clients} login client, mode={'blocking' if args.blocking else 'pool'}")
+
+    deadline = time.perf_counter() + args.seconds
+    counters: dict = {}
+    latencies: list = []
+    await asyncio.gather(
+        me_sampler(access_token, deadline, latencies),
+        *(login_worker(i, email, password, deadline, counters) for i in range(args.login_clients))
+    )
+
+    print(f"📊 /auth/login status dağılımı: {counters}")
+    print(f"📊 /auth/me örnek sayısı: {len(latencies)}")
+    if latencies:
+        print(f"   p50={percentile(latencies, 50):.1f}ms  p95={percentile(latencies, 95):.1f}ms  "
+              f"p99={percentile(latencies, 99):.1f}ms  max={max(latencies):.1f}ms  "
+              f"mean={statistics.fmean(latencies):.1f}ms")
+    print(f"🔧 Password pool: {server.password_hasher.stats()}")
+
+    await server.db.users.delete_one({"_id": user_id})
+    await server.db.refresh_tokens.delete_many({"user_id": user_id})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+# backend/benchmarks/bench_metrics.py
+#
+# MetricsMiddleware'in /auth/me sıcak yolundaki maliyeti. Uygulama doğrudan
+# ASGI çağrısıyla sürülür (httpx katmanı yok - ölçüm payı daha sert çıkar);
+# middleware açık/kapalı turlar sırayla tekrarlanır ve en iyi turlar
+# karşılaştırılır. Tur gürültüsünden bağımsız olarak middleware'in istek
+# başına maliyeti boş bir ASGI uygulaması etrafında ayrıca ölçülür ve
+# /auth/me'nin istek süresine oranlanır. Hedef: verim kaybı < %5. Sonunda
+# /metrics render süresi.
+# MONGO_URL/DB_NAME gerçek bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_metrics.py --requests 5000 --rounds 5
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+import server  # noqa: E402
+from metrics import HttpMetrics, MetricsMiddleware, MetricsRegistry  # noqa: E402
+
+
+def use_metrics(enabled: bool, middleware: list):
+    """Middleware yığınını MetricsMiddleware ile / onsuz yeniden kur"""
+    server.app.user_middleware = [m for m in middleware if enabled or m.cls is not MetricsMiddleware]
+    server.app.middleware_stack = server.app.build_middleware_stack()
+
+
+async def call_me(app, headers):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/auth/me", "raw_path": b"/api/auth/me", "root_path": "",
+        "query_string": b"", "headers": headers, "client": ("10.99.0.1", 5000), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    if status != 200:
+        raise RuntimeError(f"/auth/me {status} döndü")
+
+
+async def middleware_cost_us(calls: int, headers) -> float:
+    """Boş uygulama + middleware ile boş uygulama arasındaki fark (istek başına µs)"""
+    route = server.app.router.routes[0]
+
+    async def empty_app(scope, receive, send):
+        scope["route"] = route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    wrapped = MetricsMiddleware(empty_app, HttpMetrics(MetricsRegistry()))
+
+    async def timed(app):
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(calls):
+                await call_me(app, headers)
+            best = min(best, time.perf_counter() - started)
+        return best / calls * 1e6
+
+    return await timed(wrapped) - await timed(empty_app)
+
+
+async def run(requests: int, concurrency: int, headers) -> float:
+    app = server.app.middleware_stack
+
+    async def worker(offset: int):
+        for _ in range(offset, requests, concurrency):
+            await call_me(app, headers)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000, help="tur başına istek")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    user_id = f"bench-metrics-{uuid.uuid4().hex[:8]}"
+    await server.db.users.insert_one({"_id": user_id, "email": f"{user_id}@example.com", "name": "", "role": "user"})
+    headers = [(b"authorization", f"Bearer {server.create_access_token(user_id)}".encode())]
+    middleware = list(server.app.user_middleware)
+
+    try:
+        # Isınma: bağlantılar, token cache, route metrik nesneleri
+        for enabled in (False, True):
+            use_metrics(enabled, middleware)
+            await run(min(500, args.requests), args.concurrency, headers)
+
+        results = {False: [], True: []}
+        for round_no in range(args.rounds):
+            for enabled in ((False, True) if round_no % 2 == 0 else (True, False)):
+                use_metrics(enabled, middleware)
+                results[enabled].append(await run(args.requests, args.concurrency, headers))
+
+        without, with_ = max(results[False]), max(results[True])
+        overhead = (1 - with_ / without) * 100
+        print(f"🏁 /auth/me, {args.rounds} tur × {args.requests} istek, {args.concurrency} eşzamanlı")
+        print(f"  metrics kapalı {without:>9,.0f} istek/s")
+        print(f"  metrics açık   {with_:>9,.0f} istek/s")
+        print(f"  tur farkı: {overhead:+.2f}%")
+
+        cost = await middleware_cost_us(20000, headers)
+        share = cost / (1e6 / without) * 100
+        print(f"  middleware maliyeti: {cost:.2f} µs/istek, /auth/me isteğinin {1e6 / without:.0f} µs'si")
+        print(f"{'✅' if share < 5 else '❌'} Verim kaybı: {share:.2f}% (hedef < %5)")
+
+        started = time.perf_counter()
+        body = server.metrics_registry.render()
+        print(f"📈 /metrics render: {(time.perf_counter() - started) * 1000:.2f} ms, "
+              f"{body.count(chr(10))} satır, {len(body) / 1024:.1f} KB")
+    finally:
+        use_metrics(True, middleware)
+        await server.db.users.delete_one({"_id": user_id})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+# backend/benchmarks/bench_mongo_pool.py
+#
+# Mongo bağlantı havuzu doyum testi: her havuz boyutu için eşzamanlı istemci
+# sayısı kademeli artırılır. İstemciler login olur, zincir rotation limitine
+# gelene kadar /auth/refresh yapar, sonra tekrar login olur. Her kademe için
+# istek/s, p50/p99, havuzda en fazla kullanılan bağlantı, bağlantı bekleme
+# süresi ve bekleme zaman aşımları raporlanır; kullanılan bağlantı havuz
+# boyutuna dayanıp bekleme süresi yükselmeye başladığı yer doyum noktasıdır.
+# Uygulama in-process (httpx ASGITransport); MONGO_URL/DB_NAME gerçek bir mongod.
+#
+#   python benchmarks/bench_mongo_pool.py --pool-sizes 5,20,100 --clients 16,64,256 --seconds 5
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+import server  # noqa: E402
+from mongo_pool import MongoMetrics, create_client  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def session_client(index: int, email: str, password: str, deadline: float, stats: dict):
+    # Login rate limit IP başına 5/dk - her login yeni bir "IP"den
+    generation = 0
+    while time.perf_counter() < deadline:
+        generation += 1
+        ip = f"10.{100 + index % 100}.{(index // 100 * 50 + generation // 250) % 250}.{generation % 250}"
+        transport = httpx.ASGITransport(app=server.app, client=(ip, 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            started = time.perf_counter()
+            res = await http.post("/api/auth/login", json={"email": email, "password": password})
+            stats["latencies"].append((time.perf_counter() - started) * 1000)
+            stats["status"][res.status_code] = stats["status"].get(res.status_code, 0) + 1
+            if res.status_code != 200:
+                continue
+            refresh_token = res.json()["refresh_token"]
+            for _ in range(server.MAX_REFRESH_ROTATIONS):
+                if time.perf_counter() >= deadline:
+                    return
+                started = time.perf_counter()
+                res = await http.post("/api/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+                stats["latencies"].append((time.perf_counter() - started) * 1000)
+                stats["status"][res.status_code] = stats["status"].get(res.status_code, 0) + 1
+                if res.status_code != 200:
+                    break
+                refresh_token = res.json()["refresh_token"]
+
+
+async def run_step(metrics: MongoMetrics, clients: int, email: str, password: str, seconds: float):
+    metrics.reset_peaks()
+    before = metrics.snapshot()["pool"]
+    stats = {"latencies": [], "status": {}}
+    started = time.perf_counter()
+    await asyncio.gather(*(session_client(i, email, password, started + seconds, stats) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    pool = metrics.snapshot()["pool"]
+
+    checkouts = pool["checkouts"] - before["checkouts"]
+    wait_total = pool["checkout_wait_ms_total"] - before["checkout_wait_ms_total"]
+    errors = sum(count for code, count in stats["status"].items() if code >= 500)
+    print(f"  {clients:>5} istemci  {len(stats['latencies']) / elapsed:>7,.0f} istek/s  "
+          f"p50={percentile(stats['latencies'], 50):6.1f}ms  p99={percentile(stats['latencies'], 99):7.1f}ms  "
+          f"bağlantı max={pool['max_checked_out']:>3}  bekleme ort={wait_total / max(checkouts, 1):6.2f}ms "
+          f"max={pool['max_checkout_wait_ms']:7.1f}ms  zaman aşımı={pool['checkout_timeouts'] - before['checkout_timeouts']}  "
+          f"5xx={errors}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pool-sizes", default="5,20,100")
+    parser.add_argument("--clients", default="16,64,256", help="kademeler: eşzamanlı istemci sayısı")
+    parser.add_argument("--seconds", type=float, default=5.0, help="kademe süresi")
+    parser.add_argument("--wait-queue-timeout-ms", type=int, default=None)
+    args = parser.parse_args()
+
+    email = f"bench-pool-{uuid.uuid4().hex[:8]}@example.com"
+    password = "bench-password-123"
+    user_id = None
+
+    try:
+        for pool_size in [int(v) for v in args.pool_sizes.split(",")]:
+            metrics = MongoMetrics()
+            server.client = create_client(os.environ["MONGO_URL"], metrics, maxPoolSize=pool_size,
+                                          waitQueueTimeoutMS=args.wait_queue_timeout_ms)
+            server.db = server.client[os.environ["DB_NAME"]]
+            server.user_exists_cache.clear()
+            if user_id is None:
+                await server.setup_mongo_indexes()
+                transport = httpx.ASGITransport(app=server.app, client=("10.97.0.1", 5000))
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+                    (await http.post("/api/auth/register", json={"email": email, "password": password})).raise_for_status()
+                user_id = (await server.db.users.find_one({"email": email}))["_id"]
+
+            print(f"🏁 maxPoolSize={pool_size}")
+            for clients in [int(v) for v in args.clients.split(",")]:
+                await run_step(metrics, clients, email, password, args.seconds)
+            slowest = sorted(metrics.snapshot()["commands"], key=lambda c: -c["avg_ms"])[:3]
+            print("   en yavaş komutlar: " + ", ".join(
+                f"{c['command']} {c['collection']} ort={c['avg_ms']}ms" for c in slowest))
+            server.client.close()
+    finally:
+        if user_id is not None:
+            server.client = create_client(os.environ["MONGO_URL"])
+            server.db = server.client[os.environ["DB_NAME"]]
+            await server.db.users.delete_one({"_id": user_id})
+            await server.db.refresh_tokens.delete_many({"user_id": user_id})
+            server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+# backend/benchmarks/bench_morphology.py
+#
+# Terim çözümleme: Aho-Corasick otomatı ile her gövde için str.find döngüsü
+# (naif yöntem) karşılaştırılır. Girdi: katalogdaki terimler + morfemlerden
+# rastgele birleştirilmiş sentetik terimler ("osteo" + "arthr" + "itis" gibi).
+# Önce iki yöntemin eşleşme kümelerinin aynı olduğu doğrulanır, sonra
+#   - yalnızca eşleştirme,
+#   - uçtan uca çözümleme (eşleştirme + bölümleme, önbelleksiz)
+# ölçülür.
+#
+#   python benchmarks/bench_morphology.py --terms 100000
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from morphology import MorphologyAnalyzer, _WORD, _fold_word  # noqa: E402
+from term_catalogue import TermCatalogue  # noqa: E402
+
+
+def synthetic_terms(analyzer: MorphologyAnalyzer, count: int, rng: random.Random) -> list:
+    by_kind = {"prefix": [], "root": [], "suffix": []}
+    for stem, entries in zip(analyzer.stems, analyzer._patterns):
+        for entry in entries:
+            by_kind[entry["kind"]].append(stem + (entry["vowels"][:1] if entry["kind"] == "root" else ""))
+    terms = []
+    for _ in range(count):
+        parts = rng.sample(by_kind["prefix"], rng.randint(0, 1)) + rng.sample(by_kind["root"], rng.randint(1, 3))
+        terms.append("".join(parts + rng.sample(by_kind["suffix"], rng.randint(0, 1))))
+    return terms
+
+
+def report(name: str, words: int, chars: int, elapsed: float):
+    print(f"  {name:<26} {words / elapsed:>12,.0f} kelime/s   {chars / elapsed / 1e6:>6.2f} M karakter/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--terms", type=int, default=100000, help="sentetik terim sayısı")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    catalogue = TermCatalogue.from_data_dir()
+    started = time.perf_counter()
+    analyzer = MorphologyAnalyzer(catalogue, cache_size=0)
+    print(f"🏗️  {analyzer.morphemes} morfem, {len(analyzer.stems)} gövde, {len(analyzer._automaton)} düğüm "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms'de derlendi")
+
+    texts = list(catalogue.fields["term"]) + synthetic_terms(analyzer, args.terms, random.Random(args.seed))
+    words = [_fold_word(m.group()) for text in texts for m in _WORD.finditer(text)]
+    chars = sum(len(w) for w in words)
+    print(f"🏁 {len(words):,} kelime, {chars:,} karakter")
+
+    # Doğruluk: iki yöntem aynı eşleşmeleri bulmalı
+    mismatches = sum(
+        sorted(analyzer.matches(word)) != sorted(MorphologyAnalyzer.naive_matches(analyzer.stems, word))
+        for word in words[:20000]
+    )
+    print(f"{'✅' if not mismatches else '❌'} Eşleşme kümeleri: {mismatches} uyuşmazlık ({min(len(words), 20000):,} kelime)")
+
+    print("📊 Eşleştirme")
+    started = time.perf_counter()
+    for word in words:
+        analyzer.matches(word)
+    report("Aho-Corasick", len(words), chars, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for word in words:
+        MorphologyAnalyzer.naive_matches(analyzer.stems, word)
+    report("str.find döngüsü", len(words), chars, time.perf_counter() - started)
+
+    print("📊 Uçtan uca (eşleştirme + bölümleme, önbelleksiz)")
+    started = time.perf_counter()
+    for word in words:
+        analyzer._segment(word, analyzer._automaton.find_all(word))
+    report("Aho-Corasick", len(words), chars, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for word in words:
+        analyzer._segment(word, MorphologyAnalyzer.naive_matches(analyzer.stems, word))
+    report("str.find döngüsü", len(words), chars, time.perf_counter() - started)
+
+    # Doğrusal zaman: kelime uzunluğu 10 kat artınca süre ~10 kat artmalı
+    print("📊 Uzunluğa göre (tek kelime, eşleştirme + bölümleme)")
+    base = "osteoarthritis"
+    for repeat in (1, 10, 100):
+        word = base * repeat
+        started = time.perf_counter()
+        for _ in range(200):
+            analyzer._segment(word, analyzer._automaton.find_all(word))
+        print(f"  {len(word):>5} karakter  {(time.perf_counter() - started) / 200 * 1e6:>9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# backend/benchmarks/bench_progress.py
+#
+# Progress ingest yük testi: N eşzamanlı öğrenci (varsayılan 50k) düşünme
+# süreleriyle POST /api/progress/events gönderir; bu sırada /auth/me örneklenir.
+# Rapor: ingest p50/p99, olay/s, olay başına MongoDB yazma işlemi (birleştirme
+# oranı), flush süresi ve son durumda özetlerin doğruluğu.
+# Uygulama in-process (httpx ASGITransport) çalışır; MONGO_URL/DB_NAME gerçek
+# bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_progress.py --learners 50000 --batches 3 --events 20
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def make_batch(rng: random.Random, size: int, expected: dict) -> list:
+    events = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.8:
+            term_id = f"mv-{rng.randint(1, 465)}"
+            events.append({"type": "term", "term_id": term_id, "learned": True})
+            expected["learned"].add(term_id)
+        elif roll < 0.9:
+            score = rng.randint(0, 10)
+            events.append({"type": "quiz", "score": score, "total": 10})
+            expected["quizzes"] += 1
+        else:
+            events.append({"type": "flashcard", "completed": rng.randint(1, 20), "total": 20})
+    return events
+
+
+async def learner(http, user_id: str, args, expected: dict, latencies: list, statuses: dict):
+    rng = random.Random(user_id)
+    headers = {"Authorization": f"Bearer {server.create_access_token(user_id)}"}
+    await asyncio.sleep(rng.random() * args.think)
+    for _ in range(args.batches):
+        events = make_batch(rng, args.events, expected)
+        started = time.perf_counter()
+        res = await http.post("/api/progress/events", json={"events": events}, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+        await asyncio.sleep(rng.random() * args.think)
+
+
+async def me_sampler(http, user_id: str, done: asyncio.Event, latencies: list):
+    headers = {"Authorization": f"Bearer {server.create_access_token(user_id)}"}
+    while not done.is_set():
+        started = time.perf_counter()
+        (await http.get("/api/auth/me", headers=headers)).raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--learners", type=int, default=50000)
+    parser.add_argument("--batches", type=int, default=3, help="öğrenci başına gönderilen batch")
+    parser.add_argument("--events", type=int, default=20, help="batch başına olay")
+    parser.add_argument("--think", type=float, default=5.0, help="batch'ler arası en fazla bekleme (s)")
+    args = parser.parse_args()
+
+    run = uuid.uuid4().hex[:8]
+    user_ids = [f"bench-progress-{run}-{i}" for i in range(args.learners)]
+    expected = {user_id: {"learned": set(), "quizzes": 0} for user_id in user_ids}
+    sample_user = user_ids[0]
+    await server.db.users.insert_one({"_id": sample_user, "email": f"{sample_user}@example.com", "name": "bench"})
+
+    server.progress_service.start()
+    transport = httpx.ASGITransport(app=server.app, client=("10.99.0.1", 5000))
+    ingest, me_latencies, statuses = [], [], {}
+    done = asyncio.Event()
+    print(f"🏁 {args.learners:,} öğrenci × {args.batches} batch × {args.events} olay")
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 limits=httpx.Limits(max_connections=None)) as http:
+        sampler = asyncio.create_task(me_sampler(http, sample_user, done, me_latencies))
+        started = time.perf_counter()
+        await asyncio.gather(*(learner(http, u, args, expected[u], ingest, statuses) for u in user_ids))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await sampler
+
+    await server.progress_service.stop()
+    stats = server.progress_service.stats_snapshot()
+    events = stats["events"]
+
+    print(f"📊 Status dağılımı: {statuses}")
+    print(f"📊 {events:,} olay {elapsed:.1f}s içinde → {events / elapsed:,.0f} olay/s")
+    print(f"   ingest p50={percentile(ingest, 50):.1f}ms  p99={percentile(ingest, 99):.1f}ms  "
+          f"max={max(ingest):.1f}ms")
+    print(f"   /auth/me p50={percentile(me_latencies, 50):.1f}ms  p99={percentile(me_latencies, 99):.1f}ms "
+          f"({len(me_latencies)} örnek)")
+    print(f"📊 MongoDB: {stats['bulk_writes']:,} bulk_write round trip ({events / max(stats['bulk_writes'], 1):,.0f} olay / "
+          f"round trip), {stats['operations']:,} işlem ({stats['operations'] / max(events, 1):.2f} / olay)")
+    print(f"   {stats['flushes']} flush, son flush {stats['last_flush_ms']}ms, başarısız {stats['failed_operations']}")
+
+    # Doğruluk: rastgele örneklenen öğrencilerin özeti beklenenle aynı mı?
+    mismatches = 0
+    for user_id in random.sample(user_ids, min(200, len(user_ids))):
+        got = await server.progress_service.stats(user_id)
+        want = expected[user_id]
+        if got["learned_terms"] != len(want["learned"]) or got["quizzes_taken"] != want["quizzes"]:
+            mismatches += 1
+    print(f"{'✅' if not mismatches else '❌'} Özet doğruluğu: {mismatches} uyuşmazlık (200 örnek)")
+
+    prefix = {"$regex": f"^bench-progress-{run}-"}
+    await server.db.user_progress.delete_many({"_id": prefix})
+    await server.db.term_progress.delete_many({"user_id": prefix})
+    await server.db.users.delete_one({"_id": sample_user})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+# backend/benchmarks/bench_quiz.py
+#
+# Quiz üretim hızı: tüm sistemler sırayla, her quiz 10 soru. Quiz.jsx'teki
+# algoritmanın (her soru için tüm listeyi filtrele + sort(random) karıştır)
+# Python karşılığı referans olarak ölçülür. --http ile uçtan uca (ASGI) ölçüm.
+#
+#   python benchmarks/bench_quiz.py --quizzes 50000
+#   python benchmarks/bench_quiz.py --http --quizzes 5000
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from quiz import MIXED_SYSTEM, QuizEngine  # noqa: E402
+from term_catalogue import TermCatalogue  # noqa: E402
+
+
+def legacy_quiz(terms: list, system: str, count: int = 10) -> list:
+    """Quiz.jsx initializeQuiz'in birebir karşılığı"""
+    filtered = terms if system == MIXED_SYSTEM else [t for t in terms if t["system"] == system]
+    selected = sorted(filtered, key=lambda _: random.random() - 0.5)[:count]
+    questions = []
+    for term in selected:
+        pool = [t for t in terms if t["id"] != term["id"] and t["system"] == term["system"]]
+        if len(pool) < 3:
+            pool = [t for t in terms if t["id"] != term["id"]]
+        wrong = [t["meaning"] for t in sorted(pool, key=lambda _: random.random() - 0.5)[:3]]
+        options = sorted([term["meaning"], *wrong], key=lambda _: random.random() - 0.5)
+        questions.append({"term": term["term"], "correct_answer": term["meaning"], "options": options})
+    return questions
+
+
+def report(name: str, quizzes: int, elapsed: float):
+    print(f"  {name:<22} {quizzes / elapsed:>10,.0f} quiz/s   {elapsed / quizzes * 1e6:>8.1f} µs/quiz")
+
+
+async def bench_http(engine: QuizEngine, systems: list, quizzes: int, concurrency: int):
+    import server
+
+    server.quiz_engine = engine
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def worker(offset: int):
+            for n in range(offset, quizzes, concurrency):
+                res = await http.get("/api/quiz/generate", params={"system": systems[n % len(systems)]})
+                res.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quizzes", type=int, default=50000)
+    parser.add_argument("--legacy-quizzes", type=int, default=500)
+    parser.add_argument("--http", action="store_true", help="uçtan uca /api/quiz/generate ölç")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    catalogue = TermCatalogue.from_data_dir()
+    started = time.perf_counter()
+    engine = QuizEngine(catalogue)
+    print(f"🏗️  {len(engine.terms)} terim, {len(engine.system_names)} sistem, "
+          f"havuzlar {(time.perf_counter() - started) * 1000:.1f} ms'de kuruldu")
+
+    systems = engine.system_names + [MIXED_SYSTEM]
+    print(f"🏁 10 soruluk quiz'ler, {len(systems)} sistem sırayla")
+
+    started = time.perf_counter()
+    for n in range(args.quizzes):
+        engine.generate(systems[n % len(systems)], count=10)
+    report("QuizEngine", args.quizzes, time.perf_counter() - started)
+
+    terms = [
+        {"id": engine.term_ids[i], "term": engine.terms[i], "meaning": engine.meanings[engine.meaning_of[i]],
+         "system": engine.system_names[engine.system_of[i]]}
+        for i in range(len(engine.terms))
+    ]
+    started = time.perf_counter()
+    for n in range(args.legacy_quizzes):
+        legacy_quiz(terms, systems[n % len(systems)])
+    report("Quiz.jsx algoritması", args.legacy_quizzes, time.perf_counter() - started)
+
+    if args.http:
+        elapsed = asyncio.run(bench_http(engine, systems, args.quizzes, args.concurrency))
+        report(f"HTTP ({args.concurrency} eşzamanlı)", args.quizzes, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# backend/benchmarks/bench_rate_limiter.py
+#
+# Rate limiter mikrobenchmark'ı: 1M farklı identifier ile bellek kullanımı ve
+# ns/op. Eski defaultdict(list) implementasyonu ile karşılaştırır.
+#
+#   python benchmarks/bench_rate_limiter.py --keys 1000000
+#   python benchmarks/bench_rate_limiter.py --mongo --keys 20000   # ortak backend (mongod gerekir)
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rate_limiter import InMemoryRateLimiter, MongoRateLimiter  # noqa: E402
+
+
+class LegacyRateLimiter:
+    """Önceki check_rate_limit'in kopyası (karşılaştırma için)"""
+
+    def __init__(self):
+        self.store = defaultdict(list)
+
+    def check(self, identifier, limit, window=60):
+        now = time.time()
+        if identifier not in self.store:
+            self.store[identifier] = []
+        requests = self.store[identifier]
+        requests = [t for t in requests if now - t < window]
+        if len(requests) >= limit:
+            self.store[identifier] = requests
+            return False
+        requests.append(now)
+        self.store[identifier] = requests
+        return True
+
+
+def run(limiter, keys, hits_per_key):
+    for _ in range(hits_per_key):
+        for key in keys:
+            limiter.check(key, 5, 60)
+
+
+def measure(name, factory, keys, hits_per_key):
+    # Süre ve bellek ayrı turlarda ölçülür (tracemalloc süreyi bozar)
+    gc.collect()
+    started = time.perf_counter_ns()
+    run(factory(), keys, hits_per_key)
+    elapsed = time.perf_counter_ns() - started
+
+    gc.collect()
+    tracemalloc.start()
+    limiter = factory()
+    run(limiter, keys, hits_per_key)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ops = len(keys) * hits_per_key
+    print(f"{name:<10} {elapsed / ops:>8.0f} ns/op  {current / 1024 / 1024:>8.1f} MiB  "
+          f"{current / len(keys):>6.0f} B/key")
+
+
+async def measure_mongo(keys):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    collection = client[os.environ.get("DB_NAME", "healthlex_bench")].rate_limits_bench
+    await collection.drop()
+    limiter = MongoRateLimiter(collection)
+
+    sem = asyncio.Semaphore(64)
+
+    async def one(key):
+        async with sem:
+            await limiter.hit(key, 5, 60)
+
+    started = time.perf_counter_ns()
+    await asyncio.gather(*(one(k) for k in keys))
+    elapsed = time.perf_counter_ns() - started
+    print(f"{'mongo':<10} {elapsed / len(keys):>8.0f} ns/op  (64 eşzamanlı, {len(keys)} anahtar)")
+    await collection.drop()
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--hits-per-key", type=int, default=5)
+    parser.add_argument("--mongo", action="store_true")
+    args = parser.parse_args()
+
+    keys = [f"login_10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}-{i}" for i in range(args.keys)]
+    print(f"🏁 {args.keys} farklı identifier, anahtar başına {args.hits_per_key} istek")
+
+    if args.mongo:
+        asyncio.run(measure_mongo(keys))
+        return
+
+    measure("legacy", LegacyRateLimiter, keys, args.hits_per_key)
+    measure("memory", lambda: InMemoryRateLimiter(max_keys=args.keys), keys, args.hits_per_key)
+
+    # Boşta kalan anahtarların temizlenmesi: saat 2 pencere ileri sarılır
+    fake_now = [0.0]
+    limiter = InMemoryRateLimiter(max_keys=args.keys, clock=lambda: fake_now[0])
+    for key in keys:
+        limiter.check(key, 5, 60)
+    fake_now[0] = 180.0
+    for i in range(len(keys) // 4):
+        limiter.check(f"fresh-{i}", 5, 60)
+    print(f"🧹 2 pencere sonra {len(keys) // 4} yeni istek: kalan anahtar {len(limiter)} "
+          f"(başlangıç {len(keys)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# backend/benchmarks/bench_refresh.py
+#
+# /auth/refresh rotasyonu: eski handler'ın Mongo sorgu dizisi (find_one x2,
+# users.find_one, update_one, insert_one) ile yeni find_one_and_update yolunun
+# p50/p99 gecikmesi ve refresh başına round trip sayısı. Gerçek bir mongod gerekir.
+#
+#   MONGO_URL=mongodb://localhost:27017 DB_NAME=healthlex_bench \
+#       python benchmarks/bench_refresh.py --refreshes 2000
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+import server  # noqa: E402
+from token_keys import new_jti, token_digest  # noqa: E402
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def legacy_rotate(db, refresh_token: str):
+    """Eski handler'ın mutlu yoldaki sorgu dizisi (print'ler hariç)"""
+    await db.refresh_tokens.find_one({"token": refresh_token})
+    rec = await db.refresh_tokens.find_one({"token": refresh_token, "is_active": True})
+    user_id = rec["user_id"]
+    await db.users.find_one({"_id": user_id})
+    new_jti, new_refresh = str(uuid.uuid4()), str(uuid.uuid4())
+    await db.refresh_tokens.update_one(
+        {"token": refresh_token},
+        {"$set": {"is_active": False, "rotated_at": datetime.utcnow(), "rotated_to": new_jti}}
+    )
+    await db.refresh_tokens.insert_one({
+        "jti": new_jti,
+        "token": new_refresh,
+        "user_id": user_id,
+        "created_at": datetime.utcnow(),
+        "last_used_at": datetime.utcnow(),
+        "expires_at": datetime.utcnow() + timedelta(days=7),
+        "is_active": True,
+        "rotated_from": rec.get("jti", ""),
+        "rotations": rec.get("rotations", 0) + 1,
+    })
+    return user_id, new_refresh
+
+
+async def new_rotate(db, refresh_token: str):
+    user_id, new_refresh, _ = await server.rotate_refresh_token(refresh_token, None)
+    return user_id, new_refresh
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(name, rotate, db, counter, users, refreshes, concurrency):
+    # Her kullanıcı için bir zincir: token rotate edildikçe zincir ilerler
+    chains = {}
+    for user_id in users:
+        token = str(uuid.uuid4())
+        # Yeni yol özet + binary jti saklar (bkz. token_keys.py)
+        keys = {"jti": new_jti(), "token": token_digest(token)} if rotate is new_rotate \
+            else {"jti": str(uuid.uuid4()), "token": token}
+        await db.refresh_tokens.insert_one({
+            **keys, "user_id": user_id,
+            "created_at": datetime.utcnow(), "last_used_at": datetime.utcnow(),
+            "expires_at": datetime.utcnow() + timedelta(days=7),
+            "is_active": True, "rotations": 0,
+        })
+        chains[user_id] = token
+
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(refreshes):
+        queue.put_nowait(users[i % len(users)])
+
+    async def worker():
+        while not queue.empty():
+            user_id = queue.get_nowait()
+            started = time.perf_counter()
+            _, chains[user_id] = await rotate(db, chains[user_id])
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    commands_before = counter.count
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    commands = counter.count - commands_before
+
+    print(f"{name:<8} p50={percentile(latencies, 50):6.2f}ms  p99={percentile(latencies, 99):6.2f}ms  "
+          f"round trip/refresh={commands / refreshes:.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refreshes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    server.client = AsyncIOMotorClient(os.environ["MONGO_URL"], event_listeners=[counter])
+    server.db = db = server.client[os.environ["DB_NAME"]]
+    await server.setup_mongo_indexes()
+
+    # Rotation limiti (10) aşılmasın diye zincir başına en fazla 5 refresh;
+    # aynı zincir iki worker'da aynı anda rotate edilmesin diye en az concurrency kadar kullanıcı
+    users = [f"bench-refresh-{uuid.uuid4().hex[:8]}" for _ in range(max(args.concurrency, args.refreshes // 5))]
+    await db.users.insert_many([{"_id": u, "email": f"{u}@example.com"} for u in users])
+
+    print(f"🏁 {args.refreshes} refresh, {args.concurrency} eşzamanlı, {len(users)} kullanıcı")
+    try:
+        await run("legacy", legacy_rotate, db, counter, users, args.refreshes, args.concurrency)
+        await db.refresh_tokens.delete_many({"user_id": {"$in": users}})
+        server.user_exists_cache.clear()
+        await run("new", new_rotate, db, counter, users, args.refreshes, args.concurrency)
+    finally:
+        await db.refresh_tokens.delete_many({"user_id": {"$in": users}})
+        await db.users.delete_many({"_id": {"$in": users}})
+        server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
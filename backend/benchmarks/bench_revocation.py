@@ -0,0 +1,159 @@
+# backend/benchmarks/bench_revocation.py
+#
+# Access token iptal listesinin /auth/me sıcak yolundaki maliyeti. Boş liste
+# ile --entries (varsayılan 1M) iptal edilmiş oturum içeren liste turlar
+# halinde sırayla değiştirilir (uygulama doğrudan ASGI çağrısıyla sürülür),
+# en iyi turlar karşılaştırılır. Ayrıca is_revoked'un çağrı başına maliyeti,
+# Bloom filtresinin belleği (aynı kayıtların set'te tutulmasıyla kıyas) ve
+# rastgele oturum kimlikleriyle ölçülen yanlış pozitif oranı raporlanır.
+# MONGO_URL/DB_NAME gerçek bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_revocation.py --entries 1000000 --requests 5000 --rounds 5
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+import server  # noqa: E402
+from revocation import REVOCATION_BLOOM_FP, RevocationList  # noqa: E402
+
+
+def use_list(revocations: RevocationList):
+    server.token_revocations.is_revoked = revocations.is_revoked
+
+
+async def call_me(app, headers) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/auth/me", "raw_path": b"/api/auth/me", "root_path": "",
+        "query_string": b"", "headers": headers, "client": ("10.99.0.1", 5000), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(requests: int, concurrency: int, headers) -> float:
+    app = server.app.middleware_stack or server.app.build_middleware_stack()
+
+    async def worker(offset: int):
+        for _ in range(offset, requests, concurrency):
+            status = await call_me(app, headers)
+            if status != 200:
+                raise RuntimeError(f"/auth/me {status} döndü")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+def check_ns(revocations: RevocationList, args_list, repeat: int = 5) -> float:
+    """is_revoked çağrı başına ns (en iyi tekrar)"""
+    is_revoked = revocations.is_revoked
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for user_id, sid, issued_at in args_list:
+            is_revoked(user_id, sid, issued_at)
+        best = min(best, time.perf_counter() - started)
+    return best / len(args_list) * 1e9
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1_000_000, help="iptal edilmiş oturum sayısı")
+    parser.add_argument("--users", type=int, default=10000, help="not-before kaydı olan kullanıcı sayısı")
+    parser.add_argument("--requests", type=int, default=5000, help="tur başına istek")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--probes", type=int, default=200000, help="yanlış pozitif ölçümü için rastgele sid")
+    args = parser.parse_args()
+
+    ttl = server.ACCESS_TOKEN_MINUTES * 60
+    empty, full = RevocationList(ttl), RevocationList(ttl)
+
+    started = time.perf_counter()
+    revoked_sids = [uuid.uuid4().hex for _ in range(args.entries)]
+    for sid in revoked_sids:
+        full.revoke_session(sid)
+    now = time.time()
+    for i in range(args.users):
+        full.revoke_user(f"revoked-user-{i}", now)
+    load_s = time.perf_counter() - started
+    stats = full.stats()
+    # Aynı kayıtlar set[str] olarak: küme tablosu + hex string nesneleri
+    set_bytes = sys.getsizeof(set(revoked_sids)) + sum(sys.getsizeof(s) for s in revoked_sids)
+    print(f"🏗️  {args.entries:,} oturum + {args.users:,} kullanıcı {load_s:.1f}s'de yüklendi, "
+          f"{len(stats['generations'])} nesil")
+    print(f"  Bloom: {stats['bloom_bytes'] / 1e6:.1f} MB + parmak izleri {stats['fingerprint_bytes'] / 1e6:.1f} MB "
+          f"(set[str] ile ~{set_bytes / 1e6:.0f} MB)")
+
+    # Yanlış pozitif: hiç iptal edilmemiş rastgele sid'ler
+    probes = [("bench-user", uuid.uuid4().hex, now) for _ in range(args.probes)]
+    false_positives = sum(full.is_revoked(*probe) for probe in probes)
+    bloom_hits = full.false_positives
+    full.rejected = full.false_positives = 0
+    print(f"  Bloom yanlış pozitifi: {bloom_hits}/{args.probes:,} = {bloom_hits / args.probes:.5%} "
+          f"(hedef {REVOCATION_BLOOM_FP:.5%}), parmak iziyle doğrulandıktan sonra reddedilen: {false_positives}")
+
+    sample = probes[:20000]
+    print("⏱️  is_revoked (çağrı başına):")
+    print(f"  boş liste              {check_ns(empty, sample):>7.0f} ns")
+    print(f"  {args.entries:,} kayıt, temiz   {check_ns(full, sample):>7.0f} ns")
+    print(f"  {args.entries:,} kayıt, iptal   {check_ns(full, [('bench-user', s, now) for s in revoked_sids[:20000]]):>7.0f} ns")
+    print(f"  not-before isabeti      {check_ns(full, [(f'revoked-user-{i % args.users}', None, 0.0) for i in range(20000)]):>7.0f} ns")
+
+    user_id = f"bench-revocation-{uuid.uuid4().hex[:8]}"
+    await server.db.users.insert_one({"_id": user_id, "email": f"{user_id}@example.com", "name": "", "role": "user"})
+    headers = [(b"authorization", f"Bearer {server.create_access_token(user_id, uuid.uuid4().hex)}".encode())]
+    revoked_headers = [(b"authorization", f"Bearer {server.create_access_token(user_id, revoked_sids[0])}".encode())]
+    original = server.token_revocations.is_revoked
+
+    try:
+        use_list(full)
+        status = await call_me(server.app.build_middleware_stack(), revoked_headers)
+        print(f"🔒 İptal edilmiş oturumla /auth/me → {status}")
+        if status != 401:
+            raise RuntimeError("iptal edilmiş token kabul edildi")
+
+        # Isınma: bağlantılar, token cache
+        for revocations in (empty, full):
+            use_list(revocations)
+            await run(min(500, args.requests), args.concurrency, headers)
+
+        results = {"empty": [], "full": []}
+        for round_no in range(args.rounds):
+            order = ("empty", "full") if round_no % 2 == 0 else ("full", "empty")
+            for name in order:
+                use_list(empty if name == "empty" else full)
+                results[name].append(await run(args.requests, args.concurrency, headers))
+
+        without, with_ = max(results["empty"]), max(results["full"])
+        print(f"🏁 /auth/me, {args.rounds} tur × {args.requests} istek, {args.concurrency} eşzamanlı")
+        print(f"  boş liste          {without:>9,.0f} istek/s ({1e6 / without:.0f} µs/istek)")
+        print(f"  {args.entries:>9,} kayıt   {with_:>9,.0f} istek/s ({1e6 / with_:.0f} µs/istek)")
+        print(f"  tur farkı: {(1 - with_ / without) * 100:+.2f}% "
+              f"(iptal kontrolü ~{check_ns(full, sample) / 1000:.2f} µs/istek)")
+    finally:
+        server.token_revocations.is_revoked = original
+        await server.db.users.delete_one({"_id": user_id})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,209 @@
+# backend/benchmarks/bench_session_pages.py
+#
+# Oturum listeleri: eski sorgular (tam doküman, to_list(50) / to_list(20),
+# sayfalama yok) ile keyset sayfalı, projeksiyonlu sorgular. Tek bir
+# kullanıcıya --sessions (varsayılan 10k) geçmiş oturum yazılır (aktif,
+# logout olmuş, süresi dolmuş karışık; başka kullanıcılar da gürültü olarak).
+# Her varyant için sayfa başına gecikme p50/p99, Mongo'dan okunan BSON bayt,
+# JSON yanıt baytı ve explain (incelenen doküman / index anahtarı, FETCH var
+# mı) raporlanır; sonunda tüm listenin sayfa sayfa gezilme süresi.
+# Eski sorgular için eski index'ler ölçüm süresince kurulur.
+# MONGO_URL/DB_NAME gerçek bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_session_pages.py --sessions 10000 --requests 300
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import bson
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+import server  # noqa: E402
+from mongo_indexes import apply_indexes  # noqa: E402
+from session_pages import DETAILED_SESSION_FIELDS, SESSION_FIELDS, SORT, after_cursor  # noqa: E402
+
+LEGACY_INDEXES = [
+    ([("user_id", 1), ("is_active", 1), ("created_at", -1), ("expires_at", 1)], "user_active_sessions"),
+    ([("user_id", 1), ("last_used_at", -1), ("expires_at", 1)], "user_sessions_by_last_used"),
+]
+AGENT = ("Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+         "Version/17.4 Mobile/15E148 Safari/604.1 ") + "x" * 60
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def make_session(user_id: str, now: datetime, rng: random.Random) -> dict:
+    created_at = now - timedelta(days=rng.uniform(0, 9))
+    last_used_at = min(now, created_at + timedelta(hours=rng.uniform(0, 72)))
+    return {
+        "jti": bson.Binary(uuid.uuid4().bytes, 4), "token": bson.Binary(os.urandom(32)),
+        "user_id": user_id, "created_at": created_at,
+        "last_used_at": last_used_at.replace(microsecond=last_used_at.microsecond // 1000 * 1000),
+        "expires_at": created_at + timedelta(days=7), "is_active": rng.random() < 0.6,
+        "user_agent": AGENT, "device_name": "iPhone", "browser": "Mobile Safari 17.4", "os": "iOS 17.4",
+        "is_mobile": True, "is_tablet": False, "is_pc": False, "device_info": "Mobile Safari 17.4 on iOS",
+        "ip_address": f"85.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        "location": "Istanbul, TR", "rotations": rng.randint(0, 10),
+    }
+
+
+async def legacy_sessions(user_id: str):
+    """Eski /auth/sessions: tam doküman, created_at sırası, 50 kayıt"""
+    docs = await server.db.refresh_tokens.find(active_query(user_id)).sort("created_at", -1).to_list(length=50)
+    return docs, {"sessions": [{
+        "id": str(d["_id"]), "device_info": d.get("device_info", "Unknown device"),
+        "user_agent": d.get("user_agent", "")[:100], "ip_address": d.get("ip_address", ""),
+        "created_at": d.get("created_at"), "last_used_at": d.get("last_used_at"),
+        "expires_at": d.get("expires_at"), "location": d.get("location", "Unknown"), "is_current": False,
+    } for d in docs]}
+
+
+async def legacy_detailed(user_id: str):
+    """Eski /auth/sessions/detailed: tam doküman, 20 kayıt"""
+    docs = await server.db.refresh_tokens.find(detailed_query(user_id)).sort("last_used_at", -1).to_list(length=20)
+    return docs, {"sessions": [{
+        "id": str(d["_id"]), "device_name": d.get("device_name"), "browser": d.get("browser"),
+        "os": d.get("os"), "location": d.get("location"), "ip_address": server.mask_ip(d.get("ip_address", "")),
+        "created_at": d.get("created_at"), "last_used_at": d.get("last_used_at"),
+        "expires_at": d.get("expires_at"), "is_active": d.get("is_active", False), "is_current": False,
+    } for d in docs]}
+
+
+def active_query(user_id):
+    return {"user_id": user_id, "is_active": True, "expires_at": {"$gt": datetime.utcnow()}}
+
+
+def detailed_query(user_id):
+    return {"user_id": user_id, "expires_at": {"$gt": datetime.utcnow()}}
+
+
+async def explain(query: dict, sort, limit: int, projection=None) -> str:
+    command = {"find": "refresh_tokens", "filter": query, "sort": dict(sort), "limit": limit}
+    if projection:
+        command["projection"] = projection
+    try:
+        result = await server.db.command("explain", command, verbosity="executionStats")
+    except Exception as e:
+        return f"explain yok ({type(e).__name__})"
+    stats = result["executionStats"]
+    stages, plan = [], stats.get("executionStages", {})
+    while plan:
+        stages.append(plan.get("stage"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return (f"doküman {stats['totalDocsExamined']}, anahtar {stats['totalKeysExamined']}, "
+            f"{'FETCH' if 'FETCH' in stages else 'covered'} ({' <- '.join(filter(None, stages))})")
+
+
+async def paged_docs(query: dict, fields: dict, limit: int, cursor=None) -> list:
+    """Yeni endpoint'in Mongo'dan okuduğu kayıtlar (bayt ölçümü için)"""
+    if cursor:
+        query = {**query, **after_cursor(cursor)}
+    return await server.db.refresh_tokens.find(query, projection=fields).sort(SORT).limit(limit + 1).to_list(limit + 1)
+
+
+async def measure(label: str, call, docs: list, requests: int):
+    """call() → yanıt gövdesi; docs: aynı isteğin Mongo'dan okuduğu kayıtlar"""
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        body = await call()
+        encoded = json.dumps(jsonable_encoder(body)).encode()
+        latencies.append((time.perf_counter() - started) * 1000)
+    doc_bytes = sum(len(bson.encode(d)) for d in docs)
+    body_bytes = len(encoded)
+    rows = len(body["sessions"])
+    print(f"  {label:<28} {rows:>4} kayıt  p50={percentile(latencies, 50):6.2f}ms  p99={percentile(latencies, 99):6.2f}ms  "
+          f"Mongo {doc_bytes / 1024:7.1f} KB  yanıt {body_bytes / 1024:6.1f} KB ({body_bytes / max(rows, 1):.0f} B/kayıt)")
+    return body
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=10000, help="ölçülen kullanıcının geçmiş oturumları")
+    parser.add_argument("--other-users", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=300, help="varyant başına istek")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    run_id = uuid.uuid4().hex[:8]
+    user_id = f"bench-pages-{run_id}"
+    tokens = server.db.refresh_tokens
+
+    await apply_indexes(server.db)
+    created_legacy = []
+    existing = await tokens.index_information()
+    for keys, name in LEGACY_INDEXES:
+        if name not in existing:
+            await tokens.create_index(keys, name=name)
+            created_legacy.append(name)
+
+    # Okuma cache'i ölçümü bozmasın
+    server.sessions_cache.enabled = server.detailed_sessions_cache.enabled = False
+    try:
+        batch = [make_session(user_id, now, rng) for _ in range(args.sessions)]
+        batch += [make_session(f"bench-pages-{run_id}-other-{i % args.other_users}", now, rng)
+                  for i in range(args.other_users * 20)]
+        for start in range(0, len(batch), 5000):
+            await tokens.insert_many(batch[start:start + 5000], ordered=False)
+        print(f"🏗️  {args.sessions:,} oturum (+{args.other_users * 20:,} gürültü) yüklendi")
+
+        print("🔍 explain:")
+        print(f"  eski sessions     {await explain(active_query(user_id), [('created_at', -1)], 50)}")
+        print(f"  yeni sessions     {await explain(active_query(user_id), SORT, 51, SESSION_FIELDS)}")
+        print(f"  eski detailed     {await explain(detailed_query(user_id), [('last_used_at', -1)], 20)}")
+        print(f"  yeni detailed     {await explain(detailed_query(user_id), SORT, 21, DETAILED_SESSION_FIELDS)}")
+
+        print(f"⏱️  {args.requests} istek/varyant:")
+        async def body_of(legacy):
+            return (await legacy(user_id))[1]
+
+        await measure("eski /sessions (50)", lambda: body_of(legacy_sessions),
+                      (await legacy_sessions(user_id))[0], args.requests)
+        first = await measure("yeni /sessions ilk sayfa", lambda: server.load_sessions(user_id),
+                              await paged_docs(active_query(user_id), SESSION_FIELDS, 50), args.requests)
+        await measure("eski /sessions/detailed (20)", lambda: body_of(legacy_detailed),
+                      (await legacy_detailed(user_id))[0], args.requests)
+        await measure("yeni /detailed ilk sayfa", lambda: server.load_detailed_sessions(user_id),
+                      await paged_docs(detailed_query(user_id), DETAILED_SESSION_FIELDS, 20), args.requests)
+
+        # Derin sayfa: listenin ortası
+        cursor = None
+        for _ in range(args.sessions // 40):
+            cursor = (await server.load_detailed_sessions(user_id, 20, cursor))["next_cursor"] or cursor
+        await measure("yeni /detailed orta sayfa", lambda: server.load_detailed_sessions(user_id, 20, cursor),
+                      await paged_docs(detailed_query(user_id), DETAILED_SESSION_FIELDS, 20, cursor), args.requests)
+
+        for label, loader in (("sessions", server.load_sessions), ("detailed", server.load_detailed_sessions)):
+            started, pages, rows, cursor = time.perf_counter(), 0, 0, None
+            while True:
+                body = await loader(user_id, 100, cursor)
+                pages, rows, cursor = pages + 1, rows + len(body["sessions"]), body["next_cursor"]
+                if not cursor:
+                    break
+            print(f"📜 {label}: {rows:,} kayıt {pages} sayfada (100'lük) {time.perf_counter() - started:.2f}s")
+        if first["next_cursor"] is None:
+            print("⚠️  ilk sayfada next_cursor yok - veri beklenenden az")
+    finally:
+        server.sessions_cache.enabled = server.detailed_sessions_cache.enabled = True
+        await tokens.delete_many({"user_id": {"$regex": f"^bench-pages-{run_id}"}})
+        for name in created_legacy:
+            await tokens.drop_index(name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
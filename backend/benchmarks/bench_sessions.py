@@ -0,0 +1,132 @@
+# backend/benchmarks/bench_sessions.py
+#
+# GET /auth/sessions/detailed: oturum başına User-Agent çözümlemenin maliyeti.
+#   legacy  - cihaz alanı olmayan eski dokümanlar, her istekte her oturum parse edilir
+#   cached  - eski dokümanlar, UA cache'i ile
+#   stored  - cihaz alanları token yazılırken kaydedilmiş (parse yok)
+# Uygulama in-process (httpx ASGITransport) çalışır; MONGO_URL/DB_NAME gerçek
+# bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_sessions.py --users 50 --requests 5000
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+from device_info import UserAgentCache, _parse  # noqa: E402
+
+# Gerçek trafikte farklı UA sayısı (sürüm/derleme numaraları) user_agents'ın kendi
+# 200'lük iç cache'ini aşar; o cache dolunca tamamen boşaltılır
+UA_TEMPLATES = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{major}.0.{build}.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.{build} Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_{minor} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.{minor} Mobile/15E{build} Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{major}.0.{build}.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:{major}.0) Gecko/20100101 Firefox/{major}.{minor}",
+    "Mozilla/5.0 (iPad; CPU OS 17_{minor} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.{minor} Mobile/15E{build} Safari/604.1",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{major}.0.0.0 Safari/537.36 Edg/{major}.0.{build}.0",
+]
+
+
+def make_user_agents(count: int, rng: random.Random) -> list:
+    agents = set()
+    while len(agents) < count:
+        agents.add(rng.choice(UA_TEMPLATES).format(
+            major=rng.randint(100, 125), minor=rng.randint(0, 9), build=rng.randint(1000, 6500)))
+    return sorted(agents)
+
+
+class NoCache:
+    """Eski davranış: her çağrıda tam parse"""
+
+    def get(self, user_agent: str) -> dict:
+        return _parse((user_agent or "")[:200])
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def seed(users: list, sessions: int, agents: list, stored: bool, rng: random.Random):
+    await server.db.refresh_tokens.delete_many({"user_id": {"$in": users}})
+    now = datetime.utcnow()
+    docs = []
+    for user_id in users:
+        for _ in range(sessions):
+            user_agent = rng.choice(agents)
+            doc = {
+                "jti": str(uuid.uuid4()), "token": str(uuid.uuid4()), "user_id": user_id,
+                "created_at": now, "last_used_at": now - timedelta(seconds=rng.randrange(86400)),
+                "expires_at": now + timedelta(days=7), "is_active": True, "rotations": 0,
+                "user_agent": user_agent, "ip_address": f"85.{rng.randrange(256)}.{rng.randrange(256)}.1",
+            }
+            if stored:
+                doc.update(_parse(user_agent))
+            docs.append(doc)
+    await server.db.refresh_tokens.insert_many(docs)
+
+
+async def run(name: str, http, users: list, requests: int, concurrency: int):
+    headers = {u: {"Authorization": f"Bearer {server.create_access_token(u)}"} for u in users}
+    latencies = []
+
+    async def worker(offset: int):
+        for n in range(offset, requests, concurrency):
+            user_id = users[n % len(users)]
+            started = time.perf_counter()
+            (await http.get("/api/auth/sessions/detailed", headers=headers[user_id])).raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<8} {requests / elapsed:>8,.0f} istek/s   p50={percentile(latencies, 50):6.2f}ms  "
+          f"p99={percentile(latencies, 99):6.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=20, help="kullanıcı başına oturum (liste limiti 20)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--agents", type=int, default=1000, help="farklı User-Agent sayısı")
+    args = parser.parse_args()
+
+    users = [f"bench-sessions-{uuid.uuid4().hex[:8]}" for _ in range(args.users)]
+    rng = random.Random(42)
+    agents = make_user_agents(args.agents, rng)
+    transport = httpx.ASGITransport(app=server.app, client=("10.99.0.1", 5000))
+    print(f"🏁 {args.users} kullanıcı × {args.sessions} oturum, {len(agents)} farklı UA, "
+          f"{args.requests} istek, {args.concurrency} eşzamanlı")
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            await seed(users, args.sessions, agents, stored=False, rng=rng)
+            server.user_agent_cache = NoCache()
+            await run("legacy", http, users, args.requests, args.concurrency)
+
+            server.user_agent_cache = cache = UserAgentCache()
+            await run("cached", http, users, args.requests, args.concurrency)
+            print(f"           cache: {cache.stats()}")
+
+            await seed(users, args.sessions, agents, stored=True, rng=rng)
+            server.user_agent_cache = cache = UserAgentCache()
+            await run("stored", http, users, args.requests, args.concurrency)
+            print(f"           cache: {cache.stats()} (parse çağrısı yok)")
+    finally:
+        await server.db.refresh_tokens.delete_many({"user_id": {"$in": users}})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
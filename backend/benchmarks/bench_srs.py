@@ -0,0 +1,130 @@
+# backend/benchmarks/bench_srs.py
+#
+# Aralıklı tekrar yük testi: her biri --cards (varsayılan 10k) kartlık --users
+# kullanıcı oluşturulur; ardından
+#   - toplu değerlendirme: build_operations + bulk_write ile değerlendirme/s,
+#   - "sıradaki 20 kart" sorgusunun p50/p99 gecikmesi ve explain ile index
+#     kullanımı (COLLSCAN/FETCH olmamalı)
+# ölçülür. MONGO_URL/DB_NAME gerçek bir mongod'u göstermeli.
+#
+#   python benchmarks/bench_srs.py --users 20 --cards 10000 --reviews 500000
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+from srs import SpacedRepetition  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def plan_stages(plan: dict) -> set:
+    stages, stack = set(), [plan]
+    while stack:
+        node = stack.pop()
+        stages.add(node.get("stage"))
+        stack.extend(node.get("inputStages", []))
+        if "inputStage" in node:
+            stack.append(node["inputStage"])
+    return stages
+
+
+async def review_batches(srs, user_ids, args, rng, now):
+    """Kullanıcı başına --batch değerlendirmelik istekler, --concurrency eşzamanlı"""
+    batches = []
+    for n in range(args.reviews // args.batch):
+        reviews = [
+            {"card_id": f"card-{rng.randrange(args.cards)}", "grade": rng.choice((1, 3, 4, 4, 5)),
+             "reviewed_at": now - timedelta(seconds=rng.randrange(3600))}
+            for _ in range(args.batch)
+        ]
+        batches.append((user_ids[n % len(user_ids)], reviews))
+
+    queue = iter(batches)
+    build_time = 0.0
+
+    async def worker():
+        nonlocal build_time
+        for user_id, reviews in queue:
+            started = time.perf_counter()
+            operations = srs.build_operations(user_id, reviews, now)
+            build_time += time.perf_counter() - started
+            await srs.cards.bulk_write(operations, ordered=False)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return len(batches) * args.batch, time.perf_counter() - started, build_time
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=10000, help="kullanıcı başına kart")
+    parser.add_argument("--reviews", type=int, default=500000)
+    parser.add_argument("--batch", type=int, default=1000, help="istek başına değerlendirme")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    run = uuid.uuid4().hex[:8]
+    user_ids = [f"bench-srs-{run}-{i}" for i in range(args.users)]
+    srs = SpacedRepetition(server.db)
+    rng = random.Random(run)
+    now = datetime.utcnow()
+
+    await server.db.flashcard_state.create_index(
+        [("user_id", 1), ("due_at", 1), ("card_id", 1)], name="user_due_queue"
+    )
+
+    # Başlangıç durumu: kartların vadeleri ±30 gün arasına dağılmış
+    print(f"🏗️  {args.users} kullanıcı × {args.cards:,} kart yükleniyor...")
+    started = time.perf_counter()
+    for user_id in user_ids:
+        docs = [
+            {"_id": f"{user_id}:card-{c}", "user_id": user_id, "card_id": f"card-{c}", "ease": 2.5,
+             "interval": 6, "reps": 2, "lapses": 0, "reviews": 2,
+             "due_at": now + timedelta(minutes=rng.randint(-30 * 1440, 30 * 1440))}
+            for c in range(args.cards)
+        ]
+        await server.db.flashcard_state.insert_many(docs, ordered=False)
+    print(f"   {(time.perf_counter() - started):.1f}s")
+
+    reviews, elapsed, build_time = await review_batches(srs, user_ids, args, rng, now)
+    print(f"📊 {reviews:,} değerlendirme {elapsed:.2f}s içinde → {reviews / elapsed:,.0f} değerlendirme/s "
+          f"(işlem kurma {build_time / elapsed * 100:.0f}%)")
+
+    latencies = []
+    for n in range(args.queries):
+        started = time.perf_counter()
+        await srs.due_cards(user_ids[n % len(user_ids)], 20, now)
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"📊 Sıradaki 20 kart: p50={percentile(latencies, 50):.2f}ms  p99={percentile(latencies, 99):.2f}ms")
+
+    explain = await server.db.command(
+        "explain",
+        {"find": "flashcard_state", "filter": {"user_id": user_ids[0], "due_at": {"$lte": now}},
+         "projection": {"_id": 0, "card_id": 1, "due_at": 1}, "sort": {"due_at": 1}, "limit": 20},
+        verbosity="executionStats",
+    )
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    examined = explain["executionStats"]["totalDocsExamined"]
+    covered = "COLLSCAN" not in stages and "FETCH" not in stages and "SORT" not in stages
+    print(f"{'✅' if covered else '❌'} Plan: {sorted(s for s in stages if s)}  incelenen doküman={examined}")
+
+    await server.db.flashcard_state.delete_many({"user_id": {"$regex": f"^bench-srs-{run}-"}})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
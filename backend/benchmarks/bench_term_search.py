@@ -0,0 +1,110 @@
+# backend/benchmarks/bench_term_search.py
+#
+# Terim arama gecikmesi: gerçek katalog kök + sonek kombinasyonlarıyla sentetik
+# olarak büyütülür (varsayılan 10k / 100k / 1M kayıt). Her boyutta index kurulum
+# süresi ve sorgu tipine göre p50/p99 ölçülür (soğuk: sıralama cache'i boş,
+# sıcak: aynı sorgunun sonraki sayfası); Study.jsx'teki gibi doğrusal filtre
+# referans olarak verilir.
+#
+#   python benchmarks/bench_term_search.py --sizes 10000,100000,1000000
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from term_catalogue import TermCatalogue, fold, load_source_records  # noqa: E402
+
+SUFFIXES = [
+    ("itis", "iltihabı"), ("ektomi", "cerrahi çıkarılması"), ("ostomi", "ağız açılması"),
+    ("algia", "ağrısı"), ("oma", "tümörü"), ("pati", "hastalığı"), ("skopi", "incelenmesi"),
+    ("megali", "büyümesi"), ("plasti", "onarımı"), ("gram", "kaydı"), ("lizis", "çözülmesi"),
+]
+
+QUERIES = {
+    "1 harf": ["a", "k", "o"],
+    "2 harf": ["os", "ka", "he"],
+    "kök": ["oste", "cardi", "hepat"],
+    "tam kelime": ["kemik", "iltihabı", "osteoma"],
+    "çok kelime": ["kemik iltihabı", "karaciğer büyümesi"],
+    "eşleşmez": ["zzqx", "qwerty"],
+}
+
+
+def synthetic_records(base: list, size: int, seed: int = 7) -> list:
+    """Gerçek kayıtlar + kök×sonek türevleri; gerekirse numaralı kopyalar"""
+    rng = random.Random(seed)
+    roots = [r for r in base if r["kind"] == "root"] or base
+    records = list(base[:size])
+    while len(records) < size:
+        root = rng.choice(roots)
+        suffix, meaning = rng.choice(SUFFIXES)
+        stem = root["term"].split("/")[0]
+        n = len(records)
+        records.append({
+            "id": f"syn-{n}", "kind": "term", "term": f"{stem}{suffix}{'' if n < 50000 else n % 997}",
+            "turkish": f"{root['turkish']} {meaning}", "roots": root["term"], "definition": "",
+            "system": root["system"], "category": root["category"],
+        })
+    return records
+
+
+def linear_search(records: list, query: str) -> int:
+    """Study.jsx'teki filtre mantığı: her kayıtta alt-dize arama"""
+    needle = fold(query)
+    return sum(1 for r in records if needle in fold(r["term"]) or needle in fold(r["turkish"]))
+
+
+def measure(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--linear-max", type=int, default=100000, help="doğrusal filtreyi bu boyuta kadar ölç")
+    args = parser.parse_args()
+
+    base = load_source_records()
+    print(f"📚 Gerçek katalog: {len(base)} kayıt")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        records = synthetic_records(base, size)
+        started = time.perf_counter()
+        catalogue = TermCatalogue(records)
+        build = time.perf_counter() - started
+        postings = sum(len(p) for p in catalogue._trigrams.values())
+        print(f"\n🏗️  {size:,} kayıt: index {build:.1f}s, {len(catalogue._trigrams):,} trigram, {postings:,} posting")
+
+        for label, queries in QUERIES.items():
+            cold, cached, totals = [], [], []
+            for query in queries:
+                totals.append(catalogue.search(query)[0])
+                # Soğuk: sıralama cache'i boşken; sıcak: aynı sorgunun sonraki sayfası
+                cold += measure(lambda: (catalogue._rankings.clear(), catalogue.search(query, limit=20)), args.repeat)
+                cached += measure(lambda: catalogue.search(query, offset=20, limit=20), args.repeat)
+            print(f"  {label:<12} soğuk p50 {percentile(cold, 0.5):>8.2f} ms  p99 {percentile(cold, 0.99):>8.2f} ms"
+                  f"   sıcak p50 {percentile(cached, 0.5):>6.3f} ms"
+                  f"   (eşleşme: {', '.join(f'{t:,}' for t in totals)})")
+
+        if size <= args.linear_max:
+            samples = measure(lambda: linear_search(records, "kemik"), 3)
+            print(f"  {'doğrusal':<12} p50 {statistics.median(samples):>8.2f} ms   (referans: 'kemik')")
+
+
+if __name__ == "__main__":
+    main()
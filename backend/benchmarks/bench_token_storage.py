@@ -0,0 +1,182 @@
+# backend/benchmarks/bench_token_storage.py
+#
+# refresh_tokens anahtar biçimi: düz metin (36 karakter uuid token + jti) ile
+# SHA-256 özeti (BinData 32 bayt) + 16 baytlık binary jti karşılaştırması.
+# İki koleksiyon aynı index'lerle (token unique, jti unique sparse) doldurulur;
+# collStats'tan index/veri boyutları ve token ile tekil aramanın p50/p99
+# gecikmesi + eşzamanlı verimi raporlanır. Varsayılan 10M doküman; yükleme
+# mongod'a göre birkaç dakika sürer. MONGO_URL/DB_NAME gerçek bir mongod'u
+# göstermeli.
+#
+#   python benchmarks/bench_token_storage.py --docs 10000000 --lookups 20000
+#   python benchmarks/bench_token_storage.py --docs 10000000 --skip-load   # önceki yüklemeyi ölç
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson.binary import UUID_SUBTYPE, Binary
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+from token_keys import token_digest  # noqa: E402
+
+LAYOUTS = ("plaintext", "hashed")
+
+
+def token_for(i: int) -> str:
+    """i. dokümanın istemci token'ı - 10M token bellekte tutulmadan tekrar üretilebilir"""
+    return str(uuid.UUID(bytes=hashlib.md5(f"token:{i}".encode()).digest(), version=4))
+
+
+def jti_for(i: int) -> uuid.UUID:
+    return uuid.UUID(bytes=hashlib.md5(f"jti:{i}".encode()).digest(), version=4)
+
+
+def make_doc(layout: str, i: int, now: datetime) -> dict:
+    if layout == "hashed":
+        keys = {"token": token_digest(token_for(i)), "jti": Binary(jti_for(i).bytes, UUID_SUBTYPE)}
+    else:
+        keys = {"token": token_for(i), "jti": str(jti_for(i))}
+    return {**keys, "user_id": f"user-{i % 1000003}", "is_active": True,
+            "created_at": now, "expires_at": now + timedelta(days=7), "rotations": 0}
+
+
+def lookup_key(layout: str, i: int):
+    token = token_for(i)
+    return token_digest(token) if layout == "hashed" else token
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def load(collection, layout: str, docs: int, batch_size: int, concurrency: int):
+    await collection.drop()
+    await collection.create_index([("token", 1)], name="refresh_token_unique", unique=True)
+    await collection.create_index([("jti", 1)], name="jti_1", unique=True, sparse=True)
+    now = datetime.utcnow()
+    queue = asyncio.Queue()
+    for start in range(0, docs, batch_size):
+        queue.put_nowait(start)
+
+    started = time.perf_counter()
+    done = 0
+
+    async def worker():
+        nonlocal done
+        while not queue.empty():
+            start = queue.get_nowait()
+            batch = [make_doc(layout, i, now) for i in range(start, min(start + batch_size, docs))]
+            await collection.insert_many(batch, ordered=False)
+            done += len(batch)
+            if done % (batch_size * 100) < len(batch):
+                print(f"  ↳ {layout}: {done:,}/{docs:,} ({done / (time.perf_counter() - started):,.0f} doküman/s)")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def sizes(db, name: str) -> dict:
+    try:
+        stats = await db.command("collStats", name)
+    except (OperationFailure, NotImplementedError):
+        return {}
+    return {"data": stats.get("size", 0), "storage": stats.get("storageSize", 0),
+            "avg_doc": stats.get("avgObjSize", 0), "indexes": stats.get("indexSizes", {})}
+
+
+async def measure_lookups(collection, layout: str, docs: int, lookups: int, concurrency: int, rng: random.Random):
+    keys = [lookup_key(layout, rng.randrange(docs)) for _ in range(lookups)]
+    # Isınma: index sayfaları cache'e
+    for key in keys[: min(2000, lookups)]:
+        await collection.find_one({"token": key}, projection={"_id": 1})
+
+    latencies = []
+    for key in keys:
+        started = time.perf_counter()
+        found = await collection.find_one({"token": key}, projection={"_id": 1})
+        latencies.append((time.perf_counter() - started) * 1000)
+        if found is None:
+            raise RuntimeError(f"{layout}: token bulunamadı - yükleme eksik mi?")
+
+    queue = asyncio.Queue()
+    for key in keys:
+        queue.put_nowait(key)
+
+    async def worker():
+        while not queue.empty():
+            await collection.find_one({"token": queue.get_nowait()}, projection={"_id": 1})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    throughput = lookups / (time.perf_counter() - started)
+    return percentile(latencies, 50), percentile(latencies, 99), throughput
+
+
+def mb(value) -> str:
+    return f"{value / 1e6:,.1f} MB"
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=8, help="yükleme ve verim ölçümü")
+    parser.add_argument("--skip-load", action="store_true", help="koleksiyonlar önceki çalıştırmadan kaldı")
+    parser.add_argument("--keep", action="store_true", help="sonunda koleksiyonları silme")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    collections = {layout: db[f"bench_refresh_tokens_{layout}"] for layout in LAYOUTS}
+
+    try:
+        if not args.skip_load:
+            for layout, collection in collections.items():
+                started = time.perf_counter()
+                await load(collection, layout, args.docs, args.batch_size, args.concurrency)
+                print(f"🏗️  {layout}: {args.docs:,} doküman {time.perf_counter() - started:.0f}s'de yüklendi")
+
+        print(f"📊 {args.docs:,} doküman, {args.lookups:,} token araması")
+        results = {}
+        for layout, collection in collections.items():
+            stats = await sizes(db, collection.name)
+            p50, p99, throughput = await measure_lookups(
+                collection, layout, args.docs, args.lookups, args.concurrency, random.Random(7))
+            results[layout] = (stats, p50, p99, throughput)
+            indexes = stats.get("indexes", {})
+            print(f"  {layout:<10} ort. doküman {stats.get('avg_doc', 0):>4} B  veri {mb(stats.get('data', 0)):>11}  "
+                  f"token index {mb(indexes.get('refresh_token_unique', 0)):>10}  jti index {mb(indexes.get('jti_1', 0)):>10}  "
+                  f"p50={p50:.3f}ms  p99={p99:.3f}ms  {throughput:,.0f} arama/s")
+
+        (plain, *_), (hashed, *_) = results["plaintext"], results["hashed"]
+        if plain and hashed:
+            for label, before, after in (
+                ("token index", plain["indexes"].get("refresh_token_unique", 0), hashed["indexes"].get("refresh_token_unique", 0)),
+                ("jti index", plain["indexes"].get("jti_1", 0), hashed["indexes"].get("jti_1", 0)),
+                ("veri", plain["data"], hashed["data"]),
+            ):
+                if before:
+                    print(f"  {label:<12} {mb(before)} → {mb(after)} ({(after - before) / before * 100:+.1f}%)")
+        print(f"  p99 arama    {results['plaintext'][2]:.3f}ms → {results['hashed'][2]:.3f}ms")
+    finally:
+        if not args.keep:
+            for collection in collections.values():
+                await collection.drop()
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_token_verify.py
+#
+# get_current_user_id: eski dependency (her istekte jwt.decode + print) ile
+# LRU cache'li hızlı yolun karşılaştırması. 1k / 10k / 100k istek/s sentetik
+# trafiğin 1 saniyelik dilimi üretilir; hedef hızı karşılamak için gereken CPU
+# oranı raporlanır (>%100 = tek worker o hızı kaldıramaz).
+#
+#   python benchmarks/bench_token_verify.py --users 5000
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import jwt
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_bench")
+
+import server  # noqa: E402
+
+
+def legacy_get_current_user_id(authorization):
+    """Önceki implementasyonun birebir kopyası (karşılaştırma için)"""
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization missing")
+    try:
+        scheme, token = authorization.split(" ")
+        if scheme.lower() != "bearer":
+            raise ValueError("Bad scheme")
+        payload = jwt.decode(token, server.JWT_SECRET, algorithms=[server.JWT_ALGORITHM])
+        expire_time = datetime.fromtimestamp(payload["exp"])
+        remaining_minutes = (expire_time - datetime.utcnow()).total_seconds() / 60
+        print(f"⏰ TOKEN DEBUG - Kalan: {remaining_minutes:.1f} dakika | User: {payload['sub']}")
+        if payload.get("type") != "access":
+            raise ValueError("Bad token type")
+        return payload["sub"]
+    except jwt.ExpiredSignatureError:
+        print("⏰ ⚠️ ⚠️ TOKEN EXPIRED - Refresh tetiklenecek!")
+        raise HTTPException(status_code=401, detail="Token expired")
+    except Exception as e:
+        print(f"⏰ ❌ Token decode error: {e}")
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+
+def make_headers(users: int):
+    headers = []
+    for i in range(users):
+        payload = {
+            "sub": f"user-{i}",
+            "exp": datetime.utcnow() + timedelta(minutes=60),
+            "type": "access",
+        }
+        headers.append("Bearer " + jwt.encode(payload, server.JWT_SECRET, algorithm=server.JWT_ALGORITHM))
+    return headers
+
+
+async def run_fast(traffic):
+    started = time.perf_counter()
+    for header in traffic:
+        await server.get_current_user_id(header)
+    return time.perf_counter() - started
+
+
+def run_legacy(traffic):
+    # Print maliyeti gerçekçi olsun: satır tamponlu bir dosyaya her satırda write()
+    with open(os.devnull, "w", buffering=1) as sink, redirect_stdout(sink):
+        started = time.perf_counter()
+        for header in traffic:
+            legacy_get_current_user_id(header)
+        return time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000, help="aktif kullanıcı (farklı token) sayısı")
+    parser.add_argument("--rates", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    headers = make_headers(args.users)
+
+    print(f"🏁 {args.users} farklı token, cache boyutu {server.access_token_cache.max_size}")
+    print(f"{'rate':>8} {'legacy µs/op':>13} {'cached µs/op':>13} {'speedup':>8} {'legacy CPU':>11} {'cached CPU':>11}")
+    for rate in (int(r) for r in args.rates.split(",")):
+        # 1 saniyelik trafik: aktif kullanıcılar arasında rastgele dağılım
+        traffic = [rng.choice(headers) for _ in range(rate)]
+        server.access_token_cache.clear()
+
+        legacy = run_legacy(traffic)
+        fast = await run_fast(traffic)
+
+        print(f"{rate:>8} {legacy / rate * 1e6:>13.2f} {fast / rate * 1e6:>13.2f} "
+              f"{legacy / fast:>7.1f}x {legacy * 100:>10.1f}% {fast * 100:>10.1f}%")
+
+    print(f"📊 Cache: {server.access_token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
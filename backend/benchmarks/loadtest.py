@@ -0,0 +1,403 @@
+# backend/benchmarks/loadtest.py
+#
+# Auth API yük testi: asyncio + httpx ile eşzamanlı istemciler, senaryo başına
+# verim ve p50/p95/p99 gecikme, çıktı JSON. İki çalıştırmanın JSON'u
+# karşılaştırılıp gerilemeler işaretlenir (farklı commit'ler / ayarlar).
+#
+# Senaryolar: register, login, refresh (eşzamanlı rotation fırtınası), me,
+# sessions (/auth/sessions + /auth/sessions/detailed).
+#
+# Hedef:
+#   - in-process (varsayılan): server.app httpx ASGITransport ile sürülür,
+#     lifespan çalışır. Veritabanı MONGO_URL/DB_NAME (yerel mongod) ya da
+#     --db memory ile bellek içi mongomock-motor (pip install mongomock-motor).
+#     Bellek içi veritabanı senaryoların çalıştığını hızlıca doğrulamak
+#     içindir; mutlak sayılar ve karşılaştırmalar mongod ile alınmalı.
+#   - --base-url http://127.0.0.1:8000: ayrı çalışan uvicorn. Register/login
+#     IP başına rate limit'lidir; her istek farklı bir X-Forwarded-For ile
+#     gelir, uvicorn bunu 127.0.0.1'den gelen isteklerde varsayılan olarak
+#     kabul eder (--proxy-headers / --forwarded-allow-ips). In-process modda
+#     aynı başlık uvicorn'un ProxyHeadersMiddleware'i ile uygulanır.
+#
+# refresh senaryosunda her worker bir zincir rotate eder; zincir rotation
+# limitine (--chain-length, sunucuda MAX_REFRESH_ROTATIONS) gelince yenisi
+# alınır (ölçülmez). In-process modda yeni zincir doğrudan
+# save_refresh_token ile yazılır, uzak hedefte login ile (bcrypt süresi
+# fırtınayı seyreltir).
+#
+# Tekrarlanabilirlik: sabit --seed, senaryo başına ısınma süresi (ölçülmez),
+# sonuç dosyasında commit / Python sürümü / parametreler.
+#
+#   python benchmarks/loadtest.py run --db memory --seconds 5 --output base.json
+#   python benchmarks/loadtest.py run --scenarios login,refresh,me --output new.json
+#   python benchmarks/loadtest.py compare base.json new.json --threshold 10
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import jwt
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+SCENARIOS = ("register", "login", "refresh", "me", "sessions")
+PASSWORD = "loadtest-password-123"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(latencies: list, status: dict, failures: int, elapsed: float) -> dict:
+    total = len(latencies)
+    return {
+        "requests": total,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2) if latencies else 0.0,
+        "errors": failures + sum(count for code, count in status.items() if int(code) >= 400),
+        "status": {str(code): count for code, count in sorted(status.items())},
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+# =====================
+# HEDEF
+# =====================
+
+async def in_process_app(exit_stack: AsyncExitStack, memory_db: bool):
+    """server.app'i lifespan'ıyla başlat; istemci IP'si X-Forwarded-For'dan okunur"""
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "healthlex_loadtest")
+    import server
+    from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+    if memory_db:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--db memory için: pip install mongomock-motor")
+        from progress import ProgressService
+        from srs import SpacedRepetition
+        from revocation import RevocationService
+
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[os.environ["DB_NAME"]]
+        server.progress_service = ProgressService(server.db)
+        server.spaced_repetition = SpacedRepetition(server.db)
+        server.token_revocations = RevocationService(server.db, server.ACCESS_TOKEN_MINUTES * 60)
+        server.cache_bus.log.db = server.db
+        server.token_janitor.db = server.db
+
+    await exit_stack.enter_async_context(server.app.router.lifespan_context(server.app))
+    return server, ProxyHeadersMiddleware(server.app, trusted_hosts="*")
+
+
+def direct_refresh_issuer(server):
+    """Yeni refresh zinciri: login/bcrypt olmadan doğrudan token kaydı"""
+    from starlette.requests import Request
+
+    request = Request({"type": "http", "headers": [(b"user-agent", b"loadtest")], "client": ("127.0.0.1", 5000)})
+
+    async def issue(user_id: str) -> str:
+        refresh_token, _ = await server.save_refresh_token(user_id, request)
+        return refresh_token
+    return issue
+
+
+# =====================
+# SENARYOLAR
+# =====================
+
+class LoadTest:
+    def __init__(self, http: httpx.AsyncClient, rng: random.Random, run_id: str,
+                 chain_length: int = 10, issue_refresh=None):
+        self.http = http
+        self.rng = rng
+        self.run_id = run_id
+        self.chain_length = chain_length
+        self.issue_refresh = issue_refresh
+        # Her istek farklı bir kaynak IP'den: rate limit senaryoyu ölçmesin
+        self._ip_counter = rng.randrange(1 << 20)
+        self._email_counter = 0
+        self.users = []  # {"email", "id", "access", "refresh"}
+
+    def next_ip(self) -> dict:
+        self._ip_counter += 1
+        n = self._ip_counter & 0xFFFFFF
+        return {"X-Forwarded-For": f"10.{n >> 16}.{(n >> 8) & 255}.{n & 255}"}
+
+    def new_email(self) -> str:
+        self._email_counter += 1
+        return f"loadtest-{self.run_id}-{self._email_counter}@example.com"
+
+    async def register(self, email: str) -> httpx.Response:
+        return await self.http.post("/api/auth/register", headers=self.next_ip(),
+                                    json={"email": email, "password": PASSWORD, "name": "Load Test"})
+
+    async def login(self, email: str) -> httpx.Response:
+        return await self.http.post("/api/auth/login", headers=self.next_ip(),
+                                    json={"email": email, "password": PASSWORD})
+
+    async def setup_users(self, count: int, concurrency: int):
+        """Ölçülmez: login/me/sessions/refresh senaryoları için kullanıcı havuzu"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def create():
+            async with semaphore:
+                email = self.new_email()
+                (await self.register(email)).raise_for_status()
+                res = await self.login(email)
+                res.raise_for_status()
+                tokens = res.json()
+                user_id = jwt.decode(tokens["access_token"], options={"verify_signature": False})["sub"]
+                self.users.append({"email": email, "id": user_id,
+                                   "access": tokens["access_token"], "refresh": tokens["refresh_token"]})
+
+        await asyncio.gather(*(create() for _ in range(count)))
+
+    def scenario(self, name: str):
+        """(hazırlık, adım): hazırlık ölçülmez, adım tek bir ölçülen istektir"""
+        async def no_prepare(state):
+            pass
+
+        if name == "register":
+            async def step(state):
+                return await self.register(self.new_email())
+            return no_prepare, step
+
+        if name == "login":
+            async def step(state):
+                return await self.login(self.rng.choice(self.users)["email"])
+            return no_prepare, step
+
+        if name == "refresh":
+            # Worker başına bir zincir; rotation limitinde yenisi (ölçülmez)
+            async def prepare(state):
+                if state.get("refresh") and state["rotations"] < self.chain_length:
+                    return
+                if self.issue_refresh is not None:
+                    state["refresh"] = await self.issue_refresh(state["user"]["id"])
+                else:
+                    res = await self.login(state["user"]["email"])
+                    res.raise_for_status()
+                    state["refresh"] = res.json()["refresh_token"]
+                state["rotations"] = 0
+
+            async def step(state):
+                res = await self.http.post("/api/auth/refresh", headers={"Authorization": f"Bearer {state['refresh']}"})
+                state["refresh"] = res.json()["refresh_token"] if res.status_code == 200 else None
+                state["rotations"] += 1
+                return res
+            return prepare, step
+
+        if name == "me":
+            async def step(state):
+                return await self.http.get("/api/auth/me", headers={"Authorization": f"Bearer {state['user']['access']}"})
+            return no_prepare, step
+
+        if name == "sessions":
+            async def step(state):
+                state["n"] = state.get("n", 0) + 1
+                path = "/api/auth/sessions/detailed" if state["n"] % 2 else "/api/auth/sessions"
+                return await self.http.get(path, headers={"Authorization": f"Bearer {state['user']['access']}"})
+            return no_prepare, step
+
+        raise ValueError(f"Bilinmeyen senaryo: {name}")
+
+    async def drive(self, name: str, concurrency: int, seconds: float, warmup: float) -> dict:
+        prepare, step = self.scenario(name)
+        latencies, status = [], {}
+        failures = 0
+        measure_from = time.perf_counter() + warmup
+        deadline = measure_from + seconds
+
+        async def worker(index: int):
+            nonlocal failures
+            state = {"user": self.users[index % len(self.users)] if self.users else None}
+            while time.perf_counter() < deadline:
+                await prepare(state)
+                started = time.perf_counter()
+                try:
+                    res = await step(state)
+                except httpx.HTTPError:
+                    if started >= measure_from:
+                        failures += 1
+                    continue
+                if started >= measure_from:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    status[res.status_code] = status.get(res.status_code, 0) + 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        return summarize(latencies, status, failures, seconds)
+
+
+async def cleanup(server, run_id: str):
+    users = await server.db.users.find({"email": {"$regex": f"^loadtest-{run_id}-"}}, {"_id": 1}).to_list(None)
+    user_ids = [user["_id"] for user in users]
+    await server.db.refresh_tokens.delete_many({"user_id": {"$in": user_ids}})
+    await server.db.users.delete_many({"_id": {"$in": user_ids}})
+    return len(user_ids)
+
+
+async def run(args) -> dict:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Bilinmeyen senaryo: {', '.join(sorted(unknown))} (seçenekler: {', '.join(SCENARIOS)})")
+
+    rng = random.Random(args.seed)
+    # Kullanıcı e-postaları her çalıştırmada yeni (seed yalnızca istek seçimlerini sabitler)
+    run_id = uuid.uuid4().hex[:8]
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "target": args.base_url or "in-process",
+            "db": "memory" if args.db == "memory" else ("external" if args.base_url else os.environ.get("MONGO_URL", "")),
+            "seconds": args.seconds, "warmup": args.warmup, "concurrency": args.concurrency,
+            "users": args.users, "chain_length": args.chain_length, "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+
+    async with AsyncExitStack() as exit_stack:
+        server = None
+        if args.base_url:
+            transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+            base_url = args.base_url
+        else:
+            server, app = await in_process_app(exit_stack, args.db == "memory")
+            transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 5000))
+            base_url = "http://loadtest"
+
+        http = await exit_stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout))
+        test = LoadTest(http, rng, run_id, args.chain_length,
+                        direct_refresh_issuer(server) if server is not None else None)
+        try:
+            if set(scenarios) - {"register"}:
+                print(f"👥 {args.users} kullanıcı hazırlanıyor...", file=sys.stderr)
+                await test.setup_users(args.users, args.concurrency)
+
+            for name in scenarios:
+                summary = await test.drive(name, args.concurrency, args.seconds, args.warmup)
+                results["scenarios"][name] = summary
+                print(f"  {name:<9} {summary['rps']:>9,.1f} istek/s  p50={summary['p50_ms']:7.2f}ms  "
+                      f"p95={summary['p95_ms']:7.2f}ms  p99={summary['p99_ms']:7.2f}ms  hata={summary['errors']}",
+                      file=sys.stderr)
+        finally:
+            if server is not None:
+                removed = await cleanup(server, run_id)
+                print(f"🧹 {removed} test kullanıcısı silindi", file=sys.stderr)
+            else:
+                print(f"ℹ️  Uzak hedefte oluşturulan kullanıcılar 'loadtest-{run_id}-' önekiyle kaldı", file=sys.stderr)
+
+    return results
+
+
+# =====================
+# KARŞILAŞTIRMA
+# =====================
+
+def compare(base: dict, new: dict, threshold: float, min_delta_ms: float) -> list:
+    """Senaryo başına satırlar; verim threshold%'den fazla düştüyse ya da p95/p99
+    threshold%'den (ve min_delta_ms'den) fazla arttıysa gerileme"""
+    rows = []
+    for name, before in base["scenarios"].items():
+        after = new["scenarios"].get(name)
+        if after is None:
+            continue
+        changes, regressions = {}, []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            old, current = before[key], after[key]
+            changes[key] = round((current - old) / old * 100, 1) if old else 0.0
+        if changes["rps"] < -threshold:
+            regressions.append("rps")
+        for key in ("p95_ms", "p99_ms"):
+            if changes[key] > threshold and after[key] - before[key] > min_delta_ms:
+                regressions.append(key)
+        if after["errors"] > before["errors"]:
+            regressions.append("errors")
+        rows.append({"scenario": name, "before": before, "after": after, "change_pct": changes, "regressions": regressions})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth API yük testi")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="senaryoları çalıştır, sonucu JSON yaz")
+    run_parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    run_parser.add_argument("--base-url", default=None, help="ör. http://127.0.0.1:8000 (boş: in-process)")
+    run_parser.add_argument("--db", choices=("mongo", "memory"), default="mongo", help="in-process veritabanı")
+    run_parser.add_argument("--seconds", type=float, default=10.0, help="senaryo başına ölçüm süresi")
+    run_parser.add_argument("--warmup", type=float, default=1.0, help="senaryo başına ısınma (ölçülmez)")
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--users", type=int, default=32, help="hazırlanan kullanıcı sayısı")
+    run_parser.add_argument("--chain-length", type=int, default=10, help="refresh zinciri başına rotation")
+    run_parser.add_argument("--timeout", type=float, default=30.0)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--output", default=None, help="JSON dosyası (boş: stdout)")
+
+    compare_parser = commands.add_parser("compare", help="iki sonucu karşılaştır, gerilemede çıkış kodu 1")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="yüzde")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0, help="gecikmede gürültü eşiği")
+    compare_parser.add_argument("--json", action="store_true", help="tabloyu değil JSON'u yaz")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = asyncio.run(run(args))
+        text = json.dumps(results, indent=2, ensure_ascii=False)
+        if args.output:
+            Path(args.output).write_text(text + "\n", encoding="utf-8")
+        else:
+            print(text)
+        return 0
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    rows = compare(base, new, args.threshold, args.min_delta_ms)
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        print(f"📊 {base['meta'].get('commit') or args.base} → {new['meta'].get('commit') or args.new} "
+              f"(eşik %{args.threshold:g})")
+        for row in rows:
+            change = row["change_pct"]
+            mark = "❌" if row["regressions"] else "✅"
+            print(f"{mark} {row['scenario']:<9} rps {row['before']['rps']:>9,.1f} → {row['after']['rps']:>9,.1f} "
+                  f"({change['rps']:+.1f}%)  p95 {change['p95_ms']:+.1f}%  p99 {change['p99_ms']:+.1f}%"
+                  + (f"  gerileme: {', '.join(row['regressions'])}" if row["regressions"] else ""))
+    return 1 if any(row["regressions"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# backend/bloom.py
+#
+# Sabit boyutlu Bloom filtresi: token iptalleri (revocation.py) ve login'de
+# bilinen başarısız çiftler (login_admission.py) tarafından paylaşılır.
+# Yanlış negatif yoktur; yanlış pozitif oranı kapasite dolana kadar fp_rate
+# civarındadır. Silme yoktur - kullananlar filtreleri nesiller halinde
+# tutup eskisini toptan atar.
+import math
+
+
+class BloomFilter:
+    """128 bitlik anahtarlar için Bloom filtresi.
+
+    Anahtar zaten düzgün dağılmış olmalı (rastgele UUID ya da 16 baytlık
+    özet); ayrıca hash'lenmez, iki yarısı çift hash'leme için kullanılır.
+    """
+
+    __slots__ = ("size", "hashes", "bits", "count")
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, key: int):
+        size, bits = self.size, self.bits
+        # Çift hash: index = h1 + i*h2 (mod size); küçük tamsayılarla ilerlenir
+        index, step = key % size, (key >> 64) % size or 1
+        for _ in range(self.hashes):
+            bits[index >> 3] |= 1 << (index & 7)
+            index += step
+            if index >= size:
+                index -= size
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        size, bits = self.size, self.bits
+        index, step = key % size, (key >> 64) % size or 1
+        for _ in range(self.hashes):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False  # filtrede olmayan anahtarlarda çoğunlukla ilk bir-iki bitte
+            index += step
+            if index >= size:
+                index -= size
+        return True
@@ -0,0 +1,180 @@
+# backend/cache_bus.py
+#
+# Kullanıcı başına okuma cache'leri (/auth/me profili, bildirim tercihleri,
+# oturum listeleri) ve worker'lar arası geçersiz kılma. users / refresh_tokens
+# yazan kod invalidate() çağırır: kayıt bu worker'da hemen atılır, olay
+# cache_invalidations capped koleksiyonuna yazılır ve diğer worker'lar takip
+# ederek (bkz. capped_log.py) aynı kaydı atar. Olaylar kısa aralıklarla
+# toplanıp tek dokümanda yazılır - istek yolunda ek round trip yok.
+#
+# Bayatlık sınırı: yazma aralığı + takip gecikmesi (stats()["sync"]["lag_ms"]).
+# Olay kaybolsa bile (akış koptu) kayıtlar USER_CACHE_TTL sonra düşer.
+#
+#   USER_CACHE_TTL=30            (saniye; 0 = cache kapalı, her okuma veritabanından)
+#   USER_CACHE_SIZE=50000        (cache başına kullanıcı)
+#   CACHE_BUS_FLUSH_MS=20
+#   CACHE_BUS_LOG_SIZE_MB=32
+import asyncio
+import logging
+import os
+
+from capped_log import CappedLog
+from token_cache import TTLCache
+
+logger = logging.getLogger("healthlex.cache_bus")
+
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "50000"))
+CACHE_BUS_FLUSH_MS = int(os.environ.get("CACHE_BUS_FLUSH_MS", "20"))
+CACHE_BUS_LOG_SIZE_MB = int(os.environ.get("CACHE_BUS_LOG_SIZE_MB", "32"))
+# Akış yazılamazken biriken geçersiz kılmaların tavanı - aşılırsa TTL'e kalınır
+_MAX_PENDING_USERS = 100000
+
+
+class UserReadCache:
+    """user_id → değer; yükleme sırasında gelen geçersiz kılma bayat değerin yazılmasını engeller"""
+
+    def __init__(self, name: str, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.name = name
+        self.enabled = ttl > 0
+        self._entries = TTLCache(max_size, ttl)
+        # user_id → yükleme jetonu; invalidate jetonu siler, yükleme sonucu cache'e girmez
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, user_id: str, loader):
+        """Cache'teki değer ya da await loader(user_id) sonucu (None cache'lenmez)"""
+        if self.enabled:
+            value = self._entries.get(user_id)
+            if value is not None:
+                self.hits += 1
+                return value
+        self.misses += 1
+
+        token = object()
+        self._loading[user_id] = token
+        try:
+            value = await loader(user_id)
+        finally:
+            current = self._loading.get(user_id)
+            if current is token:
+                del self._loading[user_id]
+        if current is token and value is not None and self.enabled:
+            self._entries.put(user_id, value)
+        return value
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id)
+        self._loading.pop(user_id, None)
+        self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._loading.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheBus:
+    """Okuma cache'lerinin kaydı + cache_invalidations üzerinden yayılan geçersiz kılmalar"""
+
+    def __init__(self, db, collection: str = "cache_invalidations", flush_ms: int = CACHE_BUS_FLUSH_MS):
+        self.caches = {}
+        self.flush_interval = flush_ms / 1000
+        self.log = CappedLog(db, collection, self._apply, size_bytes=CACHE_BUS_LOG_SIZE_MB * 1024 * 1024)
+        # Yazılmayı bekleyen olaylar: cache adları → user_id'ler
+        self._pending = {}
+        self._pending_users = 0
+        self._wake = None
+        self._task = None
+        self.dropped = 0
+        self.publish_errors = 0
+
+    def cache(self, name: str, **options) -> UserReadCache:
+        if name in self.caches:
+            raise ValueError(f"Cache zaten kayıtlı: {name}")
+        cache = self.caches[name] = UserReadCache(name, **options)
+        return cache
+
+    def invalidate(self, user_id: str, *names: str):
+        """Bu worker'da hemen, diğerlerinde takip gecikmesiyle"""
+        for name in names:
+            self.caches[name].invalidate(user_id)
+        if self._task is None:
+            return  # tek process (ör. script / test): yayılacak worker yok
+        if self._pending_users >= _MAX_PENDING_USERS:
+            self.dropped += 1
+            return
+        users = self._pending.setdefault(names, set())
+        if user_id not in users:
+            users.add(user_id)
+            self._pending_users += 1
+        self._wake.set()
+
+    def _apply(self, event: dict):
+        """CappedLog handler'ı - diğer worker'ların olayları"""
+        caches = [self.caches[name] for name in event.get("caches", ()) if name in self.caches]
+        for user_id in event.get("user_ids", ()):
+            for cache in caches:
+                cache.invalidate(user_id)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending, self._pending_users = self._pending, {}, 0
+        try:
+            await self.log.publish(*({"caches": list(names), "user_ids": sorted(users)}
+                                     for names, users in pending.items()), apply_locally=False)
+        except Exception as e:
+            # Sonraki turda tekrar denenir; diğer worker'lar o zamana kadar TTL'e kalır
+            self.publish_errors += 1
+            logger.warning("⚠️ Cache geçersiz kılmaları yazılamadı: %s", e)
+            for names, users in pending.items():
+                self._pending.setdefault(names, set()).update(users)
+            self._pending_users = sum(len(users) for users in self._pending.values())
+            self._wake.set()
+            await asyncio.sleep(self.flush_interval * 10)
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            # Kısa bekleme: aynı anda gelen yazmalar tek dokümanda toplansın
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            self.log.start()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.flush()
+            await self.log.stop()
+
+    def stats(self) -> dict:
+        return {
+            "caches": {name: cache.stats() for name, cache in self.caches.items()},
+            "pending_users": self._pending_users,
+            "dropped": self.dropped,
+            "publish_errors": self.publish_errors,
+            "sync": self.log.stats(),
+        }
@@ -0,0 +1,189 @@
+# backend/capped_log.py
+#
+# Worker'lar arası olay akışı: capped koleksiyona yazılan olaylar her worker'da
+# tailable-await cursor ile okunur (change stream gibi replica set gerektirmez,
+# tek mongod'da da çalışır). Başlangıçta koleksiyondaki geçerli olaylar
+# yeniden oynatılır, sonra son _id'den itibaren takip edilir. Cursor ölürse
+# (koleksiyon boş, bağlantı koptu) artan beklemeyle yeniden açılır.
+#
+# Olaylar koleksiyona yazıldıktan sonra yayınlayan worker'da aynı handler ile
+# uygulanır (takipte kendi olayları atlanır); yazılamayan olay hiçbir yerde
+# uygulanmaz, hata çağırana döner. Diğer worker'lardaki gecikme
+# stats()["lag_ms"] ile izlenir. Handler'lar idempotent olmalı: yeniden oynatmada tekrar görülebilir.
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger("healthlex.capped_log")
+
+# Tailable cursor'ın yeni olay için sunucuda bekleme süresi
+_AWAIT_MS = 1000
+# Cursor normal kapandığında (boş koleksiyon) yeniden açma aralığı - gecikme tavanı
+_REOPEN_INTERVAL = 0.2
+# Hata sonrası artan bekleme tavanı
+_MAX_BACKOFF = 5.0
+# Yayında geçici hatalar (failover, bağlantı kopması) için deneme sayısı
+_PUBLISH_ATTEMPTS = 3
+
+
+class CappedLog:
+    """Capped koleksiyon üstünde yayınla / takip et"""
+
+    def __init__(self, db, name: str, handler, size_bytes: int, max_docs: int = None, replay_filter=None):
+        self.db = db
+        self.name = name
+        self.handler = handler
+        self.size_bytes = size_bytes
+        self.max_docs = max_docs
+        # Başlangıçta hangi olayların yeniden oynatılacağı (ör. süresi dolmamışlar)
+        self.replay_filter = replay_filter
+        # Bu process'in olayları takipte tekrar uygulanmasın
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._last_id = None
+        self._task = None
+        self._ready = None
+        self.published = 0
+        self.applied = 0
+        self.replayed = 0
+        self.reconnects = 0
+        self.errors = 0
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    @property
+    def collection(self):
+        return self.db[self.name]
+
+    async def ensure_collection(self):
+        options = {"capped": True, "size": self.size_bytes}
+        if self.max_docs:
+            options["max"] = self.max_docs
+        try:
+            await self.db.create_collection(self.name, **options)
+        except CollectionInvalid:
+            pass  # zaten var
+
+    async def publish(self, *events: dict, apply_locally: bool = True):
+        """Olayları koleksiyona yaz, sonra bu worker'da handler'ı çalıştır
+        (apply_locally=False: çağıran yerel etkiyi zaten uyguladı)"""
+        if not events:
+            return
+        documents = await self._insert(events)
+        if apply_locally:
+            for document in documents:
+                self.handler(document)
+        self.published += len(documents)
+
+    async def _insert(self, events) -> list:
+        for attempt in range(_PUBLISH_ATTEMPTS):
+            # Her denemede yeni _id: geç yazılan olay takipçilerin son _id'sinin
+            # gerisinde kalıp atlanmasın (yinelenen olay zararsız, handler idempotent)
+            now = time.time()
+            documents = [{**event, "_id": ObjectId(), "origin": self.origin, "at_ts": now} for event in events]
+            try:
+                await self.collection.insert_many(documents, ordered=False)
+                return documents
+            except PyMongoError:
+                if attempt == _PUBLISH_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(_REOPEN_INTERVAL * 2 ** attempt)
+
+    def _apply(self, event: dict):
+        self._last_id = event["_id"]
+        if event.get("origin") == self.origin:
+            return
+        self.applied += 1
+        # _id'nin zaman damgası saniye çözünürlüklü; yayınlarken yazılan at_ts kullanılır
+        sent = event.get("at_ts") or event["_id"].generation_time.timestamp()
+        self.lag_ms = max((time.time() - sent) * 1000, 0.0)
+        if self.lag_ms > self.max_lag_ms:
+            self.max_lag_ms = self.lag_ms
+        self.handler(event)
+
+    async def replay(self):
+        """Koleksiyondaki geçerli olayları uygula, takip noktasını en son olaya ayarla"""
+        newest = await self.collection.find({}, projection={"_id": 1}).sort("$natural", -1).limit(1).to_list(1)
+        # Boş koleksiyon: son bir saniyeden itibaren (yeniden görülen olay zararsız)
+        self._last_id = newest[0]["_id"] if newest else \
+            ObjectId.from_datetime(datetime.fromtimestamp(time.time() - 1, timezone.utc))
+
+        query = self.replay_filter() if self.replay_filter else {}
+        async for event in self.collection.find({**query, "_id": {"$lte": self._last_id}}):
+            self.handler(event)
+            self.replayed += 1
+
+    async def _tail(self):
+        backoff = _REOPEN_INTERVAL
+        while True:
+            try:
+                cursor = self.collection.find(
+                    {"_id": {"$gt": self._last_id}},
+                    cursor_type=CursorType.TAILABLE_AWAIT,
+                ).max_await_time_ms(_AWAIT_MS)
+                while cursor.alive:
+                    async for event in cursor:
+                        if event["_id"] > self._last_id:
+                            self._apply(event)
+                backoff = _REOPEN_INTERVAL
+                # Cursor kapandı (ör. eşleşen olay yoktu): kısa bekle, yeniden aç
+                await asyncio.sleep(_REOPEN_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("⚠️ %s takibi koptu: %s", self.name, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF)
+            self.reconnects += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await self.ensure_collection()
+                await self.replay()
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("⚠️ %s yeniden oynatılamadı: %s", self.name, e)
+                await asyncio.sleep(_MAX_BACKOFF)
+        self._ready.set()
+        await self._tail()
+
+    def start(self):
+        """Yeniden oynatma + takip görevini başlat (lifespan startup)"""
+        if self._task is None:
+            self._ready = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def wait_ready(self, timeout: float = None):
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "collection": self.name,
+            "published": self.published,
+            "applied": self.applied,
+            "replayed": self.replayed,
+            "reconnects": self.reconnects,
+            "errors": self.errors,
+            "lag_ms": round(self.lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+        }
@@ -0,0 +1,79 @@
+# backend/device_info.py
+#
+# User-Agent çözümleme: user_agents.parse regex ağırlıklı ve pahalı, farklı UA
+# string'i sayısı ise istek sayısına göre çok küçük. Sonuçlar sınırlı bir LRU'da
+# tutulur; alanlar token dokümanına yazma anında (login/refresh) kaydedilir,
+# oturum listeleri tekrar parse etmez.
+import os
+from collections import OrderedDict
+
+from startup import lazy_import
+
+# Regex seti import anında derlenir (~300ms); ilk parse'ta yüklenir (bkz. startup.py)
+user_agents = lazy_import("user_agents")
+
+UA_CACHE_SIZE = int(os.environ.get("UA_CACHE_SIZE", "4096"))
+# Anahtar ve kayıt bu uzunlukta kesilir (dokümanda da user_agent[:200] tutuluyor)
+UA_MAX_LENGTH = 200
+
+UNKNOWN_DEVICE = {
+    "device_name": "Unknown",
+    "browser": "Unknown",
+    "os": "Unknown",
+    "is_mobile": False,
+    "is_tablet": False,
+    "is_pc": False,
+    "device_info": "Unknown",
+}
+
+
+def _parse(user_agent: str) -> dict:
+    try:
+        ua = user_agents.parse(user_agent)
+        browser = f"{ua.browser.family} {ua.browser.version_string}".strip()
+        return {
+            "device_name": ua.device.family if ua.device.family != "Other" else "Desktop",
+            "browser": browser,
+            "os": f"{ua.os.family} {ua.os.version_string}".strip(),
+            "is_mobile": ua.is_mobile,
+            "is_tablet": ua.is_tablet,
+            "is_pc": ua.is_pc,
+            "device_info": f"{browser} on {ua.os.family}"[:100],
+        }
+    except Exception:
+        return {**UNKNOWN_DEVICE, "device_info": user_agent[:50] or "Unknown"}
+
+
+class UserAgentCache:
+    """UA string → çözümlenmiş cihaz alanları, sınırlı LRU (tüm yollar aynı örneği paylaşır)"""
+
+    def __init__(self, max_size: int = UA_CACHE_SIZE):
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_agent: str) -> dict:
+        """Çözümlenmiş alanların kopyası (çağıran değiştirebilir, cache etkilenmez)"""
+        key = (user_agent or "")[:UA_MAX_LENGTH]
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._entries[key] = _parse(key) if key else UNKNOWN_DEVICE
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return dict(entry)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
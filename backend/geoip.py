@@ -0,0 +1,316 @@
+# backend/geoip.py
+#
+# Çevrimdışı IP → konum: sıralı, çakışmasız IPv4/IPv6 aralıkları tek bir ikili
+# dosyada tutulur ve mmap ile açılır (tüm worker'lar aynı sayfaları paylaşır,
+# yükleme kopyasız). Arama ikili arama (bisect, C'de) ile mikrosaniye altında;
+# toplu aramalar numpy searchsorted ile aynı bellek üzerinde vektörel.
+#
+# Dosya düzeni (little-endian, bölümler 8 byte hizalı):
+#   başlık   : "HLGEOIP1", n4 (u32), n6 (u32), isim bloğu uzunluğu (u32), 4 byte boş
+#   IPv4     : başlangıç[n4] u32, bitiş[n4] u32, konum[n4] u16
+#   IPv6     : başlangıç_hi[n6] u64, başlangıç_lo[n6] u64, bitiş_hi[n6] u64, bitiş_lo[n6] u64, konum[n6] u16
+#   isimler  : UTF-8, "\n" ile ayrılmış konum etiketleri
+#
+# Dosya yerinde değiştirilmez: yeni sürüm yazılıp os.replace ile taşınır; arka
+# plan izleyicisi değişikliği görüp yeni tabloyu açar (eski tablo referansı
+# düşünce kapanır).
+#
+#   python geoip.py build ranges.csv geoip.bin    # CSV: start,end,location
+import argparse
+import asyncio
+import csv
+import logging
+import mmap
+import os
+import socket
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("healthlex.geoip")
+
+GEOIP_DB_PATH = Path(os.environ.get("GEOIP_DB_PATH", Path(__file__).resolve().parent / "data" / "geoip.bin"))
+# Dosya değişikliği bu sıklıkla kontrol edilir (saniye)
+GEOIP_RELOAD_INTERVAL = float(os.environ.get("GEOIP_RELOAD_INTERVAL", "30"))
+
+MAGIC = b"HLGEOIP1"
+_HEADER = struct.Struct("<8sIII4x")
+_U64 = (1 << 64) - 1
+_BUCKETS = 1 << 16
+
+UNKNOWN_LOCATION = "Unknown"
+LOCAL_LOCATION = "Local Network"
+
+# Özel/yerel aralıklar tablodan önce, önek bit karşılaştırmasıyla ayrılır:
+# 10/8, 127/8, 172.16/12, 192.168/16, 169.254/16, 100.64/10 | ::1, fc00::/7, fe80::/10
+_PRIVATE_V4_8 = frozenset((10, 127))
+_PRIVATE_V4_16 = frozenset((0xC0A8, 0xA9FE))
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def parse_ip(ip_address: str):
+    """"a.b.c.d" → (4, int), IPv6 → (6, (hi, lo)); IPv4-mapped IPv6 IPv4 sayılır. Geçersizse None."""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), "big")
+    except (OSError, TypeError, ValueError):
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, ip_address.split("%", 1)[0])
+    except (OSError, TypeError, ValueError, AttributeError):
+        return None
+    hi, lo = int.from_bytes(packed[:8], "big"), int.from_bytes(packed[8:], "big")
+    if hi == 0 and lo >> 32 == 0xFFFF:
+        return 4, lo & 0xFFFFFFFF
+    return 6, (hi, lo)
+
+
+def is_local(version: int, key) -> bool:
+    if version == 4:
+        return (key >> 24 in _PRIVATE_V4_8 or key >> 16 in _PRIVATE_V4_16
+                or key >> 20 == 0xAC1 or key >> 22 == 0x191)
+    hi, lo = key
+    return (hi == 0 and lo == 1) or hi >> 57 == 0x7E or hi >> 54 == 0x3FA
+
+
+def mask_ip(ip_address: str) -> str:
+    """Gizlilik için maskele: IPv4 ilk iki oktet, IPv6 ilk üç grup (/48) görünür"""
+    if not ip_address:
+        return ""
+    parsed = parse_ip(ip_address)
+    if parsed is None:
+        return "***"
+    version, key = parsed
+    if version == 4:
+        return f"{key >> 24}.{(key >> 16) & 0xFF}.***.***"
+    hi = key[0]
+    return f"{hi >> 48:x}:{(hi >> 32) & 0xFFFF:x}:{(hi >> 16) & 0xFFFF:x}:***:***:***:***:***"
+
+
+class RangeTable:
+    """mmap'lenmiş aralık tablosu - salt okunur, iş parçacığı güvenli"""
+
+    def __init__(self, path: Path):
+        if sys.byteorder != "little":
+            raise ValueError("GeoIP table requires a little-endian host")
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"Not a GeoIP range file: {self.path}")
+        magic, n4, n6, names_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a GeoIP range file: {self.path}")
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+        sections = {}
+        for name, count, fmt in (("v4_starts", n4, "I"), ("v4_ends", n4, "I"), ("v4_locs", n4, "H"),
+                                 ("v6_start_hi", n6, "Q"), ("v6_start_lo", n6, "Q"),
+                                 ("v6_end_hi", n6, "Q"), ("v6_end_lo", n6, "Q"), ("v6_locs", n6, "H")):
+            size = count * struct.calcsize(fmt)
+            if offset + size > len(view):
+                raise ValueError(f"Truncated GeoIP range file: {self.path}")
+            sections[name] = (offset, count, fmt)
+            setattr(self, name, view[offset:offset + size].cast(fmt))
+            offset = _align(offset + size)
+        self.names = bytes(view[offset:offset + names_len]).decode("utf-8").split("\n")
+        self.ipv4_ranges, self.ipv6_ranges = n4, n6
+
+        # numpy görünümleri aynı mmap üzerinde (kopya yok) - toplu arama için
+        self._np = {
+            name: np.frombuffer(self._mmap, dtype=np.dtype(fmt).newbyteorder("<"), count=count, offset=off)
+            for name, (off, count, fmt) in sections.items()
+        }
+        # Birinci seviye index: IPv4'ün üst 16 biti → starts içindeki [i, j) penceresi (256 KB,
+        # worker başına); bisect tüm tablo yerine birkaç kayıtlık pencerede çalışır
+        bounds = np.arange(_BUCKETS + 1, dtype=np.uint64) << 16
+        self._v4_buckets = array("I", np.searchsorted(self._np["v4_starts"], bounds).astype(np.uint32).tobytes())
+
+    def lookup_v4(self, ip: int):
+        bucket = ip >> 16
+        i = bisect_right(self.v4_starts, ip, self._v4_buckets[bucket], self._v4_buckets[bucket + 1]) - 1
+        if i >= 0 and ip <= self.v4_ends[i]:
+            return self.names[self.v4_locs[i]]
+        return None
+
+    def lookup_v6(self, hi: int, lo: int):
+        # (hi, lo) sözlük sırası: önce hi üzerinde, eşit hi grubunda lo üzerinde ikili arama
+        right = bisect_right(self.v6_start_hi, hi)
+        left = bisect_left(self.v6_start_hi, hi, 0, right)
+        i = (bisect_right(self.v6_start_lo, lo, left, right) if left < right else right) - 1
+        if i >= 0 and (hi, lo) <= (self.v6_end_hi[i], self.v6_end_lo[i]):
+            return self.names[self.v6_locs[i]]
+        return None
+
+    def lookup_many_v4(self, ips: np.ndarray) -> np.ndarray:
+        """Toplu IPv4 arama (uint32 dizisi) → konum index'i, bulunamayanlar -1"""
+        starts, ends, locs = self._np["v4_starts"], self._np["v4_ends"], self._np["v4_locs"]
+        index = np.searchsorted(starts, ips, side="right") - 1
+        safe = np.maximum(index, 0)
+        found = (index >= 0) & (ips <= ends[safe])
+        return np.where(found, locs[safe].astype(np.int32), -1)
+
+
+def write_range_file(path: Path, ranges) -> dict:
+    """ranges: (start, end, location) üçlüleri (IP string'leri) → ikili tablo, atomik olarak yazılır"""
+    names, name_index = [], {}
+    v4, v6 = [], []
+    for start, end, location in ranges:
+        first, last = parse_ip(start), parse_ip(end)
+        if first is None or last is None or first[0] != last[0] or first[1] > last[1]:
+            raise ValueError(f"Invalid range: {start} - {end}")
+        if location not in name_index:
+            name_index[location] = len(names)
+            names.append(location)
+        (v4 if first[0] == 4 else v6).append((first[1], last[1], name_index[location]))
+    if len(names) > 0xFFFF:
+        raise ValueError("Too many distinct locations")
+    if any("\n" in name for name in names):
+        raise ValueError("Location labels must not contain newlines")
+
+    v4.sort()
+    v6.sort()
+    for rows in (v4, v6):
+        for prev, cur in zip(rows, rows[1:]):
+            if cur[0] <= prev[1]:
+                raise ValueError(f"Overlapping ranges at {cur[0]}")
+
+    name_blob = "\n".join(names).encode("utf-8")
+    chunks = [_HEADER.pack(MAGIC, len(v4), len(v6), len(name_blob))]
+    columns = [
+        ("I", [r[0] for r in v4]), ("I", [r[1] for r in v4]), ("H", [r[2] for r in v4]),
+        ("Q", [r[0][0] for r in v6]), ("Q", [r[0][1] for r in v6]),
+        ("Q", [r[1][0] for r in v6]), ("Q", [r[1][1] for r in v6]), ("H", [r[2] for r in v6]),
+    ]
+    size = _HEADER.size
+    for fmt, values in columns:
+        column = array(fmt, values)
+        if sys.byteorder != "little":
+            column.byteswap()
+        data = column.tobytes()
+        padding = _align(size + len(data)) - size - len(data)
+        chunks += [data, b"\0" * padding]
+        size += len(data) + padding
+    chunks.append(name_blob)
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(b"".join(chunks))
+    os.replace(tmp, path)
+    return {"ipv4_ranges": len(v4), "ipv6_ranges": len(v6), "locations": len(names)}
+
+
+class GeoIPResolver:
+    """Aktif tablo + dosya değişince sıcak değiştirme (lifespan'da start/stop)"""
+
+    def __init__(self, path: Path = GEOIP_DB_PATH, reload_interval: float = GEOIP_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self._table = None
+        self._watcher = None
+        self.lookups = 0
+        self.reloads = 0
+        self.reload()
+
+    def reload(self) -> bool:
+        """Dosyayı yeniden aç; açılamazsa mevcut tablo kullanılmaya devam eder"""
+        try:
+            table = RangeTable(self.path)
+        except FileNotFoundError:
+            if self._table is None:
+                logger.info("GeoIP tablosu yok (%s), konumlar bilinmiyor olarak döner", self.path)
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning("GeoIP tablosu yüklenemedi (%s): %s", self.path, e)
+            return False
+        self._table = table
+        self.reloads += 1
+        logger.info("GeoIP tablosu yüklendi: %d IPv4, %d IPv6 aralık", table.ipv4_ranges, table.ipv6_ranges)
+        return True
+
+    def maybe_reload(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        current = self._table.signature if self._table else None
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == current:
+            return False
+        return self.reload()
+
+    def locate(self, ip_address: str) -> str:
+        if not ip_address:
+            return UNKNOWN_LOCATION
+        parsed = parse_ip(ip_address)
+        if parsed is None:
+            return UNKNOWN_LOCATION
+        version, key = parsed
+        if is_local(version, key):
+            return LOCAL_LOCATION
+        table = self._table
+        if table is None:
+            return UNKNOWN_LOCATION
+        self.lookups += 1
+        found = table.lookup_v4(key) if version == 4 else table.lookup_v6(*key)
+        return found or UNKNOWN_LOCATION
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                self.maybe_reload()
+            except Exception as e:
+                logger.warning("GeoIP izleyici hatası: %s", e)
+
+    def start(self):
+        """Dosya izleyicisini başlat (lifespan startup)"""
+        if self._watcher is None and self.reload_interval > 0:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def stats(self) -> dict:
+        table = self._table
+        return {
+            "path": str(self.path),
+            "loaded": table is not None,
+            "ipv4_ranges": table.ipv4_ranges if table else 0,
+            "ipv6_ranges": table.ipv6_ranges if table else 0,
+            "lookups": self.lookups,
+            "reloads": self.reloads,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GeoIP aralık tablosu araçları")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="CSV (start,end,location) → ikili tablo")
+    build.add_argument("source", type=Path)
+    build.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    with open(args.source, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row and row[0] != "start"]
+    summary = write_range_file(args.output, ((start, end, location) for start, end, location in rows))
+    print(f"✅ {args.output}: {summary['ipv4_ranges']} IPv4, {summary['ipv6_ranges']} IPv6 aralık, "
+          f"{summary['locations']} konum")
+
+
+if __name__ == "__main__":
+    main()
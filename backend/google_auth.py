@@ -0,0 +1,150 @@
+# backend/google_auth.py
+#
+# Google ID token doğrulama: imza anahtarları (JWKS) process genelinde cache'lenir,
+# Cache-Control max-age süresi dolmadan arka planda yenilenir; RSA doğrulaması
+# thread pool'da çalışır, event loop hiç bloklanmaz.
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from startup import lazy_import
+
+# jwt, RS256 için cryptography'yi de yükler; ilk doğrulamada yüklenir (bkz. startup.py)
+jwt = lazy_import("jwt")
+
+logger = logging.getLogger("healthlex.google")
+
+GOOGLE_CERTS_URL = os.environ.get("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_VERIFY_WORKERS = int(os.environ.get("GOOGLE_VERIFY_WORKERS", "2"))
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Header'da max-age yoksa kullanılacak süre
+_DEFAULT_MAX_AGE = 3600
+# Süre dolmadan bu kadar önce arka planda yenile
+_REFRESH_MARGIN = 0.1
+# Bilinmeyen kid için en fazla bu sıklıkla zorla yenile (sahte kid ile fetch seli olmasın)
+_UNKNOWN_KID_REFETCH = 60
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _fetch_jwks(url: str):
+    """Blocking HTTP - sadece executor içinde çağrılır"""
+    with urllib.request.urlopen(url, timeout=10) as res:
+        body = json.loads(res.read())
+        match = _MAX_AGE_RE.search(res.headers.get("Cache-Control", ""))
+    max_age = int(match.group(1)) if match else _DEFAULT_MAX_AGE
+    keys = {}
+    for jwk in body.get("keys", []):
+        if jwk.get("kty") == "RSA" and "kid" in jwk:
+            keys[jwk["kid"]] = jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
+    return keys, max_age
+
+
+class GoogleIdTokenVerifier:
+    """Paylaşılan JWKS cache'i ile Google ID token doğrulayıcı"""
+
+    def __init__(self, client_id: str, certs_url: str = GOOGLE_CERTS_URL, workers: int = GOOGLE_VERIFY_WORKERS):
+        self.client_id = client_id
+        self.certs_url = certs_url
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="google-verify")
+        self._keys = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._lock = None
+        self._refresher = None
+        self.fetches = 0
+
+    async def _refresh(self, force: bool = False):
+        # Aynı anda gelen istekler tek bir fetch'i bekler
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        requested = time.monotonic()
+        async with self._lock:
+            # Beklerken başka biri yenilediyse tekrar fetch etme
+            if self._last_fetch > requested or (not force and self._expires_at > requested):
+                return
+            loop = asyncio.get_running_loop()
+            keys, max_age = await loop.run_in_executor(self._executor, _fetch_jwks, self.certs_url)
+            self._keys = keys
+            self._last_fetch = time.monotonic()
+            self._expires_at = self._last_fetch + max_age
+            self.fetches += 1
+            logger.info("Google JWKS yenilendi: %d anahtar, max-age=%ss", len(keys), max_age)
+
+    async def _get_key(self, kid: str):
+        if time.monotonic() >= self._expires_at:
+            await self._refresh()
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._last_fetch > _UNKNOWN_KID_REFETCH:
+            # Google anahtarı rotate etmiş olabilir - cache'i zorla yenile (throttle'lı)
+            await self._refresh(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise ValueError(f"Unknown Google signing key: {kid}")
+        return key
+
+    async def verify(self, token: str) -> dict:
+        """İmza, audience, issuer ve exp doğrulanmış payload'ı döndürür; hata → ValueError"""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as e:
+            raise ValueError(f"Malformed ID token: {e}")
+        if not kid:
+            raise ValueError("ID token has no key id")
+
+        key = await self._get_key(kid)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._decode, token, key)
+        except jwt.InvalidTokenError as e:
+            raise ValueError(f"Invalid ID token: {e}")
+
+    def _decode(self, token: str, key) -> dict:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=self.client_id,
+            issuer=GOOGLE_ISSUERS,
+        )
+
+    async def _refresh_loop(self):
+        # Anahtarlar max-age dolmadan yenilenir; istekler fetch beklemez
+        while True:
+            try:
+                if self._keys:
+                    ttl = self._expires_at - time.monotonic()
+                    await asyncio.sleep(max(ttl * (1 - _REFRESH_MARGIN), 1))
+                await self._refresh(force=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Google JWKS arka plan yenileme hatası: %s", e)
+                await asyncio.sleep(30)
+
+    def start(self):
+        """Arka plan yenileyicisini başlat (lifespan startup)"""
+        if self._refresher is None:
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "fetches": self.fetches,
+            "expires_in": round(max(self._expires_at - time.monotonic(), 0), 1),
+        }
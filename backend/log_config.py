@@ -0,0 +1,147 @@
+# backend/log_config.py
+#
+# Uygulama logları: istek yolundaki thread sadece bir kuyruğa ekler (bloklamaz),
+# yazma işini ayrı bir listener thread'i yapar. Kuyruk doluysa kayıt düşürülür
+# ve sayılır. Çıktı JSON, token içerikleri maskelenir, logger başına örnekleme.
+#
+#   LOG_LEVEL=INFO
+#   LOG_SAMPLING="healthlex.auth.refresh=0.1,healthlex.auth.login=0.5"
+#   LOG_QUEUE_SIZE=10000
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLING = os.environ.get("LOG_SAMPLING", "")
+
+# JWT'ler, UUID formatındaki refresh token / jti değerleri ve Bearer header'ları
+_REDACT_PATTERNS = [
+    (re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]+"), "<jwt>"),
+    (re.compile(r"(?i)bearer\s+\S+"), "Bearer <redacted>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"), "<uuid>"),
+]
+# Bu alan adlarıyla extra= ile gelen değerler tamamen gizlenir
+_SECRET_FIELDS = {"token", "refresh_token", "access_token", "authorization", "password", "jti"}
+
+_dropped = 0
+_dropped_lock = threading.Lock()
+_listener = None
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _REDACT_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def parse_sampling(spec: str) -> dict:
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Logger adına göre (en uzun önek eşleşmesi) örnekleme - WARNING ve üstü hep geçer"""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self._cache = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate, best = 1.0, -1
+            for prefix, value in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best:
+                    rate, best = value, len(prefix)
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Kuyruk doluysa beklemez - kaydı düşürür ve sayar"""
+
+    def prepare(self, record):
+        # Mesaj istek thread'inde bir kez formatlanır ve maskelenir
+        record.msg = redact(record.getMessage())
+        record.args = None
+        record.exc_text = redact(logging.Formatter().formatException(record.exc_info)) if record.exc_info else None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with _dropped_lock:
+                _dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    _RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self._RESERVED and not key.startswith("_"):
+                data[key] = "<redacted>" if key in _SECRET_FIELDS else value
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def dropped_records() -> int:
+    return _dropped
+
+
+def setup_logging():
+    """'healthlex' logger ağacını kuyruk + JSON çıktıya bağla (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    handler = DroppingQueueHandler(records)
+    handler.addFilter(SamplingFilter(parse_sampling(LOG_SAMPLING)))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    root = logging.getLogger("healthlex")
+    root.setLevel(LOG_LEVEL)
+    root.handlers[:] = [handler]
+    root.propagate = False
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Kuyruktaki kayıtları yazıp listener'ı durdur (lifespan shutdown)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
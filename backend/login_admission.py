@@ -0,0 +1,227 @@
+# backend/login_admission.py
+#
+# /auth/login için bcrypt öncesi kabul kontrolü. IP başına rate limit, çok
+# sayıda IP'den gelen credential stuffing'i durdurmaz; her deneme bir bcrypt
+# doğrulamasına (~250ms CPU) mal olur. Burada iki ucuz kontrol bcrypt'ten önce
+# çalışır:
+#   - hesap başına başarısızlık sayacı: LOGIN_FREE_FAILURES denemeden sonra
+#     hesap üstel artan sürelerle (LOGIN_BACKOFF_BASE_S * 2^n, en fazla
+#     LOGIN_MAX_LOCK_S) kilitlenir; kilitliyken doğrulama yapılmaz (429).
+#     Sayaç e-posta var olsun olmasın tutulur - kilit davranışı hesabın
+#     varlığını göstermez.
+#   - yakın zamanda başarısız olmuş (kayıtlı hash, parola) çiftleri: Bloom
+#     filtresi nesillerinde (bkz. bloom.py), process'e özel
+#     anahtarlı blake2b özeti olarak tutulur. Stuffing listeleri aynı çifti
+#     tekrar tekrar dener; bilinen çift bcrypt'siz 401 alır. Kayıtlı hash'e
+#     bağlı olduğu için parola değişince eski kayıtlar kendiliğinden geçersiz.
+#     Yanlış pozitif doğru parolayı reddeder - oranı LOGIN_BAD_PAIR_FP ile
+#     düşük tutulur, kayıtlar LOGIN_BAD_PAIR_TTL_S sonra düşer.
+# Başarısız yanıtlar (olmayan e-posta, kilit, bilinen çift, yanlış parola)
+# isteğin başından itibaren aynı süreye tamamlanır: taban LOGIN_FAILURE_FLOOR_MS
+# ile gözlenen bcrypt süresinin (kuyruk dahil) 1.5 katının büyüğü, en fazla
+# LOGIN_FAILURE_MAX_MS - bunun üstünde bcrypt pool'u zaten doymuştur, bağlantılar
+# sonsuza kadar tutulmaz. Bekleme asyncio.sleep - CPU harcamaz. Durum worker
+# başına yereldir (N worker'da serbest deneme N katı).
+#
+#   LOGIN_ADMISSION=1                 (0 = eski davranış: her deneme bcrypt, bekleme yok)
+#   LOGIN_FREE_FAILURES=5             (kilitten önce izin verilen başarısızlık)
+#   LOGIN_BACKOFF_BASE_S=2
+#   LOGIN_MAX_LOCK_S=900
+#   LOGIN_FAILURE_WINDOW_S=3600       (bu kadar sessiz kalan hesabın sayacı sıfırlanır)
+#   LOGIN_TRACKED_ACCOUNTS=100000     (izlenen en fazla hesap; en eskisi düşer)
+#   LOGIN_BAD_PAIR_CAPACITY=1000000   (nesil başına çift)
+#   LOGIN_BAD_PAIR_FP=0.000001
+#   LOGIN_BAD_PAIR_TTL_S=3600
+#   LOGIN_FAILURE_FLOOR_MS=400
+#   LOGIN_FAILURE_MAX_MS=3000
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from bloom import BloomFilter
+
+LOGIN_ADMISSION = os.environ.get("LOGIN_ADMISSION", "1").lower() in ("1", "true", "yes")
+LOGIN_FREE_FAILURES = int(os.environ.get("LOGIN_FREE_FAILURES", "5"))
+LOGIN_BACKOFF_BASE_S = float(os.environ.get("LOGIN_BACKOFF_BASE_S", "2"))
+LOGIN_MAX_LOCK_S = float(os.environ.get("LOGIN_MAX_LOCK_S", "900"))
+LOGIN_FAILURE_WINDOW_S = float(os.environ.get("LOGIN_FAILURE_WINDOW_S", "3600"))
+LOGIN_TRACKED_ACCOUNTS = int(os.environ.get("LOGIN_TRACKED_ACCOUNTS", "100000"))
+LOGIN_BAD_PAIR_CAPACITY = int(os.environ.get("LOGIN_BAD_PAIR_CAPACITY", "1000000"))
+LOGIN_BAD_PAIR_FP = float(os.environ.get("LOGIN_BAD_PAIR_FP", "0.000001"))
+LOGIN_BAD_PAIR_TTL_S = float(os.environ.get("LOGIN_BAD_PAIR_TTL_S", "3600"))
+LOGIN_FAILURE_FLOOR_MS = float(os.environ.get("LOGIN_FAILURE_FLOOR_MS", "400"))
+LOGIN_FAILURE_MAX_MS = float(os.environ.get("LOGIN_FAILURE_MAX_MS", "3000"))
+
+# Yoğun saldırıda kapasite dolunca nesil erken döner; bellek bu kadar nesille sınırlı
+_MAX_PAIR_GENERATIONS = 4
+# Gözlenen bcrypt süresinin hareketli ortalaması (üstel); taban bunun 1.5 katı
+_VERIFY_EWMA_ALPHA = 0.2
+_VERIFY_FLOOR_FACTOR = 1.5
+
+
+def account_key(email: str) -> str:
+    return email.strip().lower()
+
+
+class LoginAdmission:
+    """Hesap kilitleri + bilinen başarısız çiftler + sabit süreli başarısız yanıt"""
+
+    def __init__(self, enabled: bool = LOGIN_ADMISSION, free_failures: int = LOGIN_FREE_FAILURES,
+                 backoff_base: float = LOGIN_BACKOFF_BASE_S, max_lock: float = LOGIN_MAX_LOCK_S,
+                 failure_window: float = LOGIN_FAILURE_WINDOW_S, max_accounts: int = LOGIN_TRACKED_ACCOUNTS,
+                 pair_capacity: int = LOGIN_BAD_PAIR_CAPACITY, pair_fp_rate: float = LOGIN_BAD_PAIR_FP,
+                 pair_ttl: float = LOGIN_BAD_PAIR_TTL_S, failure_floor_ms: float = LOGIN_FAILURE_FLOOR_MS,
+                 failure_max_ms: float = LOGIN_FAILURE_MAX_MS, clock=time.monotonic):
+        self.enabled = enabled
+        self.free_failures = max(1, free_failures)
+        self.backoff_base = backoff_base
+        self.max_lock = max_lock
+        self.failure_window = failure_window
+        self.max_accounts = max(1, max_accounts)
+        self.pair_capacity = pair_capacity
+        self.pair_fp_rate = pair_fp_rate
+        self.pair_ttl = pair_ttl
+        self.failure_floor = failure_floor_ms / 1000
+        self.failure_max = max(failure_floor_ms, failure_max_ms) / 1000
+        self.clock = clock
+        # hesap → [başarısızlık, kilit bitişi, son başarısızlık]; en eskisi başta
+        self._accounts: "OrderedDict[str, list]" = OrderedDict()
+        # [başlangıç, son ekleme zamanı, filtre] - eskiden yeniye; son eleman yazılır
+        self._pairs = []
+        # Özetler yalnızca bu process'te anlamlı; filtre sızsa da parola denenemez
+        self._secret = os.urandom(32)
+        self._verify_seconds = 0.0
+        self.failures = 0
+        self.locks = 0
+        self.rejected = {"locked": 0, "known_bad": 0}
+        self.padded = 0
+        self.padded_seconds = 0.0
+
+    # ---- hesap sayaçları ----
+
+    def _account(self, key: str, now: float) -> Optional[list]:
+        entry = self._accounts.get(key)
+        if entry is not None and now - entry[2] >= self.failure_window:
+            del self._accounts[key]
+            return None
+        return entry
+
+    def retry_after(self, email: str) -> float:
+        """Hesap kilitliyse kalan saniye, değilse 0 - kilitliyse istek reddedilir"""
+        if not self.enabled:
+            return 0.0
+        now = self.clock()
+        entry = self._account(account_key(email), now)
+        if entry is None or entry[1] <= now:
+            return 0.0
+        self.rejected["locked"] += 1
+        return entry[1] - now
+
+    def record_failure(self, email: str) -> float:
+        """Başarısız denemeyi say; kilit başladıysa süresi (saniye)"""
+        if not self.enabled:
+            return 0.0
+        key, now = account_key(email), self.clock()
+        entry = self._account(key, now)
+        if entry is None:
+            entry = self._accounts[key] = [0, 0.0, now]
+        entry[0] += 1
+        entry[2] = now
+        self._accounts.move_to_end(key)
+        if len(self._accounts) > self.max_accounts:
+            self._accounts.popitem(last=False)
+        self.failures += 1
+
+        over = entry[0] - self.free_failures
+        if over <= 0:
+            return 0.0
+        lock = min(self.max_lock, self.backoff_base * 2 ** min(over - 1, 32))
+        entry[1] = now + lock
+        self.locks += 1
+        return lock
+
+    def record_success(self, email: str):
+        self._accounts.pop(account_key(email), None)
+
+    # ---- bilinen başarısız çiftler ----
+
+    def _pair_key(self, password_hash: str, password: str) -> int:
+        digest = hashlib.blake2b(password_hash.encode() + b"\0" + password.encode(),
+                                 key=self._secret, digest_size=16).digest()
+        return int.from_bytes(digest, "big")
+
+    def _expire_pairs(self, now: float):
+        cutoff = now - self.pair_ttl
+        while self._pairs and self._pairs[0][1] < cutoff:
+            self._pairs.pop(0)
+
+    def is_known_bad(self, password_hash: str, password: str) -> bool:
+        if not self.enabled or not self._pairs:
+            return False
+        self._expire_pairs(self.clock())
+        key = self._pair_key(password_hash, password)
+        if any(key in bloom for _, _, bloom in self._pairs):
+            self.rejected["known_bad"] += 1
+            return True
+        return False
+
+    def remember_bad(self, password_hash: str, password: str):
+        if not self.enabled:
+            return
+        now = self.clock()
+        self._expire_pairs(now)
+        if self._pairs:
+            started, _, bloom = self._pairs[-1]
+            if now - started >= self.pair_ttl or bloom.count >= self.pair_capacity:
+                bloom = None
+        else:
+            bloom = None
+        if bloom is None:
+            bloom = BloomFilter(self.pair_capacity, self.pair_fp_rate)
+            self._pairs.append([now, now, bloom])
+            del self._pairs[:-_MAX_PAIR_GENERATIONS]
+        bloom.add(self._pair_key(password_hash, password))
+        self._pairs[-1][1] = now
+
+    # ---- sabit süreli yanıt ----
+
+    def observe_verify(self, seconds: float):
+        """Gerçek bir bcrypt doğrulamasının (kuyruk dahil) süresi"""
+        self._verify_seconds += _VERIFY_EWMA_ALPHA * (seconds - self._verify_seconds)
+
+    def failure_floor_seconds(self) -> float:
+        # Yük altında bcrypt uzar; sabit taban onun altında kalırsa var olan
+        # e-postalar (bcrypt çalışan) yine ayırt edilirdi
+        return min(self.failure_max, max(self.failure_floor, self._verify_seconds * _VERIFY_FLOOR_FACTOR))
+
+    async def pad(self, started: float):
+        """Başarısız yanıtı `started`tan (self.clock) itibaren tabana kadar beklet"""
+        if not self.enabled:
+            return
+        remaining = started + self.failure_floor_seconds() - self.clock()
+        if remaining > 0:
+            self.padded += 1
+            self.padded_seconds += remaining
+            await asyncio.sleep(remaining)
+
+    def stats(self) -> dict:
+        now = self.clock()
+        return {
+            "enabled": self.enabled,
+            "tracked_accounts": len(self._accounts),
+            "locked_accounts": sum(1 for entry in self._accounts.values() if entry[1] > now),
+            "failures": self.failures,
+            "locks": self.locks,
+            "rejected": dict(self.rejected),
+            "failure_floor_ms": round(self.failure_floor_seconds() * 1000, 1),
+            "verify_ewma_ms": round(self._verify_seconds * 1000, 1),
+            "padded": self.padded,
+            "padded_seconds": round(self.padded_seconds, 3),
+            "bad_pair_generations": [
+                {"age_s": round(now - started, 1), "entries": bloom.count, "bytes": len(bloom.bits)}
+                for started, _, bloom in self._pairs
+            ],
+        }
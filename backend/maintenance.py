@@ -0,0 +1,257 @@
+# backend/maintenance.py
+#
+# refresh_tokens bakım işleri için tek CLI. Büyük koleksiyonlarda:
+#   - mümkünse tek bir sunucu tarafı update_many (pipeline update),
+#   - değilse _id aralıklarıyla cursor okuma + bulk_write batch'leri,
+#   - --dry-run, checkpoint dosyasıyla kaldığı yerden devam, ilerleme/hız raporu.
+#
+#   python maintenance.py fix-jti --batch-size 1000 --checkpoint .fix-jti.ckpt
+#   python maintenance.py fix-null-dates --dry-run
+#   python maintenance.py hash-tokens --batch-size 5000 --checkpoint .hash-tokens.ckpt
+#   python maintenance.py indexes
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from bson import json_util
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from mongo_indexes import apply_indexes
+from token_keys import jti_from_str, new_jti, token_digest
+
+REFRESH_TOKEN_DAYS = int(os.environ.get("REFRESH_TOKEN_DAYS", "7"))
+_DAY_MS = 24 * 60 * 60 * 1000
+
+
+class Checkpoint:
+    """Son işlenen _id'yi dosyada tutar - iş yarıda kesilirse oradan devam edilir"""
+
+    def __init__(self, path, command: str):
+        self.path = Path(path) if path else None
+        self.command = command
+        self.last_id = None
+        self.processed = 0
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        data = json_util.loads(self.path.read_text())
+        if data.get("command") != self.command:
+            raise SystemExit(f"❌ Checkpoint başka bir komuta ait: {data.get('command')}")
+        self.last_id = data.get("last_id")
+        self.processed = data.get("processed", 0)
+        print(f"↪️  Checkpoint'ten devam: {self.processed} doküman işlenmiş, son _id={self.last_id}")
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json_util.dumps({"command": self.command, "last_id": self.last_id, "processed": self.processed}))
+        tmp.replace(self.path)
+
+    def clear(self):
+        if self.path and self.path.exists():
+            self.path.unlink()
+
+
+class Progress:
+    def __init__(self, total: int, already: int = 0):
+        self.total = total
+        self.done = already
+        self.started = time.monotonic()
+        self._session = 0
+
+    def add(self, count: int):
+        self.done += count
+        self._session += count
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = self._session / elapsed
+        remaining = max(self.total - self.done, 0)
+        eta = remaining / rate if rate else 0
+        print(f"  ↳ {self.done}/{self.total} ({rate:,.0f} doküman/s, kalan ~{eta:,.0f}s)")
+
+
+async def stream_batches(collection, query: dict, batch_size: int, checkpoint: Checkpoint, projection=None):
+    """query'ye uyan dokümanları _id sırasıyla, batch_size'lık aralıklar halinde verir"""
+    while True:
+        range_query = dict(query)
+        if checkpoint.last_id is not None:
+            range_query["_id"] = {"$gt": checkpoint.last_id}
+        batch = await collection.find(range_query, projection=projection) \
+            .sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return
+        yield batch
+
+
+async def fix_jti(db, args):
+    """jti alanı olmayan token'lara benzersiz jti ata (bulk_write batch'leri)"""
+    collection = db.refresh_tokens
+    query = {"jti": {"$exists": False}}
+    checkpoint = Checkpoint(args.checkpoint, "fix-jti")
+    checkpoint.load()
+
+    total = await collection.count_documents(query)
+    print(f"📊 JTI'si olmayan doküman sayısı: {total}")
+    if total == 0:
+        checkpoint.clear()
+        return
+
+    progress = Progress(total + checkpoint.processed, checkpoint.processed)
+    async for batch in stream_batches(collection, query, args.batch_size, checkpoint, projection={"_id": 1}):
+        operations = [
+            UpdateOne({"_id": doc["_id"], "jti": {"$exists": False}}, {"$set": {"jti": new_jti()}})
+            for doc in batch
+        ]
+        if not args.dry_run:
+            await collection.bulk_write(operations, ordered=False)
+
+        checkpoint.last_id = batch[-1]["_id"]
+        checkpoint.processed += len(batch)
+        if not args.dry_run:
+            checkpoint.save()
+        progress.add(len(batch))
+
+    print(f"{'🔎 (dry-run) ' if args.dry_run else '✅ '}{checkpoint.processed} dokümana jti atandı")
+    if not args.dry_run:
+        checkpoint.clear()
+
+
+async def fix_null_dates(db, args):
+    """created_at / expires_at / last_used_at null olan token'ları sunucu tarafında düzelt, düzeltilemeyenleri sil"""
+    collection = db.refresh_tokens
+    lifetime_ms = REFRESH_TOKEN_DAYS * _DAY_MS
+
+    steps = [
+        ("created_at = expires_at - ömür",
+         {"created_at": None, "expires_at": {"$type": "date"}},
+         [{"$set": {"created_at": {"$subtract": ["$expires_at", lifetime_ms]}}}]),
+        ("sil: created_at ve expires_at kullanılamaz",
+         {"created_at": None, "expires_at": {"$not": {"$type": "date"}}},
+         None),
+        ("expires_at = created_at + ömür",
+         {"expires_at": None, "created_at": {"$type": "date"}},
+         [{"$set": {"expires_at": {"$add": ["$created_at", lifetime_ms]}}}]),
+        ("sil: expires_at hesaplanamaz",
+         {"expires_at": None, "created_at": {"$not": {"$type": "date"}}},
+         None),
+        # Oturum listeleri (last_used_at, _id) ile sayfalanır (bkz. session_pages.py)
+        ("last_used_at = created_at",
+         {"last_used_at": None, "created_at": {"$type": "date"}},
+         [{"$set": {"last_used_at": "$created_at"}}]),
+    ]
+
+    for label, query, pipeline in steps:
+        started = time.monotonic()
+        if args.dry_run:
+            count = await collection.count_documents(query)
+            print(f"  🔎 (dry-run) {label}: {count} doküman")
+            continue
+        if pipeline is None:
+            result = await collection.delete_many(query)
+            count = result.deleted_count
+        else:
+            result = await collection.update_many(query, pipeline)
+            count = result.modified_count
+        elapsed = max(time.monotonic() - started, 1e-9)
+        print(f"  ✅ {label}: {count} doküman ({count / elapsed:,.0f} doküman/s)")
+
+    for field in ("created_at", "expires_at", "last_used_at"):
+        remaining = await collection.count_documents({field: None})
+        print(f"📊 {field} = null kalan: {remaining}")
+
+
+_JTI_FIELDS = ("jti", "rotated_from", "rotated_to")
+
+
+def _hashed_keys_update(doc: dict) -> dict:
+    """Düz metin token → SHA-256 özeti, string jti'ler → 16 bayt (boş string'ler silinir)"""
+    update = {"$set": {}, "$unset": {}}
+    if isinstance(doc.get("token"), str):
+        update["$set"]["token"] = token_digest(doc["token"])
+    for field in _JTI_FIELDS:
+        value = doc.get(field)
+        if isinstance(value, str):
+            if value:
+                update["$set"][field] = jti_from_str(value)
+            else:
+                update["$unset"][field] = ""
+    return {op: fields for op, fields in update.items() if fields}
+
+
+async def hash_tokens(db, args):
+    """Eski kayıtları token_keys.py biçimine çevir (bulk_write batch'leri, aynı index'ler kalır)"""
+    collection = db.refresh_tokens
+    query = {"$or": [{field: {"$type": "string"}} for field in ("token", *_JTI_FIELDS)]}
+    checkpoint = Checkpoint(args.checkpoint, "hash-tokens")
+    checkpoint.load()
+
+    total = await collection.count_documents(query)
+    print(f"📊 Düz metin token / string jti içeren doküman sayısı: {total}")
+    if total == 0:
+        checkpoint.clear()
+        return
+
+    projection = {field: 1 for field in ("token", *_JTI_FIELDS)}
+    progress = Progress(total + checkpoint.processed, checkpoint.processed)
+    async for batch in stream_batches(collection, query, args.batch_size, checkpoint, projection=projection):
+        operations = [UpdateOne({"_id": doc["_id"]}, _hashed_keys_update(doc)) for doc in batch]
+        if not args.dry_run:
+            await collection.bulk_write(operations, ordered=False)
+
+        checkpoint.last_id = batch[-1]["_id"]
+        checkpoint.processed += len(batch)
+        if not args.dry_run:
+            checkpoint.save()
+        progress.add(len(batch))
+
+    print(f"{'🔎 (dry-run) ' if args.dry_run else '✅ '}{checkpoint.processed} doküman dönüştürüldü")
+    if not args.dry_run:
+        checkpoint.clear()
+        print("ℹ️  Tüm worker'lar yeni sürümdeyse REFRESH_TOKEN_PLAINTEXT_FALLBACK=0 ile düz metin arama kapatılabilir")
+
+
+async def ensure_indexes(db, args):
+    """Index registry'sini uygula (mongo_indexes.py) ve drift raporla"""
+    report = await apply_indexes(db)
+    for key in ("created", "ok", "drift", "errors"):
+        for line in report[key]:
+            print(f"  [{key}] {line}")
+
+
+COMMANDS = {
+    "fix-jti": fix_jti,
+    "fix-null-dates": fix_null_dates,
+    "hash-tokens": hash_tokens,
+    "indexes": ensure_indexes,
+}
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="refresh_tokens bakım CLI'ı")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="hiçbir şey yazma, sadece say")
+    parser.add_argument("--checkpoint", help="kaldığı yerden devam için checkpoint dosyası")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
+    db = client[os.environ.get("DB_NAME")]
+
+    print(f"🔧 {args.command}{' (dry-run)' if args.dry_run else ''}")
+    started = time.monotonic()
+    try:
+        await COMMANDS[args.command](db, args)
+    finally:
+        client.close()
+    print(f"🎉 Tamamlandı ({time.monotonic() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,251 @@
+# backend/metrics.py
+#
+# Process içi metrik kaydı ve Prometheus metin formatı (text/plain 0.0.4).
+# Dış bağımlılık yok. Çekişme olmaması için:
+#   - Counter/Gauge/Histogram'a yalnızca event loop thread'i yazar; kilit yok,
+#     artırma tek bir Python işlemi.
+#   - Başka thread'lerde üretilen ölçümler (Mongo komut olayları, bcrypt
+#     süreleri) kendi sayaçlarında kalır; collector fonksiyonları onları
+#     scrape anında okur. Sıcak yolda ek kilit alınmaz.
+#
+# HTTP ölçümü saf ASGI middleware'i ile yapılır (BaseHTTPMiddleware değil):
+# istek sayısı ve gecikme histogramı FastAPI route şablonu başına
+# (/api/auth/debug-token/{user_id} gibi), eşleşmeyen yollar tek etikette toplanır.
+import time
+from bisect import bisect_left
+
+# Saniye cinsinden; auth uç noktalarının ms altı / bcrypt'in ~250ms aralığını kapsar
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # son kova: +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric:
+    kind = ""
+    _child_class = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        return self._child_class()
+
+    def labels(self, *values):
+        """Etiket değerleri için alt metrik - sıcak yolda dönen nesne saklanıp tekrar kullanılabilir"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: {len(self.labelnames)} etiket bekleniyordu")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, _format_labels(self.labelnames, values), child.value
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {_escape(self.documentation)}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+
+
+class Counter(_Metric):
+    kind = "counter"
+    _child_class = _CounterChild
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    _child_class = _GaugeChild
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount=1):
+        self._children[()].dec(amount)
+
+    def set(self, value):
+        self._children[()].set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), list(child.counts)):
+                cumulative += count
+                yield (f"{self.name}_bucket",
+                       _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"'), cumulative)
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """Metrikler + scrape anında çalışan collector'lar"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collect):
+        """collect() → (isim, tür, açıklama, [(etiket dict'i, değer), ...]) dizisi"""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            metric.render(lines)
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f"# HELP {name} {_escape(documentation)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+class HttpMetrics:
+    """Route şablonu başına istek sayısı + gecikme histogramı, toplam eşzamanlı istek"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.requests = registry.counter(
+            "http_requests_total", "Tamamlanan HTTP istekleri", ("method", "route", "status"))
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP istek süresi", ("method", "route"))
+        self.in_flight = registry.gauge("http_requests_in_flight", "İşlenmekte olan HTTP istekleri").labels()
+        # (method, route, status) → (sayaç, histogram) - sıcak yolda tek dict araması
+        self._children = {}
+
+    def observe(self, method: str, route: str, status: int, elapsed: float):
+        key = (method, route, status)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                self.requests.labels(method, route, str(status)),
+                self.latency.labels(method, route),
+            )
+        children[0].value += 1
+        children[1].observe(elapsed)
+
+
+class MetricsMiddleware:
+    """Saf ASGI middleware - ölçümleri HttpMetrics'e yazar (yığın yeniden kurulsa da metrikler tek)"""
+
+    def __init__(self, app, http_metrics: HttpMetrics):
+        self.app = app
+        self.http_metrics = http_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = self.http_metrics.in_flight
+        in_flight.value += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.value -= 1
+            # Router eşleşen APIRoute'u scope'a yazar; şablon kullanılır, ham yol değil
+            template = getattr(scope.get("route"), "path_format", None) or UNMATCHED_ROUTE
+            self.http_metrics.observe(scope["method"], template, status, elapsed)
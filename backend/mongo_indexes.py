@@ -0,0 +1,267 @@
+# backend/mongo_indexes.py
+#
+# Sunucunun kullandığı tüm index'lerin ve sorgu şekillerinin tek kaynağı.
+# Startup'ta ensure_indexes() yalnızca schema_meta'daki sürüm INDEXES'in
+# özetinden farklıysa apply_indexes() çalıştırır (idempotent); aksi halde tek
+# bir find_one. CLI her zaman kurar, sürümü yazar, drift raporu ve explain()
+# tabanlı COLLSCAN kontrolü yapar:
+#
+#   python mongo_indexes.py            # index'leri kur + drift raporu
+#   python mongo_indexes.py --check    # her kayıtlı sorguyu explain et, COLLSCAN varsa exit 1
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from bson.binary import Binary
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+
+from token_janitor import TOKEN_JANITOR
+
+# Karşılaştırılan index seçenekleri (diğerleri drift sayılmaz)
+_OPTION_KEYS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+INDEXES = {
+    "users": [
+        # login / register / google login
+        {"keys": [("email", 1)], "name": "users_email_unique", "unique": True},
+    ],
+    "refresh_tokens": [
+        # refresh / logout: token özeti (BinData, bkz. token_keys.py) ile tekil arama
+        {"keys": [("token", 1)], "name": "refresh_token_unique", "unique": True},
+        # fix_mongo_jti.py ile production'da zaten var
+        {"keys": [("jti", 1)], "name": "jti_1", "unique": True, "sparse": True},
+        # /auth/sessions ve /auth/sessions/detailed: user_id eşitlik, (last_used_at, _id) keyset
+        # sıralama, expires_at / is_active index üzerinde filtre - yalnızca sayfadaki (en fazla
+        # 101) doküman okunur (bkz. session_pages.py). Gösterilen alanlar bilerek key'de değil:
+        # her login / refresh / logout yazısı bu index'i de günceller. Eski user_active_sessions /
+        # user_sessions_by_last_used index'leri drift olarak raporlanır, elle silinebilir.
+        {"keys": [("user_id", 1), ("last_used_at", -1), ("_id", -1), ("expires_at", 1), ("is_active", 1)],
+         "name": "user_sessions_page"},
+    ] + ([
+        # TOKEN_JANITOR=1: janitor'ın kural pencereleri (expires_at / created_at aralık + sıralama).
+        # Aynı key'lerdeki TTL index'leri önce silinmeli: python token_janitor.py --drop-ttl-indexes
+        {"keys": [("expires_at", 1)], "name": "token_expires_at"},
+        {"keys": [("created_at", 1)], "name": "token_created_at"},
+    ] if TOKEN_JANITOR else [
+        # Süresi dolan / 90 günden eski token'ları TOKEN_JANITOR=1 iken token_janitor.py siler
+        # (hız tavanıyla); o zaman bu index'ler drift olarak raporlanır:
+        # python token_janitor.py --drop-ttl-indexes
+        {"keys": [("expires_at", 1)], "name": "token_expiry_ttl", "expireAfterSeconds": 0},
+        {"keys": [("expires_at", 1)], "name": "inactive_tokens_immediate_ttl", "expireAfterSeconds": 0,
+         "partialFilterExpression": {"is_active": False}},
+        {"keys": [("created_at", 1)], "name": "old_tokens_cleanup_ttl", "expireAfterSeconds": 90 * 24 * 60 * 60},
+    ]),
+    "rate_limits": [
+        {"keys": [("expires_at", 1)], "name": "rate_limit_bucket_ttl", "expireAfterSeconds": 0},
+    ],
+    "flashcard_state": [
+        # /flashcards/due: user_id eşitlik, due_at aralık + sıralama; card_id ile covered
+        {"keys": [("user_id", 1), ("due_at", 1), ("card_id", 1)], "name": "user_due_queue"},
+    ],
+}
+
+# INDEXES değiştikçe değişir - elle artırılan bir sayı yok
+SCHEMA_VERSION = hashlib.sha256(json.dumps(INDEXES, sort_keys=True).encode()).hexdigest()[:16]
+_META_COLLECTION = "schema_meta"
+_META_ID = "indexes"
+
+# Sunucudaki her sorgu şekli - --check bunların hiçbirinin COLLSCAN olmadığını doğrular
+_SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+_SAMPLE_DIGEST = Binary(bytes(32))
+QUERIES = [
+    {"name": "login/register: users by email", "collection": "users",
+     "filter": {"email": "user@example.com"}},
+    {"name": "me/refresh: users by _id", "collection": "users",
+     "filter": {"_id": _SAMPLE_ID}},
+    {"name": "refresh: rotate by token", "collection": "refresh_tokens",
+     "filter": {"token": _SAMPLE_DIGEST, "is_active": True, "expires_at": {"$gt": "$$NOW"},
+                "rotations": {"$not": {"$gt": 10}}}},
+    {"name": "logout: token", "collection": "refresh_tokens",
+     "filter": {"token": _SAMPLE_DIGEST}},
+    {"name": "logout-all: active tokens of user", "collection": "refresh_tokens",
+     "filter": {"user_id": _SAMPLE_ID, "is_active": True, "token": {"$ne": _SAMPLE_DIGEST}}},
+    {"name": "refresh: delete all tokens of user", "collection": "refresh_tokens",
+     "filter": {"user_id": _SAMPLE_ID}},
+    {"name": "sessions: active sessions", "collection": "refresh_tokens",
+     "filter": {"user_id": _SAMPLE_ID, "is_active": True, "expires_at": {"$gt": "$$NOW"}},
+     "sort": [("last_used_at", -1), ("_id", -1)], "limit": 51},
+    {"name": "sessions/detailed", "collection": "refresh_tokens",
+     "filter": {"user_id": _SAMPLE_ID, "expires_at": {"$gt": "$$NOW"}},
+     "sort": [("last_used_at", -1), ("_id", -1)], "limit": 21},
+    {"name": "sessions/detailed: next page", "collection": "refresh_tokens",
+     "filter": {"user_id": _SAMPLE_ID, "expires_at": {"$gt": "$$NOW"},
+                "$or": [{"last_used_at": {"$lt": datetime(2000, 1, 1)}},
+                        {"last_used_at": datetime(2000, 1, 1), "_id": {"$lt": ObjectId("0" * 24)}}]},
+     "sort": [("last_used_at", -1), ("_id", -1)], "limit": 21},
+    {"name": "janitor: expired window", "collection": "refresh_tokens",
+     "filter": {"expires_at": {"$lt": "$$NOW"}}, "sort": [("expires_at", 1)], "limit": 5000},
+    {"name": "janitor: max-age window", "collection": "refresh_tokens",
+     "filter": {"created_at": {"$lt": "$$NOW"}}, "sort": [("created_at", 1)], "limit": 5000},
+    {"name": "janitor: delete batch", "collection": "refresh_tokens",
+     "filter": {"_id": {"$in": [ObjectId("0" * 24)]}, "expires_at": {"$lt": "$$NOW"}}},
+    {"name": "janitor: state", "collection": "janitor_state",
+     "filter": {"_id": "refresh_tokens"}},
+    {"name": "debug-tokens: newest tokens", "collection": "refresh_tokens",
+     "filter": {}, "sort": [("_id", -1)], "limit": 20},
+    {"name": "rate limit bucket", "collection": "rate_limits",
+     "filter": {"_id": "login_127.0.0.1"}},
+    {"name": "flashcards: due queue", "collection": "flashcard_state",
+     "filter": {"user_id": _SAMPLE_ID, "due_at": {"$lte": "$$NOW"}},
+     "sort": [("due_at", 1)], "limit": 20},
+    {"name": "flashcards: seen check by _id", "collection": "flashcard_state",
+     "filter": {"_id": {"$in": [f"{_SAMPLE_ID}:mv-1"]}}},
+    {"name": "flashcards: unseen position", "collection": "flashcard_positions",
+     "filter": {"_id": f"{_SAMPLE_ID}:"}},
+]
+
+
+def _spec_options(spec: dict) -> dict:
+    return {k: spec[k] for k in _OPTION_KEYS if k in spec}
+
+
+def _existing_options(info: dict) -> dict:
+    options = {k: info[k] for k in _OPTION_KEYS if k in info}
+    if "expireAfterSeconds" in options:
+        options["expireAfterSeconds"] = int(options["expireAfterSeconds"])
+    return options
+
+
+async def apply_indexes(db) -> dict:
+    """Eksik index'leri kur, farklı olanları raporla - hiçbir index'i silmez"""
+    report = {"created": [], "ok": [], "drift": [], "errors": []}
+
+    for collection_name, specs in INDEXES.items():
+        collection = db[collection_name]
+        try:
+            existing = await collection.index_information()
+        except OperationFailure:
+            existing = {}
+
+        for spec in specs:
+            name = spec["name"]
+            label = f"{collection_name}.{name}"
+            current = existing.get(name)
+
+            if current is not None:
+                if list(current["key"]) != list(spec["keys"]) or _existing_options(current) != _spec_options(spec):
+                    report["drift"].append(f"{label}: beklenen {spec['keys']} {_spec_options(spec)}, "
+                                           f"mevcut {current['key']} {_existing_options(current)}")
+                else:
+                    report["ok"].append(label)
+                continue
+
+            try:
+                await collection.create_index(spec["keys"], name=name, **_spec_options(spec))
+                report["created"].append(label)
+            except OperationFailure as e:
+                # Örn. aynı key başka isimle var ya da unique index için tekrar eden veri
+                report["errors"].append(f"{label}: {e}")
+
+        # Registry'de olmayan index'ler (elle kurulmuş / eski script'lerden kalmış)
+        registered = {spec["name"] for spec in specs} | {"_id_"}
+        for name in existing:
+            if name not in registered:
+                report["drift"].append(f"{collection_name}.{name}: registry'de yok")
+
+    return report
+
+
+async def record_schema_version(db):
+    await db[_META_COLLECTION].update_one(
+        {"_id": _META_ID},
+        {"$set": {"version": SCHEMA_VERSION, "applied_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+async def ensure_indexes(db) -> Optional[dict]:
+    """Startup: kayıtlı sürüm güncelse None (index komutu yok), değilse apply_indexes() raporu
+
+    Sürüm yalnızca hatasız kurulumdan sonra yazılır; elle silinen bir index bir
+    sonraki INDEXES değişikliğine ya da CLI çalıştırılana kadar fark edilmez.
+    """
+    meta = await db[_META_COLLECTION].find_one({"_id": _META_ID}, projection={"version": 1})
+    if meta is not None and meta.get("version") == SCHEMA_VERSION:
+        return None
+    report = await apply_indexes(db)
+    if not report["errors"]:
+        await record_schema_version(db)
+    return report
+
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            yield from _plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def check_query_plans(db) -> list:
+    """Her kayıtlı sorguyu explain et - COLLSCAN planlayanların listesini döndür"""
+    now = datetime.utcnow()
+    failures = []
+    for query in QUERIES:
+        # "$$NOW" yer tutucusu gerçek bir tarih ile değiştirilir
+        query_filter = {
+            k: ({op: (now if v == "$$NOW" else v) for op, v in cond.items()} if isinstance(cond, dict) else cond)
+            for k, cond in query["filter"].items()
+        }
+        command = {"find": query["collection"], "filter": query_filter}
+        if "sort" in query:
+            command["sort"] = dict(query["sort"])
+        if "limit" in query:
+            command["limit"] = query["limit"]
+
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        stages = list(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+        status = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+        print(f"  {'❌' if status == 'COLLSCAN' else '✅'} {query['name']}: {' <- '.join(filter(None, stages))}")
+        if status == "COLLSCAN":
+            failures.append(query["name"])
+    return failures
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="explain() ile COLLSCAN kontrolü")
+    args = parser.parse_args()
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
+    db = client[os.environ.get("DB_NAME")]
+
+    report = await apply_indexes(db)
+    for key in ("created", "ok", "drift", "errors"):
+        for line in report[key]:
+            print(f"  [{key}] {line}")
+
+    exit_code = 1 if report["errors"] else 0
+    if not report["errors"]:
+        await record_schema_version(db)
+        print(f"  [version] {SCHEMA_VERSION}")
+    if args.check:
+        print("🔍 Sorgu planları:")
+        failures = await check_query_plans(db)
+        if failures:
+            print(f"❌ {len(failures)} sorgu COLLSCAN planlıyor")
+            exit_code = 1
+        else:
+            print("✅ Hiçbir kayıtlı sorgu COLLSCAN yapmıyor")
+
+    client.close()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+# backend/mongo_pool.py
+#
+# Paylaşılan AsyncIOMotorClient'ın havuz ayarları (env) ve ölçümü. pymongo
+# komut ve bağlantı havuzu olayları dinlenir: komut başına / koleksiyon başına
+# süre, kullanımdaki bağlantı sayısı, havuzdan bağlantı bekleme süresi ve
+# bekleme zaman aşımları. Olaylar motor'un executor thread'lerinden gelir;
+# sayaçlar kısa bir kilit altında güncellenir.
+#
+#   MONGO_MAX_POOL_SIZE=100              (pymongo varsayılanı)
+#   MONGO_MIN_POOL_SIZE=0
+#   MONGO_WAIT_QUEUE_TIMEOUT_MS=         (boş: sınırsız bekleme)
+#   MONGO_SERVER_SELECTION_TIMEOUT_MS=30000
+#   MONGO_CONNECT_TIMEOUT_MS=20000
+#   MONGO_MAX_IDLE_TIME_MS=              (boş: kapatılmaz)
+#   MONGO_COMPRESSORS=                   (ör. "zstd,snappy,zlib")
+import os
+import threading
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+
+def _int_env(name: str, default=None):
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else default
+
+
+MONGO_MAX_POOL_SIZE = _int_env("MONGO_MAX_POOL_SIZE", 100)
+MONGO_MIN_POOL_SIZE = _int_env("MONGO_MIN_POOL_SIZE", 0)
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = _int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000)
+MONGO_CONNECT_TIMEOUT_MS = _int_env("MONGO_CONNECT_TIMEOUT_MS", 20000)
+MONGO_MAX_IDLE_TIME_MS = _int_env("MONGO_MAX_IDLE_TIME_MS")
+MONGO_COMPRESSORS = os.environ.get("MONGO_COMPRESSORS", "").strip()
+
+# Bu komutların ilk argümanı koleksiyon adı değil
+_NON_COLLECTION_COMMANDS = {"ping", "hello", "ismaster", "isMaster", "buildInfo", "endSessions",
+                            "listCollections", "listDatabases", "saslStart", "saslContinue"}
+
+
+def client_options(**overrides) -> dict:
+    """AsyncIOMotorClient'a verilecek havuz/zaman aşımı ayarları (boş olanlar sürücü varsayılanında kalır)"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "compressors": MONGO_COMPRESSORS or None,
+    }
+    options.update(overrides)
+    return {key: value for key, value in options.items() if value is not None}
+
+
+class MongoMetrics(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Komut süreleri + havuz doluluğu; snapshot() ile okunur"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._inflight = {}
+        self.commands = {}      # (komut, koleksiyon) → [sayı, hata, toplam_ms, en_uzun_ms]
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_wait_ms = 0.0
+        self.max_checkout_wait_ms = 0.0
+        self.checkout_timeouts = 0
+        self.checkout_failures = 0
+        self.connections_open = 0
+        self.connections_created = 0
+
+    # --- komutlar ---
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) and event.command_name not in _NON_COLLECTION_COMMANDS else ""
+        with self._lock:
+            self._inflight[(event.request_id, event.connection_id)] = collection
+
+    def _finish(self, event, failed: bool):
+        elapsed_ms = event.duration_micros / 1000
+        with self._lock:
+            collection = self._inflight.pop((event.request_id, event.connection_id), "")
+            entry = self.commands.get((event.command_name, collection))
+            if entry is None:
+                entry = self.commands[(event.command_name, collection)] = [0, 0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += failed
+            entry[2] += elapsed_ms
+            if elapsed_ms > entry[3]:
+                entry[3] = elapsed_ms
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+    # --- bağlantı havuzu ---
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open -= 1
+
+    def connection_check_out_started(self, event):
+        # Başlangıç ve sonuç olayı aynı thread'de gelir
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        wait_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            if self.checked_out > self.max_checked_out:
+                self.max_checked_out = self.checked_out
+            self.checkout_wait_ms += wait_ms
+            if wait_ms > self.max_checkout_wait_ms:
+                self.max_checkout_wait_ms = wait_ms
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def reset_peaks(self):
+        """En yüksek değerleri sıfırla (yük testinde aşamalar arası)"""
+        with self._lock:
+            self.max_checked_out = self.checked_out
+            self.max_checkout_wait_ms = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            commands = {key: list(value) for key, value in self.commands.items()}
+            pool = {
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_wait_ms_total": round(self.checkout_wait_ms, 3),
+                "avg_checkout_wait_ms": round(self.checkout_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_checkout_wait_ms, 3),
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_failures": self.checkout_failures,
+                "connections_open": self.connections_open,
+                "connections_created": self.connections_created,
+            }
+        return {
+            "pool": pool,
+            "commands": [
+                {"command": name, "collection": collection, "count": count, "failed": failed,
+                 "total_ms": round(total, 3), "avg_ms": round(total / count, 3) if count else 0.0,
+                 "max_ms": round(longest, 3)}
+                for (name, collection), (count, failed, total, longest) in sorted(commands.items())
+            ],
+        }
+
+
+def create_client(url: str, metrics: MongoMetrics = None, **overrides) -> AsyncIOMotorClient:
+    listeners = [metrics] if metrics is not None else []
+    return AsyncIOMotorClient(url, event_listeners=listeners, **client_options(**overrides))
@@ -0,0 +1,240 @@
+# backend/morphology.py
+#
+# Terim çözümleyici: katalogdaki kök ("Oste/o"), önek ("Hyper-") ve sonek ("-itis")
+# biçimleri startup'ta tek bir Aho-Corasick otomatına derlenir. Bir terim:
+#   1. otomattan tek geçişte geçirilir (tüm morfem eşleşmeleri, O(n + eşleşme)),
+#   2. eşleşmeler üzerinde soldan sağa dinamik programlama ile en iyi bölümleme
+#      seçilir: önce tanınmayan harf sayısı, sonra parça sayısı en az olan.
+# Bölümleme kuralları: önekler yalnızca kelime başında (art arda olabilir), sonekler
+# en sonda; köklerin bağlayıcı ünlüsü ("Oste/o" → "osteo") köke dahil edilir, ünlüyle
+# biten kökün son ünlüsü düşebilir ("Cardi/o" + "-itis" → "carditis").
+import os
+import re
+from collections import OrderedDict
+
+from term_catalogue import fold
+
+# Son çözümlenen kelimelerin bölümlemesi (toplu isteklerde ortak kelimeler tekrar eder)
+MORPHOLOGY_CACHE_SIZE = int(os.environ.get("MORPHOLOGY_CACHE_SIZE", "8192"))
+
+PREFIX, ROOT, SUFFIX, UNKNOWN = "prefix", "root", "suffix", "unknown"
+_KIND_RANK = {PREFIX: 0, ROOT: 1, SUFFIX: 2}
+_SHORT_ROOT = 3
+_VOWELS = frozenset("aeiouy")
+_WORD = re.compile(r"[^\W\d_]+")
+_FORM = re.compile(r"^(?P<pre>-?)(?P<stem>[^\W\d_]+)(?:/(?P<vowel>[^\W\d_]))?(?P<post>-?)$")
+
+
+class AhoCorasick:
+    """Çok desenli eşleştirici - geçiş tablosu önceden tamamlanmış (DFA), arama karakter başına tek sözlük okuması"""
+
+    def __init__(self, patterns: list):
+        goto, outputs = [{}], [[]]
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                nxt = goto[node].get(char)
+                if nxt is None:
+                    nxt = goto[node][char] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                node = nxt
+            outputs[node].append(index)
+
+        # BFS: fail bağlantısı + kısmi geçişleri fail düğümününkilerle tamamla
+        self._delta = [None] * len(goto)
+        self._delta[0] = dict(goto[0])
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            self._delta[node] = {**self._delta[fail[node]], **goto[node]}
+            outputs[node] = outputs[node] + outputs[fail[node]]
+            for char, child in goto[node].items():
+                fail[child] = self._delta[fail[node]].get(char, 0)
+                queue.append(child)
+        self._outputs = outputs
+        self.lengths = [len(p) for p in patterns]
+
+    def __len__(self):
+        return len(self._delta)
+
+    def find_all(self, text: str):
+        """(başlangıç, bitiş, desen index'i) - bitişe göre sıralı, örtüşenler dahil"""
+        delta, outputs, lengths = self._delta, self._outputs, self.lengths
+        node = 0
+        for end, char in enumerate(text, 1):
+            node = delta[node].get(char, 0)
+            for index in outputs[node]:
+                yield end - lengths[index], end, index
+
+
+def _fold_word(word: str, cache: dict = {}) -> str:
+    """Karakter karakter katlama - uzunluk korunur, böylece konumlar orijinal metne denk gelir"""
+    out = []
+    for char in word:
+        folded = cache.get(char)
+        if folded is None:
+            folded = fold(char)
+            cache[char] = folded = folded if len(folded) == 1 else char.lower()[:1] or char
+        out.append(folded)
+    return "".join(out)
+
+
+def parse_form(text: str):
+    """"Oste/o" → (root, "oste", "o"), "Hyper-" → (prefix, "hyper", ""), "-itis" → (suffix, "itis", "")
+
+    Birleşik yazımlar ("Hyster/o + -ectomy") ve tanınmayan biçimler için None.
+    """
+    match = _FORM.match(text.strip())
+    if not match or (match["pre"] and match["post"]):
+        return None
+    kind = SUFFIX if match["pre"] else PREFIX if match["post"] else ROOT
+    if kind != ROOT and match["vowel"]:
+        return None
+    return kind, _fold_word(match["stem"]), _fold_word(match["vowel"] or "")
+
+
+class MorphologyAnalyzer:
+    """Salt okunur morfem otomatı (katalog yüklendiğinde bir kez kurulur)"""
+
+    def __init__(self, catalogue, cache_size: int = MORPHOLOGY_CACHE_SIZE):
+        self.version = catalogue.version
+        self.cache_size = cache_size
+        self._segments = OrderedDict()
+        morphemes = {}
+        for i in range(len(catalogue)):
+            kind = catalogue.kinds[i]
+            form = catalogue.fields["term"][i]
+            if kind == "term" and "/" not in form and "-" not in form:
+                continue  # tam terimler morfem değil
+            parsed = parse_form(form)
+            if parsed is None:
+                continue
+            morpheme_kind, stem, vowel = parsed
+            entry = morphemes.setdefault((stem, morpheme_kind), {
+                "kind": morpheme_kind, "form": form, "vowels": set(), "meanings": [], "ids": [],
+            })
+            if vowel:
+                entry["vowels"].add(vowel)
+            meaning = catalogue.fields["turkish"][i]
+            if meaning and meaning not in entry["meanings"]:
+                entry["meanings"].append(meaning)
+            entry["ids"].append(catalogue.ids[i])
+
+        # Aynı gövde hem önek hem kök olabilir: desen başına morfem listesi
+        self.stems = stems = sorted({stem for stem, _ in morphemes})
+        self._patterns = [[] for _ in stems]
+        stem_index = {stem: n for n, stem in enumerate(stems)}
+        for (stem, kind), entry in sorted(morphemes.items(), key=lambda item: _KIND_RANK[item[0][1]]):
+            entry["vowels"] = "".join(sorted(entry["vowels"]))
+            entry["rank"] = _KIND_RANK[kind]
+            self._patterns[stem_index[stem]].append(entry)
+        self.morphemes = len(morphemes)
+        self._automaton = AhoCorasick(stems)
+
+    @staticmethod
+    def naive_matches(stems: list, word: str) -> list:
+        """Referans: her gövde için str.find döngüsü (benchmark ve doğrulama)"""
+        matches = []
+        for index, stem in enumerate(stems):
+            start = word.find(stem)
+            while start != -1:
+                matches.append((start, start + len(stem), index))
+                start = word.find(stem, start + 1)
+        return matches
+
+    def matches(self, word: str) -> list:
+        return list(self._automaton.find_all(word))
+
+    def _segment(self, word: str, matches) -> tuple:
+        """Eşleşmeler üzerinde DP: durum (konum, evre) - evre 0 önekler, 1 kökler, 2 sonekler
+
+        Maliyet tek tamsayı: tanınmayan harf × (n+1) + parça sayısı. Sonuç (start, end, morfem|None) demeti.
+        """
+        n = len(word)
+        edges = [[] for _ in range(n + 1)]
+        for start, end, index in matches:
+            for entry in self._patterns[index]:
+                rank = entry["rank"]
+                if rank != 1:
+                    if rank == 0 or end == n:
+                        edges[start].append((end, rank, entry))
+                    continue
+                # Kısa kökler ("Ot/o") ancak ünlü önünde ya da kelime sonunda sayılır ("is" ⊂ "iskelet" değil)
+                if end - start >= _SHORT_ROOT or end == n or word[end] in _VOWELS:
+                    edges[start].append((end, 1, entry))
+                if end < n and word[end] in entry["vowels"]:
+                    edges[start].append((end + 1, 1, entry))
+                # Ünlüyle biten kök ünlüyle başlayan bir ekin önünde düşer: "cardi" + "itis" → "carditis"
+                if end - start > _SHORT_ROOT and word[end - 1] in _VOWELS:
+                    edges[start].append((end - 1, 1, entry))
+
+        unknown = n + 1
+        inf = unknown * unknown
+        best = [inf] * (3 * n + 3)
+        back = [None] * (3 * n + 3)
+        best[0] = 0
+        for i in range(n + 1):
+            for phase in range(3):
+                cost = best[3 * i + phase]
+                if cost == inf:
+                    continue
+                if i < n:
+                    # Tanınmayan harf: köke geçiş sayılır, soneklerden sonra evre değişmez
+                    state = 3 * i + 3 + (phase or 1)
+                    if cost + unknown < best[state]:
+                        best[state] = cost + unknown
+                        back[state] = (i, phase, None)
+                for end, rank, entry in edges[i]:
+                    if rank < phase or (rank == 0 and phase != 0):
+                        continue
+                    state = 3 * end + rank
+                    if cost + 1 < best[state]:
+                        best[state] = cost + 1
+                        back[state] = (i, phase, entry)
+
+        phase = min(range(3), key=lambda p: best[3 * n + p])
+        parts = []
+        i = n
+        while i > 0:
+            start, prev_phase, entry = back[3 * i + phase]
+            if entry is None and parts and parts[-1][2] is None and parts[-1][0] == i:
+                parts[-1] = (start, parts[-1][1], None)
+            else:
+                parts.append((start, i, entry))
+            i, phase = start, prev_phase
+        return tuple(reversed(parts))
+
+    def segments(self, word: str) -> tuple:
+        """Katlanmış kelimenin bölümlemesi (LRU önbellekli - toplu isteklerde kelimeler tekrarlar)"""
+        cache = self._segments
+        parts = cache.get(word)
+        if parts is None:
+            parts = cache[word] = self._segment(word, self._automaton.find_all(word))
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(word)
+        return parts
+
+    def analyze(self, text: str) -> dict:
+        """Terimi (çok kelimeli olabilir) parçalarına ayır - konumlar orijinal metne göre"""
+        parts = []
+        known = letters = 0
+        for match in _WORD.finditer(text):
+            word = _fold_word(match.group())
+            offset = match.start()
+            for start, end, entry in self.segments(word):
+                start += offset
+                end += offset
+                if entry is None:
+                    parts.append({"kind": UNKNOWN, "text": text[start:end], "start": start, "end": end})
+                else:
+                    known += end - start
+                    parts.append({"kind": entry["kind"], "text": text[start:end], "start": start, "end": end,
+                                  "form": entry["form"], "meanings": entry["meanings"], "ids": entry["ids"]})
+            letters += len(word)
+        return {"term": text, "parts": parts, "coverage": round(known / letters, 3) if letters else 0.0}
+
+    def analyze_many(self, texts: list) -> list:
+        return [self.analyze(text) for text in texts]
@@ -0,0 +1,115 @@
+# backend/password_hashing.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from startup import lazy_import
+
+# İlk hash/verify'da yüklenir (bkz. startup.py)
+bcrypt = lazy_import("bcrypt")
+
+# =====================
+# CONFIG
+# =====================
+
+# bcrypt, hash sırasında GIL'i bırakır; bu yüzden thread pool yeterli
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Kuyrukta (çalışan + bekleyen) izin verilen maksimum iş sayısı
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+
+class PasswordHasherOverloaded(Exception):
+    """Hash kuyruğu dolu - istek 503 ile reddedilmeli"""
+
+
+class PasswordHasher:
+    """bcrypt işlerini event loop dışında, sınırlı bir thread pool'da çalıştırır"""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_queue = max(self.workers, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="bcrypt"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._metrics = {
+            "hash": {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+            "verify": {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        }
+        self.rejected = 0
+
+    def _timed(self, kind: str, fn, *args):
+        """Worker thread içinde çalışır - süreyi ölçüp metriklere yazar"""
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                m = self._metrics[kind]
+                m["calls"] += 1
+                m["total_seconds"] += elapsed
+                if elapsed > m["max_seconds"]:
+                    m["max_seconds"] = elapsed
+
+    async def _submit(self, kind: str, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherOverloaded()
+            self._pending += 1
+        try:
+            future = self._executor.submit(self._timed, kind, fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # İş bitince (ya da başlamadan iptal edilince) düşülür; bekleyen
+        # coroutine iptal edilse bile çalışan bcrypt işi sayılmaya devam eder
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", _hashpw, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit("verify", _checkpw, password, hashed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            operations = {}
+            for kind, m in self._metrics.items():
+                calls = m["calls"]
+                operations[kind] = {
+                    "calls": calls,
+                    "total_seconds": m["total_seconds"],
+                    "avg_ms": round(m["total_seconds"] / calls * 1000, 2) if calls else 0.0,
+                    "max_ms": round(m["max_seconds"] * 1000, 2),
+                }
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rejected": self.rejected,
+            "operations": operations,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _hashpw(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+
+def _checkpw(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode(), hashed.encode())
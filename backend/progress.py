@@ -0,0 +1,340 @@
+# backend/progress.py
+#
+# Öğrenme ilerlemesi: istemciler olayları (öğrenilen terim, flashcard oturumu,
+# quiz skoru) toplu gönderir. Olaylar kullanıcı başına bellekte birleştirilir ve
+# arka planda periyodik olarak bulk upsert'lerle yazılır:
+#   - user_progress: kullanıcı başına tek özet dokümanı (_id = user_id); sayaçlar
+#     ve seri tek bir pipeline update ile artımlı güncellenir → /auth/me O(1)
+#   - term_progress: terim başına durum (_id = "<user_id>:<term_id>")
+# Her flush bir batch kimliği taşır; dokümanlar son uygulanan batch'leri
+# tutar ve sayaçlar yalnızca batch ilk kez görülüyorsa artar. Sonucu bilinmeyen
+# (ağ hatası) bir bulk_write tekrar denendiğinde uygulanmış işlemler etkisiz
+# kalır - istatistikler iki kez sayılmaz.
+#
+#   PROGRESS_FLUSH_INTERVAL=1.0     (saniye)
+#   PROGRESS_FLUSH_USERS=2000       (bu kadar kullanıcı birikince beklemeden yaz)
+#   PROGRESS_MAX_PENDING_USERS=200000
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+PROGRESS_FLUSH_INTERVAL = float(os.environ.get("PROGRESS_FLUSH_INTERVAL", "1.0"))
+PROGRESS_FLUSH_USERS = int(os.environ.get("PROGRESS_FLUSH_USERS", "2000"))
+PROGRESS_MAX_PENDING_USERS = int(os.environ.get("PROGRESS_MAX_PENDING_USERS", "200000"))
+PROGRESS_BULK_SIZE = int(os.environ.get("PROGRESS_BULK_SIZE", "1000"))
+# Seri hesabında gün sınırı (varsayılan Türkiye saati, UTC+3)
+PROGRESS_DAY_UTC_OFFSET = timedelta(hours=float(os.environ.get("PROGRESS_DAY_UTC_OFFSET", "3")))
+# Geç gelen (offline biriken) olaylar en fazla bu kadar geriye tarihlenebilir
+MAX_EVENT_AGE = timedelta(days=7)
+# Yazılamayan işlemler bir sonraki flush'ta tekrar denenir; bu sınırın üstü düşürülür
+MAX_RETRY_OPS = 100000
+# Doküman başına hatırlanan son batch kimlikleri; tekrar denenen işlem bundan eski olmamalı
+APPLIED_BATCHES = 32
+
+EVENT_TYPES = ("term", "flashcard", "quiz")
+
+logger = logging.getLogger("healthlex.progress")
+
+
+class ProgressBufferFull(Exception):
+    """Yazılmayı bekleyen kullanıcı sayısı sınırda - istemci biraz sonra tekrar denemeli"""
+
+
+class _Pending:
+    """Bir kullanıcının henüz yazılmamış, birleştirilmiş olayları"""
+
+    __slots__ = ("terms", "days", "reviews", "quizzes", "quiz_percent", "flashcards", "flashcard_cards")
+
+    def __init__(self):
+        self.terms = {}  # term_id -> [learned (True/False/None), review sayısı, son tarih]
+        self.days = set()
+        self.reviews = 0
+        self.quizzes = 0
+        self.quiz_percent = 0
+        self.flashcards = 0
+        self.flashcard_cards = 0
+
+
+def study_day(at: datetime) -> int:
+    """Yerel takvim gününün sıra numarası - seri hesabı için"""
+    return (at + PROGRESS_DAY_UTC_OFFSET).toordinal()
+
+
+def _event_time(at, now: datetime) -> datetime:
+    if at is None:
+        return now
+    if at.tzinfo is not None:
+        at = (at - at.utcoffset()).replace(tzinfo=None)
+    return min(max(at, now - MAX_EVENT_AGE), now)
+
+
+def _streak_stages(day: int) -> list:
+    """Bir çalışma gününü seriye ekleyen pipeline aşamaları (önceki veya aynı gün etkisiz)"""
+    last = {"$ifNull": ["$last_study_day", -1]}
+    is_new_day = {"$gt": [day, last]}
+    return [
+        {"$set": {
+            "current_streak": {"$cond": [
+                is_new_day,
+                {"$cond": [{"$eq": [last, day - 1]}, {"$add": [{"$ifNull": ["$current_streak", 0]}, 1]}, 1]},
+                {"$ifNull": ["$current_streak", 0]},
+            ]},
+            "total_days": {"$add": [{"$ifNull": ["$total_days", 0]}, {"$cond": [is_new_day, 1, 0]}]},
+            "last_study_day": {"$max": [last, day]},
+        }},
+        {"$set": {"longest_streak": {"$max": [{"$ifNull": ["$longest_streak", 0]}, "$current_streak"]}}},
+    ]
+
+
+def _once(batch_id: ObjectId, stages: list) -> list:
+    """Pipeline'ı batch kimliğiyle sar: aşamalar `$_fresh` ile batch'in ilk kez
+    uygulandığını görür, sonda kimlik kaydedilir ve geçici alan silinir"""
+    applied = {"$ifNull": ["$applied_batches", []]}
+    return [
+        {"$set": {"_fresh": {"$not": {"$in": [batch_id, applied]}}}},
+        *stages,
+        {"$set": {"applied_batches": {"$cond": [
+            "$_fresh", {"$slice": [{"$concatArrays": [applied, [batch_id]]}, -APPLIED_BATCHES]}, applied,
+        ]}}},
+        {"$unset": "_fresh"},
+    ]
+
+
+def _inc_once(field: str, value) -> dict:
+    current = {"$ifNull": [f"${field}", 0]}
+    return {"$cond": ["$_fresh", {"$add": [current, value]}, current]}
+
+
+def _summary_update(user_id: str, pending: _Pending, now: datetime, batch_id: ObjectId) -> UpdateOne:
+    learned = [term_id for term_id, (state, _, _) in pending.terms.items() if state is True]
+    unlearned = [term_id for term_id, (state, _, _) in pending.terms.items() if state is False]
+    inc = _inc_once
+
+    learned_ids = {"$setUnion": [{"$ifNull": ["$learned_ids", []]}, learned]}
+    if unlearned:
+        learned_ids = {"$filter": {"input": learned_ids, "cond": {"$not": {"$in": ["$$this", unlearned]}}}}
+
+    pipeline = [
+        {"$set": {
+            "learned_ids": learned_ids,
+            "total_reviews": inc("total_reviews", pending.reviews),
+            "quizzes_taken": inc("quizzes_taken", pending.quizzes),
+            "quiz_percentage_sum": inc("quiz_percentage_sum", pending.quiz_percent),
+            "flashcard_sessions": inc("flashcard_sessions", pending.flashcards),
+            "flashcard_cards": inc("flashcard_cards", pending.flashcard_cards),
+            "updated_at": now,
+        }},
+        {"$set": {"learned_terms": {"$size": "$learned_ids"}}},
+    ]
+    # Seri aşamaları zaten idempotent (aynı gün ikinci kez etkisiz)
+    for day in sorted(pending.days):
+        pipeline += _streak_stages(day)
+    return UpdateOne({"_id": user_id}, _once(batch_id, pipeline), upsert=True)
+
+
+def _term_updates(user_id: str, pending: _Pending, batch_id: ObjectId) -> list:
+    operations = []
+    for term_id, (state, reviews, last_reviewed) in pending.terms.items():
+        stages = [{"$set": {
+            "user_id": user_id,
+            "term_id": term_id,
+            "review_count": _inc_once("review_count", reviews),
+            "last_reviewed": {"$max": ["$last_reviewed", last_reviewed]},
+            # Durum bildirmeyen olay yeni dokümanı öğrenilmemiş açar, var olanı değiştirmez
+            "learned": {"$ifNull": ["$learned", False]} if state is None else state,
+        }}]
+        operations.append(UpdateOne({"_id": f"{user_id}:{term_id}"}, _once(batch_id, stages), upsert=True))
+    return operations
+
+
+def summarize(doc: dict, today: int = None) -> dict:
+    """user_progress dokümanından istemciye dönen istatistikler"""
+    doc = doc or {}
+    today = study_day(datetime.utcnow()) if today is None else today
+    # Dün veya bugün çalışılmadıysa seri kopmuştur
+    current = doc.get("current_streak", 0) if doc.get("last_study_day", -1) >= today - 1 else 0
+    quizzes = doc.get("quizzes_taken", 0)
+    return {
+        "learned_terms": doc.get("learned_terms", 0),
+        "total_reviews": doc.get("total_reviews", 0),
+        "current_streak": current,
+        "longest_streak": doc.get("longest_streak", 0),
+        "average_quiz_score": round(doc.get("quiz_percentage_sum", 0) / quizzes) if quizzes else 0,
+        "quizzes_taken": quizzes,
+        "flashcard_sessions": doc.get("flashcard_sessions", 0),
+    }
+
+
+class ProgressService:
+    """Olayları kullanıcı başına biriktirir, arka planda bulk upsert ile yazar"""
+
+    def __init__(self, db, interval: float = PROGRESS_FLUSH_INTERVAL, flush_users: int = PROGRESS_FLUSH_USERS,
+                 max_pending_users: int = PROGRESS_MAX_PENDING_USERS, bulk_size: int = PROGRESS_BULK_SIZE):
+        self.summaries = db.user_progress
+        self.terms = db.term_progress
+        self.interval = interval
+        self.flush_users = flush_users
+        self.max_pending_users = max_pending_users
+        self.bulk_size = bulk_size
+
+        self._pending = {}
+        self._retry = []  # (koleksiyon, UpdateOne)
+        self._wake = asyncio.Event()
+        self._task = None
+        self._counters = {"events": 0, "flushes": 0, "bulk_writes": 0, "operations": 0, "failed_operations": 0, "dropped_operations": 0}
+        self._last_flush_ms = 0.0
+
+    # ---- ingest (istek yolu, sadece bellek) ----
+
+    def add(self, user_id: str, events: list) -> int:
+        """Olayları doğrula ve kullanıcının bekleyen durumuna birleştir"""
+        pending = self._pending.get(user_id)
+        if pending is None:
+            if len(self._pending) >= self.max_pending_users:
+                raise ProgressBufferFull()
+            pending = _Pending()
+
+        now = datetime.utcnow()
+        parsed = [_validate(event, index) for index, event in enumerate(events)]
+        for event in parsed:
+            at = _event_time(event.get("at"), now)
+            pending.days.add(study_day(at))
+            kind = event["type"]
+            if kind == "term":
+                state = pending.terms.get(event["term_id"])
+                if state is None:
+                    pending.terms[event["term_id"]] = [event.get("learned"), 1, at]
+                else:
+                    if event.get("learned") is not None:
+                        state[0] = event["learned"]
+                    state[1] += 1
+                    state[2] = max(state[2], at)
+                pending.reviews += 1
+            elif kind == "quiz":
+                pending.quizzes += 1
+                pending.quiz_percent += round(event["score"] / event["total"] * 100)
+            else:
+                pending.flashcards += 1
+                pending.flashcard_cards += event.get("completed") or 0
+
+        self._pending[user_id] = pending
+        self._counters["events"] += len(parsed)
+        if len(self._pending) >= self.flush_users:
+            self._wake.set()
+        return len(parsed)
+
+    # ---- okuma ----
+
+    async def stats(self, user_id: str) -> dict:
+        """Özet dokümanından tek _id okuması (learned_ids / batch listeleri hariç)"""
+        doc = await self.summaries.find_one({"_id": user_id}, projection={"learned_ids": 0, "applied_batches": 0})
+        return summarize(doc)
+
+    # ---- flush ----
+
+    async def flush(self) -> int:
+        """Bekleyen her şeyi yaz; yazılan işlem sayısını döndürür"""
+        if not self._pending and not self._retry:
+            return 0
+        started = time.perf_counter()
+        pending, self._pending = self._pending, {}
+        now = datetime.utcnow()
+        batch_id = ObjectId()
+
+        # Tekrar denenenler kendi (eski) batch kimlikleriyle, yenilerden önce
+        operations, self._retry = self._retry, []
+        for user_id, user_pending in pending.items():
+            operations.append((self.summaries, _summary_update(user_id, user_pending, now, batch_id)))
+            operations.extend((self.terms, op) for op in _term_updates(user_id, user_pending, batch_id))
+
+        written = 0
+        for collection in (self.summaries, self.terms):
+            batch = [op for target, op in operations if target is collection]
+            for start in range(0, len(batch), self.bulk_size):
+                chunk = batch[start:start + self.bulk_size]
+                written += await self._write(collection, chunk)
+
+        self._counters["flushes"] += 1
+        self._counters["operations"] += written
+        self._last_flush_ms = (time.perf_counter() - started) * 1000
+        if self._retry:
+            logger.warning("⚠️ Progress flush: %d işlem tekrar denenecek", len(self._retry))
+        return written
+
+    async def _write(self, collection, chunk: list) -> int:
+        self._counters["bulk_writes"] += 1
+        try:
+            await collection.bulk_write(chunk, ordered=False)
+            return len(chunk)
+        except BulkWriteError as e:
+            failed = [chunk[error["index"]] for error in e.details.get("writeErrors", [])]
+            logger.warning("⚠️ Progress bulk_write: %d/%d işlem başarısız", len(failed), len(chunk))
+        except PyMongoError as e:
+            # Hangi işlemlerin uygulandığı bilinmiyor - hepsi tekrar denenir; uygulanmış
+            # olanlar batch kimliği sayesinde etkisiz kalır
+            failed = chunk
+            logger.warning("⚠️ Progress bulk_write hatası: %s", e)
+        self._counters["failed_operations"] += len(failed)
+        room = MAX_RETRY_OPS - len(self._retry)
+        if room < len(failed):
+            self._counters["dropped_operations"] += len(failed) - max(room, 0)
+            failed = failed[:max(room, 0)]
+        self._retry.extend((collection, op) for op in failed)
+        return len(chunk) - len(failed)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("❌ Progress flush hatası")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Arka plan görevini durdur ve kalanları yaz (lifespan shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def pending_users(self) -> int:
+        return len(self._pending)
+
+    def stats_snapshot(self) -> dict:
+        return {
+            **self._counters,
+            "pending_users": len(self._pending),
+            "retry_operations": len(self._retry),
+            "last_flush_ms": round(self._last_flush_ms, 1),
+        }
+
+
+def _validate(event: dict, index: int) -> dict:
+    kind = event.get("type")
+    if kind not in EVENT_TYPES:
+        raise ValueError(f"events[{index}]: unknown type {kind!r}")
+    if kind == "term" and not event.get("term_id"):
+        raise ValueError(f"events[{index}]: term_id is required")
+    if kind == "quiz":
+        total, score = event.get("total"), event.get("score")
+        if not total or score is None or not 0 <= score <= total:
+            raise ValueError(f"events[{index}]: quiz needs 0 <= score <= total and total > 0")
+    return event
@@ -0,0 +1,129 @@
+# backend/quiz.py
+#
+# Quiz üretimi: terim kataloğundan sistem başına tamsayı indeksli havuzlar bir kez
+# kurulur. Sorular ve çeldiriciler numpy Generator ile (seed verilebilir) vektörel
+# olarak örneklenir:
+#   - sorular havuzdan tekrarsız seçilir,
+#   - çeldiriciler aynı sistemin tekil anlamlarından, doğru cevap hariç düzgün
+#     dağılımla seçilir (aynı anlamı taşıyan başka bir terim çeldirici olamaz),
+#   - doğru cevabın şıktaki yeri düzgün dağılımlıdır.
+import numpy as np
+
+QUIZ_OPTIONS = 4
+MIXED_SYSTEM = "Karışık (Tüm Sistemler)"
+
+
+def sample_distractors(rng: np.random.Generator, sizes: np.ndarray, answer_ranks: np.ndarray, k: int) -> np.ndarray:
+    """Her satır i için [0, sizes[i]) aralığından answer_ranks[i] hariç k farklı sıra - rastgele sırada
+
+    Satırların havuz boyutları farklı olabilir (karışık quiz). Doğru cevap çıkarılmış
+    sizes-1'lik uzayda her değere rastgele bir anahtar verilir, en küçük k anahtar
+    seçilir (boyut dışı sütunlar hiç seçilmez) ve anahtar sırasına dizilir; sonra
+    doğru cevabın sırasından büyük olanlar bir kaydırılır.
+    """
+    width = int(sizes.max()) - 1
+    keys = rng.random((len(sizes), width))
+    keys[np.arange(width) >= (sizes - 1)[:, None]] = 2.0
+    picks = keys.argpartition(k - 1, axis=1)[:, :k]
+    rows = np.arange(len(sizes))[:, None]
+    picks = picks[rows, keys[rows, picks].argsort(axis=1)]
+    picks += picks >= answer_ranks[:, None]
+    return picks
+
+
+class QuizEngine:
+    """Salt okunur quiz havuzları (katalog yüklendiğinde bir kez kurulur)"""
+
+    def __init__(self, catalogue, options: int = QUIZ_OPTIONS):
+        self.options = options
+        self.version = catalogue.version
+
+        # Quiz.jsx ile aynı kaynak: bir sisteme bağlı terimler
+        rows = [i for i in range(len(catalogue)) if catalogue.kinds[i] == "term" and catalogue.systems[i]]
+        self.term_ids = [catalogue.ids[i] for i in rows]
+        self.terms = [catalogue.fields["term"][i] for i in rows]
+        self.categories = [catalogue.categories[i] for i in rows]
+        self.system_names = sorted({catalogue.systems[i] for i in rows})
+
+        meaning_index = {}
+        for i in rows:
+            meaning_index.setdefault(catalogue.fields["turkish"][i], len(meaning_index))
+        self.meanings = list(meaning_index)
+        self.meaning_of = np.array([meaning_index[catalogue.fields["turkish"][i]] for i in rows], dtype=np.int32)
+
+        system_index = {name: n for n, name in enumerate(self.system_names)}
+        self.system_of = np.array([system_index[catalogue.systems[i]] for i in rows], dtype=np.int32)
+
+        self._term_pools = {None: np.arange(len(rows), dtype=np.int32)}
+        for name, n in system_index.items():
+            self._term_pools[name] = np.flatnonzero(self.system_of == n).astype(np.int32)
+
+        # Çeldirici havuzları tek düz dizide: sistem başına sıralı tekil anlamlar + tüm anlamlar.
+        # Her terim için havuz başlangıcı, boyutu ve kendi anlamının havuzdaki sırası önceden
+        # hesaplanır (sistemde yeterli anlam yoksa tüm anlamlar havuzuna düşer)
+        pools = [np.unique(self.meaning_of[self.system_of == n]) for n in range(len(self.system_names))]
+        all_meanings = np.unique(self.meaning_of)
+        offsets = np.cumsum([0] + [len(p) for p in pools])
+        self._pool_values = np.concatenate(pools + [all_meanings]).astype(np.int32)
+        self._pool_offset = np.empty(len(rows), dtype=np.int64)
+        self._pool_size = np.empty(len(rows), dtype=np.int64)
+        self._answer_rank = np.empty(len(rows), dtype=np.int64)
+        for t in range(len(rows)):
+            n = self.system_of[t]
+            pool, offset = pools[n], offsets[n]
+            if len(pool) < options:
+                pool, offset = all_meanings, offsets[-1]
+            self._pool_offset[t] = offset
+            self._pool_size[t] = len(pool)
+            self._answer_rank[t] = np.searchsorted(pool, self.meaning_of[t])
+        self._enough_meanings = len(all_meanings) >= options
+        self._rng = np.random.default_rng()
+
+    def generate(self, system: str = None, count: int = 10, seed: int = None) -> dict:
+        """Tam bir quiz (sorular + karışık şıklar) - aynı seed aynı quiz'i üretir"""
+        if system == MIXED_SYSTEM:
+            system = None
+        pool = self._term_pools.get(system)
+        if pool is None:
+            raise ValueError(f"Unknown system: {system}")
+        if not self._enough_meanings or not len(pool):
+            raise ValueError("Not enough terms to build a quiz")
+
+        # Seed verilmezse paylaşılan generator (ucuz); verilirse quiz'e özel, tekrarlanabilir
+        rng = self._rng if seed is None else np.random.default_rng(seed)
+        keys = rng.random(len(pool))
+        picked = keys.argpartition(count - 1)[:count] if count < len(pool) else np.arange(len(pool))
+        questions = pool[picked[keys[picked].argsort()]]
+        answers = self.meaning_of[questions]
+
+        # Çeldiriciler: tek vektörel çekiliş, her soru kendi havuzundan
+        k = self.options - 1
+        ranks = sample_distractors(rng, self._pool_size[questions], self._answer_rank[questions], k)
+        distractors = self._pool_values[self._pool_offset[questions][:, None] + ranks]
+
+        # Doğru cevap düzgün dağılımlı bir şıkka yerleştirilir (çeldiriciler zaten rastgele sırada)
+        options = np.concatenate([distractors, answers[:, None]], axis=1)
+        slots = rng.integers(0, self.options, size=len(questions))
+        index = np.arange(len(questions))
+        options[index, k] = options[index, slots]
+        options[index, slots] = answers
+
+        meanings = self.meanings
+        return {
+            "system": system or MIXED_SYSTEM,
+            "seed": seed,
+            "catalogue_version": self.version,
+            "questions": [
+                {
+                    "id": n,
+                    "term_id": self.term_ids[q],
+                    "term": self.terms[q],
+                    "options": [meanings[m] for m in row],
+                    "correct_answer": meanings[a],
+                    "system": self.system_names[s],
+                    "category": self.categories[q],
+                }
+                for n, (q, a, s, row) in enumerate(zip(questions.tolist(), answers.tolist(),
+                                                       self.system_of[questions].tolist(), options.tolist()))
+            ],
+        }
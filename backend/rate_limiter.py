@@ -0,0 +1,161 @@
+# backend/rate_limiter.py
+#
+# Sliding-window-counter rate limiter: her anahtar için sabit boyutlu durum
+# (mevcut pencere + önceki pencerenin sayacı). Tahmini istek sayısı:
+#     previous * (pencerenin kalan oranı) + current
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger("healthlex.rate_limit")
+
+# memory: worker başına limit | mongo: tüm worker'lar ortak limit
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+# Bellek tavanı - aşılırsa en uzun süredir dokunulmayan anahtar atılır
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "1000000"))
+# Her yeni anahtarda en fazla kaç boşta anahtar temizlenir (gecikmeyi sınırlar)
+_EVICT_PER_HIT = 4
+
+
+class _Window:
+    __slots__ = ("index", "window", "previous", "current")
+
+    def __init__(self, index: int, window: int):
+        self.index = index
+        self.window = window
+        self.previous = 0
+        self.current = 0
+
+
+class InMemoryRateLimiter:
+    """Tek process içinde O(1) rate limiter - boşta kalan anahtarlar kademeli silinir"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, clock=time.monotonic):
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        # Sıra = son dokunma sırası; baştaki anahtar en eski
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+        self.rejected = 0
+
+    def check(self, key: str, limit: int, window: int = 60) -> bool:
+        now = self._clock()
+        index = int(now // window)
+
+        state = self._windows.get(key)
+        if state is None:
+            # Bellek yalnızca yeni anahtarla büyür - temizlik de burada yapılır
+            self._evict_idle(now)
+            state = _Window(index, window)
+            self._windows[key] = state
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+            if state.index != index:
+                state.previous = state.current if state.index == index - 1 else 0
+                state.current = 0
+                state.index = index
+                state.window = window
+
+        weight = 1.0 - (now - index * window) / window
+        if state.previous * weight + state.current >= limit:
+            self.rejected += 1
+            return False
+
+        state.current += 1
+        return True
+
+    async def hit(self, key: str, limit: int, window: int = 60) -> bool:
+        return self.check(key, limit, window)
+
+    def _evict_idle(self, now: float):
+        # İki pencere boyunca dokunulmayan anahtarın sayacı zaten sıfırdır
+        windows = self._windows
+        for _ in range(_EVICT_PER_HIT):
+            if not windows:
+                return
+            key, oldest = next(iter(windows.items()))
+            if oldest.index >= int(now // oldest.window) - 1:
+                return
+            del windows[key]
+
+    def __len__(self):
+        return len(self._windows)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "keys": len(self._windows), "rejected": self.rejected}
+
+
+class MongoRateLimiter:
+    """Worker'lar arası ortak limit - her kontrol tek bir atomik find_one_and_update"""
+
+    def __init__(self, collection, fallback: InMemoryRateLimiter = None):
+        self.collection = collection
+        # Mongo erişilemezse worker-local limite düş (fail-open yerine)
+        self.fallback = fallback or InMemoryRateLimiter()
+        self.rejected = 0
+
+    async def hit(self, key: str, limit: int, window: int = 60) -> bool:
+        now = time.time()
+        index = int(now // window)
+        weight = 1.0 - (now - index * window) / window
+
+        # Pencere kaydırma + koşullu artırma sunucu tarafında, tek pipeline update ile
+        pipeline = [
+            {"$set": {
+                "_previous": {"$switch": {
+                    "branches": [
+                        {"case": {"$eq": ["$index", index]}, "then": {"$ifNull": ["$previous", 0]}},
+                        {"case": {"$eq": ["$index", index - 1]}, "then": {"$ifNull": ["$current", 0]}},
+                    ],
+                    "default": 0,
+                }},
+                "_current": {"$cond": [{"$eq": ["$index", index]}, {"$ifNull": ["$current", 0]}, 0]},
+            }},
+            {"$set": {
+                "allowed": {"$lt": [
+                    {"$add": [{"$multiply": ["$_previous", weight]}, "$_current"]},
+                    limit,
+                ]},
+            }},
+            {"$set": {
+                "index": index,
+                "previous": "$_previous",
+                "current": {"$cond": ["$allowed", {"$add": ["$_current", 1]}, "$_current"]},
+                # TTL index boşta kalan anahtarları siler
+                "expires_at": datetime.utcnow() + timedelta(seconds=2 * window),
+            }},
+            {"$unset": ["_previous", "_current"]},
+        ]
+
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": key},
+                pipeline,
+                upsert=True,
+                projection={"allowed": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            logger.warning("Mongo rate limiter hatası, local limite düşülüyor: %s", e)
+            return self.fallback.check(key, limit, window)
+
+        if not doc["allowed"]:
+            self.rejected += 1
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {"backend": "mongo", "rejected": self.rejected, "fallback_keys": len(self.fallback)}
+
+
+def create_rate_limiter(db, backend: str = RATE_LIMIT_BACKEND):
+    if backend == "mongo":
+        return MongoRateLimiter(db.rate_limits)
+    if backend != "memory":
+        raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+    return InMemoryRateLimiter()
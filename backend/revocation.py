@@ -0,0 +1,248 @@
+# backend/revocation.py
+#
+# Access token iptali. Access token'lar imzayla doğrulanır (istek başına
+# veritabanı yok); iptal edilenler her worker'daki yerel kopyadan reddedilir:
+#   - oturum (sid): refresh token zincirinin kimliği, access token'da "sid"
+#     claim'i. logout, oturum sonlandırma, logout-all. Bloom filtresinde
+#     tutulur; sid refresh'te değişmediği için yanlış pozitif o oturumun tüm
+#     token'larını reddederdi. Bu yüzden Bloom isabeti (REVOCATION_BLOOM_FP
+#     oranında) nesildeki 64 bitlik sid parmak izleriyle doğrulanır (sıralı
+#     array('Q'), kayıt başına 8 bayt + birleştirilmeyi bekleyen küçük bir set).
+#     Doğrulama yalnızca isabette çalışır; temiz token'lar Bloom'da elenir.
+#   - kullanıcı "not-before": bu andan önce verilmiş tüm access token'lar
+#     geçersiz (refresh token zinciri kötüye kullanıldığında). Küçük bir dict.
+# Kayıtlar yalnızca access token ömrü (ttl) boyunca gerekir: Bloom filtreleri
+# nesiller halinde tutulur, en eski nesil içindeki son kaydın ömrü dolunca
+# atılır. Worker'lar arası senkron token_revocations capped koleksiyonu ile
+# (bkz. capped_log.py); başlangıçta süresi dolmamış olaylar yeniden oynatılır.
+#
+#   REVOCATION_BLOOM_CAPACITY=1000000   (nesil başına kayıt; dolunca yeni nesil)
+#   REVOCATION_BLOOM_FP=0.0001
+#   REVOCATION_LOG_SIZE_MB=64
+#   REVOCATION_REPLAY_TIMEOUT_S=30      (başlangıçta yeniden oynatma bu sürede bitmezse worker açılmaz)
+import asyncio
+import logging
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from pymongo.errors import PyMongoError
+
+from bloom import BloomFilter
+from capped_log import CappedLog
+
+logger = logging.getLogger("healthlex.revocation")
+
+REVOCATION_BLOOM_CAPACITY = int(os.environ.get("REVOCATION_BLOOM_CAPACITY", "1000000"))
+REVOCATION_BLOOM_FP = float(os.environ.get("REVOCATION_BLOOM_FP", "0.0001"))
+REVOCATION_LOG_SIZE_MB = int(os.environ.get("REVOCATION_LOG_SIZE_MB", "64"))
+REVOCATION_REPLAY_TIMEOUT_S = float(os.environ.get("REVOCATION_REPLAY_TIMEOUT_S", "30"))
+
+# Süresi dolan nesil / not-before kayıtlarının en fazla bu aralıkla temizlenmesi
+_EXPIRE_INTERVAL = 10.0
+# Bloom isabetini doğrulayan parmak izi: sid'in alt 64 biti
+_FINGERPRINT_MASK = (1 << 64) - 1
+# Yeni parmak izleri bu kadar birikince sıralı diziye birleştirilir
+_FINGERPRINT_MERGE = 8192
+
+
+class Fingerprints:
+    """Nesildeki sid'lerin 64 bitlik parmak izleri: sıralı dizi + küçük set"""
+
+    __slots__ = ("sorted", "pending")
+
+    def __init__(self):
+        self.sorted = array("Q")
+        self.pending = set()
+
+    def add(self, fingerprint: int):
+        self.pending.add(fingerprint)
+        if len(self.pending) >= _FINGERPRINT_MERGE:
+            self.merge()
+
+    def merge(self):
+        # İki sıralı dizi: timsort birleştirmesi O(n)
+        self.sorted = array("Q", sorted([*self.sorted, *sorted(self.pending)]))
+        self.pending = set()
+
+    def __contains__(self, fingerprint: int) -> bool:
+        if fingerprint in self.pending:
+            return True
+        index = bisect_left(self.sorted, fingerprint)
+        return index < len(self.sorted) and self.sorted[index] == fingerprint
+
+    def nbytes(self) -> int:
+        return len(self.sorted) * 8 + sys.getsizeof(self.pending)
+
+
+class RevocationList:
+    """İptal edilmiş oturumlar (Bloom nesilleri) + kullanıcı not-before zamanları"""
+
+    def __init__(self, ttl_seconds: float, capacity: int = REVOCATION_BLOOM_CAPACITY,
+                 fp_rate: float = REVOCATION_BLOOM_FP, clock=time.time):
+        self.ttl = ttl_seconds
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.clock = clock
+        # [başlangıç, son ekleme zamanı, filtre, parmak izleri] - eskiden yeniye; son eleman yazılır
+        self._generations = []
+        self._not_before = {}  # user_id → not_before (epoch saniye)
+        self._next_expiry = 0.0
+        self.revoked_sessions = 0
+        self.rejected = 0
+        self.false_positives = 0
+
+    def _writable(self, now: float) -> list:
+        if self._generations:
+            generation = self._generations[-1]
+            started, _, bloom, fingerprints = generation
+            if now - started < self.ttl and bloom.count < self.capacity:
+                return generation
+            # Nesil kapandı: artık yazılmayacak, bekleyenler diziye
+            fingerprints.merge()
+        generation = [now, now, BloomFilter(self.capacity, self.fp_rate), Fingerprints()]
+        self._generations.append(generation)
+        return generation
+
+    def revoke_session(self, sid: str):
+        now = self.clock()
+        key = int(sid, 16)
+        generation = self._writable(now)
+        generation[2].add(key)
+        generation[3].add(key & _FINGERPRINT_MASK)
+        generation[1] = now
+        self.revoked_sessions += 1
+
+    def revoke_user(self, user_id: str, not_before: float):
+        if not_before > self._not_before.get(user_id, 0.0):
+            self._not_before[user_id] = not_before
+
+    def apply(self, event: dict):
+        """CappedLog handler'ı - olay birden fazla kez uygulanabilir"""
+        if event.get("kind") == "user":
+            self.revoke_user(event["user_id"], event["not_before"])
+        else:
+            for sid in event.get("sids", ()):
+                self.revoke_session(sid)
+
+    def expire(self, now: float):
+        """Ömrü dolan nesilleri ve not-before kayıtlarını at"""
+        cutoff = now - self.ttl
+        while self._generations and self._generations[0][1] < cutoff:
+            self._generations.pop(0)
+        if self._not_before:
+            self._not_before = {u: t for u, t in self._not_before.items() if t >= cutoff}
+        self._next_expiry = now + _EXPIRE_INTERVAL
+
+    def is_revoked(self, user_id: str, sid: Optional[str], issued_at: Optional[float]) -> bool:
+        """İstek yolu: dict araması + nesil başına birkaç bit testi, I/O yok"""
+        if self._next_expiry <= (now := self.clock()):
+            self.expire(now)
+        not_before = self._not_before.get(user_id)
+        if not_before is not None and (issued_at is None or issued_at < not_before):
+            self.rejected += 1
+            return True
+        if sid is None or not self._generations:
+            return False
+        key = int(sid, 16)
+        for _, _, bloom, fingerprints in self._generations:
+            if key in bloom:
+                if key & _FINGERPRINT_MASK in fingerprints:
+                    self.rejected += 1
+                    return True
+                self.false_positives += 1
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "generations": [{"entries": bloom.count, "age_s": round(self.clock() - started, 1)}
+                            for started, _, bloom, _ in self._generations],
+            "bloom_bytes": sum(len(bloom.bits) for _, _, bloom, _ in self._generations),
+            "fingerprint_bytes": sum(fingerprints.nbytes() for _, _, _, fingerprints in self._generations),
+            "bloom_false_positives": self.false_positives,
+            "users_not_before": len(self._not_before),
+            "revoked_sessions": self.revoked_sessions,
+            "rejected": self.rejected,
+        }
+
+
+class RevocationService:
+    """İptalleri yerel listeye uygular ve token_revocations üzerinden diğer worker'lara yayar"""
+
+    def __init__(self, db, ttl_seconds: float, collection: str = "token_revocations", **list_options):
+        self.ttl = ttl_seconds
+        self.revocations = RevocationList(ttl_seconds, **list_options)
+        self.log = CappedLog(
+            db, collection, self.revocations.apply,
+            size_bytes=REVOCATION_LOG_SIZE_MB * 1024 * 1024,
+            replay_filter=lambda: {"expires_ts": {"$gt": time.time()}},
+        )
+        # İstek yolunda ek çağrı katmanı olmasın
+        self.is_revoked = self.revocations.is_revoked
+        # Yazılamamış olaylar: yerelde uygulandı, arka planda yeniden yayınlanır
+        self._unpublished = []
+        self._retry_task = None
+        self.publish_errors = 0
+
+    async def _publish(self, event: dict):
+        try:
+            await self.log.publish(event)
+        except PyMongoError as e:
+            # Refresh token çoktan pasif: istek hata vermesin, bu worker hemen
+            # reddetsin, diğerleri Mongo düzelince yayınla öğrensin
+            self.publish_errors += 1
+            logger.warning("⚠️ İptal yayınlanamadı, yeniden denenecek: %s", e)
+            self.revocations.apply(event)
+            self._unpublished.append(event)
+            if self._retry_task is None or self._retry_task.done():
+                self._retry_task = asyncio.get_running_loop().create_task(self._republish())
+
+    async def _republish(self):
+        backoff = 0.5
+        while self._unpublished:
+            await asyncio.sleep(backoff)
+            # Süresi dolan iptaller artık gerekmez; bekleme sırasında gelenler listede kalır
+            now = time.time()
+            events = [event for event in self._unpublished if event["expires_ts"] > now]
+            self._unpublished = []
+            try:
+                await self.log.publish(*events, apply_locally=False)
+            except PyMongoError as e:
+                self.publish_errors += 1
+                logger.warning("⚠️ İptal yeniden yayınlanamadı: %s", e)
+                self._unpublished = events + self._unpublished
+                backoff = min(backoff * 2, 30.0)
+
+    async def revoke_sessions(self, session_ids: Iterable[Optional[str]]):
+        sids = sorted({sid for sid in session_ids if sid})
+        if sids:
+            await self._publish({"kind": "session", "sids": sids, "expires_ts": time.time() + self.ttl})
+
+    async def revoke_user(self, user_id: str):
+        """Bu andan önce verilmiş tüm access token'ları geçersiz kıl"""
+        now = time.time()
+        await self._publish({"kind": "user", "user_id": user_id, "not_before": now, "expires_ts": now + self.ttl})
+
+    def start(self):
+        self.log.start()
+
+    async def wait_ready(self, timeout: float = None):
+        """Başlangıç yeniden oynatması bitene kadar bekle"""
+        await self.log.wait_ready(timeout)
+
+    async def stop(self):
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            try:
+                await self._retry_task
+            except asyncio.CancelledError:
+                pass
+            self._retry_task = None
+        await self.log.stop()
+
+    def stats(self) -> dict:
+        return {**self.revocations.stats(), "sync": self.log.stats(),
+                "publish_errors": self.publish_errors, "unpublished": len(self._unpublished)}
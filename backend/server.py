@@ -1,21 +1,52 @@
-from contextlib import asynccontextmanager
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, Header, Request
-from dotenv import load_dotenv
-from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel
-from typing import Optional
-from pathlib import Path
-from datetime import datetime, timedelta, timezone
-from collections import defaultdict
-import time
-import os
-import uuid
-import jwt
-import bcrypt
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-from user_agents import parse
+# Önce: import süreleri buradan itibaren ölçülür (bkz. startup.py)
+from startup import STARTUP_WARMUP, lazy_import, startup_profiler, warm_up
+with startup_profiler.trace_imports():
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI, APIRouter, Depends, HTTPException, Header, Query, Request, Response
+    from dotenv import load_dotenv
+    from starlette.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel, Field
+    from typing import Annotated, List, Literal, Optional
+    from pathlib import Path
+    from datetime import datetime, timedelta, timezone
+    import asyncio
+    import math
+    import time
+    import os
+    import uuid
+    import logging
+    from bson import ObjectId
+    from device_info import UserAgentCache
+    from geoip import GeoIPResolver, mask_ip
+    from password_hashing import PasswordHasher, PasswordHasherOverloaded
+    from token_cache import AccessTokenCache, TTLCache
+    from token_keys import (
+        key_preview, new_jti, new_refresh_token, record_sid, session_key, token_digest, token_exclude, token_match,
+    )
+    from revocation import REVOCATION_REPLAY_TIMEOUT_S, RevocationService
+    from cache_bus import CacheBus
+    from session_pages import (
+        DETAILED_SESSION_FIELDS, DETAILED_SESSIONS_PAGE_SIZE, MAX_SESSIONS_PAGE_SIZE, SESSION_FIELDS, SESSIONS_PAGE_SIZE,
+        fetch_page,
+    )
+    from rate_limiter import create_rate_limiter
+    from mongo_indexes import ensure_indexes
+    from mongo_pool import MongoMetrics, client_options, create_client
+    from google_auth import GoogleIdTokenVerifier
+    from log_config import setup_logging, shutdown_logging, dropped_records
+    from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, HttpMetrics, MetricsMiddleware, MetricsRegistry
+    from pymongo.errors import DuplicateKeyError
+    from term_catalogue import TermCatalogue
+    from quiz import QuizEngine
+    from morphology import MorphologyAnalyzer
+    from progress import ProgressService, ProgressBufferFull
+    from srs import FlashcardDeck, SpacedRepetition
+    from token_janitor import TOKEN_JANITOR, TokenJanitor
+    from login_admission import LoginAdmission
+
+# jwt + cryptography ilk token işleminde yüklenir
+jwt = lazy_import("jwt")
+startup_profiler.mark("imports")
 
 # =====================
 # ENV / DB
@@ -24,13 +55,22 @@ from user_agents import parse
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / ".env")
 
+# Kuyruklu, JSON, örneklemeli loglama (bkz. log_config.py) - print kullanılmaz
+setup_logging()
+token_logger = logging.getLogger("healthlex.auth.token")
+login_logger = logging.getLogger("healthlex.auth.login")
+refresh_logger = logging.getLogger("healthlex.auth.refresh")
+startup_logger = logging.getLogger("healthlex.startup")
+
 # ZORUNLU ENV
 MONGO_URL = os.environ.get("MONGO_URL")
 DB_NAME = os.environ.get("DB_NAME")
 if not MONGO_URL or not DB_NAME:
     raise RuntimeError("Missing env: MONGO_URL and/or DB_NAME (backend/.env)")
 
-client = AsyncIOMotorClient(MONGO_URL)
+# Havuz ayarları env'den (bkz. mongo_pool.py); komut ve havuz olayları ölçülür
+mongo_metrics = MongoMetrics()
+client = create_client(MONGO_URL, mongo_metrics)
 db = client[DB_NAME]
 
 JWT_SECRET = os.environ.get("JWT_SECRET", "dev-secret")
@@ -42,91 +82,160 @@ GOOGLE_CLIENT_ID = os.environ.get(
     "279499913538-gtltbe7fmn95ud955uen6ah5j82g1avs.apps.googleusercontent.com"
 )
 
+# Google imza anahtarları process genelinde cache'lenir, doğrulama thread pool'da
+google_verifier = GoogleIdTokenVerifier(GOOGLE_CLIENT_ID)
+
 ACCESS_TOKEN_MINUTES = int(os.environ.get("ACCESS_TOKEN_MINUTES", "60"))
 REFRESH_TOKEN_DAYS = int(os.environ.get("REFRESH_TOKEN_DAYS", "7"))
+# /api/auth/debug-* uçları: kapalıyken 404, açıkken yalnızca role=admin kullanıcılar
+DEBUG_ENDPOINTS = os.environ.get("DEBUG_ENDPOINTS", "").lower() in ("1", "true", "yes")
+# Bir refresh token zinciri en fazla bu kadar rotate edilebilir
+MAX_REFRESH_ROTATIONS = 10
+# Refresh başarısız olduğunda ek teşhis sorguları (sadece debug için, varsayılan kapalı)
+REFRESH_MISS_DIAGNOSTICS = os.environ.get("REFRESH_MISS_DIAGNOSTICS", "").lower() in ("1", "true", "yes")
+
+startup_profiler.mark("env / db client")
+
+# =====================
+# METRICS
+# =====================
+
+# Prometheus metin formatında /metrics (bkz. metrics.py); HTTP metrikleri middleware'de
+metrics_registry = MetricsRegistry()
+http_metrics = HttpMetrics(metrics_registry)
+rate_limit_rejections = metrics_registry.counter(
+    "rate_limit_rejections_total", "Rate limit ile reddedilen istekler", ("scope",))
+refresh_rotations = metrics_registry.counter(
+    "refresh_rotations_total", "Refresh token rotation sonuçları", ("result",))
+
+def collect_mongo_metrics():
+    """Komut olayları motor thread'lerinde MongoMetrics'e yazılır; scrape anında okunur"""
+    snapshot = mongo_metrics.snapshot()
+    commands = [({"command": c["command"], "collection": c["collection"]}, c) for c in snapshot["commands"]]
+    yield ("mongo_commands_total", "counter", "Mongo komutları",
+           [(labels, c["count"]) for labels, c in commands])
+    yield ("mongo_command_failures_total", "counter", "Başarısız Mongo komutları",
+           [(labels, c["failed"]) for labels, c in commands])
+    yield ("mongo_command_duration_seconds_total", "counter", "Mongo komutlarında geçen toplam süre",
+           [(labels, c["total_ms"] / 1000) for labels, c in commands])
+    pool = snapshot["pool"]
+    yield ("mongo_pool_checked_out_connections", "gauge", "Kullanımdaki havuz bağlantıları", [({}, pool["checked_out"])])
+    yield ("mongo_pool_open_connections", "gauge", "Açık havuz bağlantıları", [({}, pool["connections_open"])])
+    yield ("mongo_pool_checkouts_total", "counter", "Havuzdan alınan bağlantılar", [({}, pool["checkouts"])])
+    yield ("mongo_pool_checkout_wait_seconds_total", "counter", "Havuzdan bağlantı beklerken geçen toplam süre",
+           [({}, pool["checkout_wait_ms_total"] / 1000)])
+    yield ("mongo_pool_checkout_timeouts_total", "counter", "Havuz bekleme zaman aşımları", [({}, pool["checkout_timeouts"])])
+
+def collect_password_metrics():
+    """bcrypt süreleri worker thread'lerinde PasswordHasher'a yazılır; scrape anında okunur"""
+    stats = password_hasher.stats()
+    operations = stats["operations"].items()
+    yield ("bcrypt_operations_total", "counter", "bcrypt hash/verify çağrıları",
+           [({"operation": kind}, m["calls"]) for kind, m in operations])
+    yield ("bcrypt_duration_seconds_total", "counter", "bcrypt hash/verify'da geçen toplam süre",
+           [({"operation": kind}, m["total_seconds"]) for kind, m in operations])
+    yield ("bcrypt_queue_pending", "gauge", "bcrypt kuyruğundaki işler", [({}, stats["pending"])])
+    yield ("bcrypt_rejected_total", "counter", "Kuyruk dolu olduğu için reddedilen bcrypt işleri",
+           [({}, stats["rejected"])])
+
+def collect_revocation_metrics():
+    """İptal listesi istek yolunda güncellenir; scrape anında okunur"""
+    stats = token_revocations.stats()
+    sync = stats["sync"]
+    yield ("access_tokens_revoked_total", "counter", "İptal listesi nedeniyle reddedilen access token'lar",
+           [({}, stats["rejected"])])
+    yield ("revocation_list_sessions", "gauge", "Yerel iptal listesindeki oturumlar",
+           [({}, sum(g["entries"] for g in stats["generations"]))])
+    yield ("revocation_sync_lag_seconds", "gauge", "Diğer worker'lardan gelen son iptalin gecikmesi",
+           [({}, sync["lag_ms"] / 1000)])
+    yield ("revocation_sync_errors_total", "counter", "İptal akışı takip hataları", [({}, sync["errors"])])
+
+def collect_cache_metrics():
+    """Okuma cache sayaçları istek yolunda güncellenir; scrape anında okunur"""
+    stats = cache_bus.stats()
+    caches = stats["caches"].items()
+    yield ("user_cache_hits_total", "counter", "Kullanıcı okuma cache isabetleri",
+           [({"cache": name}, c["hits"]) for name, c in caches])
+    yield ("user_cache_misses_total", "counter", "Kullanıcı okuma cache ıskaları",
+           [({"cache": name}, c["misses"]) for name, c in caches])
+    yield ("user_cache_invalidations_total", "counter", "Geçersiz kılınan cache kayıtları",
+           [({"cache": name}, c["invalidations"]) for name, c in caches])
+    yield ("cache_bus_sync_lag_seconds", "gauge", "Diğer worker'lardan gelen son geçersiz kılmanın gecikmesi",
+           [({}, stats["sync"]["lag_ms"] / 1000)])
+
+def collect_janitor_metrics():
+    """Janitor sayaçları silme döngüsünde güncellenir; scrape anında okunur"""
+    stats = token_janitor.stats()
+    yield ("token_janitor_deleted_total", "counter", "Janitor'ın sildiği refresh token'lar", [({}, stats["deleted"])])
+    yield ("token_janitor_examined_total", "counter", "Janitor'ın incelediği refresh token'lar", [({}, stats["examined"])])
+    yield ("token_janitor_delete_rate", "gauge", "Son silme batch'inde saniyede silinen token",
+           [({}, stats["delete_rate"])])
+    yield ("token_janitor_paused", "gauge", "Janitor geri çekildi / bekliyor (1)",
+           [({}, 1 if stats["paused_reason"] else 0)])
+    yield ("token_janitor_pauses_total", "counter", "Gecikme / replikasyon nedeniyle beklemeler",
+           [({"reason": reason}, count) for reason, count in stats["pauses"].items()])
+    yield ("token_janitor_errors_total", "counter", "Janitor turu hataları", [({}, stats["errors"])])
+
+def collect_login_admission_metrics():
+    """Login kabul kontrolü sayaçları istek yolunda güncellenir; scrape anında okunur"""
+    stats = login_admission.stats()
+    yield ("login_admission_rejected_total", "counter", "bcrypt'ten önce reddedilen login denemeleri",
+           [({"reason": reason}, count) for reason, count in stats["rejected"].items()])
+    yield ("login_failures_total", "counter", "Başarısız login denemeleri", [({}, stats["failures"])])
+    yield ("login_account_locks_total", "counter", "Başarısızlık nedeniyle kilitlenen hesaplar", [({}, stats["locks"])])
+    yield ("login_locked_accounts", "gauge", "Şu an kilitli hesaplar", [({}, stats["locked_accounts"])])
+    yield ("login_failure_floor_seconds", "gauge", "Başarısız login yanıtlarının sabit süresi",
+           [({}, stats["failure_floor_ms"] / 1000)])
+    yield ("login_padding_seconds_total", "counter", "Başarısız yanıtları tabana tamamlamak için beklenen süre",
+           [({}, stats["padded_seconds"])])
+
+metrics_registry.register_collector(collect_mongo_metrics)
+metrics_registry.register_collector(collect_password_metrics)
+metrics_registry.register_collector(collect_revocation_metrics)
+metrics_registry.register_collector(collect_cache_metrics)
+metrics_registry.register_collector(collect_janitor_metrics)
+metrics_registry.register_collector(collect_login_admission_metrics)
 
 # =====================
 # RATE LIMITING
 # =====================
 
-rate_limit_store = defaultdict(list)
+# Sliding-window-counter; RATE_LIMIT_BACKEND=mongo ile tüm worker'lar ortak limit kullanır
+rate_limiter = create_rate_limiter(db)
 
-def check_rate_limit(identifier: str, limit: int, window: int = 60):
-    """Basit rate limiting kontrolü - DÜZGÜN ÇALIŞAN VERSİYON"""
-    now = time.time()
-    
-    # Eğer identifier yoksa, boş liste oluştur
-    if identifier not in rate_limit_store:
-        rate_limit_store[identifier] = []
-    
-    # Identifier'ın request listesini al
-    requests = rate_limit_store[identifier]
-    
-    # Eski istekleri temizle (window saniye öncesini sil)
-    requests = [req_time for req_time in requests if now - req_time < window]
-    
-    # Limit kontrolü
-    if len(requests) >= limit:
-        # Listeyi güncelle (temizlenmiş haliyle)
-        rate_limit_store[identifier] = requests
-        return False
-    
-    # Yeni isteği kaydet
-    requests.append(now)
-    # Listeyi güncelle
-    rate_limit_store[identifier] = requests
-    return True
+async def check_rate_limit(identifier: str, limit: int, window: int = 60) -> bool:
+    """Pencere içinde limit aşılmadıysa True döner"""
+    allowed = await rate_limiter.hit(identifier, limit, window)
+    if not allowed:
+        # Etiket: "login_1.2.3.4" → "login" (IP etikete girmez)
+        rate_limit_rejections.labels(identifier.partition("_")[0]).inc()
+    return allowed
 
 # =====================
 # MONGODB INDEX SETUP
 # =====================
 
 async def setup_mongo_indexes():
-    """MongoDB index'lerini kur - Startup'ta çalışır"""
+    """MongoDB index'lerini kur - Startup'ta çalışır (tanımlar: mongo_indexes.py)"""
     try:
-        print("🔧 MongoDB index'leri kuruluyor...")
+        report = await ensure_indexes(db)
+        # Kayıtlı şema sürümü güncel: tek find_one, index komutu yok
+        if report is None:
+            startup_logger.info("✅ MongoDB Bağlantısı Başarılı! Index'ler güncel")
+            return
+        startup_logger.info("✅ MongoDB Bağlantısı Başarılı! Index'ler kuruldu")
+
+        for name in report["created"]:
+            startup_logger.info("✅ Index kuruldu: %s", name)
+        for line in report["drift"]:
+            startup_logger.warning("⚠️ Index drift: %s", line)
+        for line in report["errors"]:
+            startup_logger.warning("⚠️ Index kurulamadı: %s", line)
         
-        # 1. Ana TTL Index: expires_at zamanı geldiğinde otomatik sil
-        # NOT: Bu tüm expired token'ları siler (aktif olsa bile)
-        try:
-            await db.refresh_tokens.create_index(
-                [("expires_at", 1)],
-                expireAfterSeconds=0,  # expires_at zamanında sil
-                name="token_expiry_ttl"
-            )
-            print("✅ Ana TTL Index kuruldu: token_expiry_ttl")
-        except Exception as e:
-            print(f"ℹ️ Ana TTL Index zaten var: {e}")
-        
-        # 2. Partial TTL Index: Sadece logout olmuş (is_active=False) token'ları HEMEN sil
-        # Bu, logout olduktan sonra token'ların hemen temizlenmesini sağlar
-        try:
-            await db.refresh_tokens.create_index(
-                [("expires_at", 1)],
-                expireAfterSeconds=0,
-                partialFilterExpression={"is_active": False},
-                name="inactive_tokens_immediate_ttl"
-            )
-            print("✅ Partial TTL Index kuruldu: inactive_tokens_immediate_ttl")
-        except Exception as e:
-            print(f"ℹ️ Partial TTL Index zaten var: {e}")
-        
-        # 3. Cleanup index: 90 günden eski tüm token'ları temizle (aktif olsa bile)
-        # Güvenlik için çok eski token'ları temizler
-        try:
-            await db.refresh_tokens.create_index(
-                [("created_at", 1)],
-                expireAfterSeconds=90 * 24 * 60 * 60,  # 90 gün
-                name="old_tokens_cleanup_ttl"
-            )
-            print("✅ Eski token cleanup TTL Index kuruldu: old_tokens_cleanup_ttl")
-        except Exception as e:
-            print(f"ℹ️ Cleanup TTL Index zaten var: {e}")
-        
-        print("✅ Tüm TTL Index'leri kuruldu/kontrol edildi")
+        startup_logger.info("✅ Index'ler kontrol edildi (%d hazır, %d yeni)", len(report["ok"]), len(report["created"]))
         
     except Exception as e:
-        print(f"⚠️ TTL Index kurulum hatası: {e}")
+        startup_logger.error("❌ MongoDB Hata: %s", e)
 
 # =====================
 # MODELS
@@ -151,148 +260,335 @@ class TokenPairResponse(BaseModel):
 class RefreshRequest(BaseModel):
     refresh_token: Optional[str] = None
 
+class ProgressEvent(BaseModel):
+    type: Literal["term", "flashcard", "quiz"]
+    term_id: Optional[str] = Field(None, max_length=64)
+    learned: Optional[bool] = None
+    category_id: Optional[str] = Field(None, max_length=64)
+    completed: Optional[int] = Field(None, ge=0)
+    total: Optional[int] = Field(None, ge=1)
+    score: Optional[int] = Field(None, ge=0)
+    at: Optional[datetime] = None
+
+class ProgressBatch(BaseModel):
+    events: List[ProgressEvent] = Field(..., min_length=1, max_length=500)
+
+class TermAnalysisBatch(BaseModel):
+    terms: List[Annotated[str, Field(max_length=100)]] = Field(..., min_length=1, max_length=5000)
+
+class FlashcardReview(BaseModel):
+    card_id: str = Field(..., max_length=64)
+    grade: int = Field(..., ge=0, le=5)
+    reviewed_at: Optional[datetime] = None
+
+class FlashcardReviewBatch(BaseModel):
+    reviews: List[FlashcardReview] = Field(..., min_length=1, max_length=1000)
+
 # =====================
 # AUTH UTILS
 # =====================
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+# bcrypt event loop'u ~250ms kilitler - ayrı, sınırlı bir pool'da çalışır
+password_hasher = PasswordHasher()
+
+# Kilitli hesaplar / bilinen başarısız çiftler bcrypt'e girmeden reddedilir,
+# başarısız yanıtlar sabit sürede döner (bkz. login_admission.py)
+login_admission = LoginAdmission()
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed.encode())
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy. Please try again shortly.",
+        headers={"Retry-After": "1"}
+    )
+
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherOverloaded:
+        raise _password_pool_busy()
 
-def create_access_token(user_id: str) -> str:
+async def verify_password(password: str, hashed: str) -> bool:
+    try:
+        return await password_hasher.verify(password, hashed)
+    except PasswordHasherOverloaded:
+        raise _password_pool_busy()
+
+def create_access_token(user_id: str, sid: Optional[str] = None) -> str:
     payload = {
         "sub": user_id,
+        # Saniye altı çözünürlük: aynı saniyedeki not-before iptalinden sonra verilen token geçerli kalsın
+        "iat": time.time(),
         "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_MINUTES),
         "type": "access"
     }
+    if sid:
+        payload["sid"] = sid  # oturum kimliği - logout / oturum sonlandırmada iptal için
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization missing")
-    
-    try:
-        scheme, token = authorization.split(" ")
-        if scheme.lower() != "bearer":
-            raise ValueError("Bad scheme")
+# Doğrulanmış access token'lar - her istekte jwt.decode çalışmasın
+access_token_cache = AccessTokenCache()
 
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        
-        # HER ZAMAN LOG GÖSTER (debug için)
-        expire_time = datetime.fromtimestamp(payload["exp"])
-        remaining_minutes = (expire_time - datetime.utcnow()).total_seconds() / 60
-        
-        print(f"⏰ TOKEN DEBUG - Kalan: {remaining_minutes:.1f} dakika | User: {payload['sub']}")
-        
-        if payload.get("type") != "access":
-            raise ValueError("Bad token type")
+# İptal edilen oturumlar / kullanıcılar - her worker'da yerel kopya, capped koleksiyonla senkron
+# (bkz. revocation.py); doğrulamada veritabanına gidilmez
+token_revocations = RevocationService(db, ACCESS_TOKEN_MINUTES * 60)
 
-        return payload["sub"]
-        
+def decode_access_token(token: str) -> tuple:
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
     except jwt.ExpiredSignatureError:
-        print("⏰ ⚠️ ⚠️ TOKEN EXPIRED - Refresh tetiklenecek!")
+        token_logger.debug("⏰ Access token expired - refresh tetiklenecek")
         raise HTTPException(status_code=401, detail="Token expired")
     except Exception as e:
-        print(f"⏰ ❌ Token decode error: {e}")
+        token_logger.debug("⏰ Token decode error: %s", e)
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    if payload.get("type") != "access" or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    if token_logger.isEnabledFor(logging.DEBUG):
+        remaining_minutes = (payload["exp"] - time.time()) / 60
+        token_logger.debug("⏰ Token doğrulandı - kalan: %.1f dakika", remaining_minutes, extra={"user_id": payload["sub"]})
+
+    return payload["sub"], payload.get("sid"), payload.get("iat"), payload["exp"]
+
+async def get_current_session(authorization: Optional[str] = Header(None)) -> tuple:
+    """Access token → (user_id, sid, iat)"""
+    # async: thread pool'a atlamadan event loop üzerinde çalışır (iş mikro saniyeler sürer)
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization missing")
+
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    # Hızlı yol: daha önce doğrulanmış ve süresi dolmamış token
+    claims = access_token_cache.get(token)
+    if claims is None:
+        user_id, sid, issued_at, exp = decode_access_token(token)
+        access_token_cache.put(token, user_id, exp, sid, issued_at)
+        claims = (user_id, sid, issued_at)
+
+    # İptal kontrolü cache isabetinde de yapılır (token cache'e iptalden önce girmiş olabilir)
+    if token_revocations.is_revoked(*claims):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return claims
+
+async def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    return (await get_current_session(authorization))[0]
+
 # =====================
 # DEVICE & LOCATION HELPERS
 # =====================
 
-def parse_device_info(user_agent: str) -> dict:
-    """User-Agent string'inden device bilgisi çıkar"""
-    try:
-        ua = parse(user_agent)
-        return {
-            "device": ua.device.family if ua.device.family != "Other" else "Desktop",
-            "browser": f"{ua.browser.family} {ua.browser.version_string}",
-            "os": f"{ua.os.family} {ua.os.version_string}",
-            "is_mobile": ua.is_mobile,
-            "is_tablet": ua.is_tablet,
-            "is_pc": ua.is_pc,
-            "raw": user_agent[:100]
-        }
-    except:
-        return {
-            "device": "Unknown",
-            "browser": "Unknown",
-            "os": "Unknown",
-            "raw": user_agent[:100] if user_agent else ""
-        }
+# Login/refresh'te bir kez çözümlenip token dokümanına yazılır (bkz. device_info.py);
+# aynı UA string'i tekrar parse edilmez
+user_agent_cache = UserAgentCache()
 
+# Çevrimdışı IP → konum tablosu (bkz. geoip.py); oturum yazılırken bir kez çözülür
+geo_resolver = GeoIPResolver()
 
 def get_location_from_ip(ip_address: str) -> str:
-    """Basit IP location (production'da daha gelişmiş kullanılabilir)"""
-    if not ip_address:
-        return "Unknown"
-    
-    # Local IP'ler
-    if ip_address.startswith("192.168.") or ip_address.startswith("10.") or ip_address == "127.0.0.1":
-        return "Local Network"
-    
-    # Basit mapping
-    return "Turkey"  # Placeholder
+    return geo_resolver.locate(ip_address)
 
+# =====================
+# READ CACHES
+# =====================
 
-def mask_ip(ip_address: str) -> str:
-    """IP adresini maskele (gizlilik için)"""
-    if not ip_address:
-        return ""
-    
-    parts = ip_address.split(".")
-    if len(parts) == 4:
-        return f"{parts[0]}.{parts[1]}.***.***"
-    
-    return ip_address
+# Kullanıcı başına okuma cache'leri. users / refresh_tokens'a yazan her yol ilgili
+# cache'leri yazmadan sonra geçersiz kılar; diğer worker'lara cache_invalidations
+# capped koleksiyonuyla yayılır (bkz. cache_bus.py)
+cache_bus = CacheBus(db)
+profile_cache = cache_bus.cache("profile")
+preferences_cache = cache_bus.cache("notification_preferences")
+sessions_cache = cache_bus.cache("sessions")
+detailed_sessions_cache = cache_bus.cache("sessions_detailed")
+# Koleksiyona göre geçersiz kılınan cache'ler
+USER_CACHES = ("profile", "notification_preferences")
+SESSION_CACHES = ("sessions", "sessions_detailed")
 
 # =====================
 # REFRESH TOKEN HELPERS
 # =====================
 
 async def save_refresh_token(user_id: str, request: Request):
-    """Güvenli refresh token kaydet - metadata ile"""
-    jti = str(uuid.uuid4())
-    refresh_token = str(uuid.uuid4())
+    """Güvenli refresh token kaydet - metadata ile (veritabanına yalnızca özeti yazılır).
+    (refresh token, oturum kimliği) döner; oturum kimliği access token'a "sid" olarak girer."""
+    jti = new_jti()
+    refresh_token = new_refresh_token()
     
     # User-Agent ve IP
     user_agent = request.headers.get("User-Agent", "")
     ip_address = request.client.host if request.client else ""
     
-    # UA parsing
-    device_info = "Unknown"
-    try:
-        ua = parse(user_agent)
-        device_info = f"{ua.browser.family} {ua.browser.version_string} on {ua.os.family}"
-    except:
-        device_info = user_agent[:50]
-    
     # CRITICAL FIX: created_at ve expires_at MUTLAKA datetime olmalı!
     created_at = datetime.utcnow()
     expires_at = created_at + timedelta(days=REFRESH_TOKEN_DAYS)
     
     token_data = {
         "jti": jti,
-        "token": refresh_token,
+        "sid": jti,  # yeni oturum: zincir kimliği ilk jti
+        "token": token_digest(refresh_token),
         "user_id": user_id,
         "created_at": created_at,  # <-- BU ASLA NULL OLMAMALI!
         "last_used_at": created_at,
         "expires_at": expires_at,  # <-- BU ASLA NULL OLMAMALI!
         "is_active": True,
         "user_agent": user_agent[:200],
-        "device_info": device_info[:100],
+        **user_agent_cache.get(user_agent),
         "ip_address": ip_address,
+        "location": get_location_from_ip(ip_address),
         "rotations": 0
     }
     
     await db.refresh_tokens.insert_one(token_data)
+    cache_bus.invalidate(user_id, *SESSION_CACHES)
     
-    print(f"💾 Refresh token kaydedildi: {refresh_token[:12]}... (user: {user_id})")
-    print(f"   created_at: {created_at}, expires_at: {expires_at}")
+    token_logger.debug("💾 Refresh token kaydedildi (expires_at: %s)", expires_at, extra={"user_id": user_id})
     
-    return refresh_token
+    return refresh_token, record_sid(token_data)
+
+# Refresh'te kullanıcı var mı kontrolü - her rotate'te users koleksiyonuna gitmesin
+user_exists_cache = TTLCache(max_size=50000, ttl=60)
+
+async def user_exists(user_id: str) -> bool:
+    if user_exists_cache.get(user_id):
+        return True
+    if await db.users.find_one({"_id": user_id}, projection={"_id": 1}) is None:
+        return False
+    user_exists_cache.put(user_id, True)
+    return True
+
+async def log_refresh_miss_diagnostics(refresh_token: str):
+    """Opt-in: token neden bulunamadı? (REFRESH_MISS_DIAGNOSTICS=1)"""
+    total_tokens = await db.refresh_tokens.count_documents({})
+    active_tokens = await db.refresh_tokens.count_documents({"is_active": True})
+    any_token = await db.refresh_tokens.find_one({"token": token_match(refresh_token)}, projection={"is_active": 1, "user_id": 1})
+    alt_token = await db.refresh_tokens.find_one({"refresh_token": refresh_token}, projection={"_id": 1})
+    refresh_logger.warning(
+        "Refresh miss - toplam %s token, %s aktif | token kaydı: %s | 'refresh_token' alanında: %s",
+        total_tokens, active_tokens,
+        {"is_active": any_token.get("is_active"), "user_id": any_token.get("user_id")} if any_token else None,
+        alt_token is not None
+    )
+
+async def rotate_refresh_token(refresh_token: str, request: Optional[Request]):
+    """Refresh token'ı tek atomik sorguda tüket ve yenisini yaz - (user_id, yeni token, sid) döner"""
+    now = datetime.utcnow()
+    next_jti = new_jti()
+    new_refresh = new_refresh_token()
+    token_key = token_match(refresh_token)
+
+    # 1. round trip: aktif + süresi dolmamış + rotation limiti aşılmamış token'ı bul ve inaktif yap
+    rec = await db.refresh_tokens.find_one_and_update(
+        {
+            "token": token_key,
+            "is_active": True,
+            "expires_at": {"$gt": now},
+            "rotations": {"$not": {"$gt": MAX_REFRESH_ROTATIONS}}
+        },
+        {"$set": {"is_active": False, "rotated_at": now, "rotated_to": next_jti}},
+        projection={"user_id": 1, "jti": 1, "sid": 1, "rotations": 1}
+    )
+
+    if not rec:
+        # Sadece hata yolunda: neden reddedildiğini ayırt et
+        stale = await db.refresh_tokens.find_one(
+            {"token": token_key, "is_active": True},
+            projection={"user_id": 1, "expires_at": 1, "rotations": 1}
+        )
+        if stale and stale.get("rotations", 0) > MAX_REFRESH_ROTATIONS:
+            await db.refresh_tokens.delete_many({"user_id": stale["user_id"]})
+            cache_bus.invalidate(stale["user_id"], *SESSION_CACHES)
+            # Zincir kötüye kullanılmış olabilir: verilmiş access token'lar da geçersiz
+            await token_revocations.revoke_user(stale["user_id"])
+            refresh_rotations.labels("rotation_limit").inc()
+            raise HTTPException(status_code=401, detail="Too many rotations, please re-login")
+        if stale and isinstance(stale.get("expires_at"), datetime) and stale["expires_at"] <= now:
+            await db.refresh_tokens.update_one({"_id": stale["_id"]}, {"$set": {"is_active": False}})
+            cache_bus.invalidate(stale["user_id"], *SESSION_CACHES)
+            refresh_rotations.labels("expired").inc()
+            raise HTTPException(status_code=401, detail="Refresh token expired")
+
+        if REFRESH_MISS_DIAGNOSTICS:
+            await log_refresh_miss_diagnostics(refresh_token)
+        refresh_rotations.labels("invalid").inc()
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user_id = rec["user_id"]
+    if not await user_exists(user_id):
+        refresh_rotations.labels("user_not_found").inc()
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # User-Agent ve IP
+    user_agent = request.headers.get("User-Agent", "") if request else ""
+    ip_address = request.client.host if request and request.client else ""
+
+    # 2. round trip: yeni token'ı yaz (ek okuma yok)
+    new_record = {
+        "jti": next_jti,
+        "sid": rec.get("sid") or rec.get("jti"),  # aynı oturum
+        "token": token_digest(new_refresh),
+        "user_id": user_id,
+        "created_at": now,
+        "last_used_at": now,
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_DAYS),
+        "is_active": True,
+        "user_agent": user_agent[:200],
+        **user_agent_cache.get(user_agent),
+        "ip_address": ip_address,
+        "location": get_location_from_ip(ip_address),
+        "rotated_from": rec.get("jti"),
+        "rotations": rec.get("rotations", 0) + 1
+    }
+    await db.refresh_tokens.insert_one(new_record)
+    cache_bus.invalidate(user_id, *SESSION_CACHES)
+
+    refresh_rotations.labels("ok").inc()
+    return user_id, new_refresh, record_sid(new_record)
+
+# =====================
+# TERM CATALOGUE
+# =====================
+
+# Frontend veri dosyalarından startup'ta bir kez yüklenir (bkz. term_catalogue.py)
+term_catalogue = TermCatalogue([])
+# Quiz havuzları katalogdan türetilir ve onunla birlikte yenilenir
+quiz_engine = QuizEngine(term_catalogue)
+# Kök/önek/sonek otomatı da öyle (bkz. morphology.py)
+term_analyzer = MorphologyAnalyzer(term_catalogue)
+# Sistem başına flashcard aday listeleri de (bkz. srs.py)
+flashcard_deck = FlashcardDeck(term_catalogue)
+
+def load_term_catalogue():
+    global term_catalogue, quiz_engine, term_analyzer, flashcard_deck
+    try:
+        term_catalogue = TermCatalogue.from_data_dir()
+        quiz_engine = QuizEngine(term_catalogue)
+        term_analyzer = MorphologyAnalyzer(term_catalogue)
+        flashcard_deck = FlashcardDeck(term_catalogue)
+        startup_logger.info("✅ Terim kataloğu yüklendi: %d kayıt (sürüm %s)", len(term_catalogue), term_catalogue.version)
+    except (OSError, ValueError) as e:
+        startup_logger.warning("⚠️ Terim kataloğu yüklenemedi, boş katalog kullanılıyor: %s", e)
+
+# =====================
+# LEARNING PROGRESS
+# =====================
+
+# Olaylar kullanıcı başına bellekte birleştirilir, arka planda bulk upsert ile yazılır
+progress_service = ProgressService(db)
+
+# Flashcard'lar için SM-2 planlayıcısı (bkz. srs.py)
+spaced_repetition = SpacedRepetition(db)
+
+# =====================
+# TOKEN JANITOR
+# =====================
+
+# Süresi dolmuş / 90 günden eski refresh token'lar hız tavanıyla, _id sırasıyla silinir
+# (bkz. token_janitor.py); birden çok worker'da açık olsa da aynı anda biri çalışır.
+# TOKEN_JANITOR=0 iken bu işi TTL index'leri yapar (bkz. mongo_indexes.py)
+token_janitor = TokenJanitor(db)
 
 # =====================
 # LIFESPAN (Startup/Shutdown)
@@ -300,29 +596,52 @@ async def save_refresh_token(user_id: str, request: Request):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup (uygulama başlarken)
-    print("🚀 Uygulama başlatılıyor...")
-    try:
-        await client.admin.command("ping")
-        print("✅ MongoDB Bağlantısı Başarılı!")
-        
+    # Startup (uygulama başlarken) - her adımın süresi startup_profiler'da
+    startup_logger.info("🚀 Uygulama başlatılıyor...")
+    with startup_profiler.phase("background services"):
+        google_verifier.start()
+        geo_resolver.start()
+        progress_service.start()
+        # İptal listesi: süresi dolmamış olayları yeniden oynat, sonra diğer worker'ları takip et
+        token_revocations.start()
+        cache_bus.start()
+    with startup_profiler.phase("term catalogue"):
+        load_term_catalogue()
+    # Bağlantı kontrolü de burada: şema sürümü okunamazsa Mongo erişilemez
+    with startup_profiler.phase("mongo indexes"):
         await setup_mongo_indexes()
-        
-        deleted = await db.refresh_tokens.delete_many({
-            "expires_at": {"$lt": datetime.utcnow()},
-            "is_active": True
-        })
-        print(f"✅ {deleted.deleted_count} expired token temizlendi")
-        
-    except Exception as e:
-        print(f"❌ MongoDB Hata: {e}")
+    # Yeniden oynatma bitmeden açılan worker iptal edilmiş access token'ları kabul ederdi
+    with startup_profiler.phase("revocation replay"):
+        try:
+            await token_revocations.wait_ready(REVOCATION_REPLAY_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"İptal listesi {REVOCATION_REPLAY_TIMEOUT_S:.0f}s içinde yüklenemedi")
+    startup_profiler.ready()
+
+    # Hazırlık yolunda olmayan işler
+    if TOKEN_JANITOR:
+        token_janitor.start()
+    background = []
+    if STARTUP_WARMUP:
+        background.append(asyncio.create_task(warm_up()))
     
     yield  # Uygulama burada çalışır
     
     # Shutdown (uygulama kapanırken)
-    print("🛑 Uygulama kapatılıyor...")
+    startup_logger.info("🛑 Uygulama kapatılıyor...")
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    password_hasher.shutdown()
+    await google_verifier.stop()
+    await geo_resolver.stop()
+    await progress_service.stop()
+    await token_revocations.stop()
+    await cache_bus.stop()
+    await token_janitor.stop()
     client.close()
-    print("✅ MongoDB bağlantısı kapatıldı")
+    startup_logger.info("✅ MongoDB bağlantısı kapatıldı")
+    shutdown_logging()
 
 # =====================
 # APP CONFIG
@@ -339,7 +658,7 @@ api_router = APIRouter(prefix="/api")
 async def register(data: RegisterRequest, request: Request):
     # Rate limiting: IP başına dakikada 3 kayıt
     client_ip = request.client.host if request.client else "unknown"
-    if not check_rate_limit(f"register_{client_ip}", limit=3, window=60):
+    if not await check_rate_limit(f"register_{client_ip}", limit=3, window=60):
         raise HTTPException(
             status_code=429,
             detail="Too many registration attempts. Please try again later."
@@ -353,12 +672,16 @@ async def register(data: RegisterRequest, request: Request):
         "_id": user_id,
         "email": data.email,
         "name": data.name or "",
-        "password": hash_password(data.password),
+        "password": await hash_password(data.password),
         "email_verified": True,
         "created_at": datetime.now(timezone.utc),
         "role": "user"
     }
-    await db.users.insert_one(user)
+    try:
+        await db.users.insert_one(user)
+    except DuplicateKeyError:
+        # Eşzamanlı kayıt: unique email index'i yakaladı
+        raise HTTPException(status_code=400, detail="Email already registered")
     return {"ok": True}
 
 @api_router.post("/auth/login", response_model=TokenPairResponse)
@@ -367,23 +690,48 @@ async def login(data: LoginRequest, request: Request):
     client_ip = request.client.host if request.client else "unknown"
     identifier = f"login_{client_ip}"
     
-    print(f"🔐 Login attempt from {client_ip} - email: {data.email}")
+    login_logger.debug("🔐 Login attempt from %s - email: %s", client_ip, data.email)
     
-    if not check_rate_limit(identifier, limit=5, window=60):
-        print(f"🚫 RATE LIMIT HIT! {identifier} - Too many requests")
+    if not await check_rate_limit(identifier, limit=5, window=60):
+        login_logger.warning("🚫 RATE LIMIT HIT! %s - Too many requests", identifier)
         raise HTTPException(
             status_code=429,
             detail="Too many login attempts. Please try again later."
         )
     
-    print(f"✅ Rate limit OK for {identifier}")
-    
+    # Başarısız yanıtların hepsi (olmayan e-posta, kilit, bilinen çift, yanlış
+    # parola) isteğin başından itibaren aynı sürede döner
+    started = login_admission.clock()
+    retry_after = login_admission.retry_after(data.email)
+    if retry_after:
+        await login_admission.pad(started)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
     user = await db.users.find_one({"email": data.email})
-    if not user or not verify_password(data.password, user["password"]):
+    # Google ile açılmış hesapların parolası yok
+    password_hash = user.get("password") if user else None
+    if not password_hash or login_admission.is_known_bad(password_hash, data.password):
+        login_admission.record_failure(data.email)
+        await login_admission.pad(started)
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    verify_started = time.perf_counter()
+    valid = await verify_password(data.password, password_hash)
+    login_admission.observe_verify(time.perf_counter() - verify_started)
+    if not valid:
+        if login_admission.record_failure(data.email):
+            login_logger.warning("🔒 Account locked after repeated failures - email: %s", data.email)
+        login_admission.remember_bad(password_hash, data.password)
+        await login_admission.pad(started)
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_admission.record_success(data.email)
 
-    access = create_access_token(user["_id"])
-    refresh = await save_refresh_token(user["_id"], request)
+    refresh, sid = await save_refresh_token(user["_id"], request)
+    access = create_access_token(user["_id"], sid)
 
     return {"access_token": access, "refresh_token": refresh}
 
@@ -391,18 +739,14 @@ async def login(data: LoginRequest, request: Request):
 async def google_login(data: GoogleLoginRequest, request: Request):
     # Rate limiting: IP başına dakikada 5 Google login
     client_ip = request.client.host if request.client else "unknown"
-    if not check_rate_limit(f"google_{client_ip}", limit=5, window=60):
+    if not await check_rate_limit(f"google_{client_ip}", limit=5, window=60):
         raise HTTPException(
             status_code=429,
             detail="Too many Google login attempts. Please try again later."
         )
     
     try:
-        idinfo = id_token.verify_oauth2_token(
-            data.credential,
-            google_requests.Request(),
-            GOOGLE_CLIENT_ID
-        )
+        idinfo = await google_verifier.verify(data.credential)
 
         email = idinfo["email"]
         name = idinfo.get("name", "")
@@ -418,10 +762,14 @@ async def google_login(data: GoogleLoginRequest, request: Request):
                 "created_at": datetime.now(timezone.utc),
                 "role": "user"
             }
-            await db.users.insert_one(user)
+            try:
+                await db.users.insert_one(user)
+            except DuplicateKeyError:
+                # Aynı anda gelen ikinci Google login: mevcut kaydı kullan
+                user = await db.users.find_one({"email": email})
 
-        access = create_access_token(user["_id"])
-        refresh = await save_refresh_token(user["_id"], request)
+        refresh, sid = await save_refresh_token(user["_id"], request)
+        access = create_access_token(user["_id"], sid)
 
         return {"access_token": access, "refresh_token": refresh}
     except Exception as e:
@@ -433,163 +781,17 @@ async def refresh_tokens(authorization: Optional[str] = Header(None), request: R
     Refresh token endpoint - Authorization header'dan refresh token alır
     Format: "Bearer {refresh_token}"
     """
-    print("\n" + "="*60)
-    print("🔄 /api/auth/refresh ÇAĞRILDI")
-    print(f"📅 Zaman: {datetime.utcnow()}")
-    
     if not authorization:
-        print("❌ HATA: Authorization header eksik")
         raise HTTPException(status_code=401, detail="Refresh token missing")
-    
-    print(f"📨 Authorization header (ilk 50 karakter): {authorization[:50]}")
-    
+
     if not authorization.startswith("Bearer "):
-        print(f"❌ HATA: Yanlış token formatı")
         raise HTTPException(status_code=401, detail="Invalid token format")
-    
-    refresh_token = authorization[7:]
-    print(f"🔑 Alınan refresh token (ilk 20 karakter): {refresh_token[:20]}")
-    print(f"🔑 Token uzunluğu: {len(refresh_token)} karakter")
-    
-    # Önce MongoDB'de bu token var mı kontrol et (aktif olmasa bile)
-    any_token = await db.refresh_tokens.find_one({"token": refresh_token})
-    print(f"📊 MongoDB'de token var mı (aktif olmasa bile): {'EVET' if any_token else 'HAYIR'}")
-    
-    if any_token:
-        print(f"📊 Token detayları: is_active={any_token.get('is_active', False)}, user_id={any_token.get('user_id', 'N/A')}")
-    
-    # MongoDB'de refresh token'ı ara (sadece aktif olanlar)
-    rec = await db.refresh_tokens.find_one({
-        "token": refresh_token,
-        "is_active": True
-    })
-    
-    if not rec:
-        print(f"❌ HATA: Token bulunamadı veya aktif değil")
-        
-        # Neden bulunamadığını anlamak için daha fazla debug
-        total_tokens = await db.refresh_tokens.count_documents({})
-        active_tokens = await db.refresh_tokens.count_documents({"is_active": True})
-        print(f"   📊 MongoDB Durumu: Toplam {total_tokens} token, {active_tokens} aktif")
-        
-        # Tüm koleksiyonları listele
-        collections = await db.list_collection_names()
-        print(f"   📋 MongoDB koleksiyonları: {collections}")
-        
-        # Tüm token'ları listele (debug için)
-        all_tokens = await db.refresh_tokens.find().limit(5).to_list(5)
-        print(f"   📋 İlk 5 token preview:")
-        for i, t in enumerate(all_tokens):
-            token_preview = t.get("token", "")[:10] + "..." if t.get("token") else "None"
-            print(f"     {i+1}. {token_preview} - aktif: {t.get('is_active', False)} - user: {t.get('user_id', 'N/A')}")
-        
-        # Belki token 'refresh_token' field'ında?
-        alt_token = await db.refresh_tokens.find_one({"refresh_token": refresh_token})
-        if alt_token:
-            print(f"   ⚠️ Token 'refresh_token' field'ında bulundu!")
-        
-        raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    print(f"✅ Token BULUNDU!")
-    print(f"   👤 user_id: {rec.get('user_id')}")
-    print(f"   ✅ is_active: {rec.get('is_active', False)}")
-    print(f"   📅 created_at: {rec.get('created_at')}")
-    print(f"   🆔 jti: {rec.get('jti', 'N/A')[:10]}...")
-    
-    # Expire kontrol
-    expires_at = rec.get("expires_at")
-    if expires_at and isinstance(expires_at, datetime):
-        now = datetime.utcnow()
-        time_left = expires_at - now
-        hours_left = time_left.total_seconds() / 3600
-        
-        print(f"   ⏰ Token süresi: {expires_at}")
-        print(f"   ⏰ Şu an: {now}")
-        print(f"   ⏰ Kalan süre: {hours_left:.1f} saat")
-        
-        if expires_at < now:
-            print(f"   ❌ Token süresi DOLMUŞ!")
-            await db.refresh_tokens.update_one(
-                {"token": refresh_token},
-                {"$set": {"is_active": False}}
-            )
-            raise HTTPException(status_code=401, detail="Refresh token expired")
-    else:
-        print(f"   ⚠️ expires_at bilgisi yok veya datetime değil: {expires_at}")
+    user_id, new_refresh, sid = await rotate_refresh_token(authorization[7:], request)
+    refresh_logger.debug("✅ Refresh başarılı", extra={"user_id": user_id})
 
-    user_id = rec["user_id"]
-    old_jti = rec.get("jti", "")
-    
-    # Rotation limit kontrolü
-    rotations = rec.get("rotations", 0)
-    print(f"   🔄 Rotation sayısı: {rotations}")
-    
-    if rotations > 10:
-        print(f"   🚫 Çok fazla rotation ({rotations})")
-        await db.refresh_tokens.delete_many({"user_id": user_id})
-        raise HTTPException(status_code=401, detail="Too many rotations, please re-login")
-    
-    # Kullanıcıyı kontrol et
-    user = await db.users.find_one({"_id": user_id})
-    if not user:
-        print(f"   ❌ Kullanıcı bulunamadı: {user_id}")
-        raise HTTPException(status_code=404, detail="User not found")
-
-    print(f"   ✅ Kullanıcı bulundu: email={user.get('email')}")
-    
-    # Yeni access token oluştur
-    new_access = create_access_token(user_id)
-    print(f"   ✅ Yeni access token oluşturuldu (ilk 30 karakter): {new_access[:30]}...")
-    
-    # Yeni refresh token (rotate)
-    new_jti = str(uuid.uuid4())
-    new_refresh = str(uuid.uuid4())
-    print(f"   🔄 Yeni refresh token oluşturuldu: {new_refresh[:12]}...")
-    
-    # User-Agent ve IP
-    user_agent = request.headers.get("User-Agent", "") if request else ""
-    ip_address = request.client.host if request and request.client else ""
-    
-    print(f"   📱 User-Agent: {user_agent[:50]}")
-    print(f"   🌐 IP Address: {ip_address}")
-    
-    # Eski token'ı inaktif yap
-    update_result = await db.refresh_tokens.update_one(
-        {"token": refresh_token},
-        {
-            "$set": {
-                "is_active": False,
-                "rotated_at": datetime.utcnow(),
-                "rotated_to": new_jti
-            }
-        }
-    )
-    
-    print(f"   🔄 Eski token inaktif yapıldı. Güncellenen: {update_result.modified_count}")
-    
-    # Yeni refresh token'ı metadata ile kaydet
-    new_token_data = {
-        "jti": new_jti,
-        "token": new_refresh,
-        "user_id": user_id,
-        "created_at": datetime.utcnow(),
-        "last_used_at": datetime.utcnow(),
-        "expires_at": datetime.utcnow() + timedelta(days=REFRESH_TOKEN_DAYS),
-        "is_active": True,
-        "user_agent": user_agent[:200],
-        "ip_address": ip_address,
-        "rotated_from": old_jti,
-        "rotations": rotations + 1
-    }
-    
-    insert_result = await db.refresh_tokens.insert_one(new_token_data)
-    print(f"   💾 Yeni token kaydedildi. ID: {insert_result.inserted_id}")
-    
-    print("✅ REFRESH BAŞARILI!")
-    print("="*60 + "\n")
-    
     return {
-        "access_token": new_access,
+        "access_token": create_access_token(user_id, sid),
         "refresh_token": new_refresh
     }
 
@@ -603,21 +805,27 @@ async def logout(data: Optional[RefreshRequest] = None, authorization: Optional[
         refresh_token = data.refresh_token
     
     if refresh_token:
-        await db.refresh_tokens.update_one(
-            {"token": refresh_token},
-            {"$set": {"is_active": False, "logged_out_at": datetime.utcnow()}}
+        rec = await db.refresh_tokens.find_one_and_update(
+            {"token": token_match(refresh_token)},
+            {"$set": {"is_active": False, "logged_out_at": datetime.utcnow()}},
+            projection={"user_id": 1, "jti": 1, "sid": 1}
         )
+        # Oturumun henüz süresi dolmamış access token'ları da geçersiz
+        if rec:
+            cache_bus.invalidate(rec["user_id"], *SESSION_CACHES)
+            await token_revocations.revoke_sessions([record_sid(rec)])
     
     return {"ok": True}
 
 @api_router.post("/auth/logout-all")
 async def logout_all(
-    user_id: str = Depends(get_current_user_id),
+    session: tuple = Depends(get_current_session),
     request: Request = None
 ):
     """
     Tüm cihazlardan çıkış yap (mevcut cihaz hariç)
     """
+    user_id, current_sid, _ = session
     # Mevcut cihazın refresh token'ını al (eğer varsa)
     current_refresh_token = None
     auth_header = request.headers.get("Authorization") if request else None
@@ -627,11 +835,16 @@ async def logout_all(
     # Update query: Tüm aktif token'ları inaktif yap, ama mevcut token'ı hariç tut
     update_query = {"user_id": user_id, "is_active": True}
     if current_refresh_token:
-        update_query["token"] = {"$ne": current_refresh_token}
+        update_query["token"] = token_exclude(current_refresh_token)
+        if current_sid:
+            # Header'daki access token'ın oturumu (refresh token zinciri) açık kalır
+            update_query["sid"] = {"$ne": session_key(current_sid)}
         message = "Diğer tüm cihazlardan çıkış yapıldı. Mevcut cihazda kalmaya devam ediyorsunuz."
     else:
         message = "Tüm cihazlardan çıkış yapıldı."
     
+    # Kapatılan oturumların access token'ları da iptal edilecek
+    sessions = await db.refresh_tokens.find(update_query, projection={"jti": 1, "sid": 1}).to_list(None)
     result = await db.refresh_tokens.update_many(
         update_query,
         {
@@ -642,6 +855,8 @@ async def logout_all(
             }
         }
     )
+    cache_bus.invalidate(user_id, *SESSION_CACHES)
+    await token_revocations.revoke_sessions(record_sid(s) for s in sessions)
     
     # Log kaydı
     await db.user_logs.insert_one({
@@ -659,44 +874,66 @@ async def logout_all(
         "tokens_invalidated": result.modified_count,
         "current_device_excluded": current_refresh_token is not None
     }
-@api_router.get("/auth/me")
-async def me(user_id: str = Depends(get_current_user_id)):
-    user = await db.users.find_one({"_id": user_id})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
+
+async def load_profile(user_id: str) -> Optional[dict]:
+    user = await db.users.find_one({"_id": user_id}, projection={"email": 1, "name": 1, "role": 1})
+    if not user:
+        return None
     return {
         "id": user["_id"],
         "email": user["email"],
         "name": user.get("name", ""),
         "role": user.get("role", "user"),
-        "stats": {"learned_terms": 0, "current_streak": 0, "average_quiz_score": 0}
     }
 
-@api_router.get("/auth/sessions")
-async def get_sessions(user_id: str = Depends(get_current_user_id)):
-    """Kullanıcının aktif oturumlarını listele"""
-    sessions = await db.refresh_tokens.find({
+@api_router.get("/auth/me")
+async def me(user_id: str = Depends(get_current_user_id)):
+    profile, stats = await asyncio.gather(
+        profile_cache.get_or_load(user_id, load_profile),
+        progress_service.stats(user_id),
+    )
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return {**profile, "stats": stats}
+
+async def load_sessions(user_id: str, limit: int = SESSIONS_PAGE_SIZE, cursor: Optional[str] = None) -> dict:
+    sessions, next_cursor = await fetch_page(db.refresh_tokens, {
         "user_id": user_id,
         "is_active": True,
         "expires_at": {"$gt": datetime.utcnow()}
-    }).sort("created_at", -1).to_list(length=50)
+    }, SESSION_FIELDS, limit, cursor)
     
     formatted_sessions = []
     for session in sessions:
         formatted_sessions.append({
             "id": str(session.get("_id", "")),
-            "device_info": session.get("device_info", "Unknown device"),
-            "user_agent": session.get("user_agent", "")[:100],
-            "ip_address": session.get("ip_address", ""),
+            "device_info": session.get("device_info") or "Unknown device",
+            "ip_address": session.get("ip_address") or "",
             "created_at": session.get("created_at"),
             "last_used_at": session.get("last_used_at"),
             "expires_at": session.get("expires_at"),
-            "location": session.get("location", "Unknown"),  # IP'den location çözebiliriz
+            "location": session.get("location") or "Unknown",
             "is_current": False  # Frontend bunu ayarlayacak
         })
     
-    return {"sessions": formatted_sessions}
+    return {"sessions": formatted_sessions, "next_cursor": next_cursor}
+
+@api_router.get("/auth/sessions")
+async def get_sessions(
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(SESSIONS_PAGE_SIZE, ge=1, le=MAX_SESSIONS_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, max_length=64)
+):
+    """Kullanıcının aktif oturumlarını listele (son kullanılan önce; devamı için next_cursor)"""
+    if cursor is None and limit == SESSIONS_PAGE_SIZE:
+        # İlk sayfa en sık istenen - cache'ten; sonraki sayfalar doğrudan
+        return await sessions_cache.get_or_load(user_id, load_sessions)
+    try:
+        return await load_sessions(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.delete("/auth/sessions/{session_id}")
 async def revoke_session(
@@ -704,7 +941,7 @@ async def revoke_session(
     user_id: str = Depends(get_current_user_id)
 ):
     """Belirli bir oturumu sonlandır"""
-    result = await db.refresh_tokens.update_one(
+    rec = await db.refresh_tokens.find_one_and_update(
         {
             "_id": ObjectId(session_id),
             "user_id": user_id,
@@ -716,34 +953,187 @@ async def revoke_session(
                 "revoked_at": datetime.utcnow(),
                 "revoked_reason": "manual_revoke"
             }
-        }
+        },
+        projection={"jti": 1, "sid": 1}
     )
     
-    if result.modified_count == 0:
+    if rec is None:
         raise HTTPException(
             status_code=404,
             detail="Session not found or already inactive"
         )
     
+    cache_bus.invalidate(user_id, *SESSION_CACHES)
+    # Oturumun access token'ları da hemen geçersiz
+    await token_revocations.revoke_sessions([record_sid(rec)])
+    
     return {"message": "Session revoked successfully"}
 
+# =====================
+# ROUTES – TERMS
+# =====================
+
+@api_router.get("/terms/search")
+async def search_terms(
+    request: Request,
+    response: Response,
+    q: str = Query("", max_length=100),
+    system: Optional[str] = None,
+    kind: Optional[str] = Query(None, pattern="^(term|root|prefix)$"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Terim arama - sıralı, sayfalı; katalog değişmedikçe aynı URL aynı ETag'i döner"""
+    etag = f'"terms-{term_catalogue.version}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    total, results = term_catalogue.search(q, system=system, kind=kind, offset=(page - 1) * limit, limit=limit)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return {"query": q, "total": total, "page": page, "limit": limit, "results": results}
+
+@api_router.get("/terms/systems")
+async def term_systems(request: Request, response: Response):
+    """Sistem listesi ve her sistemdeki kayıt sayısı"""
+    etag = f'"terms-{term_catalogue.version}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return {"systems": term_catalogue.systems_summary()}
+
+@api_router.get("/terms/analyze")
+async def analyze_term(request: Request, response: Response, q: str = Query(..., min_length=1, max_length=100)):
+    """Terimi kök/önek/sonek parçalarına ve anlamlarına ayır"""
+    etag = f'"terms-{term_catalogue.version}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return term_analyzer.analyze(q)
+
+@api_router.post("/terms/analyze")
+async def analyze_terms(data: TermAnalysisBatch):
+    """Toplu çözümleme - istek başına binlerce terim, sırası korunur"""
+    return {"catalogue_version": term_catalogue.version, "results": term_analyzer.analyze_many(data.terms)}
+
+# =====================
+# ROUTES – QUIZ
+# =====================
+
+@api_router.get("/quiz/generate")
+async def generate_quiz(
+    system: Optional[str] = None,
+    count: int = Query(10, ge=1, le=50),
+    seed: Optional[int] = Query(None, ge=0, lt=2**63),
+):
+    """Sorular + şıklar tek cevapta; aynı seed ve katalog sürümü aynı quiz'i verir"""
+    try:
+        return quiz_engine.generate(system=system, count=count, seed=seed)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+# =====================
+# ROUTES – FLASHCARDS
+# =====================
+
+def _flashcard(card_id: str, due_at=None) -> Optional[dict]:
+    record = term_catalogue.get(card_id)
+    if record is None:
+        return None
+    return {"card_id": card_id, "term": record["term"], "meaning": record["turkish"],
+            "system": record["system"], "category": record["category"], "due_at": due_at, "new": due_at is None}
+
+@api_router.get("/flashcards/due")
+async def due_flashcards(
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(20, ge=1, le=100),
+    new: int = Query(10, ge=0, le=100),
+    system: Optional[str] = None,
+):
+    """Vadesi gelen kartlar (en eskiden) + gerekirse hiç görülmemiş kartlarla tamamlanır"""
+    cards = [card for card in (_flashcard(doc["card_id"], doc["due_at"])
+                               for doc in await spaced_repetition.due_cards(user_id, limit)) if card]
+
+    missing = min(new, limit - len(cards))
+    if missing > 0:
+        for card_id in await spaced_repetition.unseen_cards(user_id, flashcard_deck, system, missing):
+            cards.append(_flashcard(card_id))
+
+    return {"cards": cards}
+
+@api_router.post("/flashcards/reviews")
+async def review_flashcards(data: FlashcardReviewBatch, user_id: str = Depends(get_current_user_id)):
+    """Toplu değerlendirme - kart başına atomik SM-2 güncellemesi, tek bulk_write"""
+    unknown = [review.card_id for review in data.reviews if term_catalogue.get(review.card_id) is None]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown card_id: {unknown[0]}")
+    processed = await spaced_repetition.apply_reviews(user_id, [review.model_dump() for review in data.reviews])
+    return {"processed": processed}
+
+# =====================
+# ROUTES – PROGRESS
+# =====================
+
+@api_router.post("/progress/events", status_code=202)
+async def ingest_progress(data: ProgressBatch, user_id: str = Depends(get_current_user_id)):
+    """Öğrenme olaylarını toplu al - yazma arka planda, kullanıcı başına birleştirilerek yapılır"""
+    try:
+        accepted = progress_service.add(user_id, [event.model_dump() for event in data.events])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ProgressBufferFull:
+        raise HTTPException(status_code=503, detail="Progress buffer is full, retry shortly",
+                            headers={"Retry-After": "1"})
+    return {"accepted": accepted}
+
+@api_router.get("/progress")
+async def get_progress(user_id: str = Depends(get_current_user_id)):
+    return {"stats": await progress_service.stats(user_id)}
+
+# =====================
+# METRICS ENDPOINT
+# =====================
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape: HTTP, rate limit, refresh, bcrypt ve Mongo metrikleri"""
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # =====================
 # DEBUG ENDPOINTS
 # =====================
 
-@api_router.get("/auth/debug-tokens")
+# İç durum (havuz ayarları, kuyruklar, önbellekler) herkese açık olmamalı:
+# debug_router'daki uçlar DEBUG_ENDPOINTS kapalıyken yok (404), açıkken admin ister
+def require_debug_endpoints():
+    if not DEBUG_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+async def require_admin(user_id: str = Depends(get_current_user_id)):
+    user = await db.users.find_one({"_id": user_id}, projection={"role": 1})
+    if not user or user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+debug_router = APIRouter(prefix="/auth", dependencies=[Depends(require_debug_endpoints), Depends(require_admin)])
+
+@debug_router.get("/debug-tokens")
 async def debug_tokens():
     """Debug: MongoDB'deki refresh token'ları göster"""
     try:
         # Tüm token'ları getir
-        tokens = await db.refresh_tokens.find().sort("created_at", -1).limit(20).to_list(20)
+        # _id (ObjectId) oluşturulma sırası - created_at index'i yok
+        tokens = await db.refresh_tokens.find().sort("_id", -1).limit(20).to_list(20)
         
         result = []
         for token in tokens:
             result.append({
                 "id": str(token.get("_id", "")),
-                "token_preview": f"{token.get('token', '')[:8]}..." if token.get('token') else "None",
-                "jti_preview": f"{token.get('jti', '')[:8]}..." if token.get('jti') else "None",
+                "token_preview": key_preview(token.get("token")),
+                "jti_preview": key_preview(token.get("jti")),
                 "user_id": token.get("user_id", ""),
                 "is_active": token.get("is_active", False),
                 "created_at": token.get("created_at"),
@@ -752,11 +1142,12 @@ async def debug_tokens():
                 "user_agent": (token.get("user_agent", "")[:30] + "...") if token.get("user_agent") else ""
             })
         
-        total = await db.refresh_tokens.count_documents({})
+        # Toplamlar koleksiyon metadata'sından (tam tarama yok)
+        total = await db.refresh_tokens.estimated_document_count()
         active = await db.refresh_tokens.count_documents({"is_active": True})
         
         # Users koleksiyonundan user sayısı
-        user_count = await db.users.count_documents({})
+        user_count = await db.users.estimated_document_count()
         
         return {
             "total_tokens": total,
@@ -767,7 +1158,62 @@ async def debug_tokens():
     except Exception as e:
         return {"error": str(e)}
 
-@api_router.get("/auth/debug-token/{user_id}")
+@debug_router.get("/debug-password-pool")
+async def debug_password_pool():
+    """Debug: bcrypt worker pool metrikleri"""
+    return password_hasher.stats()
+
+@debug_router.get("/debug-login-admission")
+async def debug_login_admission():
+    """Debug: login kabul kontrolü (kilitli hesaplar, bcrypt'siz reddedilenler, yanıt tabanı)"""
+    return login_admission.stats()
+
+@debug_router.get("/debug-ua-cache")
+async def debug_ua_cache():
+    """Debug: User-Agent çözümleme cache'i (boyut, hit/miss)"""
+    return user_agent_cache.stats()
+
+@debug_router.get("/debug-geoip")
+async def debug_geoip():
+    """Debug: GeoIP tablosu (aralık sayıları, arama ve yeniden yükleme sayısı)"""
+    return geo_resolver.stats()
+
+@debug_router.get("/debug-mongo")
+async def debug_mongo():
+    """Debug: Mongo havuz ayarları, doluluk, bekleme süreleri ve komut başına süreler"""
+    return {"options": client_options(), **mongo_metrics.snapshot()}
+
+@debug_router.get("/debug-logging")
+async def debug_logging():
+    """Debug: log kuyruğu dolduğu için düşürülen kayıt sayısı"""
+    return {"dropped_records": dropped_records()}
+
+@debug_router.get("/debug-progress")
+async def debug_progress():
+    """Debug: progress yazma tamponu (bekleyen kullanıcı, flush, başarısız işlem sayıları)"""
+    return progress_service.stats_snapshot()
+
+@debug_router.get("/debug-revocations")
+async def debug_revocations():
+    """Debug: access token iptal listesi (Bloom nesilleri, not-before kayıtları, senkron gecikmesi)"""
+    return token_revocations.stats()
+
+@debug_router.get("/debug-caches")
+async def debug_caches():
+    """Debug: kullanıcı okuma cache'leri (isabet oranı, geçersiz kılmalar, worker'lar arası gecikme)"""
+    return cache_bus.stats()
+
+@debug_router.get("/debug-janitor")
+async def debug_janitor():
+    """Debug: token janitor (checkpoint, silme hızı, geri çekilmeler, replikasyon gecikmesi)"""
+    return token_janitor.stats()
+
+@debug_router.get("/debug-startup")
+async def debug_startup():
+    """Debug: başlangıç süreleri (import'lar, modül bölümleri, lifespan adımları, tembel modüller)"""
+    return startup_profiler.report()
+
+@debug_router.get("/debug-token/{user_id}")
 async def debug_get_token(user_id: str):  # <-- İNDENT DÜZELDİ! @api_router ile aynı hizada
     """DEBUG: User ID için access token oluştur"""
     user = await db.users.find_one({"_id": user_id})
@@ -783,36 +1229,42 @@ async def debug_get_token(user_id: str):  # <-- İNDENT DÜZELDİ! @api_router i
         "expires_in": "60 minutes"
     }
 
+api_router.include_router(debug_router)
+
 # =====================
 # ENHANCED SESSION MANAGEMENT
 # =====================
 
 
-@api_router.get("/auth/sessions/detailed")
-async def get_detailed_sessions(user_id: str = Depends(get_current_user_id)):
-    """Detaylı oturum bilgilerini döndür"""
-    sessions = await db.refresh_tokens.find({
+async def load_detailed_sessions(user_id: str, limit: int = DETAILED_SESSIONS_PAGE_SIZE, cursor: Optional[str] = None) -> dict:
+    sessions, next_cursor = await fetch_page(db.refresh_tokens, {
         "user_id": user_id,
         "expires_at": {"$gt": datetime.utcnow()}
-    }).sort("last_used_at", -1).to_list(length=20)
+    }, DETAILED_SESSION_FIELDS, limit, cursor)
+    
+    # Cihaz alanları token yazılırken kaydedildi; alanı olmayan eski kayıtlar için
+    # User-Agent ayrıca okunup cache'li parse edilir (yalnızca o kayıtlar)
+    legacy_ids = [session["_id"] for session in sessions if not session.get("device_name")]
+    legacy_agents = {}
+    if legacy_ids:
+        async for doc in db.refresh_tokens.find({"_id": {"$in": legacy_ids}}, projection={"user_agent": 1}):
+            legacy_agents[doc["_id"]] = doc.get("user_agent", "")
     
     formatted_sessions = []
     
     for session in sessions:
-        # Device detection from user_agent
-        user_agent = session.get("user_agent", "")
-        device_info = parse_device_info(user_agent)
+        device_info = session if session.get("device_name") else user_agent_cache.get(legacy_agents.get(session["_id"], ""))
         
-        # Location
-        location = get_location_from_ip(session.get("ip_address", ""))
+        # Konum oturum yazılırken kaydedildi; eski kayıtlar için tablodan
+        location = session.get("location") or get_location_from_ip(session.get("ip_address") or "")
         
         formatted_sessions.append({
             "id": str(session.get("_id", "")),
-            "device_name": device_info.get("device", "Unknown Device"),
-            "browser": device_info.get("browser", "Unknown Browser"),
-            "os": device_info.get("os", "Unknown OS"),
+            "device_name": device_info.get("device_name") or "Unknown Device",
+            "browser": device_info.get("browser") or "Unknown Browser",
+            "os": device_info.get("os") or "Unknown OS",
             "location": location,
-            "ip_address": mask_ip(session.get("ip_address", "")),
+            "ip_address": mask_ip(session.get("ip_address") or ""),
             "created_at": session.get("created_at"),
             "last_used_at": session.get("last_used_at") or session.get("created_at"),
             "expires_at": session.get("expires_at"),
@@ -820,19 +1272,33 @@ async def get_detailed_sessions(user_id: str = Depends(get_current_user_id)):
             "is_current": False  # Frontend localStorage'daki token ile karşılaştıracak
         })
     
-    return {"sessions": formatted_sessions}
+    return {"sessions": formatted_sessions, "next_cursor": next_cursor}
 
+@api_router.get("/auth/sessions/detailed")
+async def get_detailed_sessions(
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(DETAILED_SESSIONS_PAGE_SIZE, ge=1, le=MAX_SESSIONS_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, max_length=64)
+):
+    """Detaylı oturum bilgilerini döndür (son kullanılan önce; devamı için next_cursor)"""
+    if cursor is None and limit == DETAILED_SESSIONS_PAGE_SIZE:
+        return await detailed_sessions_cache.get_or_load(user_id, load_detailed_sessions)
+    try:
+        return await load_detailed_sessions(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.post("/auth/logout-all-enhanced")
 async def logout_all_enhanced(
     exclude_current: bool = True,
-    user_id: str = Depends(get_current_user_id),
+    session: tuple = Depends(get_current_session),
     request: Request = None
 ):
     """
     Geliştirilmiş logout-all
     - exclude_current: Mevcut cihazı hariç tut (default: True)
     """
+    user_id, current_sid, _ = session
     # Mevcut token'ı al
     current_token = None
     auth_header = request.headers.get("Authorization") if request else None
@@ -842,11 +1308,14 @@ async def logout_all_enhanced(
     # Update query
     update_query = {"user_id": user_id, "is_active": True}
     if exclude_current and current_token:
-        update_query["token"] = {"$ne": current_token}
+        update_query["token"] = token_exclude(current_token)
+        if current_sid:
+            update_query["sid"] = {"$ne": session_key(current_sid)}
         message = f"Diğer tüm cihazlardan çıkış yapıldı. Mevcut cihazda oturumunuz açık kaldı."
     else:
         message = "Tüm cihazlardan çıkış yapıldı."
     
+    sessions = await db.refresh_tokens.find(update_query, projection={"jti": 1, "sid": 1}).to_list(None)
     result = await db.refresh_tokens.update_many(
         update_query,
         {
@@ -857,6 +1326,8 @@ async def logout_all_enhanced(
             }
         }
     )
+    cache_bus.invalidate(user_id, *SESSION_CACHES)
+    await token_revocations.revoke_sessions(record_sid(s) for s in sessions)
     
     return {
         "success": True,
@@ -866,10 +1337,15 @@ async def logout_all_enhanced(
     }
 
 
+async def load_notification_preferences(user_id: str) -> dict:
+    """Kullanıcının kayıtlı preference'ları"""
+    user = await db.users.find_one({"_id": user_id}, projection={"notification_preferences": 1})
+    return user.get("notification_preferences", {}) if user else {}
+
 @api_router.get("/auth/notifications/preferences")
 async def get_notification_preferences(user_id: str = Depends(get_current_user_id)):
     """Kullanıcının notification preference'larını getir"""
-    user = await db.users.find_one({"_id": user_id})
+    user_prefs = await preferences_cache.get_or_load(user_id, load_notification_preferences)
     
     # Varsayılan preferences
     default_prefs = {
@@ -879,9 +1355,6 @@ async def get_notification_preferences(user_id: str = Depends(get_current_user_i
         "email_digest": "weekly"
     }
     
-    # Kullanıcının kayıtlı preference'ları
-    user_prefs = user.get("notification_preferences", {}) if user else {}
-    
     return {**default_prefs, **user_prefs}
 
 
@@ -896,6 +1369,7 @@ async def update_notification_preferences(
         {"$set": {"notification_preferences": preferences}},
         upsert=True
     )
+    cache_bus.invalidate(user_id, *USER_CACHES)
     
     return {
         "success": True, 
@@ -912,7 +1386,7 @@ async def test_refresh():
         "endpoints": {
             "login": "POST /api/auth/login",
             "refresh": "POST /api/auth/refresh",
-            "debug": "GET /api/auth/debug-tokens",
+            "debug": "GET /api/auth/debug-tokens (DEBUG_ENDPOINTS=1 + admin access token)",
             "me": "GET /api/auth/me"
         }
     }
@@ -937,4 +1411,8 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
     expose_headers=["Content-Length"],
     max_age=600,
-)
\ No newline at end of file
+)
+# İstek sayısı / gecikme / eşzamanlı istek (bkz. metrics.py) - /metrics'te yayınlanır
+app.add_middleware(MetricsMiddleware, http_metrics=http_metrics)
+
+startup_profiler.mark("routes / app")
@@ -0,0 +1,79 @@
+# backend/session_pages.py
+#
+# Oturum listeleri için keyset sayfalama: sıra (last_used_at, _id) azalan,
+# istemciye sayfanın son kaydından üretilen opak bir cursor verilir. Sıralama ve
+# filtreler (expires_at, is_active) user_sessions_page index'inde (bkz.
+# mongo_indexes.py): yalnızca sayfadaki dokümanlar okunur, sorgular da yalnızca
+# yanıtta gösterilen alanları ister (200 karakterlik user_agent gönderilmez).
+#
+# last_used_at'i olmayan eski kayıtlar sıralamada en sona düşer ve ilk
+# sayfadan sonra görünmez: `python maintenance.py fix-null-dates` doldurur.
+import base64
+import binascii
+import struct
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+SESSIONS_PAGE_SIZE = 50
+DETAILED_SESSIONS_PAGE_SIZE = 20
+MAX_SESSIONS_PAGE_SIZE = 100
+
+SORT = [("last_used_at", -1), ("_id", -1)]
+
+# /auth/sessions ve /auth/sessions/detailed yanıtlarında kullanılan alanlar
+SESSION_FIELDS = {
+    "_id": 1, "device_info": 1, "ip_address": 1, "location": 1,
+    "created_at": 1, "last_used_at": 1, "expires_at": 1,
+}
+DETAILED_SESSION_FIELDS = {
+    "_id": 1, "device_name": 1, "browser": 1, "os": 1, "location": 1, "ip_address": 1,
+    "created_at": 1, "last_used_at": 1, "expires_at": 1, "is_active": 1,
+}
+
+_EPOCH = datetime(1970, 1, 1)
+# 8 bayt last_used_at (ms) + 12 bayt ObjectId
+_CURSOR = struct.Struct(">q12s")
+
+
+def encode_cursor(session: dict) -> Optional[str]:
+    """Sayfanın son kaydından sonraki sayfanın cursor'ı"""
+    last_used_at = session.get("last_used_at")
+    if not isinstance(last_used_at, datetime) or not isinstance(session.get("_id"), ObjectId):
+        return None
+    millis = (last_used_at.replace(tzinfo=None) - _EPOCH) // timedelta(milliseconds=1)
+    raw = _CURSOR.pack(millis, session["_id"].binary)
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """cursor → (last_used_at, _id); bozuk cursor için ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        millis, oid = _CURSOR.unpack(raw)
+        return _EPOCH + timedelta(milliseconds=millis), ObjectId(oid)
+    except (binascii.Error, struct.error, InvalidId, OverflowError) as e:
+        raise ValueError(f"Geçersiz cursor: {e}") from None
+
+
+def after_cursor(cursor: str) -> dict:
+    """Sorguya eklenecek "cursor'dan sonra" koşulu"""
+    last_used_at, oid = decode_cursor(cursor)
+    return {"$or": [
+        {"last_used_at": {"$lt": last_used_at}},
+        {"last_used_at": last_used_at, "_id": {"$lt": oid}},
+    ]}
+
+
+async def fetch_page(collection, query: dict, fields: dict, limit: int, cursor: Optional[str] = None) -> tuple:
+    """(kayıtlar, sonraki sayfanın cursor'ı ya da None)"""
+    if cursor:
+        query = {**query, **after_cursor(cursor)}
+    # Bir fazla oku: sonraki sayfa var mı
+    rows = await collection.find(query, projection=fields).sort(SORT).limit(limit + 1).to_list(limit + 1)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
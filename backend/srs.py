@@ -0,0 +1,207 @@
+# backend/srs.py
+#
+# Flashcard'lar için SM-2 aralıklı tekrar planlayıcısı. Kart durumu kullanıcı
+# başına, kart başına flashcard_state koleksiyonunda (_id = "<user_id>:<card_id>"):
+#   ease, interval (gün), reps, lapses, reviews, last_reviewed_at, due_at
+#
+#   - Değerlendirmeler toplu gelir; aynı kartın değerlendirmeleri zaman sırasıyla
+#     tek bir pipeline update'e dönüşür, tüm batch tek bulk_write (okuma yok,
+#     read-modify-write yarışı yok - her kart atomik güncellenir).
+#   - "Sıradaki N kart" (user_id, due_at, card_id) index'i üzerinden sıralı ve
+#     covered sorgu: doküman okunmaz, tarama yok.
+#   - Hiç görülmemiş kartlar: aday listeleri (FlashcardDeck) katalog yüklenirken
+#     sistem başına bir kez çıkarılır. Kullanıcı + sistem başına "sıradaki
+#     görülmemiş" konumu tutulur (bellekte LRU + flashcard_positions): ondan
+#     önceki adayların hepsi görülmüştür, kontrol oradan başlar. Bir kart bir
+#     kez değerlendirilince durumu silinmediği için konum yalnızca ilerler.
+#
+# Notlar (grade): 0-2 unutuldu, 3 zor, 4 iyi, 5 kolay. Flashcards.jsx'teki
+# "biliyorum" = 4, "bilmiyorum" = 1.
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+START_EASE = 2.5
+MIN_EASE = 1.3
+# Aralık üst sınırı - kolay kartlar ease ile üstel büyür
+MAX_INTERVAL_DAYS = int(os.environ.get("SRS_MAX_INTERVAL_DAYS", "3650"))
+_DAY_MS = 24 * 60 * 60 * 1000
+SRS_BULK_SIZE = int(os.environ.get("SRS_BULK_SIZE", "1000"))
+# Offline biriken değerlendirmeler en fazla bu kadar geriye tarihlenebilir
+MAX_REVIEW_AGE = timedelta(days=7)
+# Bellekte tutulan (kullanıcı, sistem) "sıradaki görülmemiş" konumları
+SRS_POSITION_CACHE_SIZE = int(os.environ.get("SRS_POSITION_CACHE_SIZE", "50000"))
+
+
+def ease_delta(grade: int) -> float:
+    miss = 5 - grade
+    return 0.1 - miss * (0.08 + miss * 0.02)
+
+
+def schedule(state: dict, grade: int, reviewed_at: datetime) -> dict:
+    """Tek bir SM-2 adımı (pipeline ile aynı formül; doğrulama ve testler için)"""
+    reps = state.get("reps", 0)
+    interval = state.get("interval", 0)
+    ease = state.get("ease", START_EASE)
+    lapses = state.get("lapses", 0)
+    if grade >= 3:
+        interval = 1 if reps == 0 else 6 if reps == 1 else min(MAX_INTERVAL_DAYS, int(interval * ease + 0.5))
+        reps += 1
+    else:
+        reps, interval, lapses = 0, 1, lapses + 1
+    return {
+        **state,
+        "reps": reps,
+        "interval": interval,
+        "ease": max(MIN_EASE, ease + ease_delta(grade)),
+        "lapses": lapses,
+        "reviews": state.get("reviews", 0) + 1,
+        "last_reviewed_at": reviewed_at,
+        "due_at": reviewed_at + timedelta(days=interval),
+    }
+
+
+def _review_stages(grade: int, reviewed_at: datetime) -> list:
+    """schedule()'in pipeline karşılığı - grade sabit olduğu için dallar Python'da seçilir"""
+    reps = {"$ifNull": ["$reps", 0]}
+    interval = {"$ifNull": ["$interval", 0]}
+    ease = {"$ifNull": ["$ease", START_EASE]}
+    step = {
+        "ease": {"$max": [MIN_EASE, {"$add": [ease, ease_delta(grade)]}]},
+        "reviews": {"$add": [{"$ifNull": ["$reviews", 0]}, 1]},
+        "last_reviewed_at": reviewed_at,
+    }
+    if grade >= 3:
+        step["interval"] = {"$switch": {
+            "branches": [
+                {"case": {"$eq": [reps, 0]}, "then": 1},
+                {"case": {"$eq": [reps, 1]}, "then": 6},
+            ],
+            "default": {"$min": [MAX_INTERVAL_DAYS, {"$floor": {"$add": [{"$multiply": [interval, ease]}, 0.5]}}]},
+        }}
+        step["reps"] = {"$add": [reps, 1]}
+        step["lapses"] = {"$ifNull": ["$lapses", 0]}
+    else:
+        step["interval"] = 1
+        step["reps"] = 0
+        step["lapses"] = {"$add": [{"$ifNull": ["$lapses", 0]}, 1]}
+    return [
+        {"$set": step},
+        {"$set": {"due_at": {"$add": [reviewed_at, {"$multiply": ["$interval", _DAY_MS]}]}}},
+    ]
+
+
+class FlashcardDeck:
+    """Flashcard adayları (sistemi olan terimler) katalog sırasıyla, sistem başına - katalogla birlikte yenilenir"""
+
+    def __init__(self, catalogue):
+        self.version = catalogue.version
+        pools = {None: []}
+        for i, card_id in enumerate(catalogue.ids):
+            system = catalogue.systems[i]
+            if catalogue.kinds[i] == "term" and system:
+                pools[None].append(card_id)
+                pools.setdefault(system, []).append(card_id)
+        self._pools = {system: tuple(ids) for system, ids in pools.items()}
+
+    def candidates(self, system: str = None) -> tuple:
+        return self._pools.get(system or None, ())
+
+
+class SpacedRepetition:
+    def __init__(self, db, bulk_size: int = SRS_BULK_SIZE, position_cache_size: int = SRS_POSITION_CACHE_SIZE):
+        self.cards = db.flashcard_state
+        self.positions = db.flashcard_positions
+        self.bulk_size = bulk_size
+        self.position_cache_size = max(1, position_cache_size)
+        # "<user_id>:<sistem>" → (katalog sürümü, konum)
+        self._positions = OrderedDict()
+
+    async def due_cards(self, user_id: str, limit: int, now: datetime = None) -> list:
+        """Vadesi gelmiş en eski N kart - (user_id, due_at, card_id) index'inden covered okuma"""
+        cursor = self.cards.find(
+            {"user_id": user_id, "due_at": {"$lte": now or datetime.utcnow()}},
+            projection={"_id": 0, "card_id": 1, "due_at": 1},
+        ).sort("due_at", 1).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def _position(self, key: str, version: str) -> int:
+        cached = self._positions.get(key)
+        if cached is None:
+            doc = await self.positions.find_one({"_id": key})
+            cached = (doc.get("version"), doc.get("position", 0)) if doc else (version, 0)
+            self._remember(key, cached)
+        else:
+            self._positions.move_to_end(key)
+        # Katalog değiştiyse aday sırası da değişmiştir
+        return cached[1] if cached[0] == version else 0
+
+    def _remember(self, key: str, entry: tuple):
+        self._positions[key] = entry
+        self._positions.move_to_end(key)
+        while len(self._positions) > self.position_cache_size:
+            self._positions.popitem(last=False)
+
+    async def _advance(self, key: str, version: str, position: int):
+        self._remember(key, (version, position))
+        # Başka worker daha ileri götürmüş olabilir: aynı sürümde yalnızca büyür
+        await self.positions.update_one({"_id": key}, [{"$set": {
+            "position": {"$cond": [{"$eq": ["$version", version]}, {"$max": ["$position", position]}, position]},
+            "version": version,
+        }}], upsert=True)
+
+    async def unseen_cards(self, user_id: str, deck: FlashcardDeck, system: str, limit: int) -> list:
+        """Deste sırasıyla, kullanıcının hiç görmediği ilk N kart - kayıtlı konumdan başlayarak"""
+        candidates = deck.candidates(system)
+        key = f"{user_id}:{system or ''}"
+        start = await self._position(key, deck.version)
+        picked, first_unseen = [], None
+        position, window = start, limit * 2
+        while position < len(candidates) and len(picked) < limit:
+            chunk = candidates[position:position + window]
+            seen = {
+                doc["_id"] for doc in await self.cards.find(
+                    {"_id": {"$in": [f"{user_id}:{card_id}" for card_id in chunk]}}, projection={"_id": 1}
+                ).to_list(None)
+            }
+            for offset, card_id in enumerate(chunk):
+                if f"{user_id}:{card_id}" not in seen:
+                    if first_unseen is None:
+                        first_unseen = position + offset
+                    picked.append(card_id)
+                    if len(picked) == limit:
+                        break
+            position += len(chunk)
+        # Gösterilen ama değerlendirilmeyen kartlar görülmemiş sayılır: konum ilkinde durur
+        if first_unseen is None:
+            first_unseen = position
+        if first_unseen > start:
+            await self._advance(key, deck.version, first_unseen)
+        return picked
+
+    def build_operations(self, user_id: str, reviews: list, now: datetime = None) -> list:
+        """reviews: [{"card_id", "grade", "reviewed_at"?}] → kart başına bir UpdateOne (upsert)"""
+        now = now or datetime.utcnow()
+        per_card = {}
+        for review in reviews:
+            at = review.get("reviewed_at") or now
+            if at.tzinfo is not None:
+                at = (at - at.utcoffset()).replace(tzinfo=None)
+            at = min(max(at, now - MAX_REVIEW_AGE), now)
+            per_card.setdefault(review["card_id"], []).append((at, review["grade"]))
+
+        operations = []
+        for card_id, card_reviews in per_card.items():
+            pipeline = [{"$set": {"user_id": user_id, "card_id": card_id}}]
+            for at, grade in sorted(card_reviews, key=lambda item: item[0]):
+                pipeline += _review_stages(grade, at)
+            operations.append(UpdateOne({"_id": f"{user_id}:{card_id}"}, pipeline, upsert=True))
+        return operations
+
+    async def apply_reviews(self, user_id: str, reviews: list) -> int:
+        operations = self.build_operations(user_id, reviews)
+        for start in range(0, len(operations), self.bulk_size):
+            await self.cards.bulk_write(operations[start:start + self.bulk_size], ordered=False)
+        return len(reviews)
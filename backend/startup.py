@@ -0,0 +1,202 @@
+# backend/startup.py
+#
+# Soğuk başlangıç: process'in trafiğe hazır olana kadar geçen süresinin fazlara
+# göre ölçümü ve ağır bağımlılıkların (user_agents ~300ms, jwt + cryptography
+# ~100ms, bcrypt) ilk kullanımda yüklenmesi.
+#
+# server.py bu modülü ilk import eder; import bölümü boyunca server.py'nin
+# doğrudan import ettiği her modülün (alt bağımlılıkları dahil) süresi, ardından
+# modül bölümleri (mark) ve lifespan adımları (phase) kaydedilir. Import takibi
+# builtins.__import__'u değiştirir; yalnızca server.py'nin import bloğunda (with)
+# açıktır - server'ı import eden script/test/benchmark'larda kalıcı olmaz. Hazır
+# olunca tek satır özet loglanır; ayrıntı GET /api/auth/debug-startup.
+#
+#   python startup.py             # server'ı import et, lifespan startup'ı çalıştır, raporu bas
+#
+#   STARTUP_WARMUP=1              (hazır olduktan sonra tembel modülleri arka planda yükle;
+#                                  0 = ilk kullanan istek yükler)
+import asyncio
+import builtins
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger("healthlex.startup")
+
+STARTUP_WARMUP = os.environ.get("STARTUP_WARMUP", "1").lower() in ("1", "true", "yes")
+
+
+class StartupProfiler:
+    """Import, modül bölümleri ve lifespan adımları için süre kaydı (ms)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lap = self.started
+        self.phases = []
+        self.imports = {}
+        self.lazy = {}
+        self.ready_ms = None
+        self._import_depth = 0
+        self._original_import = None
+
+    def trace_imports(self) -> "_ImportTrace":
+        """Üst düzey import'ların süresini topla - with bloğu bitince (ya da ready()) bırakılır"""
+        if self._original_import is not None:
+            # Zaten açık (ör. python startup.py): iç blok dıştakini kapatmasın
+            return _ImportTrace(self, owner=False)
+        original = self._original_import = builtins.__import__
+        main_thread = threading.main_thread()
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # Yalnızca en dıştaki import ölçülür; iç içe olanlar onun süresine dahil
+            if self._import_depth or level or name in sys.modules or threading.current_thread() is not main_thread:
+                return original(name, globals, locals, fromlist, level)
+            self._import_depth += 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._import_depth -= 1
+                self.imports[name] = self.imports.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+        builtins.__import__ = timed_import
+        return _ImportTrace(self, owner=True)
+
+    def _stop_tracing(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, name: str):
+        """Önceki mark'tan (ya da başlangıçtan) bu yana geçen süre `name` fazına yazılır"""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._lap) * 1000))
+        self._lap = now
+
+    def phase(self, name: str):
+        """with profiler.phase("..."): - lifespan adımları; öncesindeki boşluk ayrı yazılır"""
+        return _Phase(self, name)
+
+    def ready(self):
+        """Trafik kabul edilmeye hazır - import takibini bırak, özeti logla"""
+        if self.ready_ms is not None:
+            return
+        self._stop_tracing()
+        self.ready_ms = (time.perf_counter() - self.started) * 1000
+        slowest = sorted(self.phases, key=lambda p: -p[1])[:4]
+        logger.info("⏱️ Hazır: %.0fms (%s)", self.ready_ms,
+                    ", ".join(f"{name} {ms:.0f}ms" for name, ms in slowest))
+
+    def record_lazy(self, name: str, ms: float, during_startup: bool):
+        self.lazy[name] = {"ms": round(ms, 1), "during_startup": during_startup}
+
+    def report(self, top_imports: int = 15) -> dict:
+        imports = sorted(self.imports.items(), key=lambda item: -item[1])
+        return {
+            "ready_ms": round(self.ready_ms, 1) if self.ready_ms is not None else None,
+            "phases": [{"name": name, "ms": round(ms, 1)} for name, ms in self.phases],
+            "imports_ms": round(sum(ms for _, ms in imports), 1),
+            "slowest_imports": [{"module": name, "ms": round(ms, 1)} for name, ms in imports[:top_imports]],
+            "lazy_modules": self.lazy,
+        }
+
+
+class _ImportTrace:
+    def __init__(self, profiler: StartupProfiler, owner: bool):
+        self.profiler = profiler
+        self.owner = owner
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # Import hata verse de builtins.__import__ geri yüklenir
+        if self.owner:
+            self.profiler._stop_tracing()
+        return False
+
+
+class _Phase:
+    def __init__(self, profiler: StartupProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        # Önceki mark/phase ile bu adım arasındaki süre (ör. uvicorn kurulumu) kaybolmasın
+        if time.perf_counter() - self.profiler._lap > 0.001:
+            self.profiler.mark(f"before {self.name}")
+        else:
+            self.profiler._lap = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.mark(self.name)
+        return False
+
+
+startup_profiler = StartupProfiler()
+
+
+class LazyModule:
+    """Öznitelik ilk okunduğunda import edilen modül vekili"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(self._name)
+            if self._module is None:
+                startup_profiler.record_lazy(self._name, (time.perf_counter() - started) * 1000,
+                                             during_startup=startup_profiler.ready_ms is None)
+                self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._module or self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+_lazy_modules = {}
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Aynı ad için aynı vekil - warm_up() hepsini bir kez yükler"""
+    module = _lazy_modules.get(name)
+    if module is None:
+        module = _lazy_modules[name] = LazyModule(name)
+    return module
+
+
+async def warm_up():
+    """Henüz yüklenmemiş tembel modülleri sırayla thread'de yükle (hazır olduktan sonra)"""
+    for module in list(_lazy_modules.values()):
+        if module._module is None:
+            try:
+                await asyncio.to_thread(module.load)
+            except Exception as e:
+                logger.warning("⚠️ %s önceden yüklenemedi: %s", module._name, e)
+
+
+async def _main():
+    import json
+
+    import server
+
+    async with server.lifespan(server.app):
+        print(json.dumps(startup_profiler.report(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    # server'ın import ettiği startup ile bu modül aynı olsun (yoksa __main__ ayrı bir kopya)
+    sys.modules.setdefault("startup", sys.modules["__main__"])
+    startup_profiler.trace_imports()
+    asyncio.run(_main())
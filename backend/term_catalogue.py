@@ -0,0 +1,318 @@
+# backend/term_catalogue.py
+#
+# Tıbbi terim kataloğu: frontend/src/data altındaki JS dosyaları startup'ta bir kez
+# okunur, kompakt sütunlu listelere çevrilir ve trigram index'i kurulur.
+# Arama: her sorgu kelimesi için en kısa posting listesi taranır, aday doğrudan
+# normalize metin üzerinde doğrulanır ve alana göre puanlanır.
+import hashlib
+import json
+import os
+import re
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+TERMS_DATA_DIR = Path(os.environ.get(
+    "TERMS_DATA_DIR",
+    Path(__file__).resolve().parent.parent / "frontend" / "src" / "data"
+))
+
+# Son sorguların sıralı sonuçları (sayfalama ve popüler kısa önekler için)
+TERMS_RANKING_CACHE_SIZE = int(os.environ.get("TERMS_RANKING_CACHE_SIZE", "256"))
+
+# Aranan alanlar (sırası puanlamada kullanılır)
+FIELDS = ("term", "turkish", "roots", "definition")
+_FIELD_SEP = "\x00"
+
+# Türkçe büyük/küçük harf: İ/I/ı/i hepsi aynı anahtara katlanır ("İskelet" ~ "iskelet",
+# "Ischi/o" ~ "ischi"); Python'un varsayılan lower()'ı "İ"yi "i̇" (noktalı) yapar
+_TURKISH_FOLD = str.maketrans({"İ": "i", "I": "i", "ı": "i", "̇": None, "/": None})
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def fold(text: str) -> str:
+    """Arama anahtarı: Türkçe harf katlama + küçük harf + noktalama → boşluk"""
+    return _NON_WORD.sub(" ", text.translate(_TURKISH_FOLD).casefold().translate(_TURKISH_FOLD)).strip()
+
+
+# =====================
+# JS DATA LOADER
+# =====================
+
+class _JsLiteralParser:
+    """Frontend veri dosyalarındaki JS obje/dizi literal'lerini Python'a çevirir"""
+
+    _TOKEN = re.compile(r"""
+        \s+ | //[^\n]* | /\*.*?\*/                      # boşluk ve yorumlar (atlanır)
+        | (?P<str>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")
+        | (?P<num>-?\d+(?:\.\d+)?)
+        | (?P<ident>[A-Za-z_$][\w$]*)
+        | (?P<punct>[{}\[\]:,])
+    """, re.VERBOSE | re.DOTALL)
+
+    def __init__(self, source: str, pos: int = 0):
+        self.source = source
+        self.pos = pos
+        self._peeked = None
+
+    def _next(self):
+        if self._peeked is not None:
+            token, self._peeked = self._peeked, None
+            return token
+        while True:
+            match = self._TOKEN.match(self.source, self.pos)
+            if not match:
+                raise ValueError(f"Unexpected JS syntax at {self.pos}: {self.source[self.pos:self.pos + 30]!r}")
+            self.pos = match.end()
+            if match.lastgroup:
+                return match.lastgroup, match.group(match.lastgroup)
+
+    def _peek(self):
+        if self._peeked is None:
+            self._peeked = self._next()
+        return self._peeked[1]
+
+    def value(self):
+        kind, text = self._next()
+        if text == "{":
+            result = {}
+            while self._peek() != "}":
+                _, key = self._next()
+                key = _js_string(key) if key[0] in "'\"" else key
+                if self._next()[1] != ":":
+                    raise ValueError(f"Expected ':' after key {key!r}")
+                result[key] = self.value()
+                if self._peek() == ",":
+                    self._next()
+            self._next()
+            return result
+        if text == "[":
+            result = []
+            while self._peek() != "]":
+                result.append(self.value())
+                if self._peek() == ",":
+                    self._next()
+            self._next()
+            return result
+        if kind == "str":
+            return _js_string(text)
+        if kind == "num":
+            return float(text) if "." in text else int(text)
+        if text in ("true", "false", "null"):
+            return {"true": True, "false": False, "null": None}[text]
+        raise ValueError(f"Unsupported JS value: {text}")
+
+
+def _js_string(text: str) -> str:
+    if text[0] == '"':
+        return json.loads(text)
+    inner = re.sub(r'(?<!\\)"', '\\"', text[1:-1].replace("\\'", "'"))
+    return json.loads('"' + inner + '"')
+
+
+def load_js_export(path: Path, name: str):
+    """`export const <name> = <literal>;` değerini oku"""
+    source = path.read_text(encoding="utf-8")
+    match = re.search(rf"export\s+const\s+{re.escape(name)}\s*=\s*", source)
+    if not match:
+        raise ValueError(f"{name} not found in {path}")
+    # Sadece literal okunur; dosyanın geri kalanındaki yardımcı fonksiyonlara dokunulmaz
+    return _JsLiteralParser(source, match.end()).value()
+
+
+def load_source_records(data_dir: Path = TERMS_DATA_DIR) -> list:
+    """Dört frontend veri dosyasını tek bir kayıt listesine normalize et"""
+    records = []
+
+    for item in load_js_export(data_dir / "medicalData.js", "medicalTerms"):
+        records.append({
+            "id": str(item["id"]), "kind": "term", "term": item["term"], "turkish": item.get("meaning", ""),
+            "roots": "", "definition": "", "system": item.get("system", ""), "category": item.get("category", ""),
+        })
+
+    for category, items in load_js_export(data_dir / "medicalTerms.js", "medicalTermsData").items():
+        for item in items:
+            records.append({
+                "id": f"ct-{item['id']}", "kind": "term", "term": item["term"], "turkish": item.get("turkish", ""),
+                "roots": item.get("roots", ""), "definition": item.get("definition", ""),
+                "system": "", "category": item.get("category", category),
+            })
+
+    for system in load_js_export(data_dir / "medicalRoots.js", "medicalRoots"):
+        for subcategory in system["subcategories"]:
+            for item in subcategory["roots"]:
+                records.append({
+                    "id": str(item["id"]), "kind": "root", "term": item["root"], "turkish": item.get("meaning", ""),
+                    "roots": "", "definition": "", "system": system["system"], "category": subcategory["name"],
+                })
+
+    for group in load_js_export(data_dir / "medicalPrefixes.js", "medicalPrefixes"):
+        for item in group["prefixes"]:
+            records.append({
+                "id": str(item["id"]), "kind": "prefix", "term": item["prefix"], "turkish": item.get("meaning", ""),
+                "roots": "", "definition": "", "system": "", "category": group["category"],
+            })
+
+    return records
+
+
+# =====================
+# CATALOGUE + INDEX
+# =====================
+
+# Alan + eşleşme tipine göre puan (yüksek = daha alakalı)
+_SCORES = {
+    "term": (100, 80, 60, 40),  # tam eşleşme, başlangıç, kelime başı, içerir
+    "turkish": (50, 35, 30, 20),
+    "roots": (25, 20, 15, 10),
+    "definition": (12, 10, 8, 5),
+}
+
+
+class TermCatalogue:
+    """Sütunlu, salt okunur terim kataloğu + trigram index"""
+
+    def __init__(self, records: list):
+        self.version = hashlib.sha1(json.dumps(records, sort_keys=True).encode()).hexdigest()[:12]
+        # Kayıtlar statik sıraya dizilir (kısa terim önce, sonra alfabetik): posting listeleri
+        # artan sırada olduğu için eşit puanlı sonuçlarda ek sıralama anahtarı gerekmez
+        docs = [_FIELD_SEP.join(fold(r[f]) for f in FIELDS) for r in records]
+        order = sorted(range(len(records)), key=lambda i: (len(docs[i].split(_FIELD_SEP, 1)[0]), docs[i]))
+        records = [records[i] for i in order]
+        self.docs = [docs[i] for i in order]
+
+        self.ids = [r["id"] for r in records]
+        self.kinds = [r["kind"] for r in records]
+        self.systems = [r["system"] for r in records]
+        self.categories = [r["category"] for r in records]
+        self.fields = {f: [r[f] for r in records] for f in FIELDS}
+        self.position = {term_id: i for i, term_id in enumerate(self.ids)}
+
+        self._rankings = OrderedDict()
+        self._trigrams = {}
+        self._initials = {}
+        for i, doc in enumerate(self.docs):
+            for gram in _doc_trigrams(doc):
+                postings = self._trigrams.get(gram)
+                if postings is None:
+                    postings = self._trigrams[gram] = array("I")
+                postings.append(i)
+            term_key = doc.split(_FIELD_SEP, 1)[0]
+            if term_key:
+                self._initials.setdefault(term_key[0], array("I")).append(i)
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path = TERMS_DATA_DIR) -> "TermCatalogue":
+        return cls(load_source_records(data_dir))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def record(self, i: int) -> dict:
+        data = {"id": self.ids[i], "kind": self.kinds[i], "system": self.systems[i], "category": self.categories[i]}
+        for f in FIELDS:
+            data[f] = self.fields[f][i]
+        return data
+
+    def get(self, term_id: str):
+        i = self.position.get(term_id)
+        return None if i is None else self.record(i)
+
+    def _postings(self, word: str):
+        if len(word) == 1:
+            return self._initials.get(word, ())
+        grams = [" " + word[:2]] if len(word) == 2 else _word_trigrams(word)
+        smallest = None
+        for gram in grams:
+            postings = self._trigrams.get(gram)
+            if postings is None:
+                return ()
+            if smallest is None or len(postings) < len(smallest):
+                smallest = postings
+        return smallest
+
+    def search(self, query: str, system: str = None, kind: str = None, offset: int = 0, limit: int = 20):
+        """(toplam eşleşme, sıralı sayfa) döndürür - boş sorgu filtreye uyan her şeyi listeler"""
+        words = frozenset(fold(query).split())
+        key = (words, system, kind)
+        ranking = self._rankings.get(key)
+        if ranking is None:
+            ranking = self._rank(words, system, kind)
+            self._rankings[key] = ranking
+            if len(self._rankings) > TERMS_RANKING_CACHE_SIZE:
+                self._rankings.popitem(last=False)
+        else:
+            self._rankings.move_to_end(key)
+        return len(ranking), [self.record(i) for i in ranking[offset:offset + limit]]
+
+    def _rank(self, words: frozenset, system: str, kind: str):
+        if not words:
+            candidates = range(len(self.ids))
+        else:
+            # Tüm kelimeler eşleşmek zorunda: en kısa posting listesi aday kümesidir
+            candidates = min((self._postings(word) for word in words), key=len)
+        if system or kind:
+            candidates = array("I", (i for i in candidates
+                                     if (not system or self.systems[i] == system) and (not kind or self.kinds[i] == kind)))
+
+        if not words or (len(words) == 1 and len(next(iter(words))) == 1):
+            # Boş sorgu / tek harf: her aday terim başında eşleşir, statik sıra zaten doğru sıra
+            return candidates
+
+        scored = []
+        docs = self.docs
+        for i in candidates:
+            score = _score(docs[i], words)
+            if score:
+                scored.append((-score, i))
+        scored.sort()
+        return array("I", (i for _, i in scored))
+
+    def systems_summary(self) -> list:
+        counts = {}
+        for system in self.systems:
+            if system:
+                counts[system] = counts.get(system, 0) + 1
+        return [{"system": name, "count": counts[name]} for name in sorted(counts)]
+
+
+def _doc_trigrams(doc: str):
+    grams = set()
+    for field_text in doc.split(_FIELD_SEP):
+        padded = " " + field_text
+        for j in range(len(padded) - 2):
+            grams.add(padded[j:j + 3])
+    return grams
+
+
+def _word_trigrams(word: str):
+    return [word[j:j + 3] for j in range(len(word) - 2)]
+
+
+def _score(doc: str, words: list) -> int:
+    """Tüm kelimeler eşleşmeli (AND); her kelime için en iyi alan puanı toplanır"""
+    if not words:
+        return 1
+    field_texts = doc.split(_FIELD_SEP)
+    total = 0
+    for word in words:
+        best = 0
+        for field, text in zip(FIELDS, field_texts):
+            position = text.find(word)
+            if position == -1:
+                continue
+            exact, starts, word_start, contains = _SCORES[field]
+            if text == word:
+                points = exact
+            elif position == 0:
+                points = starts
+            elif text[position - 1] == " " or (" " + word) in text:
+                points = word_start
+            else:
+                points = contains
+            if points > best:
+                best = points
+        if not best:
+            return 0
+        total += best
+    return total
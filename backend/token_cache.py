@@ -0,0 +1,96 @@
+# backend/token_cache.py
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+ACCESS_TOKEN_CACHE_SIZE = int(os.environ.get("ACCESS_TOKEN_CACHE_SIZE", "10000"))
+
+
+def cache_key(token: str) -> bytes:
+    """Cache anahtarı - token'ın kendisini bellekte tutmamak için SHA-256 digest"""
+    return hashlib.sha256(token.encode()).digest()
+
+
+class AccessTokenCache:
+    """Doğrulanmış access token'lar için sınırlı LRU - kayıtlar token'ın exp anında düşer"""
+
+    def __init__(self, max_size: int = ACCESS_TOKEN_CACHE_SIZE):
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[tuple]:
+        """(user_id, sid, iat) - iptal kontrolü cache isabetinde de yapılabilsin"""
+        key = cache_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        exp, claims = entry
+        if time.time() >= exp:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, user_id: str, exp: float, sid: Optional[str] = None, iat: Optional[float] = None):
+        key = cache_key(token)
+        self._entries[key] = (exp, (user_id, sid, iat))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class TTLCache:
+    """Sınırlı, süreli küçük cache - kayıtlar ttl saniye sonra düşer"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._entries: "OrderedDict[object, tuple]" = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires = entry
+        if time.monotonic() >= expires:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,405 @@
+# backend/token_janitor.py
+#
+# refresh_tokens temizliği (TTL index'lerinin yerine): süresi dolmuş ve 90 günden
+# eski token'lar - TTL index'leriyle aynı kurallar - index'li aralık sorgularıyla
+# (expires_at < şimdi, created_at < şimdi - 90 gün) sabit boyutlu pencereler
+# halinde bulunur ve küçük batch'lerle silinir (istenirse önce arşivlenir).
+# Canlı token'lar hiç okunmaz; bir tur silinecek doküman sayısıyla orantılıdır.
+# TTL monitörünün aksine hızın bir tavanı vardır; silme batch'leri yavaşlarsa
+# batch küçülür ve janitor geri çekilir, replikasyon gecikmesi yükselirse
+# düşene kadar bekler.
+#
+# Her pencereden sonra janitor_state'e checkpoint (sıradaki kural) yazılır:
+# silinen dokümanlar sorgudan düştüğü için process yeniden başlarsa tur aynı
+# kuraldan devam eder. Aynı doküman bir kiralamadır - birden çok worker'da açık
+# olsa da aynı anda yalnızca biri temizler.
+#
+#   python token_janitor.py                     # tek tur, sonra çık
+#   python token_janitor.py --loop              # sürekli (sunucudan ayrı process)
+#   python token_janitor.py --dry-run           # silmeden say
+#   python token_janitor.py --drop-ttl-indexes  # eski TTL index'lerini sil (bir kez)
+#
+#   TOKEN_JANITOR=1                  (sunucu içinde çalıştır; 0 = TTL index'leri temizler,
+#                                     mongo_indexes.py onları kurar)
+#   JANITOR_INTERVAL_S=900           (turlar arası bekleme)
+#   JANITOR_SCAN_BATCH=5000          (pencere başına okunan silinecek _id)
+#   JANITOR_DELETE_BATCH=500         (tek delete_many'deki en fazla doküman)
+#   JANITOR_MAX_DELETES_PER_S=2000   (hız tavanı)
+#   JANITOR_MAX_BATCH_MS=250         (silme batch'i bundan yavaşsa küçült + bekle)
+#   JANITOR_MAX_REPL_LAG_S=10        (secondary'ler bundan fazla gerideyse bekle)
+#   JANITOR_ARCHIVE_COLLECTION=      (boş değilse silinenler önce buraya; token özeti hariç)
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger("healthlex.janitor")
+
+TOKEN_JANITOR = os.environ.get("TOKEN_JANITOR", "1").lower() in ("1", "true", "yes")
+JANITOR_INTERVAL_S = float(os.environ.get("JANITOR_INTERVAL_S", "900"))
+JANITOR_SCAN_BATCH = int(os.environ.get("JANITOR_SCAN_BATCH", "5000"))
+JANITOR_DELETE_BATCH = int(os.environ.get("JANITOR_DELETE_BATCH", "500"))
+JANITOR_MAX_DELETES_PER_S = float(os.environ.get("JANITOR_MAX_DELETES_PER_S", "2000"))
+JANITOR_MAX_BATCH_MS = float(os.environ.get("JANITOR_MAX_BATCH_MS", "250"))
+JANITOR_MAX_REPL_LAG_S = float(os.environ.get("JANITOR_MAX_REPL_LAG_S", "10"))
+JANITOR_ARCHIVE_COLLECTION = os.environ.get("JANITOR_ARCHIVE_COLLECTION", "")
+
+# Janitor kapalıyken aynı işi yapan TTL index'leri (bkz. mongo_indexes.py; --drop-ttl-indexes)
+LEGACY_TTL_INDEXES = ("token_expiry_ttl", "inactive_tokens_immediate_ttl", "old_tokens_cleanup_ttl")
+MAX_TOKEN_AGE = timedelta(days=90)
+
+_LEASE_SECONDS = 120
+_MIN_DELETE_BATCH = 50
+_REPL_CHECK_INTERVAL = 5.0
+# Kural (checkpoint adı) → index'li alan, uygulama sırasıyla. Pencereler yalnızca _id okur
+_RULE_FIELDS = {"expired": "expires_at", "max_age": "created_at"}
+
+
+def garbage_filter(now: datetime) -> dict:
+    """Silinecek token'lar; silme sırasında sunucu tarafında yeniden doğrulanır
+
+    TTL index'leriyle aynı: süresi dolan (aktif olsun olmasın) ve 90 günden eski
+    token'lar. Logout / rotate edilmiş token'lar süreleri dolana kadar kalır.
+    """
+    return {"$or": [
+        {"expires_at": {"$lt": now}},
+        {"created_at": {"$lt": now - MAX_TOKEN_AGE}},
+    ]}
+
+
+def rule_filter(rule: str, now: datetime) -> dict:
+    """garbage_filter'ın tek bir index'le çalışan kolu"""
+    if rule == "expired":
+        return {"expires_at": {"$lt": now}}
+    return {"created_at": {"$lt": now - MAX_TOKEN_AGE}}
+
+
+class TokenJanitor:
+    """refresh_tokens'ı index'li kural pencereleriyle, hız tavanı ve geri çekilmeyle temizler"""
+
+    def __init__(
+        self,
+        db,
+        collection: str = "refresh_tokens",
+        state_collection: str = "janitor_state",
+        interval: float = JANITOR_INTERVAL_S,
+        scan_batch: int = JANITOR_SCAN_BATCH,
+        delete_batch: int = JANITOR_DELETE_BATCH,
+        max_rate: float = JANITOR_MAX_DELETES_PER_S,
+        max_batch_ms: float = JANITOR_MAX_BATCH_MS,
+        max_repl_lag: float = JANITOR_MAX_REPL_LAG_S,
+        archive_collection: str = JANITOR_ARCHIVE_COLLECTION,
+        dry_run: bool = False,
+    ):
+        self.db = db
+        self.collection = collection
+        self.state_collection = state_collection
+        self.interval = interval
+        self.scan_batch = max(1, scan_batch)
+        self.max_delete_batch = max(_MIN_DELETE_BATCH, delete_batch)
+        self.max_rate = max_rate
+        self.max_batch_ms = max_batch_ms
+        self.max_repl_lag = max_repl_lag
+        self.archive_collection = archive_collection or None
+        self.dry_run = dry_run
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+        # Uyarlanan batch boyutu: yavaş batch'te yarıya, hızlıda yavaş yavaş büyür
+        self.delete_batch = self.max_delete_batch
+        self.checkpoint = None
+        self.examined = 0
+        self.deleted = 0
+        self.archived = 0
+        self.passes = 0
+        self.errors = 0
+        self.pauses = {"latency": 0, "repl_lag": 0}
+        self.paused_seconds = 0.0
+        self.paused_reason = None
+        self.delete_rate = 0.0
+        self.last_batch_ms = 0.0
+        self.last_pass = None
+        # None = ölçülemiyor (standalone ya da yetki yok) - kontrol kapalı
+        self.repl_lag = None
+        self._repl_checks = True
+        self._next_repl_check = 0.0
+        self._stopping = False
+        self._task = None
+
+    # ---- kiralama + checkpoint ----
+
+    async def _acquire(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        try:
+            return await self.db[self.state_collection].find_one_and_update(
+                {"_id": self.collection,
+                 "$or": [{"owner": self.owner}, {"owner": None}, {"lease_until": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "lease_until": now + timedelta(seconds=_LEASE_SECONDS)}},
+                upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return None  # başka bir worker tutuyor
+
+    async def _save(self, run: dict, finished: bool = False) -> bool:
+        """Checkpoint + kiralamayı uzat; kiralama kaybedildiyse False"""
+        now = datetime.utcnow()
+        fields = {"checkpoint": self.checkpoint, "pass": run}
+        if finished:
+            fields.update({"checkpoint": None, "pass": None, "last_pass": run, "owner": None, "lease_until": now})
+        else:
+            fields["lease_until"] = now + timedelta(seconds=_LEASE_SECONDS)
+        result = await self.db[self.state_collection].update_one(
+            {"_id": self.collection, "owner": self.owner}, {"$set": fields})
+        return result.matched_count == 1
+
+    # ---- geri çekilme ----
+
+    async def _replication_lag(self) -> Optional[float]:
+        try:
+            status = await self.db.client.admin.command("replSetGetStatus")
+        except OperationFailure as e:
+            # NoReplicationEnabled / Unauthorized: ölçülemiyor, bir daha sorma
+            self._repl_checks = False
+            logger.info("ℹ️ Replikasyon gecikmesi izlenmiyor: %s", e)
+            return None
+        members = status.get("members", [])
+        primary = next((m for m in members if m.get("stateStr") == "PRIMARY"), None)
+        if primary is None:
+            return None
+        lags = [(primary["optimeDate"] - m["optimeDate"]).total_seconds()
+                for m in members if m.get("stateStr") == "SECONDARY" and "optimeDate" in m]
+        return max(lags, default=0.0)
+
+    async def _wait_for_replication(self):
+        if not self._repl_checks or time.monotonic() < self._next_repl_check:
+            return
+        while not self._stopping:
+            self.repl_lag = await self._replication_lag()
+            self._next_repl_check = time.monotonic() + _REPL_CHECK_INTERVAL
+            if self.repl_lag is None or self.repl_lag <= self.max_repl_lag:
+                self.paused_reason = None
+                return
+            if self.paused_reason != "repl_lag":
+                self.pauses["repl_lag"] += 1
+                logger.warning("⏸️ Janitor bekliyor: replikasyon gecikmesi %.1fs", self.repl_lag)
+            self.paused_reason = "repl_lag"
+            await self._pause(_REPL_CHECK_INTERVAL)
+
+    async def _pause(self, seconds: float):
+        self.paused_seconds += seconds
+        await asyncio.sleep(seconds)
+
+    async def _delete(self, ids: list, now: datetime) -> int:
+        """Bir batch'i sil; süresine göre batch boyutunu uyarla ve hız tavanına göre bekle"""
+        started = time.monotonic()
+        if self.archive_collection:
+            await self._archive(ids)
+        result = await self.db[self.collection].delete_many(
+            {"_id": {"$in": ids}, **garbage_filter(now)})
+        elapsed = time.monotonic() - started
+        self.last_batch_ms = elapsed * 1000
+
+        if self.last_batch_ms > self.max_batch_ms:
+            # Mongo zorlanıyor: yarıya in, batch süresinin iki katı kadar nefes ver
+            self.delete_batch = max(_MIN_DELETE_BATCH, self.delete_batch // 2)
+            if self.paused_reason != "latency":
+                self.pauses["latency"] += 1
+            self.paused_reason = "latency"
+            await self._pause(elapsed * 2)
+        else:
+            self.paused_reason = None
+            if self.last_batch_ms < self.max_batch_ms / 2:
+                self.delete_batch = min(self.max_delete_batch, int(self.delete_batch * 1.25) + 1)
+        # Hız tavanı: bu batch en az n / max_rate saniye sürmeli
+        if self.max_rate > 0:
+            await asyncio.sleep(max(0.0, len(ids) / self.max_rate - (time.monotonic() - started)))
+        self.delete_rate = result.deleted_count / max(time.monotonic() - started, 1e-6)
+        return result.deleted_count
+
+    async def _archive(self, ids: list):
+        docs = await self.db[self.collection].find({"_id": {"$in": ids}}, projection={"token": 0}).to_list(None)
+        if not docs:
+            return
+        try:
+            await self.db[self.archive_collection].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Yarıda kalmış bir pencere tekrar işleniyor: zaten arşivlenmiş olanlar
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+        self.archived += len(docs)
+
+    # ---- tur ----
+
+    async def run_pass(self) -> Optional[dict]:
+        """Kuralları checkpoint'ten başlayarak eşleşen kalmayana kadar uygula; kiralama alınamazsa None"""
+        if self.dry_run:
+            state = {}
+        else:
+            state = await self._acquire()
+            if state is None:
+                return None
+        self.checkpoint = state.get("checkpoint")
+        run = state.get("pass") if self.checkpoint is not None else None
+        run = run or {"started_at": datetime.utcnow(), "examined": 0, "deleted": 0, "seconds": 0.0}
+        started = time.monotonic() - run["seconds"]
+        collection = self.db[self.collection]
+
+        if self.dry_run:
+            # $or'un iki kolu da index'li: silinecek her doküman bir kez sayılır
+            count = await collection.count_documents(garbage_filter(datetime.utcnow()))
+            run["examined"] += count
+            run["deleted"] += count
+            self.examined += count
+        rules = [] if self.dry_run else list(_RULE_FIELDS)
+        if self.checkpoint in rules:
+            rules = rules[rules.index(self.checkpoint):]
+
+        for rule in rules:
+            self.checkpoint = rule
+            while not self._stopping:
+                now = datetime.utcnow()
+                window = await collection.find(rule_filter(rule, now), projection={"_id": 1}) \
+                    .sort(_RULE_FIELDS[rule], 1).limit(self.scan_batch).to_list(self.scan_batch)
+                if not window:
+                    break
+                ids = [doc["_id"] for doc in window]
+                run["examined"] += len(ids)
+                self.examined += len(ids)
+
+                deleted_in_window = 0
+                while ids:
+                    await self._wait_for_replication()
+                    if self._stopping:
+                        break
+                    batch, ids = ids[:self.delete_batch], ids[self.delete_batch:]
+                    deleted = await self._delete(batch, now)
+                    deleted_in_window += deleted
+                    run["deleted"] += deleted
+                    self.deleted += deleted
+
+                run["seconds"] = time.monotonic() - started
+                if not await self._save(run):
+                    logger.warning("⚠️ Janitor kiralaması kaybedildi, tur bırakılıyor")
+                    return None
+                if not deleted_in_window:
+                    break  # başka biri (ör. geçiş sırasındaki TTL monitörü) sildi; sonsuz döngü olmasın
+            if self._stopping:
+                break
+
+        run["seconds"] = round(time.monotonic() - started, 3)
+        if self._stopping:
+            return None
+        run["finished_at"] = datetime.utcnow()
+        run["deleted_per_s"] = round(run["deleted"] / max(run["seconds"], 1e-6), 1)
+        self.passes += 1
+        self.last_pass = run
+        if not self.dry_run:
+            await self._save(run, finished=True)
+        self.checkpoint = None
+        return run
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                run = await self.run_pass()
+                if run is not None:
+                    logger.info("🧹 Janitor turu: %d incelendi, %d silindi (%.1fs, %.0f/s)",
+                                run["examined"], run["deleted"], run["seconds"], run["deleted_per_s"])
+            except Exception as e:
+                self.errors += 1
+                logger.warning("⚠️ Janitor hatası: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "checkpoint": str(self.checkpoint) if self.checkpoint is not None else None,
+            "examined": self.examined,
+            "deleted": self.deleted,
+            "archived": self.archived,
+            "passes": self.passes,
+            "errors": self.errors,
+            "delete_rate": round(self.delete_rate, 1),
+            "delete_batch": self.delete_batch,
+            "last_batch_ms": round(self.last_batch_ms, 1),
+            "paused_reason": self.paused_reason,
+            "pauses": dict(self.pauses),
+            "paused_seconds": round(self.paused_seconds, 1),
+            "replication_lag_s": self.repl_lag,
+            "last_pass": self.last_pass,
+        }
+
+
+async def drop_legacy_ttl_indexes(db, collection: str = "refresh_tokens") -> list:
+    existing = await db[collection].index_information()
+    dropped = []
+    for name in LEGACY_TTL_INDEXES:
+        if name in existing:
+            await db[collection].drop_index(name)
+            dropped.append(name)
+    return dropped
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="refresh_tokens janitor")
+    parser.add_argument("--loop", action="store_true", help="turları sürekli çalıştır")
+    parser.add_argument("--dry-run", action="store_true", help="silmeden say")
+    parser.add_argument("--rate", type=float, default=JANITOR_MAX_DELETES_PER_S, help="saniyede en fazla silme")
+    parser.add_argument("--drop-ttl-indexes", action="store_true", help=f"{', '.join(LEGACY_TTL_INDEXES)} sil")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
+    db = client[os.environ.get("DB_NAME")]
+    try:
+        if args.drop_ttl_indexes:
+            if not TOKEN_JANITOR:
+                print("❌ TOKEN_JANITOR=0: temizliği TTL index'leri yapıyor, silinmedi")
+                sys.exit(1)
+            dropped = await drop_legacy_ttl_indexes(db)
+            print(f"🗑️  Silinen TTL index'leri: {', '.join(dropped) or 'yok'}")
+            return
+        janitor = TokenJanitor(db, max_rate=args.rate, dry_run=args.dry_run)
+        if args.loop:
+            await janitor._run()
+            return
+        run = await janitor.run_pass()
+        if run is None:
+            print("⏭️  Başka bir janitor çalışıyor (kiralama dolu)")
+            sys.exit(1)
+        print(f"{'🔎 (dry-run) ' if args.dry_run else '✅ '}{run['examined']} incelendi, "
+              f"{run['deleted']} {'silinecek' if args.dry_run else 'silindi'} "
+              f"({run['seconds']:.1f}s, {run['deleted_per_s']:.0f}/s)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
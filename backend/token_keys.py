@@ -0,0 +1,82 @@
+# backend/token_keys.py
+#
+# refresh_tokens anahtarlarının veritabanı biçimi:
+#   token - istemciye verilen token'ın SHA-256 özeti (BinData, 32 bayt).
+#           Token'ın kendisi yalnızca yanıtta bulunur; veritabanı sızıntısı
+#           kullanılabilir token vermez. Token 256 bit rastgele olduğundan
+#           tuz / yavaş hash gerekmez, arama tek bir eşitlik sorgusu kalır.
+#   jti   - 16 baytlık UUID (BinData subtype 4); rotated_from / rotated_to da.
+#   sid   - oturum (refresh token zinciri) kimliği: zincirin ilk jti'si, rotate
+#           edilen token'lara aynen taşınır. Access token'da hex olarak "sid"
+#           claim'idir; access token iptali bununla yapılır (bkz. revocation.py).
+#
+# Eski düz metin kayıtlar `python maintenance.py hash-tokens` ile dönüştürülür.
+# Geçiş tamamlanana kadar aramalar düz metin değeri de kabul eder:
+#   REFRESH_TOKEN_PLAINTEXT_FALLBACK=1   (geçişten sonra 0)
+import hashlib
+import os
+import secrets
+import uuid
+
+from bson.binary import UUID_SUBTYPE, Binary
+
+DIGEST_SIZE = 32
+PLAINTEXT_FALLBACK = os.environ.get("REFRESH_TOKEN_PLAINTEXT_FALLBACK", "1").lower() in ("1", "true", "yes")
+
+
+def new_refresh_token() -> str:
+    """İstemciye verilecek token (256 bit, URL-safe)"""
+    return secrets.token_urlsafe(32)
+
+
+def token_digest(token: str) -> Binary:
+    return Binary(hashlib.sha256(token.encode()).digest())
+
+
+def new_jti() -> Binary:
+    return Binary(uuid.uuid4().bytes, UUID_SUBTYPE)
+
+
+def jti_from_str(value: str) -> Binary:
+    """Eski string jti → 16 bayt; UUID olmayan değerler özetin ilk 16 baytı olur"""
+    try:
+        raw = uuid.UUID(value).bytes
+    except ValueError:
+        raw = hashlib.sha256(value.encode()).digest()[:16]
+    return Binary(raw, UUID_SUBTYPE)
+
+
+def record_sid(record: dict):
+    """Token dokümanının oturum kimliği (hex) - sid alanı olmayan eski kayıtlarda jti"""
+    value = record.get("sid") or record.get("jti")
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = jti_from_str(value)
+    return bytes(value).hex()
+
+
+def session_key(sid: str) -> Binary:
+    """Access token'daki hex sid → sorgu değeri"""
+    return Binary(bytes.fromhex(sid), UUID_SUBTYPE)
+
+
+def token_match(token: str):
+    """`token` alanı için sorgu değeri"""
+    digest = token_digest(token)
+    return {"$in": [digest, token]} if PLAINTEXT_FALLBACK else digest
+
+
+def token_exclude(token: str):
+    """`token` alanı için "bu token hariç" sorgu değeri"""
+    digest = token_digest(token)
+    return {"$nin": [digest, token]} if PLAINTEXT_FALLBACK else {"$ne": digest}
+
+
+def key_preview(value) -> str:
+    """Debug çıktısı için kısa gösterim (özet/jti hex, eski kayıtta metin)"""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()[:8] + "..."
+    if isinstance(value, uuid.UUID):
+        return value.hex[:8] + "..."
+    return f"{value[:8]}..." if value else "None"
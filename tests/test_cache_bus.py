@@ -0,0 +1,82 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from cache_bus import CacheBus, UserReadCache  # noqa: E402
+
+
+def test_hit_after_load_and_none_not_cached():
+    cache = UserReadCache("profile", max_size=10, ttl=60)
+    calls = []
+
+    async def loader(user_id):
+        calls.append(user_id)
+        return None if user_id == "missing" else {"id": user_id}
+
+    async def scenario():
+        assert await cache.get_or_load("u1", loader) == {"id": "u1"}
+        assert await cache.get_or_load("u1", loader) == {"id": "u1"}
+        assert await cache.get_or_load("missing", loader) is None
+        assert await cache.get_or_load("missing", loader) is None
+
+    asyncio.run(scenario())
+    assert calls == ["u1", "missing", "missing"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidation_during_load_keeps_stale_value_out():
+    cache = UserReadCache("profile", max_size=10, ttl=60)
+    version = {"u1": 1}
+
+    async def slow_loader(user_id):
+        value = {"version": version[user_id]}
+        await asyncio.sleep(0.01)  # bu arada başka bir worker yazıyor
+        return value
+
+    async def scenario():
+        load = asyncio.ensure_future(cache.get_or_load("u1", slow_loader))
+        await asyncio.sleep(0)
+        version["u1"] = 2
+        cache.invalidate("u1")
+        assert (await load)["version"] == 1  # eski okuma döner ama cache'e girmez
+        assert (await cache.get_or_load("u1", slow_loader))["version"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_disabled_cache_always_loads():
+    cache = UserReadCache("profile", ttl=0)
+    calls = []
+
+    async def loader(user_id):
+        calls.append(user_id)
+        return {"id": user_id}
+
+    async def scenario():
+        for _ in range(3):
+            await cache.get_or_load("u1", loader)
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+
+
+def test_remote_event_evicts_only_named_caches():
+    bus = CacheBus(db=None)
+    profile = bus.cache("profile", ttl=60)
+    sessions = bus.cache("sessions", ttl=60)
+
+    async def loader(user_id):
+        return {"id": user_id}
+
+    async def scenario():
+        for cache in (profile, sessions):
+            await cache.get_or_load("u1", loader)
+            await cache.get_or_load("u2", loader)
+
+    asyncio.run(scenario())
+    bus._apply({"caches": ["sessions"], "user_ids": ["u1"]})
+    assert profile.stats()["size"] == 2
+    assert sessions.stats()["size"] == 1
+    assert sessions.stats()["invalidations"] == 1
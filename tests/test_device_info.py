@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import device_info  # noqa: E402
+from device_info import UA_MAX_LENGTH, UNKNOWN_DEVICE, UserAgentCache  # noqa: E402
+
+CHROME = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+          "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+def test_parses_each_user_agent_once(monkeypatch):
+    calls = []
+
+    def fake_parse(user_agent):
+        calls.append(user_agent)
+        return {**UNKNOWN_DEVICE, "browser": user_agent}
+
+    monkeypatch.setattr(device_info, "_parse", fake_parse)
+    cache = UserAgentCache(max_size=2)
+    assert cache.get("a")["browser"] == "a"
+    assert cache.get("a")["browser"] == "a"
+    cache.get("b")
+    cache.get("a")  # "a" en yeni olur
+    cache.get("c")
+    cache.get("b")  # düşmüştü, yeniden parse edilir
+
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 2, "misses": 4}
+
+    # Uzun UA'lar kesilmiş haliyle tek anahtar
+    cache.get("x" * UA_MAX_LENGTH + "tail-1")
+    cache.get("x" * UA_MAX_LENGTH + "tail-2")
+    assert calls[-1] == "x" * UA_MAX_LENGTH and calls.count(calls[-1]) == 1
+
+
+def test_returned_fields_are_copies():
+    cache = UserAgentCache()
+    fields = cache.get(CHROME)
+    assert fields["browser"].startswith("Chrome 120")
+    assert fields["os"].startswith("Windows")
+    assert fields["is_pc"] and not fields["is_mobile"]
+
+    fields["browser"] = "changed"
+    assert cache.get(CHROME)["browser"].startswith("Chrome 120")
+    assert cache.get("") == UNKNOWN_DEVICE
+    assert cache.get(None) == UNKNOWN_DEVICE
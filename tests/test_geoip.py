@@ -0,0 +1,119 @@
+import ipaddress
+import os
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from geoip import GeoIPResolver, RangeTable, mask_ip, write_range_file  # noqa: E402
+
+RANGES = [
+    ("1.0.0.0", "1.0.0.255", "Avustralya"),
+    ("5.2.0.0", "5.2.255.255", "İstanbul, Türkiye"),
+    ("5.3.0.0", "5.3.0.0", "Ankara, Türkiye"),
+    ("255.255.255.0", "255.255.255.255", "Son"),
+    ("2001:db8::", "2001:db8::ffff", "Belgeleme"),
+    ("2a02:e0::", "2a02:e0:ffff:ffff:ffff:ffff:ffff:ffff", "İzmir, Türkiye"),
+    ("2a02:e1::", "2a02:e1::", "Tek adres"),
+]
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = tmp_path / "geoip.bin"
+    write_range_file(path, RANGES)
+    return path
+
+
+def test_boundaries_and_gaps(table_path):
+    geo = GeoIPResolver(table_path, reload_interval=0)
+    assert geo.locate("1.0.0.0") == "Avustralya"
+    assert geo.locate("1.0.0.255") == "Avustralya"
+    assert geo.locate("1.0.1.0") == "Unknown"
+    assert geo.locate("0.255.255.255") == "Unknown"
+    assert geo.locate("5.2.128.9") == "İstanbul, Türkiye"
+    assert geo.locate("5.3.0.0") == "Ankara, Türkiye"
+    assert geo.locate("5.3.0.1") == "Unknown"
+    assert geo.locate("255.255.255.255") == "Son"
+
+
+def test_ipv6_and_mapped_ipv4(table_path):
+    geo = GeoIPResolver(table_path, reload_interval=0)
+    assert geo.locate("2001:db8::1") == "Belgeleme"
+    assert geo.locate("2001:db8::1:0") == "Unknown"
+    assert geo.locate("2a02:e0:1234::5") == "İzmir, Türkiye"
+    assert geo.locate("2a02:e1::") == "Tek adres"
+    assert geo.locate("2a02:e1::1") == "Unknown"
+    assert geo.locate("::ffff:5.2.0.1") == "İstanbul, Türkiye"
+
+
+def test_local_and_invalid_addresses(table_path):
+    geo = GeoIPResolver(table_path, reload_interval=0)
+    for ip in ("10.1.2.3", "192.168.0.10", "172.20.0.1", "127.0.0.1", "::1", "fe80::1%eth0", "fd00::5"):
+        assert geo.locate(ip) == "Local Network", ip
+    for ip in ("", "testclient", "999.1.1.1", "1.2.3"):
+        assert geo.locate(ip) == "Unknown", ip
+
+
+def test_missing_file_falls_back_to_unknown(tmp_path):
+    geo = GeoIPResolver(tmp_path / "yok.bin", reload_interval=0)
+    assert geo.locate("5.2.0.1") == "Unknown"
+    assert not geo.stats()["loaded"]
+
+
+def test_matches_linear_scan_on_random_table(tmp_path):
+    rng = random.Random(3)
+    points = sorted(rng.sample(range(1 << 32), 4000))
+    ranges = [(str(ipaddress.IPv4Address(a)), str(ipaddress.IPv4Address(b)), f"L{i % 50}")
+              for i, (a, b) in enumerate(zip(points[::2], points[1::2]))]
+    write_range_file(tmp_path / "t.bin", ranges)
+    table = RangeTable(tmp_path / "t.bin")
+
+    def linear(ip):
+        for start, end, label in ranges:
+            if int(ipaddress.IPv4Address(start)) <= ip <= int(ipaddress.IPv4Address(end)):
+                return label
+        return None
+
+    probes = [rng.randrange(1 << 32) for _ in range(300)] + points[:100] + [p + 1 for p in points[:100]]
+    probes = [p for p in probes if p < 1 << 32]
+    for ip in probes:
+        assert table.lookup_v4(ip) == linear(ip)
+
+    batch = table.lookup_many_v4(np.array(probes, dtype=np.uint32))
+    assert [table.names[i] if i >= 0 else None for i in batch.tolist()] == [table.lookup_v4(ip) for ip in probes]
+
+
+def test_hot_swap(table_path):
+    geo = GeoIPResolver(table_path, reload_interval=0)
+    assert geo.locate("5.2.0.1") == "İstanbul, Türkiye"
+    assert not geo.maybe_reload()
+
+    write_range_file(table_path, [("5.2.0.0", "5.2.255.255", "Bursa, Türkiye")])
+    assert geo.maybe_reload()
+    assert geo.locate("5.2.0.1") == "Bursa, Türkiye"
+    assert geo.locate("1.0.0.1") == "Unknown"
+
+    # Bozuk dosya (os.replace ile): eski tablo kullanılmaya devam eder
+    broken = table_path.with_name("bozuk.bin")
+    broken.write_bytes(b"bozuk")
+    os.replace(broken, table_path)
+    assert not geo.maybe_reload()
+    assert geo.locate("5.2.0.1") == "Bursa, Türkiye"
+
+
+def test_rejects_overlapping_ranges(tmp_path):
+    with pytest.raises(ValueError):
+        write_range_file(tmp_path / "x.bin", [("1.0.0.0", "1.0.0.10", "A"), ("1.0.0.5", "1.0.0.20", "B")])
+
+
+def test_mask_ip():
+    assert mask_ip("85.34.120.7") == "85.34.***.***"
+    assert mask_ip("2a02:e0:1234:5678::1") == "2a02:e0:1234:***:***:***:***:***"
+    assert mask_ip("::ffff:85.34.1.2") == "85.34.***.***"
+    assert mask_ip("") == ""
+    assert mask_ip("testclient") == "***"
@@ -0,0 +1,76 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from login_admission import LoginAdmission  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lock_backs_off_exponentially_and_resets():
+    clock = FakeClock()
+    admission = LoginAdmission(enabled=True, free_failures=3, backoff_base=2, max_lock=10,
+                               failure_window=3600, clock=clock)
+
+    assert [admission.record_failure("A@example.com") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert admission.retry_after("a@example.com") == 0.0
+    # Büyük/küçük harf aynı hesap; 2, 4, 8, sonra tavan
+    assert [admission.record_failure("a@example.com ") for _ in range(4)] == [2, 4, 8, 10]
+    assert admission.retry_after("a@example.com") == 10
+    assert admission.rejected["locked"] == 1
+
+    clock.now += 10
+    assert admission.retry_after("a@example.com") == 0.0
+    admission.record_success("a@example.com")
+    assert admission.record_failure("a@example.com") == 0.0
+
+    # Sessiz geçen pencereden sonra sayaç baştan
+    for _ in range(5):
+        admission.record_failure("b@example.com")
+    clock.now += 3600
+    assert admission.retry_after("b@example.com") == 0.0
+    assert admission.record_failure("b@example.com") == 0.0
+
+
+def test_known_bad_pairs_follow_stored_hash_and_expire():
+    clock = FakeClock()
+    admission = LoginAdmission(enabled=True, pair_capacity=1000, pair_ttl=60, clock=clock)
+    admission.remember_bad("$2b$12$old", "hunter2")
+
+    assert admission.is_known_bad("$2b$12$old", "hunter2")
+    assert not admission.is_known_bad("$2b$12$old", "hunter3")
+    # Parola değişti: aynı parola yeni hash ile yeniden doğrulanır
+    assert not admission.is_known_bad("$2b$12$new", "hunter2")
+
+    clock.now += 61
+    assert not admission.is_known_bad("$2b$12$old", "hunter2")
+    assert admission.rejected["known_bad"] == 1
+
+
+def test_failures_padded_to_observed_verify_time():
+    admission = LoginAdmission(enabled=True, failure_floor_ms=20)
+    assert admission.failure_floor_seconds() == 0.02
+    for _ in range(50):
+        admission.observe_verify(0.04)
+    floor = admission.failure_floor_seconds()
+    assert 0.059 < floor <= 0.06
+
+    async def respond(work: float) -> float:
+        started = time.monotonic()
+        await asyncio.sleep(work)
+        await admission.pad(started)
+        return time.monotonic() - started
+
+    # Anında reddedilen ve bcrypt'e giren başarısızlık aynı sürede döner
+    fast, slow = asyncio.run(respond(0)), asyncio.run(respond(0.04))
+    assert floor <= fast < floor + 0.1
+    assert floor <= slow < floor + 0.1
@@ -0,0 +1,112 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId, json_util
+from pymongo.errors import AutoReconnect
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from maintenance import Checkpoint, fix_jti  # noqa: E402
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if not isinstance(condition, dict):
+            if doc.get(key) != condition:
+                return False
+        elif "$exists" in condition:
+            if (key in doc) != condition["$exists"]:
+                return False
+        elif "$gt" in condition:
+            if not doc[key] > condition["$gt"]:
+                return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    def sort(self, field: str, direction: int):
+        self.rows.sort(key=lambda row: row[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n: int):
+        self.rows = self.rows[:n]
+        return self
+
+    async def to_list(self, length: int):
+        return self.rows[:length]
+
+
+class FakeCollection:
+    """Bakım komutlarının kullandığı kadarı; `fail_on` numaralı bulk_write bağlantı hatası verir"""
+
+    def __init__(self, docs: list, fail_on: int = None):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.fail_on = fail_on
+        self.bulk_writes = 0
+        self.updates = 0
+
+    async def count_documents(self, query: dict) -> int:
+        return sum(matches(doc, query) for doc in self.docs.values())
+
+    def find(self, query: dict, projection: dict = None):
+        return FakeCursor([{"_id": doc["_id"]} for doc in self.docs.values() if matches(doc, query)])
+
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        self.bulk_writes += 1
+        if self.bulk_writes == self.fail_on:
+            raise AutoReconnect("connection reset")
+        for op in operations:
+            doc = self.docs[op._filter["_id"]]
+            if matches(doc, op._filter):
+                doc.update(op._doc["$set"])
+                self.updates += 1
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path):
+    docs = [{"_id": ObjectId()} for _ in range(10)] + [{"_id": ObjectId(), "jti": "kept"}]
+    collection = FakeCollection(docs, fail_on=3)
+    db = SimpleNamespace(refresh_tokens=collection)
+    path = tmp_path / "fix-jti.ckpt"
+    args = SimpleNamespace(batch_size=3, dry_run=False, checkpoint=str(path))
+
+    with pytest.raises(AutoReconnect):
+        asyncio.run(fix_jti(db, args))
+    saved = json_util.loads(path.read_text())
+    assert saved == {"command": "fix-jti", "last_id": docs[5]["_id"], "processed": 6}
+
+    # Yeniden çalıştırma son _id'den sonrasını tarar, ilerleme sayısı devam eder
+    checkpoint = Checkpoint(path, "fix-jti")
+    checkpoint.load()
+    assert (checkpoint.last_id, checkpoint.processed) == (docs[5]["_id"], 6)
+    asyncio.run(fix_jti(db, args))
+    assert not path.exists()
+    assert collection.updates == 10
+    assert all(doc["jti"] for doc in collection.docs.values())
+    assert collection.docs[docs[-1]["_id"]]["jti"] == "kept"
+    assert len({bytes(doc["jti"]) for doc in docs[:10]}) == 10
+
+
+def test_checkpoint_of_another_command_is_refused(tmp_path):
+    path = tmp_path / "job.ckpt"
+    checkpoint = Checkpoint(path, "hash-tokens")
+    checkpoint.last_id, checkpoint.processed = ObjectId(), 5
+    checkpoint.save()
+    assert not path.with_suffix(".tmp").exists()
+
+    with pytest.raises(SystemExit):
+        Checkpoint(path, "fix-jti").load()
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    collection = FakeCollection([{"_id": ObjectId()} for _ in range(4)])
+    path = tmp_path / "fix-jti.ckpt"
+    args = SimpleNamespace(batch_size=3, dry_run=True, checkpoint=str(path))
+    asyncio.run(fix_jti(SimpleNamespace(refresh_tokens=collection), args))
+    assert collection.bulk_writes == 0
+    assert not path.exists()
@@ -0,0 +1,81 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from metrics import UNMATCHED_ROUTE, HttpMetrics, MetricsMiddleware, MetricsRegistry  # noqa: E402
+
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry()
+    counter = registry.counter("logins_total", "Login denemeleri", ("result",))
+    counter.labels("ok").inc()
+    counter.labels("ok").inc(2)
+    counter.labels('kötü "x"').inc()
+    gauge = registry.gauge("queue_depth", "Kuyruk")
+    gauge.set(4)
+    gauge.dec()
+
+    lines = registry.render().splitlines()
+    assert "# TYPE logins_total counter" in lines
+    assert 'logins_total{result="ok"} 3' in lines
+    assert 'logins_total{result="kötü \\"x\\""} 1' in lines
+    assert "queue_depth 3" in lines
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Gecikme", ("route",), buckets=(0.1, 1.0))
+    child = histogram.labels("/a")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.65' in lines
+
+
+def test_duplicate_name_and_label_count_rejected():
+    registry = MetricsRegistry()
+    counter = registry.counter("x_total", "x", ("a",))
+    with pytest.raises(ValueError):
+        registry.counter("x_total", "x")
+    with pytest.raises(ValueError):
+        counter.labels("1", "2")
+
+
+def test_collector_output():
+    registry = MetricsRegistry()
+    registry.register_collector(lambda: [("mongo_commands_total", "counter", "Komutlar",
+                                          [({"command": "find", "collection": "users"}, 7)])])
+    assert 'mongo_commands_total{command="find",collection="users"} 7' in registry.render().splitlines()
+
+
+def test_middleware_labels_by_route_template():
+    registry = MetricsRegistry()
+    http_metrics = HttpMetrics(registry)
+
+    async def app(scope, receive, send):
+        if scope["path"].startswith("/users/"):
+            scope["route"] = SimpleNamespace(path_format="/users/{user_id}")
+        await send({"type": "http.response.start", "status": 200 if "route" in scope else 404})
+
+    async def call(path):
+        async def send(message):
+            pass
+        await MetricsMiddleware(app, http_metrics)({"type": "http", "method": "GET", "path": path}, None, send)
+
+    for path in ("/users/1", "/users/2", "/missing"):
+        asyncio.run(call(path))
+
+    lines = registry.render().splitlines()
+    assert 'http_requests_total{method="GET",route="/users/{user_id}",status="200"} 2' in lines
+    assert f'http_requests_total{{method="GET",route="{UNMATCHED_ROUTE}",status="404"}} 1' in lines
+    assert "http_requests_in_flight 0" in lines
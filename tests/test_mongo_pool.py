@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from pymongo import monitoring
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from mongo_pool import MongoMetrics, client_options  # noqa: E402
+
+
+def command(name, target, request_id, duration_ms=2.0):
+    return SimpleNamespace(command_name=name, command={name: target}, request_id=request_id,
+                           connection_id=("localhost", 27017), duration_micros=int(duration_ms * 1000))
+
+
+def test_command_durations_grouped_by_collection():
+    metrics = MongoMetrics()
+    for request_id, (name, target, ms, failed) in enumerate([
+        ("find", "users", 2.0, False), ("find", "users", 6.0, False),
+        ("insert", "refresh_tokens", 3.0, True), ("ping", 1, 1.0, False),
+    ]):
+        event = command(name, target, request_id, ms)
+        metrics.started(event)
+        (metrics.failed if failed else metrics.succeeded)(event)
+
+    commands = {(c["command"], c["collection"]): c for c in metrics.snapshot()["commands"]}
+    assert set(commands) == {("find", "users"), ("insert", "refresh_tokens"), ("ping", "")}
+    find = commands[("find", "users")]
+    assert (find["count"], find["failed"], find["avg_ms"], find["max_ms"]) == (2, 0, 4.0, 6.0)
+    assert commands[("insert", "refresh_tokens")]["failed"] == 1
+    assert not metrics._inflight
+
+
+def test_pool_counters_track_checkouts_and_timeouts():
+    metrics = MongoMetrics()
+    event = SimpleNamespace()
+    for _ in range(3):
+        metrics.connection_created(event)
+    for _ in range(2):
+        metrics.connection_check_out_started(event)
+        metrics.connection_checked_out(event)
+    metrics.connection_checked_in(event)
+    metrics.connection_closed(event)
+    metrics.connection_check_out_failed(SimpleNamespace(reason=monitoring.ConnectionCheckOutFailedReason.TIMEOUT))
+    metrics.connection_check_out_failed(SimpleNamespace(reason=monitoring.ConnectionCheckOutFailedReason.CONN_ERROR))
+
+    pool = metrics.snapshot()["pool"]
+    assert (pool["checked_out"], pool["max_checked_out"], pool["checkouts"]) == (1, 2, 2)
+    assert (pool["checkout_timeouts"], pool["checkout_failures"]) == (1, 2)
+    assert (pool["connections_open"], pool["connections_created"]) == (2, 3)
+
+    metrics.reset_peaks()
+    pool = metrics.snapshot()["pool"]
+    assert pool["max_checked_out"] == 1 and pool["max_checkout_wait_ms"] == 0.0
+
+
+def test_client_options_leave_unset_values_to_the_driver():
+    options = client_options(maxPoolSize=7, compressors=None)
+    assert options["maxPoolSize"] == 7
+    assert "compressors" not in options
+    assert all(value is not None for value in options.values())
@@ -0,0 +1,94 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from morphology import PREFIX, ROOT, SUFFIX, UNKNOWN, AhoCorasick, MorphologyAnalyzer, parse_form  # noqa: E402
+from term_catalogue import TermCatalogue  # noqa: E402
+
+
+def record(term_id, term, turkish, kind):
+    return {"id": term_id, "kind": kind, "term": term, "turkish": turkish, "roots": "",
+            "definition": "", "system": "", "category": "test"}
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return MorphologyAnalyzer(TermCatalogue([
+        record("r1", "Oste/o", "Kemik", "root"),
+        record("r2", "Arthr/o", "Eklem", "root"),
+        record("r3", "Cardi/o", "Kalp", "root"),
+        record("r4", "Ot/o", "Kulak", "root"),
+        record("r5", "Gastr/o", "Mide", "root"),
+        record("r6", "Enter/o", "Bağırsak", "root"),
+        record("p1", "Peri-", "Çevresinde", "prefix"),
+        record("p2", "Hyper-", "Aşırı", "prefix"),
+        record("s1", "-itis", "İltihap", "suffix"),
+        record("s2", "-ectomy", "Cerrahi çıkarma", "suffix"),
+        record("s3", "-logy", "Bilim", "suffix"),
+        # Tam terimler morfem değildir
+        record("t1", "Osteoarthritis", "Kireçlenme", "term"),
+    ]))
+
+
+def shape(analysis):
+    return [(part["kind"], part["text"]) for part in analysis["parts"]]
+
+
+@pytest.mark.parametrize("form, expected", [
+    ("Oste/o", (ROOT, "oste", "o")),
+    ("Hyper-", (PREFIX, "hyper", "")),
+    ("-itis", (SUFFIX, "itis", "")),
+    ("İleum", (ROOT, "ileum", "")),
+    ("Hyster/o + -ectomy", None),
+    ("-itis-", None),
+    ("Peri/o-", None),
+])
+def test_parse_form(form, expected):
+    assert parse_form(form) == expected
+
+
+def test_aho_corasick_matches_naive_search():
+    stems = ["oste", "osteo", "arthr", "itis", "is", "t", "ost"]
+    automaton = AhoCorasick(stems)
+    rng = random.Random(7)
+    for word in ["osteoarthritis", "carditis"] + ["".join(rng.choice("aehiorst") for _ in range(30)) for _ in range(50)]:
+        assert sorted(automaton.find_all(word)) == sorted(MorphologyAnalyzer.naive_matches(stems, word))
+
+
+def test_linking_vowel_belongs_to_root(analyzer):
+    result = analyzer.analyze("Osteoarthritis")
+    assert shape(result) == [(ROOT, "Osteo"), (ROOT, "arthr"), (SUFFIX, "itis")]
+    assert result["coverage"] == 1.0
+    assert result["parts"][0]["meanings"] == ["Kemik"]
+    assert [part["start"] for part in result["parts"]] == [0, 5, 10]
+
+
+def test_root_final_vowel_drops_before_suffix(analyzer):
+    assert shape(analyzer.analyze("Carditis")) == [(ROOT, "Card"), (SUFFIX, "itis")]
+    assert shape(analyzer.analyze("Pericarditis")) == [(PREFIX, "Peri"), (ROOT, "card"), (SUFFIX, "itis")]
+    assert shape(analyzer.analyze("Gastroenterology")) == [(ROOT, "Gastro"), (ROOT, "entero"), (SUFFIX, "logy")]
+
+
+def test_prefixes_only_at_start_and_suffixes_only_at_end(analyzer):
+    # "peri" kelime ortasında önek sayılmaz, "itis" sonda değilse sonek değil
+    assert shape(analyzer.analyze("Otoperi")) == [(ROOT, "Oto"), (UNKNOWN, "peri")]
+    assert (SUFFIX, "itis") not in shape(analyzer.analyze("Itisoste"))
+
+
+def test_short_roots_need_a_vowel_or_word_end(analyzer):
+    # "ot" ⊂ "otx" tanınmaz; ünlü önünde ya da tek başına tanınır
+    assert shape(analyzer.analyze("Otx")) == [(UNKNOWN, "Otx")]
+    assert shape(analyzer.analyze("Otitis")) == [(ROOT, "Ot"), (SUFFIX, "itis")]
+
+
+def test_multi_word_offsets_and_coverage(analyzer):
+    text = "Hyper-Gastritis xyz"
+    result = analyzer.analyze(text)
+    assert shape(result) == [(PREFIX, "Hyper"), (ROOT, "Gastr"), (SUFFIX, "itis"), (UNKNOWN, "xyz")]
+    assert all(text[part["start"]:part["end"]] == part["text"] for part in result["parts"])
+    assert result["coverage"] == round(14 / 17, 3)
+    assert analyzer.analyze("")["coverage"] == 0.0
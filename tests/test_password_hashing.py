@@ -0,0 +1,47 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from password_hashing import PasswordHasher, PasswordHasherOverloaded  # noqa: E402
+
+
+def test_cancelled_caller_keeps_running_job_counted():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+        return "hashed"
+
+    async def scenario():
+        task = asyncio.create_task(hasher._submit("hash", slow_hash))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # bcrypt işi hâlâ worker'da: kuyruk dolu sayılmalı
+        assert hasher.stats()["pending"] == 1
+        with pytest.raises(PasswordHasherOverloaded):
+            await hasher._submit("hash", slow_hash)
+
+        release.set()
+        for _ in range(100):
+            if hasher.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert hasher.stats()["pending"] == 0
+        assert await hasher._submit("hash", lambda: "next") == "next"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        hasher.shutdown()
+    assert hasher.rejected == 1
+    assert hasher.stats()["operations"]["hash"]["calls"] == 2
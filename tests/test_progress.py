@@ -0,0 +1,51 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from pymongo.errors import AutoReconnect
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from progress import ProgressService  # noqa: E402
+
+
+class FlakyCollection:
+    """İlk bulk_write sonucu bilinmeyen bir ağ hatası verir"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.writes = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.writes.append(list(operations))
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("bağlantı koptu")
+
+
+def batch_of(operation) -> object:
+    # Pipeline'ın ilk aşaması batch kimliğini applied_batches'ta arar
+    return operation._doc[0]["$set"]["_fresh"]["$not"]["$in"][0]
+
+
+def test_retried_writes_keep_their_batch_id():
+    db = SimpleNamespace(user_progress=FlakyCollection(failures=1), term_progress=FlakyCollection())
+    service = ProgressService(db)
+    summaries = db.user_progress
+
+    async def scenario():
+        service.add("u1", [{"type": "quiz", "score": 8, "total": 10}, {"type": "term", "term_id": "t1"}])
+        await service.flush()
+        assert service.stats_snapshot()["retry_operations"] == 1
+        service.add("u1", [{"type": "quiz", "score": 5, "total": 10}])
+        await service.flush()
+
+    asyncio.run(scenario())
+    first, retried_and_new = summaries.writes
+    # Sonucu bilinmeyen işlem aynı batch kimliğiyle tekrar yazılır: uygulanmışsa etkisiz kalır
+    assert retried_and_new[0] is first[0]
+    assert batch_of(retried_and_new[1]) != batch_of(first[0])
+    # Terim işlemi ayrı koleksiyonda ilk flush'ta yazıldı, aynı batch'le
+    assert batch_of(db.term_progress.writes[0][0]) == batch_of(first[0])
+    assert service.stats_snapshot()["retry_operations"] == 0
@@ -0,0 +1,122 @@
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from quiz import QuizEngine, sample_distractors  # noqa: E402
+from term_catalogue import TermCatalogue  # noqa: E402
+
+
+def chi_square_limit(df: int, z: float = 3.09) -> float:
+    """p≈0.001 kritik değeri (Wilson–Hilferty yaklaşımı)"""
+    return df * (1 - 2 / (9 * df) + z * (2 / (9 * df)) ** 0.5) ** 3
+
+
+def chi_square(counts, expected: float) -> float:
+    return sum((c - expected) ** 2 / expected for c in counts)
+
+
+def make_catalogue():
+    records = []
+    for system, size in (("Alfa", 12), ("Beta", 8), ("Gama", 2)):
+        for n in range(size):
+            records.append({
+                "id": f"{system}-{n}", "kind": "term", "term": f"{system}term{n}", "turkish": f"{system} anlam {n}",
+                "roots": "", "definition": "", "system": system, "category": "test",
+            })
+    # Aynı anlamı taşıyan ikinci terim: birbirinin çeldiricisi olmamalı
+    records.append({
+        "id": "Alfa-dup", "kind": "term", "term": "Alfadup", "turkish": "Alfa anlam 0",
+        "roots": "", "definition": "", "system": "Alfa", "category": "test",
+    })
+    return TermCatalogue(records)
+
+
+@pytest.mark.parametrize("answer", [2, 11, 23, 40])
+def test_distractors_are_distinct_and_exclude_answer(answer):
+    pool = np.array([2, 5, 7, 11, 13, 17, 19, 23, 29, 40])
+    rng = np.random.default_rng(1)
+    picks = pool[sample_distractors(rng, np.full(5000, len(pool)), np.full(5000, np.searchsorted(pool, answer)), 3)]
+    assert picks.shape == (5000, 3)
+    assert not (picks == answer).any()
+    assert np.isin(picks, pool).all()
+    assert all(len(set(row)) == 3 for row in picks.tolist())
+
+
+@pytest.mark.parametrize("answer", [2, 17, 40])
+def test_distractor_selection_is_uniform(answer):
+    pool = np.array([2, 5, 7, 11, 13, 17, 19, 23, 29, 40])
+    draws = 60000
+    rng = np.random.default_rng(2024)
+    picks = pool[sample_distractors(rng, np.full(draws, len(pool)), np.full(draws, np.searchsorted(pool, answer)), 3)]
+    others = [v for v in pool.tolist() if v != answer]
+
+    # Her yanlış anlam eşit sıklıkta seçilmeli
+    overall = Counter(picks.ravel().tolist())
+    expected = draws * 3 / len(others)
+    assert chi_square([overall[v] for v in others], expected) < chi_square_limit(len(others) - 1)
+
+    # Şık sırası da rastgele olmalı: her sütunda her değer eşit sıklıkta
+    for column in range(3):
+        counts = Counter(picks[:, column].tolist())
+        assert chi_square([counts[v] for v in others], draws / len(others)) < chi_square_limit(len(others) - 1)
+
+
+def test_mixed_pool_sizes_stay_in_range_and_uniform():
+    # Karışık quiz: her satır farklı boyutta bir havuzdan çeker
+    sizes = np.tile([4, 9, 30], 20000)
+    answers = sizes // 2
+    rng = np.random.default_rng(5)
+    ranks = sample_distractors(rng, sizes, answers, 3)
+    assert ((ranks >= 0) & (ranks < sizes[:, None])).all()
+    assert not (ranks == answers[:, None]).any()
+    rows = sizes == 9
+    counts = Counter(ranks[rows].ravel().tolist())
+    others = [v for v in range(9) if v != 4]
+    assert chi_square([counts[v] for v in others], rows.sum() * 3 / 8) < chi_square_limit(7)
+
+
+def test_correct_answer_position_is_uniform():
+    engine = QuizEngine(make_catalogue())
+    positions = Counter()
+    for seed in range(3000):
+        for question in engine.generate("Alfa", count=5, seed=seed)["questions"]:
+            positions[question["options"].index(question["correct_answer"])] += 1
+    total = sum(positions.values())
+    assert chi_square([positions[i] for i in range(4)], total / 4) < chi_square_limit(3)
+
+
+def test_options_come_from_question_system_and_skip_duplicate_meanings():
+    engine = QuizEngine(make_catalogue())
+    for seed in range(200):
+        quiz = engine.generate(count=10, seed=seed)
+        for question in quiz["questions"]:
+            options = question["options"]
+            assert len(set(options)) == 4
+            assert options.count(question["correct_answer"]) == 1
+            if question["system"] != "Gama":
+                assert all(option.startswith(question["system"]) for option in options)
+
+
+def test_small_system_falls_back_to_all_meanings():
+    engine = QuizEngine(make_catalogue())
+    quiz = engine.generate("Gama", count=2, seed=7)
+    assert len(quiz["questions"]) == 2
+    for question in quiz["questions"]:
+        assert len(set(question["options"])) == 4
+
+
+def test_same_seed_same_quiz():
+    engine = QuizEngine(make_catalogue())
+    assert engine.generate("Beta", seed=99) == engine.generate("Beta", seed=99)
+    assert engine.generate("Beta", seed=99) != engine.generate("Beta", seed=100)
+
+
+def test_unknown_system_is_rejected():
+    engine = QuizEngine(make_catalogue())
+    with pytest.raises(ValueError):
+        engine.generate("Yok")
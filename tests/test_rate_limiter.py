@@ -0,0 +1,93 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from rate_limiter import InMemoryRateLimiter, MongoRateLimiter, create_rate_limiter  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def allowed(limiter, key: str, attempts: int, limit: int = 10, window: int = 60) -> int:
+    return sum(limiter.check(key, limit, window) for _ in range(attempts))
+
+
+def test_previous_window_is_weighted_by_remaining_fraction():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+    assert allowed(limiter, "ip", 15) == 10
+    assert limiter.rejected == 5
+
+    # Yeni pencerenin başı: önceki pencere tam ağırlıkta
+    clock.now = 60
+    assert allowed(limiter, "ip", 3) == 0
+    # Yarısı geçti: 10 * 0.5 + current < 10 → 5 istek daha
+    clock.now = 90
+    assert allowed(limiter, "ip", 10) == 5
+    # Bir pencere atlandı: önceki sayaç sıfır
+    clock.now = 180
+    assert allowed(limiter, "ip", 12) == 10
+
+    # Anahtarlar birbirinden bağımsız
+    assert allowed(limiter, "other", 10) == 10
+
+
+def test_idle_keys_are_evicted_when_new_keys_arrive():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+    for n in range(10):
+        limiter.check(f"old-{n}", 10, 60)
+    limiter.check("recent", 10, 60)
+
+    # Bir pencere sonra: önceki sayaç hâlâ gerekli, silinmez
+    clock.now = 60
+    limiter.check("new-0", 10, 60)
+    assert len(limiter) == 12
+
+    # İki pencere boşta: her yeni anahtar en fazla birkaç eskiyi temizler
+    clock.now = 120
+    limiter.check("recent", 10, 60)
+    limiter.check("new-1", 10, 60)
+    assert len(limiter) == 12 - 4 + 1
+    for n in range(2, 5):
+        limiter.check(f"new-{n}", 10, 60)
+    # old-* gitti; yakın zamanda dokunulan "recent" ve new-0 kaldı
+    assert len(limiter) == 6
+    assert not any(key.startswith("old-") for key in limiter._windows)
+    assert "recent" in limiter._windows and "new-0" in limiter._windows
+
+
+def test_max_keys_drops_least_recently_used():
+    limiter = InMemoryRateLimiter(max_keys=3, clock=FakeClock())
+    for key in ("a", "b", "c"):
+        limiter.check(key, 1, 60)
+    assert not limiter.check("a", 1, 60)  # "a" en yeni olur
+    limiter.check("d", 1, 60)
+    assert list(limiter._windows) == ["c", "a", "d"]
+    # "b" unutuldu: sayacı sıfırdan başlar
+    assert limiter.check("b", 1, 60)
+
+
+class DownCollection:
+    async def find_one_and_update(self, *args, **kwargs):
+        raise ServerSelectionTimeoutError("mongo down")
+
+
+def test_mongo_limiter_falls_back_to_local_limit():
+    limiter = MongoRateLimiter(DownCollection(), fallback=InMemoryRateLimiter(clock=FakeClock()))
+
+    async def hits():
+        return [await limiter.hit("ip", 3, 60) for _ in range(5)]
+
+    assert asyncio.run(hits()) == [True, True, True, False, False]
+    assert limiter.stats() == {"backend": "mongo", "rejected": 0, "fallback_keys": 1}
+    assert isinstance(create_rate_limiter(None, "memory"), InMemoryRateLimiter)
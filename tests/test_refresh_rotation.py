@@ -0,0 +1,162 @@
+import asyncio
+import copy
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+# Import sırasında yalnızca istemci nesnesi kurulur; testler bağlantı açmaz
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "healthlex_test")
+
+import server  # noqa: E402
+from token_keys import new_jti, token_digest  # noqa: E402
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        value = doc.get(key)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+        elif "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif "$gt" in condition:
+            if value is None or not value > condition["$gt"]:
+                return False
+        elif "$not" in condition:
+            if value is not None and value > condition["$not"]["$gt"]:
+                return False
+        else:
+            raise AssertionError(f"desteklenmeyen koşul: {condition}")
+    return True
+
+
+def project(doc: dict, projection: dict) -> dict:
+    return {k: v for k, v in doc.items() if k == "_id" or k in projection}
+
+
+class FakeTokens:
+    """refresh_tokens: find_one_and_update eşleşme + güncellemeyi await noktası olmadan yapar (atomik)"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def find_one_and_update(self, query, update, projection):
+        for doc in self.docs:
+            if matches(doc, query):
+                before = project(copy.deepcopy(doc), projection)
+                doc.update(update["$set"])
+                return before
+        return None
+
+    async def find_one(self, query, projection=None):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        return project(doc, projection) if doc and projection else doc
+
+    async def insert_one(self, doc):
+        self.docs.append({"_id": ObjectId(), **doc})
+
+    async def update_one(self, query, update):
+        doc = await self.find_one(query)
+        if doc:
+            doc.update(update["$set"])
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not matches(d, query)]
+
+
+class FakeUsers:
+    async def find_one(self, query, projection=None):
+        return {"_id": query["_id"]} if query["_id"] == "u1" else None
+
+
+class FakeRevocations:
+    def __init__(self):
+        self.users = []
+
+    async def revoke_user(self, user_id):
+        self.users.append(user_id)
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    collection = FakeTokens()
+    monkeypatch.setattr(server, "db", SimpleNamespace(refresh_tokens=collection, users=FakeUsers()))
+    monkeypatch.setattr(server, "token_revocations", FakeRevocations())
+    server.user_exists_cache.clear()
+    return collection
+
+
+def issue(tokens: FakeTokens, raw: str, **fields) -> dict:
+    now = datetime.utcnow()
+    jti = new_jti()
+    doc = {"_id": ObjectId(), "jti": jti, "sid": jti, "token": token_digest(raw), "user_id": "u1",
+           "created_at": now, "last_used_at": now, "expires_at": now + timedelta(days=1),
+           "is_active": True, "rotations": 0, **fields}
+    tokens.docs.append(doc)
+    return doc
+
+
+def rotate(raw: str):
+    return asyncio.run(server.rotate_refresh_token(raw, None))
+
+
+def test_rotation_consumes_token_once_and_keeps_session(tokens):
+    old = issue(tokens, "r1", rotations=3)
+    user_id, new_raw, sid = rotate("r1")
+
+    assert user_id == "u1" and new_raw != "r1"
+    assert sid == bytes(old["sid"]).hex()
+    new = next(d for d in tokens.docs if d["token"] == token_digest(new_raw))
+    assert old["is_active"] is False and old["rotated_to"] == new["jti"]
+    assert (new["rotated_from"], new["sid"], new["rotations"]) == (old["jti"], old["sid"], 4)
+
+    # Aynı token ikinci kez (tekrar kullanım): reddedilir, yeni token yazılmaz
+    with pytest.raises(HTTPException) as exc:
+        rotate("r1")
+    assert exc.value.detail == "Invalid refresh token"
+    assert len(tokens.docs) == 2
+    assert rotate(new_raw)[0] == "u1"
+
+
+def test_concurrent_refreshes_of_one_token_rotate_once(tokens):
+    issue(tokens, "r1")
+
+    async def race():
+        return await asyncio.gather(*(server.rotate_refresh_token("r1", None) for _ in range(5)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(race())
+    assert sum(not isinstance(r, Exception) for r in results) == 1
+    assert all(r.status_code == 401 for r in results if isinstance(r, Exception))
+    assert sum(d["is_active"] for d in tokens.docs) == 1
+
+
+def test_rotation_cap_ends_every_session_of_user(tokens):
+    issue(tokens, "r1", rotations=server.MAX_REFRESH_ROTATIONS)
+    issue(tokens, "over", rotations=server.MAX_REFRESH_ROTATIONS + 1)
+    issue(tokens, "other-device")
+
+    # Sınırdaki token hâlâ rotate edilir
+    assert rotate("r1")[0] == "u1"
+    with pytest.raises(HTTPException) as exc:
+        rotate("over")
+    assert exc.value.detail == "Too many rotations, please re-login"
+    assert tokens.docs == []
+    assert server.token_revocations.users == ["u1"]
+
+
+def test_expired_token_is_deactivated(tokens):
+    doc = issue(tokens, "r1", expires_at=datetime.utcnow() - timedelta(seconds=1))
+    with pytest.raises(HTTPException) as exc:
+        rotate("r1")
+    assert exc.value.detail == "Refresh token expired"
+    assert doc["is_active"] is False and len(tokens.docs) == 1
@@ -0,0 +1,157 @@
+import asyncio
+import sys
+import uuid
+from pathlib import Path
+
+from pymongo.errors import AutoReconnect
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from bloom import BloomFilter  # noqa: E402
+from revocation import RevocationList, RevocationService  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bloom_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=5000, fp_rate=0.001)
+    keys = [uuid.uuid4().int for _ in range(5000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(uuid.uuid4().int in bloom for _ in range(20000))
+    assert false_positives < 20000 * 0.005
+
+
+def test_revoked_session_rejected_until_ttl_passes():
+    clock = FakeClock()
+    revocations = RevocationList(ttl_seconds=60, capacity=100, clock=clock)
+    sid, other = uuid.uuid4().hex, uuid.uuid4().hex
+    revocations.apply({"kind": "session", "sids": [sid]})
+
+    assert revocations.is_revoked("u1", sid, clock.now)
+    assert not revocations.is_revoked("u1", other, clock.now)
+    assert not revocations.is_revoked("u1", None, clock.now)
+
+    # Kayıttan sonra verilmiş token da ttl boyunca reddedilir; sonra nesil atılır
+    clock.now += 59
+    assert revocations.is_revoked("u1", sid, clock.now)
+    clock.now += 20
+    assert not revocations.is_revoked("u1", sid, clock.now)
+    assert revocations.stats()["generations"] == []
+
+
+def test_generations_rotate_on_capacity_and_age():
+    clock = FakeClock()
+    revocations = RevocationList(ttl_seconds=60, capacity=2, clock=clock)
+    sids = [uuid.uuid4().hex for _ in range(5)]
+    for sid in sids[:3]:
+        revocations.revoke_session(sid)
+    assert [g["entries"] for g in revocations.stats()["generations"]] == [2, 1]
+
+    clock.now += 61
+    revocations.revoke_session(sids[3])
+    assert [g["entries"] for g in revocations.stats()["generations"]] == [2, 1, 1]
+
+    revocations.expire(clock.now)
+    assert [g["entries"] for g in revocations.stats()["generations"]] == [1]
+    assert revocations.is_revoked("u1", sids[3], clock.now)
+    assert not revocations.is_revoked("u1", sids[0], clock.now)
+
+
+def test_user_not_before():
+    clock = FakeClock()
+    revocations = RevocationList(ttl_seconds=60, clock=clock)
+    revocations.apply({"kind": "user", "user_id": "u1", "not_before": 1000.0})
+    # Yeniden oynatılan daha eski olay not-before'u geri almaz
+    revocations.apply({"kind": "user", "user_id": "u1", "not_before": 990.0})
+
+    assert revocations.is_revoked("u1", None, 999.5)
+    assert revocations.is_revoked("u1", uuid.uuid4().hex, None)
+    assert not revocations.is_revoked("u1", None, 1000.5)
+    assert not revocations.is_revoked("u2", None, 999.5)
+
+    clock.now += 61
+    revocations.expire(clock.now)
+    assert revocations.stats()["users_not_before"] == 0
+
+
+def test_bloom_false_positive_does_not_revoke_session():
+    clock = FakeClock()
+    # Çok küçük filtre: rastgele sid'lerin çoğu Bloom'da isabet eder
+    revocations = RevocationList(ttl_seconds=60, capacity=2, fp_rate=0.5, clock=clock)
+    revoked = [uuid.uuid4().hex for _ in range(3)]
+    for sid in revoked:
+        revocations.revoke_session(sid)
+    # İlk nesil kapandı (sıralı dizi), ikincisinin parmak izi henüz birleştirilmedi
+    assert [g["entries"] for g in revocations.stats()["generations"]] == [2, 1]
+
+    assert all(revocations.is_revoked("u1", sid, clock.now) for sid in revoked)
+    others = [uuid.uuid4().hex for _ in range(200)]
+    assert not any(revocations.is_revoked("u1", sid, clock.now) for sid in others)
+    # Filtre boyu kadar kaydırılmış sid aynı bitlere düşer ama parmak izi farklı:
+    # rastgele sid'lere bel bağlamadan kesin bir Bloom isabeti
+    collision = f"{int(revoked[0], 16) + BloomFilter(2, 0.5).size:032x}"
+    assert not revocations.is_revoked("u1", collision, clock.now)
+    assert revocations.stats()["bloom_false_positives"] > 0
+    assert revocations.rejected == 3
+
+
+class FlakyCollection:
+    """İlk `failures` insert_many çağrısı bağlantı hatası verir"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.documents = []
+
+    async def insert_many(self, documents, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("primary yok")
+        self.documents.extend(documents)
+
+
+def test_failed_publish_applies_locally_and_is_republished(monkeypatch):
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+    # CappedLog 3 kez dener: ilk yayın tamamen başarısız, yeniden yayın ikinci denemede yazılır
+    collection = FlakyCollection(failures=4)
+    service = RevocationService({"token_revocations": collection}, ttl_seconds=60)
+    sid = uuid.uuid4().hex
+
+    async def scenario():
+        await service.revoke_sessions([sid])
+        assert service.is_revoked("u1", sid, None)
+        assert service.stats()["unpublished"] == 1
+        await service._retry_task
+
+    asyncio.run(scenario())
+    assert [d["sids"] for d in collection.documents] == [[sid]]
+    assert service.stats()["unpublished"] == 0
+    assert service.stats()["publish_errors"] == 1
+
+
+def test_publish_does_not_apply_locally_when_insert_fails(monkeypatch):
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+    service = RevocationService({"token_revocations": FlakyCollection(failures=3)}, ttl_seconds=60)
+    applied = []
+    service.log.handler = applied.append
+
+    async def scenario():
+        try:
+            await service.log.publish({"kind": "session", "sids": ["ab"]})
+        except AutoReconnect:
+            return True
+
+    assert asyncio.run(scenario())
+    assert applied == []
+
+
+async def _no_sleep(seconds):
+    pass
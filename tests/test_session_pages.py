@@ -0,0 +1,104 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from session_pages import after_cursor, decode_cursor, encode_cursor, fetch_page  # noqa: E402
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not (key in doc and all(op == "$lt" and doc[key] < value for op, value in condition.items())):
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    def sort(self, keys: list):
+        for field, direction in reversed(keys):
+            self.rows.sort(key=lambda row: row[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n: int):
+        self.rows = self.rows[:n]
+        return self
+
+    async def to_list(self, length: int):
+        return self.rows[:length]
+
+
+class FakeCollection:
+    """find(query, projection).sort().limit().to_list() - fetch_page'in kullandığı kadarı"""
+
+    def __init__(self, docs: list):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query: dict, projection: dict):
+        self.queries.append(query)
+        return FakeCursor([{k: v for k, v in doc.items() if k in projection}
+                           for doc in self.docs if matches(doc, query)])
+
+
+def test_cursor_round_trip_keeps_millisecond_and_object_id():
+    oid = ObjectId()
+    last_used_at = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor({"_id": oid, "last_used_at": last_used_at})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (last_used_at.replace(microsecond=123000), oid)
+    # Eski kayıt: last_used_at yok → cursor üretilmez
+    assert encode_cursor({"_id": oid}) is None
+    assert after_cursor(cursor)["$or"][1] == {"last_used_at": last_used_at.replace(microsecond=123000), "_id": {"$lt": oid}}
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "AAAA", encode_cursor(
+    {"_id": ObjectId(), "last_used_at": datetime(2026, 1, 1)})[:-2]])
+def test_malformed_cursor_is_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_every_session_once_with_ties_broken_by_id():
+    base = datetime(2026, 5, 1)
+    docs = []
+    for n in range(23):
+        # Üçerli gruplar aynı last_used_at'e sahip: sınır bir grubun ortasına düşer
+        docs.append({"_id": ObjectId(), "user_id": "u1", "last_used_at": base - timedelta(minutes=n // 3),
+                     "user_agent": "x" * 200})
+    docs.append({"_id": ObjectId(), "user_id": "u2", "last_used_at": base})
+    collection = FakeCollection(docs)
+    fields = {"_id": 1, "last_used_at": 1}
+
+    async def walk(limit: int):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = await fetch_page(collection, {"user_id": "u1"}, fields, limit, cursor)
+            pages.append(rows)
+            if cursor is None:
+                return pages
+
+    pages = asyncio.run(walk(4))
+    assert [len(rows) for rows in pages] == [4, 4, 4, 4, 4, 3]
+    seen = [row["_id"] for rows in pages for row in rows]
+    expected = sorted((d for d in docs if d["user_id"] == "u1"),
+                      key=lambda d: (d["last_used_at"], d["_id"]), reverse=True)
+    assert seen == [d["_id"] for d in expected]
+    assert all(set(row) == {"_id", "last_used_at"} for rows in pages for row in rows)
+
+    # Tam sayfa: sonraki sayfa yoksa cursor da yok
+    rows, cursor = asyncio.run(fetch_page(collection, {"user_id": "u1"}, fields, 23))
+    assert len(rows) == 23 and cursor is None
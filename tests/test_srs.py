@@ -0,0 +1,188 @@
+import asyncio
+import math
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from srs import FlashcardDeck, SpacedRepetition, _review_stages, schedule  # noqa: E402
+from term_catalogue import TermCatalogue  # noqa: E402
+
+T0 = datetime(2026, 3, 1, 9, 30)
+
+
+def evaluate(expr, doc: dict):
+    """_review_stages'in kullandığı aggregation ifadelerinin küçük bir yorumlayıcısı"""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if not isinstance(expr, dict):
+        return expr
+    (op, args), = expr.items()
+    if op == "$switch":
+        for branch in args["branches"]:
+            if evaluate(branch["case"], doc):
+                return evaluate(branch["then"], doc)
+        return evaluate(args["default"], doc)
+    values = [evaluate(arg, doc) for arg in args] if isinstance(args, list) else [evaluate(args, doc)]
+    if op == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$max":
+        return max(values)
+    if op == "$min":
+        return min(values)
+    if op == "$floor":
+        return math.floor(values[0])
+    if op == "$multiply":
+        return math.prod(values)
+    if op == "$add":
+        # Tarih + sayı = tarih + milisaniye
+        dates = [v for v in values if isinstance(v, datetime)]
+        total = sum(v for v in values if not isinstance(v, datetime))
+        return dates[0] + timedelta(milliseconds=total) if dates else total
+    raise AssertionError(f"desteklenmeyen operatör {op}")
+
+
+def run_pipeline(pipeline: list, doc: dict) -> dict:
+    for stage in pipeline:
+        (op, fields), = stage.items()
+        assert op == "$set"
+        # $set'teki ifadeler aşamanın girdisini görür
+        doc = {**doc, **{name: evaluate(expr, doc) for name, expr in fields.items()}}
+    return doc
+
+
+@pytest.mark.parametrize("grades", [
+    [4, 4, 4, 4, 4],
+    [5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5],
+    [4, 1, 3, 3, 2, 5, 5, 0, 4],
+    [0, 0, 0, 3, 3, 3, 3, 3, 3, 3],
+    [3, 5, 4, 2, 1, 4, 5, 5, 3],
+])
+def test_pipeline_matches_schedule(grades):
+    expected, actual = {}, {}
+    for n, grade in enumerate(grades):
+        at = T0 + timedelta(days=n * 3, minutes=n)
+        expected = schedule(expected, grade, at)
+        actual = run_pipeline(_review_stages(grade, at), actual)
+        assert set(actual) == set(expected)
+        for field in ("reps", "interval", "lapses", "reviews", "last_reviewed_at", "due_at"):
+            assert actual[field] == expected[field], (n, field)
+        assert actual["ease"] == pytest.approx(expected["ease"])
+
+
+def test_interval_is_capped_like_schedule():
+    state = {"reps": 5, "interval": 3000, "ease": 2.5}
+    assert schedule(state, 5, T0)["interval"] == run_pipeline(_review_stages(5, T0), state)["interval"] == 3650
+
+
+def test_build_operations_applies_reviews_in_time_order():
+    repetition = SpacedRepetition(SimpleNamespace(flashcard_state=None, flashcard_positions=None))
+    now = T0 + timedelta(days=1)
+    late, early = now - timedelta(hours=1), now - timedelta(hours=5)
+    operations = repetition.build_operations("u1", [
+        {"card_id": "c1", "grade": 1, "reviewed_at": late},
+        {"card_id": "c1", "grade": 5, "reviewed_at": early},
+        {"card_id": "c2", "grade": 4, "reviewed_at": now - timedelta(days=30)},  # 7 güne kırpılır
+    ], now=now)
+    assert [op._filter for op in operations] == [{"_id": "u1:c1"}, {"_id": "u1:c2"}]
+
+    c1 = run_pipeline(operations[0]._doc, {})
+    assert c1 == {**schedule(schedule({}, 5, early), 1, late), "user_id": "u1", "card_id": "c1"}
+    assert run_pipeline(operations[1]._doc, {})["last_reviewed_at"] == now - timedelta(days=7)
+
+
+def record(term_id, system, kind="term"):
+    return {"id": term_id, "kind": kind, "term": f"T{term_id}", "turkish": "", "roots": "",
+            "definition": "", "system": system, "category": "test"}
+
+
+def make_deck() -> FlashcardDeck:
+    records = [record(f"k{i}", "Kalp") for i in range(30)] + [record(f"s{i}", "Sinir") for i in range(10)]
+    return FlashcardDeck(TermCatalogue(records + [record("r1", "Kalp", kind="root"), record("x1", "")]))
+
+
+def test_deck_pools_hold_only_terms_with_a_system():
+    deck = make_deck()
+    assert len(deck.candidates()) == 40 and len(deck.candidates("Kalp")) == 30
+    assert not any(card_id in ("r1", "x1") for card_id in deck.candidates())
+    assert deck.candidates("Bilinmeyen") == ()
+
+
+class FakeState:
+    def __init__(self, seen=()):
+        self.seen = set(seen)
+        self.probed = []
+
+    def find(self, query, projection=None):
+        ids = query["_id"]["$in"]
+        self.probed.append(len(ids))
+        return SimpleNamespace(to_list=lambda length: _done([{"_id": i} for i in ids if i in self.seen]))
+
+
+class FakePositions:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, pipeline, upsert=False):
+        stage = pipeline[0]["$set"]
+        self.docs[query["_id"]] = {"version": stage["version"], "position": stage["position"]["$cond"][2]}
+
+
+async def _done(value):
+    return value
+
+
+def test_unseen_cards_resume_from_the_stored_position():
+    deck = make_deck()
+    kalp = deck.candidates("Kalp")
+    state, positions = FakeState(), FakePositions()
+    repetition = SpacedRepetition(SimpleNamespace(flashcard_state=state, flashcard_positions=positions))
+
+    async def unseen(limit=5):
+        return await repetition.unseen_cards("u1", deck, "Kalp", limit)
+
+    assert asyncio.run(unseen()) == list(kalp[:5])
+    # Gösterilen ama değerlendirilmeyen kartlar tekrar gelir, konum ilerlemez
+    assert asyncio.run(unseen()) == list(kalp[:5])
+    assert "u1:Kalp" not in positions.docs
+
+    state.seen |= {f"u1:{card_id}" for card_id in kalp[:12]} | {f"u1:{kalp[14]}"}
+    assert asyncio.run(unseen()) == [kalp[12], kalp[13], kalp[15], kalp[16], kalp[17]]
+    assert positions.docs["u1:Kalp"] == {"version": deck.version, "position": 12}
+
+    # Sonraki istek baştan değil 12. adaydan başlar: tek pencere
+    state.probed.clear()
+    assert asyncio.run(unseen())[0] == kalp[12]
+    assert state.probed == [10]
+
+    # Yeni bir worker konumu flashcard_positions'tan okur
+    fresh = SpacedRepetition(SimpleNamespace(flashcard_state=state, flashcard_positions=positions))
+    state.probed.clear()
+    assert asyncio.run(fresh.unseen_cards("u1", deck, "Kalp", 5))[0] == kalp[12]
+    assert state.probed == [10]
+
+
+def test_position_is_ignored_after_catalogue_change():
+    deck = make_deck()
+    state, positions = FakeState(), FakePositions()
+    positions.docs["u1:"] = {"version": "eski-sürüm", "position": 35}
+    repetition = SpacedRepetition(SimpleNamespace(flashcard_state=state, flashcard_positions=positions))
+    assert asyncio.run(repetition.unseen_cards("u1", deck, None, 3)) == list(deck.candidates()[:3])
+
+
+def test_position_cache_is_bounded():
+    deck = make_deck()
+    repetition = SpacedRepetition(SimpleNamespace(flashcard_state=FakeState(), flashcard_positions=FakePositions()),
+                                  position_cache_size=2)
+    for user in ("u1", "u2", "u3"):
+        asyncio.run(repetition.unseen_cards(user, deck, "Sinir", 1))
+    assert list(repetition._positions) == ["u2:Sinir", "u3:Sinir"]
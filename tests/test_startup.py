@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import mongo_indexes  # noqa: E402
+import startup  # noqa: E402
+from mongo_indexes import SCHEMA_VERSION, ensure_indexes  # noqa: E402
+from startup import lazy_import  # noqa: E402
+
+
+def test_lazy_module_imports_on_first_attribute(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = lazy_import("colorsys")
+    assert lazy_import("colorsys") is module
+    assert "not loaded" in repr(module)
+    assert "colorsys" not in sys.modules
+
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules and "(loaded)" in repr(module)
+    assert startup.startup_profiler.lazy["colorsys"]["ms"] >= 0
+
+
+class FakeCollection:
+    def __init__(self, calls: list, name: str, doc: dict = None):
+        self.calls = calls
+        self.name = name
+        self.doc = doc
+
+    async def find_one(self, query, projection=None):
+        self.calls.append(("find_one", self.name))
+        return self.doc
+
+    async def update_one(self, query, update, upsert=False):
+        self.calls.append(("update_one", self.name))
+        self.doc = {"_id": query["_id"], **update["$set"]}
+
+    async def index_information(self):
+        self.calls.append(("index_information", self.name))
+        return {}
+
+    async def create_index(self, keys, name, **options):
+        self.calls.append(("create_index", self.name))
+
+
+class FakeDb:
+    def __init__(self, meta: dict = None):
+        self.calls = []
+        self.collections = {"schema_meta": FakeCollection(self.calls, "schema_meta", meta)}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self.calls, name)
+        return self.collections[name]
+
+
+def test_current_schema_version_skips_index_commands():
+    db = FakeDb({"_id": "indexes", "version": SCHEMA_VERSION})
+    assert asyncio.run(ensure_indexes(db)) is None
+    assert db.calls == [("find_one", "schema_meta")]
+
+
+def test_stale_schema_version_applies_indexes_and_records_version():
+    db = FakeDb({"_id": "indexes", "version": "old"})
+    report = asyncio.run(ensure_indexes(db))
+    expected = sum(len(specs) for specs in mongo_indexes.INDEXES.values())
+    assert len(report["created"]) == expected and not report["errors"]
+    assert db.calls[-1] == ("update_one", "schema_meta")
+    assert db["schema_meta"].doc["version"] == SCHEMA_VERSION
+
+    # Sonraki başlangıç yalnızca sürümü okur
+    db.calls.clear()
+    assert asyncio.run(ensure_indexes(db)) is None
+    assert db.calls == [("find_one", "schema_meta")]
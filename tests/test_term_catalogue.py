@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from term_catalogue import TermCatalogue, _JsLiteralParser, fold, load_js_export  # noqa: E402
+
+
+def record(term_id, term, turkish="", roots="", definition="", system="", kind="term"):
+    return {"id": term_id, "kind": kind, "term": term, "turkish": turkish, "roots": roots,
+            "definition": definition, "system": system, "category": "test"}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("İskelet", "iskelet"),
+    ("ISKELET", "iskelet"),
+    ("ışık", "işik"),
+    ("Ischi/o", "ischio"),
+    ("Kalp-damar  (sistem)", "kalp damar sistem"),
+])
+def test_fold_collapses_turkish_dotted_and_dotless_i(text, expected):
+    assert fold(text) == expected
+
+
+def test_js_literal_parser_reads_frontend_syntax():
+    source = """{
+        // satır yorumu
+        id: 1, term: 'Kardi/o', "meaning": "Kalp \\"organı\\"",
+        note: 'it\\'s', ratio: -0.5, /* blok
+        yorum */ tags: ['a', "b",], ok: true, missing: null,
+    }"""
+    assert _JsLiteralParser(source).value() == {
+        "id": 1, "term": "Kardi/o", "meaning": 'Kalp "organı"', "note": "it's",
+        "ratio": -0.5, "tags": ["a", "b"], "ok": True, "missing": None,
+    }
+    with pytest.raises(ValueError):
+        _JsLiteralParser("{ id: undefined }").value()
+
+
+def test_load_js_export_reads_only_the_literal(tmp_path):
+    path = tmp_path / "data.js"
+    path.write_text("import x from 'y';\nexport const medicalTerms = [{ id: 1 }];\n"
+                    "export const helper = (a) => a.map(b => b);\n", encoding="utf-8")
+    assert load_js_export(path, "medicalTerms") == [{"id": 1}]
+    with pytest.raises(ValueError):
+        load_js_export(path, "medicalRoots")
+
+
+def make_catalogue():
+    return TermCatalogue([
+        record("1", "Carditis", turkish="Kalp iltihabı", system="Kalp"),
+        record("2", "Cardi/o", turkish="Kalp", system="Kalp", kind="root"),
+        record("3", "Pericarditis", turkish="Kalp zarı iltihabı", system="Kalp"),
+        record("4", "Arthritis", turkish="Eklem iltihabı", system="İskelet"),
+        record("5", "Osteoarthritis", turkish="Kireçlenme", definition="Eklem kıkırdağının aşınması",
+               system="İskelet"),
+        record("6", "Iskemi", turkish="Kansızlık", system="Kalp"),
+    ])
+
+
+def test_search_ranks_by_field_and_match_position():
+    catalogue = make_catalogue()
+    total, page = catalogue.search("carditis")
+    # Tam eşleşme, sonra kelime içinde geçen
+    assert total == 2
+    assert [r["id"] for r in page] == ["1", "3"]
+
+    # Terim başı (80) > Türkçe tam eşleşme (50) > Türkçe kelime başı (30)
+    total, page = catalogue.search("kalp")
+    assert [r["id"] for r in page] == ["2", "1", "3"]
+
+    # Tüm kelimeler eşleşmeli; alanlar arası toplanır
+    total, page = catalogue.search("eklem arthritis")
+    assert [r["id"] for r in page] == ["4", "5"]
+    assert catalogue.search("eklem carditis") == (0, [])
+
+    # İ ile yazılmış sorgu noktasız I ile yazılmış terimi bulur
+    assert [r["id"] for r in catalogue.search("İSKEMİ")[1]] == ["6"]
+
+
+def test_search_filters_and_paginates_in_static_order():
+    catalogue = make_catalogue()
+    total, everything = catalogue.search("")
+    assert total == len(catalogue) == 6
+    # Boş sorgu: kısa terim önce, sonra alfabetik
+    assert [r["term"] for r in everything] == [
+        "Cardi/o", "Iskemi", "Carditis", "Arthritis", "Pericarditis", "Osteoarthritis",
+    ]
+
+    pages = [catalogue.search("", offset=offset, limit=2) for offset in (0, 2, 4, 6)]
+    assert all(total == 6 for total, _ in pages)
+    assert [r["id"] for _, page in pages for r in page] == [r["id"] for r in everything]
+    assert pages[-1][1] == []
+
+    total, page = catalogue.search("iltihab", system="Kalp", kind="term")
+    assert total == 2 and {r["id"] for r in page} == {"1", "3"}
+    assert catalogue.search("c", kind="root")[0] == 1
+    assert catalogue.get("5")["definition"] == "Eklem kıkırdağının aşınması"
+    assert catalogue.get("missing") is None
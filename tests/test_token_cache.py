@@ -0,0 +1,52 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from token_cache import AccessTokenCache, TTLCache  # noqa: E402
+
+
+def test_entries_expire_at_token_exp():
+    cache = AccessTokenCache(max_size=10)
+    now = time.time()
+    cache.put("live", "u1", now + 60, sid="s1", iat=now)
+    cache.put("expired", "u2", now - 1)
+
+    assert cache.get("live") == ("u1", "s1", now)
+    assert cache.get("expired") is None
+    assert cache.get("unknown") is None
+    # Süresi dolan kayıt ilk okumada silinir
+    assert cache.stats() == {"size": 1, "max_size": 10, "hits": 1, "misses": 2}
+
+
+def test_least_recently_used_token_is_evicted():
+    cache = AccessTokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("a", "ua", exp)
+    cache.put("b", "ub", exp)
+    assert cache.get("a") is not None  # "a" en yeni olur
+    cache.put("c", "uc", exp)
+
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == "ua" and cache.get("c")[0] == "uc"
+    # Token metni bellekte tutulmaz, yalnızca özeti
+    assert all(isinstance(key, bytes) and len(key) == 32 for key in cache._entries)
+
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+def test_ttl_cache_expires_and_evicts():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None and len(cache) == 2
+    cache.pop("a")
+    assert cache.get("a") is None
+
+    expired = TTLCache(max_size=2, ttl=0)
+    expired.put("a", 1)
+    assert expired.get("a") is None and len(expired) == 0
@@ -0,0 +1,164 @@
+import asyncio
+import importlib
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from token_janitor import LEGACY_TTL_INDEXES, TokenJanitor  # noqa: E402
+
+NOW = datetime(2026, 1, 10, 12, 0)
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for field, cond in query.items():
+        if field == "$or":
+            if not any(matches(doc, branch) for branch in cond):
+                return False
+        elif "$in" in cond:
+            if doc.get(field) not in cond["$in"]:
+                return False
+        # Mongo tür sınırı: tarih olmayan değerler tarih aralığına girmez
+        elif not (isinstance(doc.get(field), datetime) and doc[field] < cond["$lt"]):
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs: list):
+        self.docs = docs
+
+    def sort(self, field: str, direction: int):
+        self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n: int):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return [{"_id": doc["_id"]} for doc in self.docs]
+
+
+class FakeTokens:
+    def __init__(self, docs: list):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return FakeCursor([doc for doc in self.docs.values() if matches(doc, query)])
+
+    async def delete_many(self, query):
+        doomed = [key for key, doc in self.docs.items() if matches(doc, query)]
+        for key in doomed:
+            del self.docs[key]
+        return SimpleNamespace(deleted_count=len(doomed))
+
+    async def count_documents(self, query):
+        return sum(matches(doc, query) for doc in self.docs.values())
+
+
+class FakeState:
+    def __init__(self):
+        self.saved = []
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        return {"_id": query["_id"], "checkpoint": None}
+
+    async def update_one(self, query, update):
+        self.saved.append(update["$set"]["checkpoint"])
+        return SimpleNamespace(matched_count=1)
+
+
+def token(n: int, **fields) -> dict:
+    now = datetime.utcnow()
+    return {"_id": n, "expires_at": now + timedelta(days=1), "created_at": now - timedelta(days=6),
+            "is_active": True, **fields}
+
+
+def test_pass_deletes_by_indexed_rules_only():
+    now = datetime.utcnow()
+    docs = [
+        token(1), token(2, is_active=False),  # logout / rotate: süresi dolana kadar kalır
+        token(3, expires_at=now - timedelta(seconds=5)),
+        token(4, expires_at=now - timedelta(days=2), is_active=False),
+        token(5, created_at=now - timedelta(days=91)),
+        token(6, expires_at=None, created_at="2020-01-01"),  # bozuk alanlar silinme sebebi değil
+    ] + [token(10 + i, expires_at=now - timedelta(minutes=i)) for i in range(7)]
+    tokens, state = FakeTokens(docs), FakeState()
+    janitor = TokenJanitor({"refresh_tokens": tokens, "janitor_state": state},
+                           scan_batch=3, delete_batch=50, max_rate=0)
+    janitor._repl_checks = False
+
+    assert asyncio.run(TokenJanitor({"refresh_tokens": tokens}, dry_run=True).run_pass())["deleted"] == 10
+    run = asyncio.run(janitor.run_pass())
+    assert run["deleted"] == run["examined"] == 10
+    assert sorted(tokens.docs) == [1, 2, 6]
+    # Pencereler hep bir kuralın aralık sorgusu; koleksiyon _id ile taranmıyor
+    assert all(set(query) in ({"expires_at"}, {"created_at"}) for query in tokens.queries)
+    assert state.saved == ["expired"] * 3 + ["max_age", None]
+
+
+def refresh_token_indexes(monkeypatch, token_janitor: str) -> tuple:
+    monkeypatch.setenv("TOKEN_JANITOR", token_janitor)
+    monkeypatch.delitem(sys.modules, "token_janitor", raising=False)
+    monkeypatch.delitem(sys.modules, "mongo_indexes", raising=False)
+    module = importlib.import_module("mongo_indexes")
+    return {spec["name"]: spec for spec in module.INDEXES["refresh_tokens"]}, module.SCHEMA_VERSION
+
+
+def test_ttl_indexes_are_registered_only_without_janitor(monkeypatch):
+    with_janitor, janitor_version = refresh_token_indexes(monkeypatch, "1")
+    assert not any("expireAfterSeconds" in spec for spec in with_janitor.values())
+    assert {"token_expires_at", "token_created_at"} <= set(with_janitor)
+
+    without_janitor, ttl_version = refresh_token_indexes(monkeypatch, "0")
+    ttl = {name: spec for name, spec in without_janitor.items() if "expireAfterSeconds" in spec}
+    assert set(ttl) == set(LEGACY_TTL_INDEXES)
+    assert ttl["old_tokens_cleanup_ttl"]["expireAfterSeconds"] == 90 * 24 * 60 * 60
+    # Mod değişince startup index'leri yeniden kurar
+    assert ttl_version != janitor_version
+
+
+class SlowCollection:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.batches = []
+
+    async def delete_many(self, query):
+        self.batches.append(len(query["_id"]["$in"]))
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(deleted_count=len(query["_id"]["$in"]))
+
+
+def test_slow_deletes_shrink_batch_and_count_as_pause():
+    collection = SlowCollection(delay=0.02)
+    janitor = TokenJanitor({"refresh_tokens": collection}, delete_batch=400, max_rate=0, max_batch_ms=5)
+
+    async def scenario():
+        for _ in range(3):
+            await janitor._delete(list(range(janitor.delete_batch)), NOW)
+
+    asyncio.run(scenario())
+    assert collection.batches == [400, 200, 100]
+    assert janitor.pauses["latency"] == 1
+    assert janitor.paused_reason == "latency"
+
+
+def test_rate_ceiling_spaces_out_fast_deletes():
+    collection = SlowCollection(delay=0)
+    janitor = TokenJanitor({"refresh_tokens": collection}, delete_batch=100, max_rate=2000, max_batch_ms=1000)
+
+    async def scenario():
+        for _ in range(4):
+            await janitor._delete(list(range(100)), NOW)
+
+    started = time.monotonic()
+    asyncio.run(scenario())
+    # 400 silme / 2000 s⁻¹ = en az 0.2s
+    assert time.monotonic() - started >= 0.19
+    assert janitor.paused_reason is None
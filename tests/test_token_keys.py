@@ -0,0 +1,64 @@
+import hashlib
+import sys
+import uuid
+from pathlib import Path
+
+from bson.binary import UUID_SUBTYPE, Binary
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import token_keys  # noqa: E402
+from maintenance import _hashed_keys_update  # noqa: E402
+from token_keys import jti_from_str, record_sid, session_key, token_digest, token_exclude, token_match  # noqa: E402
+
+
+def test_jti_from_str_keeps_uuids_and_hashes_anything_else():
+    value = uuid.uuid4()
+    for text in (str(value), value.hex, str(value).upper()):
+        converted = jti_from_str(text)
+        assert converted == Binary(value.bytes, UUID_SUBTYPE)
+        assert converted.subtype == UUID_SUBTYPE
+
+    legacy = jti_from_str("legacy-jti-42")
+    assert legacy == Binary(hashlib.sha256(b"legacy-jti-42").digest()[:16], UUID_SUBTYPE)
+    # Aynı eski değer her çalıştırmada aynı anahtara döner
+    assert jti_from_str("legacy-jti-42") == legacy
+    assert jti_from_str("legacy-jti-43") != legacy
+
+
+def test_record_sid_matches_session_key():
+    jti = token_keys.new_jti()
+    sid = token_keys.new_jti()
+    assert record_sid({"jti": jti, "sid": sid}) == bytes(sid).hex()
+    # sid'i olmayan eski kayıt: zincirin kimliği jti, string jti de aynı hex'e çevrilir
+    assert record_sid({"jti": jti}) == bytes(jti).hex()
+    assert record_sid({"jti": "legacy"}) == bytes(jti_from_str("legacy")).hex()
+    assert record_sid({}) is None
+    assert session_key(record_sid({"sid": sid})) == sid
+
+
+def test_hashed_keys_update_converts_only_legacy_fields():
+    jti = uuid.uuid4()
+    binary_jti = token_keys.new_jti()
+    update = _hashed_keys_update({
+        "_id": 1, "token": "plain-token", "jti": str(jti), "rotated_from": "", "rotated_to": binary_jti,
+    })
+    assert update == {
+        "$set": {"token": token_digest("plain-token"), "jti": Binary(jti.bytes, UUID_SUBTYPE)},
+        "$unset": {"rotated_from": ""},
+    }
+    assert len(update["$set"]["token"]) == token_keys.DIGEST_SIZE
+
+    # Zaten dönüştürülmüş doküman: boş update yerine hiçbir operatör yok
+    assert _hashed_keys_update({"_id": 2, "token": token_digest("x"), "jti": binary_jti}) == {}
+    assert _hashed_keys_update({"_id": 3, "rotated_to": "legacy"}) == {"$set": {"rotated_to": jti_from_str("legacy")}}
+
+
+def test_token_queries_accept_plaintext_only_during_migration(monkeypatch):
+    digest = token_digest("tok")
+    monkeypatch.setattr(token_keys, "PLAINTEXT_FALLBACK", True)
+    assert token_match("tok") == {"$in": [digest, "tok"]}
+    assert token_exclude("tok") == {"$nin": [digest, "tok"]}
+    monkeypatch.setattr(token_keys, "PLAINTEXT_FALLBACK", False)
+    assert token_match("tok") == digest
+    assert token_exclude("tok") == {"$ne": digest}